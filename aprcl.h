@@ -67,11 +67,32 @@ typedef enum
     PROBABPRIME
 } primality_test_status;
 
+/* Pair (q, p) with q | s, p | q - 1 and p^k the exact power of p in q - 1 */
+typedef struct
+{
+    ulong q;
+    ulong p;
+    ulong k;
+    int pind;       /* index of p in the factorisation of R */
+} _aprcl_pair_struct;
+
+/* flags shared between the threads checking the pairs */
+#if FLINT_USES_PTHREAD && (__GNUC__ > 4 || (__GNUC__ == 4 && __GNUC_MINOR__ >= 8))
+#define _APRCL_FLAG_LOAD(x) __atomic_load_n(&(x), __ATOMIC_RELAXED)
+#define _APRCL_FLAG_STORE(x, v) __atomic_store_n(&(x), (v), __ATOMIC_RELAXED)
+#else
+#define _APRCL_FLAG_LOAD(x) (*((volatile int *) &(x)))
+#define _APRCL_FLAG_STORE(x, v) (*((volatile int *) &(x)) = (v))
+#endif
+
 /* Useful functions */
 FLINT_DLL int _aprcl_p_ind(const aprcl_config conf, ulong p);
 
 FLINT_DLL ulong aprcl_p_power_in_q(ulong q, ulong p);
 
+FLINT_DLL slong _aprcl_config_pairs(_aprcl_pair_struct ** pairs,
+                                                   const aprcl_config conf);
+
 FLINT_DLL int aprcl_is_mul_coprime_ui_ui(ulong x, ulong y, const fmpz_t n);
 
 FLINT_DLL int aprcl_is_mul_coprime_ui_fmpz(ulong x, const fmpz_t y, const fmpz_t n);
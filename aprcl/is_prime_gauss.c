@@ -10,6 +10,8 @@
 */
 
 #include "aprcl.h"
+#include "thread_support.h"
+#include "ctrl.h"
 
 /*
     Returns 1 if \tau^{\sigma_n-n}(\chi)=-1; otherwise returns 0.
@@ -148,11 +150,171 @@ _aprcl_is_gausspower_from_unity_p(ulong q, ulong r, const fmpz_t n)
     return result;
 }
 
+/*
+    Checks the pair (q, p) for every prime power r = p^k | q - 1. Returns 0
+    if n is proved composite; otherwise returns 1 and sets state to the
+    parts of (Lp) shown by these checks, as for lambdas_p below. Checks of
+    (Lp) are skipped once lambdas_p = 3.
+*/
+static int
+_aprcl_is_prime_gauss_pair(int * state_out, const int * lambdas,
+                   const _aprcl_pair_struct * pair, const fmpz_t n, ulong nmod4)
+{
+    int state;
+    ulong k, p, q;
+
+    q = pair->q;
+    p = pair->p;
+    state = (_APRCL_FLAG_LOAD(lambdas[pair->pind]) == 3) ? 3 : 0;
+
+    /*
+        (Lp.a)
+        if p == 2 and n = 1 mod 4 then (Lp) is equal to:
+            for quadratic character \chi (\tau(\chi))^(\sigma_n-n) = -1
+    */
+    if (p == 2 && state == 0 && nmod4 == 1)
+    {
+        if (_aprcl_is_gausspower_2q_equal_first(q, n) == 1)
+            state = 3;
+    }
+
+    /*
+        (Lp.b)
+        if p == 2, r = 2^k >= 4 and n = 3 mod 4 then (Lp) is equal to:
+            1) for quadratic character \chi 
+                (\tau(\chi^(r / 2)))^(\sigma_n-n) = -1
+            2) for character \chi = \chi_{r, q}
+                (\tau(\chi))^(\sigma_n-n) is a generator of cyclic 
+                group <\zeta_r>
+
+        if 1) is true, then lambdas_p = 1
+        if 2) is true, then lambdas_p = 2
+        if 1) and 2) is true, then lambdas_p = 3
+    */
+    if (p == 2 && (state == 0 || state == 2) && nmod4 == 3)
+    {
+        if (_aprcl_is_gausspower_2q_equal_second(q, n) == 1)
+        {
+            if (state == 2)
+                state = 3;
+            else
+                state = 1;
+        }
+    }
+
+    /* for every prime power p^k | q - 1 */
+    for (k = 1; k <= pair->k; k++)
+    {
+        int unity_power;
+        ulong r;
+
+        /* r = p^k */
+        r = n_pow(p, k);
+
+        /* if gcd(q*r, n) != 1 */
+        if (aprcl_is_mul_coprime_ui_ui(q, r, n) == 0)
+            return 0;
+
+        /* 
+            if exists z such that \tau(\chi^n) = \zeta_r^z*\tau^n(\chi) 
+            unity_power = z; otherwise unity_power = -1
+        */
+        unity_power = _aprcl_is_gausspower_from_unity_p(q, r, n);
+
+        /* if unity_power < 0 then n is composite */
+        if (unity_power < 0)
+            return 0;
+
+        /*
+            (Lp.c)
+            if p > 2 then (Lp) is equal to:
+                (\tau(\chi))^(\sigma_n - n) is a generator of cyclic 
+                group <\zeta_r>
+        */
+        if (p > 2 && state == 0 && unity_power > 0)
+        {
+            ulong upow = unity_power;
+            /* 
+                if gcd(r, unity_power) = 1 then 
+                (\tau(\chi))^(\sigma_n - n) is a generator
+            */
+            if (n_gcd(r, upow) == 1)
+                state = 3;
+        }
+
+        /*
+            (Lp.b)
+            check 2) of (Lp) if p == 2 and nmod4 == 3
+        */
+        if (p == 2 && unity_power > 0 
+            && (state == 0 || state == 1) && nmod4 == 3)
+        {
+            ulong upow = unity_power;
+            if (n_gcd(r, upow) == 1)
+                state |= 2;
+        }
+    }
+
+    *state_out = state;
+
+    return 1;
+}
+
+typedef struct
+{
+    const fmpz * n;
+    ulong nmod4;
+    const _aprcl_pair_struct * pairs;
+    slong num;
+    int * lambdas;              /* pairs proving (Lp) set lambdas_p = 3 */
+    int * states;               /* the part of (Lp) shown by each pair */
+    int * status;               /* 0 if not checked, 1 if passed, 2 if not */
+    flint_ctrl_struct * ctrl;
+    int stop;
+}
+_aprcl_is_prime_gauss_struct;
+
+static void
+_aprcl_is_prime_gauss_worker(slong start, slong stop, void * varg)
+{
+    _aprcl_is_prime_gauss_struct * arg = (_aprcl_is_prime_gauss_struct *) varg;
+    flint_ctrl_struct * prev;
+    slong i;
+
+    prev = flint_ctrl_attach(arg->ctrl);
+
+    for (i = start; i < stop && !_APRCL_FLAG_LOAD(arg->stop); i++)
+    {
+        if (flint_ctrl_check("aprcl_is_prime", i, arg->num))
+        {
+            _APRCL_FLAG_STORE(arg->stop, 1);
+            break;
+        }
+
+        if (_aprcl_is_prime_gauss_pair(arg->states + i, arg->lambdas,
+                                      arg->pairs + i, arg->n, arg->nmod4))
+        {
+            arg->status[i] = 1;
+
+            if (arg->states[i] == 3)
+                _APRCL_FLAG_STORE(arg->lambdas[arg->pairs[i].pind], 3);
+        }
+        else
+        {
+            /* n is composite, abandon all other pairs */
+            arg->status[i] = 2;
+            _APRCL_FLAG_STORE(arg->stop, 1);
+        }
+    }
+
+    flint_ctrl_attach(prev);
+}
+
 primality_test_status
 _aprcl_is_prime_gauss(const fmpz_t n, const aprcl_config config)
 {
     int *lambdas;
-    ulong i, j, k, nmod4;
+    ulong i, nmod4;
     primality_test_status result;
 
     /* 
@@ -172,150 +334,55 @@ _aprcl_is_prime_gauss(const fmpz_t n, const aprcl_config config)
     /* nmod4 = n % 4 */
     nmod4 = fmpz_tdiv_ui(n, 4);
 
-    /* for every prime q | s */
-    for (i = 0; i < config->qs->num; i++)
+    /*
+        The pairs (q, p) with q | s and p | q - 1 are independent and are
+        checked in parallel; the first composite witness stops the others.
+    */
     {
-        n_factor_t q_factors;
-        ulong q;
-        if (result == COMPOSITE) break;
-
-        q = fmpz_get_ui(config->qs->p + i);
+        _aprcl_is_prime_gauss_struct arg;
+        _aprcl_pair_struct * pairs;
+        slong num;
 
         /* n == q, q - prime => n - prime */
-        if (fmpz_equal_ui(n, q))
+        for (i = 0; i < config->qs->num; i++)
         {
-            result = PRIME;
-            break;
+            if (fmpz_equal(n, config->qs->p + i))
+                result = PRIME;
         }
 
-        /* find prime factors of q - 1 */
-        n_factor_init(&q_factors);
-        n_factor(&q_factors, q - 1, 1);
-
-        /* for every prime p | q - 1 */
-        for (j = 0; j < q_factors.num; j++)
-        {
-            int state, pind;
-            ulong p;
-            if (result == COMPOSITE) break;
+        num = _aprcl_config_pairs(&pairs, config);
 
-            p = q_factors.p[j];
+        arg.n = n;
+        arg.nmod4 = nmod4;
+        arg.pairs = pairs;
+        arg.num = num;
+        arg.lambdas = lambdas;
+        arg.states = (int *) flint_calloc(num + 1, sizeof(int));
+        arg.status = (int *) flint_calloc(num + 1, sizeof(int));
+        arg.ctrl = flint_ctrl_current();
+        arg.stop = 0;
 
-            pind = _aprcl_p_ind(config, p);
-            state = lambdas[pind];
+        if (result != PRIME)
+            flint_parallel_for(0, num, 1, _aprcl_is_prime_gauss_worker, &arg);
 
-            /*
-                (Lp.a)
-                if p == 2 and n = 1 mod 4 then (Lp) is equal to:
-                    for quadratic character \chi (\tau(\chi))^(\sigma_n-n) = -1
-            */
-            if (p == 2 && state == 0 && nmod4 == 1)
+        for (i = 0; i < num && result != PRIME; i++)
+        {
+            if (arg.status[i] == 2)
             {
-                if (_aprcl_is_gausspower_2q_equal_first(q, n) == 1)
-                {
-                    state = 3;
-                    lambdas[pind] = state;
-                }
+                result = COMPOSITE;
+                break;
             }
 
-            /*
-                (Lp.b)
-                if p == 2, r = 2^k >= 4 and n = 3 mod 4 then (Lp) is equal to:
-                    1) for quadratic character \chi 
-                        (\tau(\chi^(r / 2)))^(\sigma_n-n) = -1
-                    2) for character \chi = \chi_{r, q}
-                        (\tau(\chi))^(\sigma_n-n) is a generator of cyclic 
-                        group <\zeta_r>
-
-                if 1) is true, then lambdas_p = 1
-                if 2) is true, then lambdas_p = 2
-                if 1) and 2) is true, then lambdas_p = 3
-            */
-            if (p == 2 && (state == 0 || state == 2) && nmod4 == 3)
-            {
-                if (_aprcl_is_gausspower_2q_equal_second(q, n) == 1)
-                {
-                    if (state == 2)
-                        state = 3;
-                    else
-                        state = 1;
-                    lambdas[pind] = state;
-                }
-            }
+            /* the computation was stopped */
+            if (arg.status[i] == 0)
+                result = UNKNOWN;
 
-            /* for every prime power p^k | q - 1 */
-            for (k = 1; k <= q_factors.exp[j]; k++)
-            {
-                int unity_power;
-                ulong r;
-
-                /* r = p^k */
-                r = n_pow(p, k);
-
-                /* if gcd(q*r, n) != 1 */
-                if (aprcl_is_mul_coprime_ui_ui(q, r, n) == 0)
-                {
-                    result = COMPOSITE;
-                    break;
-                }
-
-                /* 
-                    if exists z such that \tau(\chi^n) = \zeta_r^z*\tau^n(\chi) 
-                    unity_power = z; otherwise unity_power = -1
-                */
-                unity_power = _aprcl_is_gausspower_from_unity_p(q, r, n);
-
-                /* if unity_power < 0 then n is composite */
-                if (unity_power < 0)
-                {
-                    result = COMPOSITE;
-                    break;
-                }
-
-                /*
-                    (Lp.c)
-                    if p > 2 then (Lp) is equal to:
-                        (\tau(\chi))^(\sigma_n - n) is a generator of cyclic 
-                        group <\zeta_r>
-                */
-                if (p > 2 && state == 0 && unity_power > 0)
-                {
-                    ulong upow = unity_power;
-                    /* 
-                        if gcd(r, unity_power) = 1 then 
-                        (\tau(\chi))^(\sigma_n - n) is a generator
-                    */
-                    if (n_gcd(r, upow) == 1)
-                    {
-                        state = 3;
-                        lambdas[pind] = state;
-                    }
-                }
-
-                /*
-                    (Lp.b)
-                    check 2) of (Lp) if p == 2 and nmod4 == 3
-                */
-                if (p == 2 && unity_power > 0 
-                    && (state == 0 || state == 1) && nmod4 == 3)
-                {
-                    ulong upow = unity_power;
-                    if (n_gcd(r, upow) == 1)
-                    {
-                        if (state == 0) 
-                        { 
-                            state = 2;
-                            lambdas[pind] = state;
-                        }
-                        if (state == 1)
-                        {
-                            state = 3;
-                            lambdas[pind] = state;
-                        }
-                    }
-                }
-            }
+            lambdas[pairs[i].pind] |= arg.states[i];
         }
+
+        flint_free(arg.states);
+        flint_free(arg.status);
+        flint_free(pairs);
     }
 
     /* 
@@ -388,7 +455,7 @@ aprcl_is_prime_gauss(const fmpz_t n)
         not proved (Lp) for some p (most likely we fail L.c step); 
         we can try to use bigger R
     */
-    if (result == PROBABPRIME)
+    if (result == PROBABPRIME && !flint_ctrl_stopped())
     {
         R = R * 2;
         aprcl_config_gauss_init_min_R(config, n, R);
@@ -396,7 +463,7 @@ aprcl_is_prime_gauss(const fmpz_t n)
         aprcl_config_gauss_clear(config);
     }
 
-    if (result == PROBABPRIME)
+    if (result == PROBABPRIME && !flint_ctrl_stopped())
     {
         R = R * 3;
         aprcl_config_gauss_init_min_R(config, n, R);
@@ -404,7 +471,7 @@ aprcl_is_prime_gauss(const fmpz_t n)
         aprcl_config_gauss_clear(config);
     }
 
-    if (result == PROBABPRIME)
+    if (result == PROBABPRIME && !flint_ctrl_stopped())
     {
         R = R * 5;
         aprcl_config_gauss_init_min_R(config, n, R);
@@ -412,6 +479,10 @@ aprcl_is_prime_gauss(const fmpz_t n)
         aprcl_config_gauss_clear(config);
     }
 
+    /* gave up */
+    if ((result == PROBABPRIME || result == UNKNOWN) && flint_ctrl_stopped())
+        return -1;
+
     if (result == PROBABPRIME || result == UNKNOWN)
     {
         flint_printf("aprcl_is_prime_gauss: failed to prove n prime\n");
@@ -10,6 +10,8 @@
 */
 
 #include "aprcl.h"
+#include "thread_support.h"
+#include "ctrl.h"
 
 /*
     Below is the implementation of primality test using Jacobi sums.
@@ -535,13 +537,173 @@ _aprcl_is_prime_jacobi_additional_test(const fmpz_t n, ulong p)
     return result;
 }
 
+/*
+    Pseudoprime test with Jacobi sums for the pair (q, p), see algorithm
+    (9.1.28) step 4 in [1]. Sets lambdas_p to 1 if the test shows that
+    (Lp) holds. Returns 0 if n is proved composite; otherwise returns 1.
+*/
+static int
+_aprcl_is_prime_jacobi_pair(int * lambdas, const _aprcl_pair_struct * pair,
+        const fmpz_t n, const fmpz_t ndec, const fmpz_t ndecdiv, ulong nmod4)
+{
+    int pind = pair->pind;
+    slong h;
+    ulong v, p, q, r, k;
+    fmpz_t u, q_pow;
+    unity_zp jacobi_sum, jacobi_sum2_1, jacobi_sum2_2;
+
+    q = pair->q;
+    p = pair->p;            /* p | q - 1 */
+    k = pair->k;            /* max k for which p^k | q - 1 */
+    r = n_pow(p, k);        /* r = p^k */
+
+    if (p == 2 && k == 1)
+    {
+        h = _aprcl_is_prime_jacobi_check_21(q, n);
+
+        /* if h not found then n is composite */
+        if (h < 0)
+            return 0;
+
+        /* 
+            check (Lp); 
+            if h == 1 (unity root = -1) 
+            and n % 4 == 1 then lambdas_2 = 1 
+        */
+        if (h == 1 && nmod4 == 1)
+            _APRCL_FLAG_STORE(lambdas[pind], 1);
+
+        return 1;
+    }
+
+    /* compute u = n / r and v = n % r */
+    fmpz_init(u);
+    fmpz_tdiv_q_ui(u, n, r);
+    v = fmpz_tdiv_ui(n, r);
+
+    /* init unity_zp for jacobi sums */
+    unity_zp_init(jacobi_sum, p, k, n);
+
+    /* compute set jacobi_sum = J(p, q) */
+    unity_zp_jacobi_sum_pq(jacobi_sum, q, p);
+
+    if (p == 2 && k == 2)
+    {
+        h = _aprcl_is_prime_jacobi_check_22(jacobi_sum, u, v, q);
+    }
+    else if (p == 2)
+    {
+        /* if p == 2 and k >= 3 we also need J_3(q) and J_2(q) */
+        unity_zp_init(jacobi_sum2_1, p, k, n);
+        unity_zp_init(jacobi_sum2_2, p, k, n);
+        unity_zp_jacobi_sum_2q_one(jacobi_sum2_1, q);
+        unity_zp_jacobi_sum_2q_two(jacobi_sum2_2, q);
+
+        h = _aprcl_is_prime_jacobi_check_2k(jacobi_sum,
+                jacobi_sum2_1, jacobi_sum2_2, u, v);
+
+        unity_zp_clear(jacobi_sum2_1);
+        unity_zp_clear(jacobi_sum2_2);
+    }
+    else
+    {
+        h = _aprcl_is_prime_jacobi_check_pk(jacobi_sum, u, v);
+    }
+
+    fmpz_clear(u);
+    unity_zp_clear(jacobi_sum);
+
+    /* if h not found then n is composite */
+    if (h < 0)
+        return 0;
+
+    if (p == 2)
+    {
+        /* 
+            check (Lp); 
+            if h % 2 != 0 (primitive unity root) 
+            and q^{(n - 1) / 2} = -1 mod n then lambdas_2 = 1
+        */
+        if (h % 2 != 0 && _APRCL_FLAG_LOAD(lambdas[pind]) == 0)
+        {
+            fmpz_init_set_ui(q_pow, q);
+            fmpz_powm(q_pow, q_pow, ndecdiv, n);
+
+            if (fmpz_equal(q_pow, ndec))
+                _APRCL_FLAG_STORE(lambdas[pind], 1);
+
+            fmpz_clear(q_pow);
+        }
+    }
+    else
+    {
+        /* 
+            check (Lp); 
+            if h % p != 0 (primitive unity root) 
+            then lambdas_p = 1
+        */
+        if (h % p != 0)
+            _APRCL_FLAG_STORE(lambdas[pind], 1);
+    }
+
+    return 1;
+}
+
+typedef struct
+{
+    const fmpz * n;
+    const fmpz * ndec;
+    const fmpz * ndecdiv;
+    ulong nmod4;
+    const _aprcl_pair_struct * pairs;
+    slong num;
+    int * lambdas;
+    int * status;               /* 0 if not checked, 1 if passed, 2 if not */
+    flint_ctrl_struct * ctrl;
+    int stop;
+}
+_aprcl_is_prime_jacobi_struct;
+
+static void
+_aprcl_is_prime_jacobi_worker(slong start, slong stop, void * varg)
+{
+    _aprcl_is_prime_jacobi_struct * arg = (_aprcl_is_prime_jacobi_struct *) varg;
+    flint_ctrl_struct * prev;
+    slong i;
+
+    prev = flint_ctrl_attach(arg->ctrl);
+
+    for (i = start; i < stop && !_APRCL_FLAG_LOAD(arg->stop); i++)
+    {
+        if (flint_ctrl_check("aprcl_is_prime", i, arg->num))
+        {
+            _APRCL_FLAG_STORE(arg->stop, 1);
+            break;
+        }
+
+        if (_aprcl_is_prime_jacobi_pair(arg->lambdas, arg->pairs + i,
+                            arg->n, arg->ndec, arg->ndecdiv, arg->nmod4))
+        {
+            arg->status[i] = 1;
+        }
+        else
+        {
+            /* n is composite, abandon all other pairs */
+            arg->status[i] = 2;
+            _APRCL_FLAG_STORE(arg->stop, 1);
+        }
+    }
+
+    flint_ctrl_attach(prev);
+}
+
 primality_test_status
 _aprcl_is_prime_jacobi(const fmpz_t n, const aprcl_config config)
 {
     int *lambdas;
-    ulong i, j, nmod4;
+    ulong i, nmod4;
     primality_test_status result;
-    fmpz_t temp, p2, ndec, ndecdiv, u, q_pow;
+    fmpz_t temp, p2, ndec, ndecdiv;
 
     /* deal with primes that can divide R */
     if (fmpz_cmp_ui(n, 2) == 0)
@@ -551,8 +713,6 @@ _aprcl_is_prime_jacobi(const fmpz_t n, const aprcl_config config)
        return PRIME;
 
     /* initialization */
-    fmpz_init(q_pow);
-    fmpz_init(u);
     fmpz_init(temp);
     fmpz_init(p2);
     fmpz_init(ndecdiv);
@@ -600,148 +760,55 @@ _aprcl_is_prime_jacobi(const fmpz_t n, const aprcl_config config)
     if (aprcl_is_mul_coprime_ui_fmpz(config->R, config->s, n) == 0)
         result = COMPOSITE;
 
-    /* Begin pseudoprime tests with Jacobi sums step. */
-    /* for every prime q | s */
-    for (i = 0; i < config->qs->num; i++)
+    /*
+        Begin pseudoprime tests with Jacobi sums step. The pairs (q, p)
+        are independent and are checked in parallel; the first composite
+        witness stops the others.
+    */
+    if (result != COMPOSITE)
     {
-        n_factor_t q_factors;
-        ulong q;
-
-        if (config->qs_used[i] == 0)
-            continue;
-
-        if (result == COMPOSITE)
-            break;
-
-        q = fmpz_get_ui(config->qs->p + i); /* set q; q must get into ulong */
+        _aprcl_is_prime_jacobi_struct arg;
+        _aprcl_pair_struct * pairs;
+        slong num;
 
         /* if n == q; q - prime => n - prime */
-        if (fmpz_equal_ui(n, q))
+        for (i = 0; i < config->qs->num; i++)
         {
-            result = PRIME;
-            break;
+            if (config->qs_used[i] != 0 && fmpz_equal(n, config->qs->p + i))
+                result = PRIME;
         }
 
-        /* find prime factors of q - 1 */
-        n_factor_init(&q_factors);
-        n_factor(&q_factors, q - 1, 1);
-
-        /* for every prime p | q - 1 */
-        for (j = 0; j < q_factors.num; j++)
-        {
-            int pind;
-            slong h;
-            ulong v, p, r, k;
-            unity_zp jacobi_sum, jacobi_sum2_1, jacobi_sum2_2;
-
-            if (result == COMPOSITE)
-                break;
-
-            p = q_factors.p[j];     /* set p; p | q - 1 */
-            k = q_factors.exp[j];   /* set max k for which p^k | q - 1 */
-            r = n_pow(p, k);        /* set r = p^k */
-            pind = _aprcl_p_ind(config, p);  /* find index of p in lambdas */
-
-            /* if lambdas_p == 0 set q_pow = q^{(n - 1) / 2} and p == 2 */
-            fmpz_set_ui(q_pow, q);
-            if (lambdas[pind] == 0 && p == 2)
-                fmpz_powm(q_pow, q_pow, ndecdiv, n);
-
-            /* compute u = n / r and v = n % r */
-            fmpz_tdiv_q_ui(u, n, r);
-            v = fmpz_tdiv_ui(n, r);
-
-            /* init unity_zp for jacobi sums */
-            unity_zp_init(jacobi_sum, p, k, n);
-            unity_zp_init(jacobi_sum2_1, p, k, n);
-            unity_zp_init(jacobi_sum2_2, p, k, n);
-
-            /* compute set jacobi_sum = J(p, q) */
-            unity_zp_jacobi_sum_pq(jacobi_sum, q, p);
-            /* if p == 2 and k >= 3 we also need to compute J_2(q) and J_3(q) */
-            if (p == 2 && k >= 3)
-            {
-                /* compute J_3(q) */
-                unity_zp_jacobi_sum_2q_one(jacobi_sum2_1, q);
-                /* compute J_2(q) */
-                unity_zp_jacobi_sum_2q_two(jacobi_sum2_2, q);
-            }
-
-            if (p == 2 && k == 1)
-            {
-                h = _aprcl_is_prime_jacobi_check_21(q, n);
-
-                /* if h not found then n is composite */
-                if (h < 0)
-                    result = COMPOSITE;
-
-                /* 
-                    check (Lp); 
-                    if h == 1 (unity root = -1) 
-                    and n % 4 == 1 then lambdas_2 = 1 
-                */
-                if (lambdas[pind] == 0 && h == 1 && nmod4 == 1)
-                    lambdas[pind] = 1;
-            }
-
-            if (p == 2 && k == 2)
-            {
-                h = _aprcl_is_prime_jacobi_check_22(jacobi_sum, u, v, q);
-
-                /* if h not found then n is composite */
-                if (h < 0)
-                    result = COMPOSITE;
-
-                /* 
-                    check (Lp); 
-                    if h == 1 or 3 (unity root = -i or i) 
-                    and q^{(n - 1) / 2} = -1 mod n then lambdas_2 = 1
-                */
-                if (h % 2 != 0 && lambdas[pind] == 0 && fmpz_equal(q_pow, ndec))
-                    lambdas[pind] = 1;
-            }
+        num = _aprcl_config_pairs(&pairs, config);
 
-            if (p == 2 && k >= 3)
-            {
-                h = _aprcl_is_prime_jacobi_check_2k(jacobi_sum,
-                        jacobi_sum2_1, jacobi_sum2_2, u, v);
+        arg.n = n;
+        arg.ndec = ndec;
+        arg.ndecdiv = ndecdiv;
+        arg.nmod4 = nmod4;
+        arg.pairs = pairs;
+        arg.num = num;
+        arg.lambdas = lambdas;
+        arg.status = (int *) flint_calloc(num + 1, sizeof(int));
+        arg.ctrl = flint_ctrl_current();
+        arg.stop = 0;
 
-                /* if h not found then n is composite */
-                if (h < 0)
-                    result = COMPOSITE;
+        if (result != PRIME)
+            flint_parallel_for(0, num, 1, _aprcl_is_prime_jacobi_worker, &arg);
 
-                /* 
-                    check (Lp); 
-                    if h % 2 != 0 (primitive unity root) 
-                    and q^{(n - 1) / 2} = -1 mod n then lambdas_2 = 1
-                */
-                if (h % 2 != 0 && lambdas[pind] == 0 && fmpz_equal(q_pow, ndec))
-                    lambdas[pind] = 1;
-            }
-
-            if (p != 2)
+        for (i = 0; i < num && result != PRIME; i++)
+        {
+            if (arg.status[i] == 2)
             {
-                h = _aprcl_is_prime_jacobi_check_pk(jacobi_sum, u, v);
-
-                /* if h not found then n is composite */
-                if (h < 0)
-                    result = COMPOSITE;
-
-                /* 
-                    check (Lp); 
-                    if h % p != 0 (primitive unity root) 
-                    then lambdas_p = 1
-                */
-                if (h % p != 0 && lambdas[pind] == 0)
-                    lambdas[pind] = 1;
+                result = COMPOSITE;
+                break;
             }
 
-            /* clear unity_zp for jacobi sums */
-            unity_zp_clear(jacobi_sum);
-            unity_zp_clear(jacobi_sum2_1);
-            unity_zp_clear(jacobi_sum2_2);
+            /* the computation was stopped */
+            if (arg.status[i] == 0)
+                result = UNKNOWN;
         }
 
+        flint_free(arg.status);
+        flint_free(pairs);
     }
 
     /* Begin L_p tests */
@@ -799,8 +866,6 @@ _aprcl_is_prime_jacobi(const fmpz_t n, const aprcl_config config)
 
     /* clear */
     flint_free(lambdas);
-    fmpz_clear(u);
-    fmpz_clear(q_pow);
     fmpz_clear(p2);
     fmpz_clear(ndec);
     fmpz_clear(ndecdiv);
@@ -825,6 +890,10 @@ aprcl_is_prime_jacobi(const fmpz_t n)
 
     aprcl_config_jacobi_clear(config);
 
+    /* gave up */
+    if (result == UNKNOWN && flint_ctrl_stopped())
+        return -1;
+
     if (result == PROBABPRIME || result == UNKNOWN)
     {
         flint_printf("aprcl_is_prime_jacobi: failed to prove n prime\n");
@@ -231,6 +231,43 @@ int main(void)
         }
     }
 
+    /* Test aprcl_is_prime_jacobi with the pairs (q, p) checked in parallel. */
+    for (i = 0; i < 20 * flint_test_multiplier(); i++)
+    {
+        int pbprime, cycloprime;
+        fmpz_t n, f;
+        fmpz_init(n);
+        fmpz_init(f);
+
+        flint_set_num_threads(n_randint(state, 4) + 2);
+
+        fmpz_randprime(n, state, 60 + n_randint(state, 100), 0);
+
+        /* a product of primes has no small factor to give it away */
+        if (n_randint(state, 2))
+        {
+            fmpz_randprime(f, state, 60 + n_randint(state, 40), 0);
+            fmpz_mul(n, n, f);
+        }
+
+        pbprime = fmpz_is_probabprime(n);
+        cycloprime = aprcl_is_prime_jacobi(n);
+
+        if (pbprime != cycloprime)
+        {
+            flint_printf("FAIL\n");
+            flint_printf("Testing number = ");
+            fmpz_print(n);
+            flint_printf("\nis_probabprime = %i, aprcl_is_prime_jacobi = %i (threaded)\n", pbprime, cycloprime);
+            abort();
+        }
+
+        fmpz_clear(n);
+        fmpz_clear(f);
+    }
+
+    flint_set_num_threads(1);
+
     FLINT_TEST_CLEANUP(state);
 
     flint_printf("PASS\n");
@@ -40,3 +40,48 @@ aprcl_p_power_in_q(ulong q, ulong p)
     }
     return k;
 }
+
+/*
+    Sets pairs to a newly allocated array of the pairs (q, p) with q | s
+    used by the configuration and p | q - 1. Returns the number of pairs.
+*/
+slong
+_aprcl_config_pairs(_aprcl_pair_struct ** pairs, const aprcl_config conf)
+{
+    slong i, j, num, alloc;
+    n_factor_t q_factors;
+    ulong q;
+
+    num = 0;
+    alloc = 0;
+    *pairs = NULL;
+
+    for (i = 0; i < conf->qs->num; i++)
+    {
+        if (conf->qs_used != NULL && conf->qs_used[i] == 0)
+            continue;
+
+        q = fmpz_get_ui(conf->qs->p + i);
+
+        n_factor_init(&q_factors);
+        n_factor(&q_factors, q - 1, 1);
+
+        if (num + q_factors.num > alloc)
+        {
+            alloc = FLINT_MAX(2*alloc, num + q_factors.num);
+            *pairs = (_aprcl_pair_struct *) flint_realloc(*pairs,
+                                        alloc*sizeof(_aprcl_pair_struct));
+        }
+
+        for (j = 0; j < q_factors.num; j++)
+        {
+            (*pairs)[num].q = q;
+            (*pairs)[num].p = q_factors.p[j];
+            (*pairs)[num].k = q_factors.exp[j];
+            (*pairs)[num].pind = _aprcl_p_ind(conf, q_factors.p[j]);
+            num++;
+        }
+    }
+
+    return num;
+}
@@ -0,0 +1,477 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <string.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "binfile.h"
+
+#if (!defined (__WIN32) || defined(__CYGWIN__)) && !defined(_MSC_VER)
+#define FLINT_BIN_MMAP 1
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#else
+#define FLINT_BIN_MMAP 0
+#endif
+
+static const char flint_bin_magic[8] = {'F', 'L', 'I', 'N', 'T', 'B', 'I', 'N'};
+
+/* words converted per call to fwrite */
+#define FLINT_BIN_BUFFER 1024
+
+void flint_bin_header_init(flint_bin_header_t h, flint_bin_type_t type)
+{
+    memset(h, 0, sizeof(flint_bin_header_struct));
+    memcpy(h->magic, flint_bin_magic, sizeof(flint_bin_magic));
+    h->version = FLINT_BIN_VERSION;
+    h->limb_bits = FLINT_BITS;
+    h->type = type;
+    h->endian = FLINT_BIN_ENDIAN;
+}
+
+int flint_bin_header_check(const flint_bin_header_t h, flint_bin_type_t type)
+{
+    return memcmp(h->magic, flint_bin_magic, sizeof(flint_bin_magic)) == 0
+        && h->version == FLINT_BIN_VERSION
+        && h->limb_bits == FLINT_BITS
+        && h->endian == FLINT_BIN_ENDIAN
+        && h->type == type;
+}
+
+int flint_bin_header_fwrite(FILE * file, const flint_bin_header_t h)
+{
+    return fwrite(h, sizeof(flint_bin_header_struct), 1, file) == 1;
+}
+
+int flint_bin_header_fread(FILE * file, flint_bin_header_t h,
+                                                        flint_bin_type_t type)
+{
+    if (fread(h, sizeof(flint_bin_header_struct), 1, file) != 1)
+        return 0;
+
+    return flint_bin_header_check(h, type);
+}
+
+static int _flint_bin_words_fwrite(FILE * file, mp_srcptr w, ulong n)
+{
+    return n == 0 || fwrite(w, sizeof(mp_limb_t), n, file) == n;
+}
+
+static int _flint_bin_words_fread(FILE * file, mp_ptr w, ulong n)
+{
+    return n == 0 || fread(w, sizeof(mp_limb_t), n, file) == n;
+}
+
+/*
+    The fmpz coefficients are given as r rows of c entries and the data
+    words as dr rows of dc words, so that matrices whose rows have been
+    permuted are written in their logical order.
+*/
+
+static ulong _flint_bin_fmpz_pool_size(fmpz * const * rows, slong r, slong c)
+{
+    ulong size = 0;
+    slong i, j;
+
+    for (i = 0; i < r; i++)
+        for (j = 0; j < c; j++)
+            if (COEFF_IS_MPZ(rows[i][j]))
+                size += 1 + FLINT_ABS(COEFF_TO_PTR(rows[i][j])->_mp_size);
+
+    return size;
+}
+
+static int
+_flint_bin_fmpz_fwrite_table(FILE * file, fmpz * const * rows, slong r, slong c)
+{
+    mp_limb_t buf[FLINT_BIN_BUFFER];
+    ulong offset = 0;
+    slong i, j, k, n;
+
+    for (i = 0; i < r; i++)
+    {
+        for (j = 0; j < c; j += n)
+        {
+            n = FLINT_MIN(c - j, FLINT_BIN_BUFFER);
+
+            for (k = 0; k < n; k++)
+            {
+                fmpz x = rows[i][j + k];
+
+                if (!COEFF_IS_MPZ(x))
+                    buf[k] = x;
+                else
+                {
+                    buf[k] = FLINT_BIN_LARGE + offset;
+                    offset += 1 + FLINT_ABS(COEFF_TO_PTR(x)->_mp_size);
+                }
+            }
+
+            if (!_flint_bin_words_fwrite(file, buf, n))
+                return 0;
+        }
+    }
+
+    return 1;
+}
+
+static int
+_flint_bin_fmpz_fwrite_pool(FILE * file, fmpz * const * rows, slong r, slong c)
+{
+    slong i, j;
+
+    for (i = 0; i < r; i++)
+    {
+        for (j = 0; j < c; j++)
+        {
+            if (COEFF_IS_MPZ(rows[i][j]))
+            {
+                __mpz_struct * z = COEFF_TO_PTR(rows[i][j]);
+                mp_limb_t size = z->_mp_size;
+
+                if (!_flint_bin_words_fwrite(file, &size, 1) ||
+                    !_flint_bin_words_fwrite(file, z->_mp_d,
+                                                   FLINT_ABS(z->_mp_size)))
+                    return 0;
+            }
+        }
+    }
+
+    return 1;
+}
+
+/* whether a table word is a small coefficient, anything else must be a
+   reference into the pool as it would otherwise be taken for a pointer */
+#define FLINT_BIN_IS_SMALL(w) ((w) >= COEFF_MIN && (w) <= COEFF_MAX)
+
+/*
+    Reads the table over the entries, which must not be large. Large
+    coefficients are left as table words until _flint_bin_fmpz_fread_pool,
+    which with file == NULL just zeroes them.
+*/
+static int
+_flint_bin_fmpz_fread_table(FILE * file, fmpz * const * rows, slong r, slong c)
+{
+    slong i, j;
+
+    for (i = 0; i < r; i++)
+    {
+        if (!_flint_bin_words_fread(file, (mp_ptr) rows[i], c))
+        {
+            for ( ; i < r; i++)
+                for (j = 0; j < c; j++)
+                    rows[i][j] = 0;
+
+            return 0;
+        }
+    }
+
+    return 1;
+}
+
+static int
+_flint_bin_fmpz_fread_pool(FILE * file, fmpz * const * rows, slong r, slong c)
+{
+    ulong offset = 0;
+    slong i, j;
+    int ok = 1;
+
+    for (i = 0; i < r; i++)
+    {
+        for (j = 0; j < c; j++)
+        {
+            fmpz * x = rows[i] + j;
+            mp_limb_t size;
+            ulong n;
+            __mpz_struct * z;
+
+            if (FLINT_BIN_IS_SMALL(*x))
+                continue;
+
+            if (!ok || file == NULL || *x >= COEFF_MIN ||
+                (ulong) (*x - FLINT_BIN_LARGE) != offset ||
+                !_flint_bin_words_fread(file, &size, 1))
+            {
+                *x = 0;
+                ok = 0;
+                continue;
+            }
+
+            n = FLINT_ABS((slong) size);
+            *x = 0;
+
+            if (n == 0 || n > (ulong) INT_MAX)
+            {
+                ok = 0;
+                continue;
+            }
+
+            z = _fmpz_promote(x);
+            mpz_realloc2(z, n*FLINT_BITS);
+
+            if (!_flint_bin_words_fread(file, z->_mp_d, n) ||
+                z->_mp_d[n - 1] == 0)
+            {
+                z->_mp_size = 0;
+                _fmpz_demote(x);
+                ok = 0;
+                continue;
+            }
+
+            z->_mp_size = (slong) size;
+            _fmpz_demote_val(x);
+            offset += 1 + n;
+        }
+    }
+
+    return ok;
+}
+
+/*
+    Write h followed by the sections for the coefficients and the data
+    words. The section sizes in h are set here.
+*/
+int _flint_bin_fwrite(FILE * file, flint_bin_header_t h,
+                         fmpz * const * rows, slong r, slong c,
+                         mp_ptr const * drows, slong dr, slong dc)
+{
+    slong i;
+
+    h->num = r*c;
+    h->data = dr*dc;
+    h->pool = _flint_bin_fmpz_pool_size(rows, r, c);
+
+    if (!flint_bin_header_fwrite(file, h) ||
+        !_flint_bin_fmpz_fwrite_table(file, rows, r, c))
+        return 0;
+
+    for (i = 0; i < dr; i++)
+        if (!_flint_bin_words_fwrite(file, drows[i], dc))
+            return 0;
+
+    return _flint_bin_fmpz_fwrite_pool(file, rows, r, c);
+}
+
+/*
+    Read the sections following the header h into the coefficients, which
+    must be small, and the data words. The caller checks that the shapes
+    agree with h. On failure the coefficients are left valid.
+*/
+int _flint_bin_fread(FILE * file, const flint_bin_header_t h,
+                         fmpz * const * rows, slong r, slong c,
+                         mp_ptr const * drows, slong dr, slong dc)
+{
+    slong i;
+
+    if (!_flint_bin_fmpz_fread_table(file, rows, r, c))
+        return 0;
+
+    for (i = 0; i < dr; i++)
+    {
+        if (!_flint_bin_words_fread(file, drows[i], dc))
+        {
+            _flint_bin_fmpz_fread_pool(NULL, rows, r, c);
+            return 0;
+        }
+    }
+
+    return _flint_bin_fmpz_fread_pool(file, rows, r, c);
+}
+
+int flint_bin_map_open(flint_bin_map_t M, const char * path)
+{
+    const flint_bin_header_struct * h;
+    size_t words;
+#if FLINT_BIN_MMAP
+    struct stat st;
+    int fd;
+
+    fd = open(path, O_RDONLY);
+    if (fd < 0)
+        return 0;
+
+    if (fstat(fd, &st) != 0 ||
+        (size_t) st.st_size < sizeof(flint_bin_header_struct))
+    {
+        close(fd);
+        return 0;
+    }
+
+    M->size = st.st_size;
+    M->base = mmap(NULL, M->size, PROT_READ, MAP_PRIVATE, fd, 0);
+    close(fd);
+
+    if (M->base == MAP_FAILED)
+        return 0;
+
+    M->mapped = 1;
+#else
+    FILE * file;
+    long size;
+
+    file = fopen(path, "rb");
+    if (file == NULL)
+        return 0;
+
+    if (fseek(file, 0, SEEK_END) != 0 || (size = ftell(file)) < 0 ||
+        (size_t) size < sizeof(flint_bin_header_struct) ||
+        fseek(file, 0, SEEK_SET) != 0)
+    {
+        fclose(file);
+        return 0;
+    }
+
+    M->size = size;
+    M->base = flint_malloc(M->size);
+
+    if (fread(M->base, 1, M->size, file) != M->size)
+    {
+        flint_free(M->base);
+        fclose(file);
+        return 0;
+    }
+
+    fclose(file);
+    M->mapped = 0;
+#endif
+
+    h = (const flint_bin_header_struct *) M->base;
+    words = (M->size - sizeof(flint_bin_header_struct))/sizeof(mp_limb_t);
+
+    if (memcmp(h->magic, flint_bin_magic, sizeof(flint_bin_magic)) != 0 ||
+        h->version != FLINT_BIN_VERSION || h->limb_bits != FLINT_BITS ||
+        h->endian != FLINT_BIN_ENDIAN ||
+        (M->size - sizeof(flint_bin_header_struct)) % sizeof(mp_limb_t) != 0 ||
+        h->num > words || h->data > words - h->num ||
+        h->pool != words - h->num - h->data)
+    {
+        M->header = NULL;
+        flint_bin_map_close(M);
+        return 0;
+    }
+
+    M->header = h;
+    M->table = (const fmpz *) (h + 1);
+    M->data = (mp_srcptr) (M->table + h->num);
+    M->pool = M->data + h->data;
+
+    return 1;
+}
+
+void flint_bin_map_close(flint_bin_map_t M)
+{
+#if FLINT_BIN_MMAP
+    if (M->mapped)
+        munmap(M->base, M->size);
+    else
+#endif
+        flint_free(M->base);
+
+    M->base = NULL;
+    M->size = 0;
+}
+
+/* whether the coefficients i, ..., i + len - 1 are in the table */
+static int _flint_bin_map_in_range(const flint_bin_map_t M, slong i, slong len)
+{
+    return i >= 0 && len >= 0 && (ulong) i <= M->header->num
+                              && (ulong) len <= M->header->num - i;
+}
+
+int flint_bin_map_is_small(const flint_bin_map_t M, slong i)
+{
+    return _flint_bin_map_in_range(M, i, 1) && FLINT_BIN_IS_SMALL(M->table[i]);
+}
+
+mp_srcptr flint_bin_map_limbs(slong * size, const flint_bin_map_t M, slong i)
+{
+    ulong offset, n;
+
+    if (!_flint_bin_map_in_range(M, i, 1))
+        return NULL;
+
+    offset = M->table[i] - FLINT_BIN_LARGE;
+
+    if (M->table[i] >= COEFF_MIN || offset >= M->header->pool)
+        return NULL;
+
+    *size = (slong) M->pool[offset];
+    n = FLINT_ABS(*size);
+
+    /* the top limb must be nonzero, as for the stream reader */
+    if (n == 0 || n > M->header->pool - offset - 1 || n > (ulong) INT_MAX ||
+        M->pool[offset + n] == 0)
+        return NULL;
+
+    return M->pool + offset + 1;
+}
+
+int flint_bin_map_get_fmpz(fmpz_t f, const flint_bin_map_t M, slong i)
+{
+    if (!_flint_bin_map_in_range(M, i, 1))
+    {
+        fmpz_zero(f);
+        return 0;
+    }
+
+    if (FLINT_BIN_IS_SMALL(M->table[i]))
+    {
+        fmpz_set_si(f, M->table[i]);
+    }
+    else
+    {
+        __mpz_struct * z;
+        mp_srcptr d;
+        slong size, n;
+
+        d = flint_bin_map_limbs(&size, M, i);
+
+        if (d == NULL)
+        {
+            fmpz_zero(f);
+            return 0;
+        }
+
+        n = FLINT_ABS(size);
+
+        z = _fmpz_promote(f);
+        mpz_realloc2(z, n*FLINT_BITS);
+        flint_mpn_copyi(z->_mp_d, d, n);
+        z->_mp_size = size;
+
+        _fmpz_demote_val(f);
+    }
+
+    return 1;
+}
+
+int flint_bin_map_get_fmpz_vec(fmpz * vec,
+                                 const flint_bin_map_t M, slong i, slong len)
+{
+    slong j;
+    int ok = 1;
+
+    if (!_flint_bin_map_in_range(M, i, len))
+    {
+        _fmpz_vec_zero(vec, len);
+        return 0;
+    }
+
+    for (j = 0; j < len; j++)
+        ok &= flint_bin_map_get_fmpz(vec + j, M, i + j);
+
+    return ok;
+}
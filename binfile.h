@@ -0,0 +1,127 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#ifndef FLINT_BINFILE_H
+#define FLINT_BINFILE_H
+
+#include <stdio.h>
+#include "flint.h"
+#include "fmpz.h"
+
+#ifdef __cplusplus
+ extern "C" {
+#endif
+
+/*
+    Binary container for fmpz vectors, polynomials and matrices, nmod
+    matrices and fmpz multivariate polynomials.
+
+    A file is a header followed by three sections of words:
+
+        table   one word per fmpz coefficient; small coefficients are stored
+                as they are in an fmpz, large ones as FLINT_BIN_LARGE plus
+                the offset of the coefficient in the pool
+        data    type specific words (exponents, nmod entries)
+        pool    for each large coefficient in table order, its signed
+                size in limbs followed by its limbs
+
+    The format is native: files are only read back on machines with the
+    same word size and byte order.
+*/
+
+#define FLINT_BIN_VERSION 1
+
+#define FLINT_BIN_ENDIAN 0x01020304
+
+/* table words below COEFF_MIN refer to the pool, words above COEFF_MAX
+   are invalid */
+#define FLINT_BIN_LARGE WORD_MIN
+
+typedef enum
+{
+    FLINT_BIN_FMPZ_VEC = 1,     /* dims: len */
+    FLINT_BIN_FMPZ_POLY = 2,    /* dims: len */
+    FLINT_BIN_FMPZ_MAT = 3,     /* dims: rows, cols */
+    FLINT_BIN_NMOD_MAT = 4,     /* dims: rows, cols, modulus */
+    FLINT_BIN_FMPZ_MPOLY = 5    /* dims: len, bits, nvars, ord */
+} flint_bin_type_t;
+
+typedef struct
+{
+    char magic[8];
+    unsigned int version;
+    unsigned int limb_bits;
+    unsigned int type;
+    unsigned int endian;
+    ulong dims[4];
+    ulong num;      /* words in the table */
+    ulong data;     /* words in the data section */
+    ulong pool;     /* words in the pool */
+} flint_bin_header_struct;
+
+typedef flint_bin_header_struct flint_bin_header_t[1];
+
+FLINT_DLL void flint_bin_header_init(flint_bin_header_t h,
+                                                       flint_bin_type_t type);
+
+FLINT_DLL int flint_bin_header_check(const flint_bin_header_t h,
+                                                       flint_bin_type_t type);
+
+FLINT_DLL int flint_bin_header_fwrite(FILE * file, const flint_bin_header_t h);
+
+FLINT_DLL int flint_bin_header_fread(FILE * file, flint_bin_header_t h,
+                                                       flint_bin_type_t type);
+
+/* Sections ****************************************************************/
+
+FLINT_DLL int _flint_bin_fwrite(FILE * file, flint_bin_header_t h,
+                         fmpz * const * rows, slong r, slong c,
+                         mp_ptr const * drows, slong dr, slong dc);
+
+FLINT_DLL int _flint_bin_fread(FILE * file, const flint_bin_header_t h,
+                         fmpz * const * rows, slong r, slong c,
+                         mp_ptr const * drows, slong dr, slong dc);
+
+/* Memory mapped files *******************************************************/
+
+typedef struct
+{
+    const flint_bin_header_struct * header;
+    const fmpz * table;
+    mp_srcptr data;
+    mp_srcptr pool;
+    void * base;
+    size_t size;
+    int mapped;
+} flint_bin_map_struct;
+
+typedef flint_bin_map_struct flint_bin_map_t[1];
+
+FLINT_DLL int flint_bin_map_open(flint_bin_map_t M, const char * path);
+
+FLINT_DLL void flint_bin_map_close(flint_bin_map_t M);
+
+FLINT_DLL int flint_bin_map_is_small(const flint_bin_map_t M, slong i);
+
+FLINT_DLL mp_srcptr flint_bin_map_limbs(slong * size,
+                                             const flint_bin_map_t M, slong i);
+
+FLINT_DLL int flint_bin_map_get_fmpz(fmpz_t f,
+                                             const flint_bin_map_t M, slong i);
+
+FLINT_DLL int flint_bin_map_get_fmpz_vec(fmpz * vec,
+                                const flint_bin_map_t M, slong i, slong len);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
@@ -0,0 +1,111 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include "flint.h"
+#include "profiler.h"
+#include "ctrl.h"
+
+/* cancel and status may be written by another thread */
+#if FLINT_USES_PTHREAD && (__GNUC__ > 4 || (__GNUC__ == 4 && __GNUC_MINOR__ >= 8))
+#define _CTRL_LOAD(x) __atomic_load_n(&(x), __ATOMIC_ACQUIRE)
+#define _CTRL_STORE(x, v) __atomic_store_n(&(x), (v), __ATOMIC_RELEASE)
+#else
+#define _CTRL_LOAD(x) (*((volatile int *) &(x)))
+#define _CTRL_STORE(x, v) (*((volatile int *) &(x)) = (v))
+#endif
+
+/* the context attached to this thread, if any */
+static FLINT_TLS_PREFIX flint_ctrl_struct * _flint_ctrl = NULL;
+
+static double _flint_ctrl_wall_time(void)
+{
+    struct timeval tv;
+
+    gettimeofday(&tv, 0);
+
+    return tv.tv_sec + 1e-6 * tv.tv_usec;
+}
+
+void flint_ctrl_init(flint_ctrl_t ctrl)
+{
+    ctrl->deadline = 0;
+    ctrl->cancel = 0;
+    ctrl->status = FLINT_CTRL_RUNNING;
+    ctrl->progress = NULL;
+    ctrl->data = NULL;
+}
+
+void flint_ctrl_set_timeout(flint_ctrl_t ctrl, double seconds)
+{
+    ctrl->deadline = _flint_ctrl_wall_time() + seconds;
+}
+
+void flint_ctrl_set_progress(flint_ctrl_t ctrl,
+                                     flint_progress_func_t func, void * data)
+{
+    ctrl->progress = func;
+    ctrl->data = data;
+}
+
+void flint_ctrl_cancel(flint_ctrl_t ctrl)
+{
+    _CTRL_STORE(ctrl->cancel, 1);
+}
+
+int flint_ctrl_status(const flint_ctrl_t ctrl)
+{
+    return _CTRL_LOAD(ctrl->status);
+}
+
+flint_ctrl_struct * flint_ctrl_attach(flint_ctrl_struct * ctrl)
+{
+    flint_ctrl_struct * prev = _flint_ctrl;
+
+    _flint_ctrl = ctrl;
+
+    return prev;
+}
+
+flint_ctrl_struct * flint_ctrl_current(void)
+{
+    return _flint_ctrl;
+}
+
+int flint_ctrl_check(const char * stage, slong done, slong total)
+{
+    flint_ctrl_struct * ctrl = _flint_ctrl;
+    int status;
+
+    if (ctrl == NULL)
+        return 0;
+
+    if (_CTRL_LOAD(ctrl->status) != FLINT_CTRL_RUNNING)
+        return 1;
+
+    if (_CTRL_LOAD(ctrl->cancel))
+        status = FLINT_CTRL_CANCELLED;
+    else if (ctrl->deadline != 0 && _flint_ctrl_wall_time() >= ctrl->deadline)
+        status = FLINT_CTRL_DEADLINE;
+    else if (ctrl->progress != NULL && ctrl->progress(ctrl->data, stage, done, total))
+        status = FLINT_CTRL_CANCELLED;
+    else
+        return 0;
+
+    _CTRL_STORE(ctrl->status, status);
+
+    return 1;
+}
+
+int flint_ctrl_stopped(void)
+{
+    return _flint_ctrl != NULL
+        && _CTRL_LOAD(_flint_ctrl->status) != FLINT_CTRL_RUNNING;
+}
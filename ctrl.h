@@ -0,0 +1,73 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#ifndef FLINT_CTRL_H
+#define FLINT_CTRL_H
+
+#include "flint.h"
+
+#ifdef __cplusplus
+ extern "C" {
+#endif
+
+/*
+    A control context bounds and observes long running computations. It
+    carries a deadline, a cancellation flag and a progress callback, which
+    are polled by the computation at natural checkpoints. A context is
+    attached to the calling thread, so that checkpoints deep inside a
+    computation find it without it being passed down explicitly.
+*/
+
+#define FLINT_CTRL_RUNNING 0
+#define FLINT_CTRL_CANCELLED 1
+#define FLINT_CTRL_DEADLINE 2
+
+/* return nonzero to stop the computation */
+typedef int (* flint_progress_func_t)(void * data, const char * stage,
+                                                      slong done, slong total);
+
+typedef struct
+{
+    double deadline;        /* wall clock time in seconds, 0 for none */
+    int cancel;             /* set by flint_ctrl_cancel */
+    int status;             /* reason the computation was stopped */
+    flint_progress_func_t progress;
+    void * data;
+} flint_ctrl_struct;
+
+typedef flint_ctrl_struct flint_ctrl_t[1];
+
+FLINT_DLL void flint_ctrl_init(flint_ctrl_t ctrl);
+
+FLINT_DLL void flint_ctrl_set_timeout(flint_ctrl_t ctrl, double seconds);
+
+FLINT_DLL void flint_ctrl_set_progress(flint_ctrl_t ctrl,
+                                    flint_progress_func_t func, void * data);
+
+FLINT_DLL void flint_ctrl_cancel(flint_ctrl_t ctrl);
+
+FLINT_DLL int flint_ctrl_status(const flint_ctrl_t ctrl);
+
+/* Checkpoints ***************************************************************/
+
+FLINT_DLL flint_ctrl_struct * flint_ctrl_attach(flint_ctrl_struct * ctrl);
+
+FLINT_DLL flint_ctrl_struct * flint_ctrl_current(void);
+
+FLINT_DLL int flint_ctrl_check(const char * stage, slong done, slong total);
+
+FLINT_DLL int flint_ctrl_stopped(void);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
@@ -13,9 +13,7 @@
 #include "flint.h"
 #include "fft.h"
 #include "ulong_extras.h"
-#include "fft_tuning.h"
-
-static int fft_tuning_table[5][2] = FFT_TAB;
+#include "tuning.h"
 
 void flint_mpn_mul_fft_main(mp_ptr r1, mp_srcptr i1, mp_size_t n1, 
                         mp_srcptr i2, mp_size_t n2)
@@ -54,7 +52,7 @@ void flint_mpn_mul_fft_main(mp_ptr r1, mp_srcptr i1, mp_size_t n1,
    {
       mp_size_t wadj = 1;
       
-      off = fft_tuning_table[depth - 6][w - 1]; /* adjust n and w */
+      off = FLINT_TUNING->fft_tab[depth - 6][w - 1]; /* adjust n and w */
       depth -= off;
       n = ((mp_size_t) 1 << depth);
       w *= ((mp_size_t) 1 << (2*off));
@@ -31,8 +31,11 @@ void mul_truncate_sqrt2(mp_ptr r1, mp_srcptr i1, mp_size_t n1,
 
    mp_limb_t ** ii, ** jj, * t1, * t2, * s1, * tt, * ptr;
    mp_limb_t c;
-   
-   ii = flint_malloc((4*(n + n*size) + 5*size)*sizeof(mp_limb_t));
+   FLINT_ARENA_INIT;
+
+   FLINT_ARENA_START;
+
+   ii = FLINT_ARENA_ALLOC((4*(n + n*size) + 5*size)*sizeof(mp_limb_t));
    for (i = 0, ptr = (mp_limb_t *) ii + 4*n; i < 4*n; i++, ptr += size) 
    {
       ii[i] = ptr;
@@ -44,7 +47,7 @@ void mul_truncate_sqrt2(mp_ptr r1, mp_srcptr i1, mp_size_t n1,
    
    if (i1 != i2)
    {
-      jj = flint_malloc(4*(n + n*size)*sizeof(mp_limb_t));
+      jj = FLINT_ARENA_ALLOC(4*(n + n*size)*sizeof(mp_limb_t));
       for (i = 0, ptr = (mp_limb_t *) jj + 4*n; i < 4*n; i++, ptr += size) 
       {
          jj[i] = ptr;
@@ -88,7 +91,6 @@ void mul_truncate_sqrt2(mp_ptr r1, mp_srcptr i1, mp_size_t n1,
    flint_mpn_zero(r1, r_limbs);
    fft_combine_bits(r1, ii, j1 + j2 - 1, bits1, limbs, r_limbs);
      
-   flint_free(ii);
-   if (i1 != i2) flint_free(jj);
+   FLINT_ARENA_END;
 }
 
@@ -1,5 +1,6 @@
 /* 
     Copyright (C) 2009, 2011 William Hart
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -15,6 +16,7 @@
 #include "longlong.h"
 #include "ulong_extras.h"
 #include "fft_tuning.h"
+#include "tuning.h"
 #include "mpn_extras.h"
 
 static mp_size_t mulmod_2expp1_table_n[FFT_N_NUM] = MULMOD_TAB;
@@ -184,7 +186,7 @@ void fft_mulmod_2expp1(mp_limb_t * r, mp_limb_t * i1, mp_limb_t * i2,
       return;
    }
 
-   if (limbs <= FFT_MULMOD_2EXPP1_CUTOFF) 
+   if (limbs <= FLINT_TUNE(FLINT_TUNE_FFT_MULMOD_2EXPP1))
    {
       r[limbs] = flint_mpn_mulmod_2expp1_basecase(r, i1, i2, c, bits, tt);
       return;
@@ -207,7 +209,7 @@ slong fft_adjust_limbs(mp_size_t limbs)
    mp_size_t depth = 1, limbs2, depth1 = 1, depth2 = 1, adj;
    mp_size_t off1, off2;
 
-   if (limbs <= FFT_MULMOD_2EXPP1_CUTOFF) return limbs;
+   if (limbs <= FLINT_TUNE(FLINT_TUNE_FFT_MULMOD_2EXPP1)) return limbs;
          
    depth = FLINT_CLOG2(limbs);
    limbs2 = (WORD(1)<<depth); /* within a factor of 2 of limbs */
@@ -423,6 +423,38 @@ mp_limb_t FLINT_BIT_COUNT(mp_limb_t x)
       __tmp_root = __tmp_root->next; \
    }
 
+/* scoped per-thread arena allocation */
+typedef struct
+{
+    size_t used;
+    size_t high_water;
+    size_t reserved;
+} flint_arena_stats_struct;
+
+typedef flint_arena_stats_struct flint_arena_stats_t[1];
+
+/* an arena keeps at most this many bytes which are not in use */
+#define FLINT_ARENA_KEEP (WORD(1) << 22)
+
+FLINT_DLL size_t flint_arena_mark(void);
+FLINT_DLL void * flint_arena_alloc(size_t size);
+FLINT_DLL void flint_arena_release(size_t mark);
+FLINT_DLL void flint_arena_stats(flint_arena_stats_t stats);
+FLINT_DLL void flint_arena_clear(void);
+
+#define FLINT_ARENA_INIT \
+   size_t __arena_mark
+
+#define FLINT_ARENA_START \
+   __arena_mark = flint_arena_mark()
+
+#define FLINT_ARENA_ALLOC(size) flint_arena_alloc(size)
+
+#define FLINT_ARENA_ARRAY_ALLOC(n, T) (T *) flint_arena_alloc((n)*sizeof(T))
+
+#define FLINT_ARENA_END \
+   flint_arena_release(__arena_mark)
+
 /* compatibility between gmp and mpir */
 #ifndef mpn_com_n
 #define mpn_com_n mpn_com
@@ -56,6 +56,21 @@ typedef struct
 
 typedef fmpz_preinvn_struct fmpz_preinvn_t[1];
 
+/*
+   Powers pow[k] = b^(digits*2^k) of a base b used for radix conversion,
+   where b^digits is the largest power of b fitting in a limb. The first
+   inv_len of them also have inv[k] = floor(4^bits(pow[k])/pow[k]). Entries
+   are only ever appended, so they stay valid while the cache grows.
+*/
+typedef struct
+{
+   slong digits;
+   slong len;
+   slong inv_len;
+   fmpz pow[FLINT_BITS];
+   fmpz inv[FLINT_BITS];
+} fmpz_radix_cache_struct;
+
 typedef struct
 {
    int count;
@@ -65,6 +80,17 @@ typedef struct
    void * address;
 } fmpz_block_header_s;
 
+typedef struct
+{
+   ulong hits;
+   ulong misses;
+   ulong remote_frees;
+   ulong slabs;
+   ulong cached;
+} fmpz_mpz_cache_stats_struct;
+
+typedef fmpz_mpz_cache_stats_struct fmpz_mpz_cache_stats_t[1];
+
 /* maximum positive value a small coefficient can have */
 #define COEFF_MAX ((WORD(1) << (FLINT_BITS - 2)) - WORD(1))
 
@@ -73,6 +99,24 @@ typedef struct
 
 #define COEFF_IS_MPZ(x) (((x) >> (FLINT_BITS - 2)) == WORD(1))  /* is x a pointer not an integer */
 
+/*
+   large operands with at most this many limbs are handled directly on their
+   limbs by the core arithmetic functions rather than via the mpz layer, and
+   the slab memory manager stores this many limbs in the same block as the
+   header of each mpz
+*/
+#define FMPZ_MPN_INLINE_LIMBS 8
+
+/* integers of at least this many limbs are converted by divide and conquer */
+#define FMPZ_GET_STR_DC_LIMBS 4000
+#define FMPZ_SET_STR_DC_LIMBS 4000
+
+/* products in radix conversion of at least this many limbs use the FFT */
+#define FMPZ_RADIX_FFT_LIMBS 4000
+
+/* halves of at least this many limbs are converted in parallel */
+#define FMPZ_RADIX_THREAD_LIMBS 4000
+
 FLINT_DLL __mpz_struct * _fmpz_new_mpz(void);
 
 FLINT_DLL void _fmpz_clear_mpz(fmpz f);
@@ -81,6 +125,10 @@ FLINT_DLL void _fmpz_cleanup_mpz_content(void);
 
 FLINT_DLL void _fmpz_cleanup(void);
 
+FLINT_DLL void _fmpz_mpz_cache_trim(void);
+
+FLINT_DLL void _fmpz_mpz_cache_stats(fmpz_mpz_cache_stats_t stats);
+
 FLINT_DLL __mpz_struct * _fmpz_promote(fmpz_t f);
 
 FLINT_DLL __mpz_struct * _fmpz_promote_val(fmpz_t f);
@@ -101,6 +149,28 @@ void _fmpz_demote(fmpz_t f)
 
 FLINT_DLL void _fmpz_demote_val(fmpz_t f);
 
+/*
+   Sets {d, an + bn} to the product of the absolute values of the mpz's a
+   and b, which are nonzero and have an and bn limbs respectively, and
+   returns the normalised length of the product. The output must not
+   overlap the inputs.
+*/
+FMPZ_INLINE
+mp_size_t _fmpz_mpz_mul_limbs(mp_ptr d, const __mpz_struct * a, mp_size_t an,
+                                        const __mpz_struct * b, mp_size_t bn)
+{
+    mp_size_t rn = an + bn;
+
+    if (an == 1 && bn == 1)
+        umul_ppmm(d[1], d[0], a->_mp_d[0], b->_mp_d[0]);
+    else if (an >= bn)
+        mpn_mul(d, a->_mp_d, an, b->_mp_d, bn);
+    else
+        mpn_mul(d, b->_mp_d, bn, a->_mp_d, an);
+
+    return rn - (d[rn - 1] == 0);
+}
+
 FLINT_DLL void _fmpz_init_readonly_mpz(fmpz_t f, const mpz_t z);
 
 FLINT_DLL void _fmpz_clear_readonly_mpz(mpz_t);
@@ -396,6 +466,13 @@ FLINT_DLL size_t fmpz_sizeinbase(const fmpz_t f, int b);
 
 FLINT_DLL char * fmpz_get_str(char * str, int b, const fmpz_t f);
 
+FLINT_DLL const fmpz_radix_cache_struct * _fmpz_radix_cache(int b,
+                                                  slong len, slong inv_len);
+
+FLINT_DLL void _fmpz_radix_cache_clear(void);
+
+FLINT_DLL void _fmpz_radix_mul(fmpz_t r, const fmpz_t a, const fmpz_t b);
+
 FMPZ_INLINE
 void fmpz_swap(fmpz_t f, fmpz_t g)
 {
@@ -552,6 +629,9 @@ FLINT_DLL void fmpz_addmul_ui(fmpz_t f, const fmpz_t g, ulong x);
 
 FLINT_DLL void fmpz_submul_ui(fmpz_t f, const fmpz_t g, ulong x);
 
+FLINT_DLL void _fmpz_addmul_large(fmpz_t f, const __mpz_struct * a,
+                                      const __mpz_struct * b, int subtract);
+
 FLINT_DLL void fmpz_addmul(fmpz_t f, const fmpz_t g, const fmpz_t h);
 
 FLINT_DLL void fmpz_submul(fmpz_t f, const fmpz_t g, const fmpz_t h);
@@ -978,6 +1058,19 @@ FLINT_DLL void fmpz_multi_mod_ui(mp_limb_t * out, const fmpz_t in,
 FLINT_DLL void fmpz_multi_CRT_ui(fmpz_t output, mp_srcptr residues,
                       const fmpz_comb_t comb, fmpz_comb_temp_t temp, int sign);
 
+/* limbs of combs kept by each thread */
+#define FMPZ_COMB_CACHE_LIMBS (WORD(1) << 20)
+
+/*
+    The returned comb is borrowed from a cache local to the calling thread.
+    It is only valid until this thread requests another prime set or calls
+    flint_cleanup, and must not be cleared.
+*/
+FLINT_DLL const fmpz_comb_struct * _fmpz_comb_cache(mp_srcptr primes,
+                                                            slong num_primes);
+
+FLINT_DLL void _fmpz_comb_cache_clear(void);
+
 /*****************************************************************************/
 
 FLINT_DLL mp_limb_t fmpz_abs_ubound_ui_2exp(slong * exp, const fmpz_t x, int bits);
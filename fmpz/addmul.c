@@ -14,10 +14,49 @@
 #include "ulong_extras.h"
 #include "fmpz.h"
 
+void _fmpz_addmul_large(fmpz_t f, const __mpz_struct * a,
+                                      const __mpz_struct * b, int subtract)
+{
+    mp_size_t an = FLINT_ABS(a->_mp_size);
+    mp_size_t bn = FLINT_ABS(b->_mp_size);
+    __mpz_struct * mpz_ptr;
+
+    if (an <= FMPZ_MPN_INLINE_LIMBS && bn <= FMPZ_MPN_INLINE_LIMBS)
+    {
+        /* form the short product on the stack and add it to f */
+        mp_limb_t t[2*FMPZ_MPN_INLINE_LIMBS];
+        __mpz_struct r;
+        mp_size_t rn;
+
+        rn = _fmpz_mpz_mul_limbs(t, a, an, b, bn);
+
+        r._mp_d = t;
+        r._mp_alloc = rn;
+        r._mp_size = ((a->_mp_size ^ b->_mp_size) < 0) ? -rn : rn;
+
+        mpz_ptr = _fmpz_promote_val(f);
+
+        if (subtract)
+            mpz_sub(mpz_ptr, mpz_ptr, &r);
+        else
+            mpz_add(mpz_ptr, mpz_ptr, &r);
+    }
+    else
+    {
+        mpz_ptr = _fmpz_promote_val(f);
+
+        if (subtract)
+            mpz_submul(mpz_ptr, a, b);
+        else
+            mpz_addmul(mpz_ptr, a, b);
+    }
+
+    _fmpz_demote_val(f);  /* cancellation may have occurred */
+}
+
 void fmpz_addmul(fmpz_t f, const fmpz_t g, const fmpz_t h)
 {
     fmpz c1, c2;
-    __mpz_struct * mpz_ptr;
 	
     c1 = *g;
 	
@@ -38,7 +77,5 @@ void fmpz_addmul(fmpz_t f, const fmpz_t g, const fmpz_t h)
 	} 
 
 	/* both g and h are large */
-    mpz_ptr = _fmpz_promote_val(f);
-    mpz_addmul(mpz_ptr, COEFF_TO_PTR(c1), COEFF_TO_PTR(c2));
-    _fmpz_demote_val(f);  /* cancellation may have occurred	*/
+    _fmpz_addmul_large(f, COEFF_TO_PTR(c1), COEFF_TO_PTR(c2), 0);
 }
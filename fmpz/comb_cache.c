@@ -0,0 +1,138 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <string.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+
+typedef struct
+{
+    mp_ptr primes;
+    slong num_primes;
+    slong size;
+    ulong last_use;
+    fmpz_comb_t comb;
+} _fmpz_comb_cache_entry;
+
+/* combs for the most recently used prime sets, using at most
+   FMPZ_COMB_CACHE_LIMBS limbs unless a single comb is larger */
+static FLINT_TLS_PREFIX _fmpz_comb_cache_entry ** _fmpz_comb_caches = NULL;
+static FLINT_TLS_PREFIX slong _fmpz_comb_cache_len = 0;
+static FLINT_TLS_PREFIX slong _fmpz_comb_cache_size = 0;
+static FLINT_TLS_PREFIX ulong _fmpz_comb_cache_time = 0;
+
+/* number of limbs used by the integers in C */
+static slong _fmpz_comb_size(const fmpz_comb_struct * C)
+{
+    slong i, k, s, size = C->num_primes;
+
+    for (i = 0; i < C->crt_P->length; i++)
+        size += fmpz_size(C->crt_P->prog[i].b_modulus)
+              + fmpz_size(C->crt_P->prog[i].c_modulus);
+
+    for (i = 0; i < C->crt_P->moduli_count; i++)
+        size += fmpz_size(C->crt_P->moduli + i)
+              + fmpz_size(C->crt_P->fracmoduli + i);
+
+    size += fmpz_size(C->crt_P->final_modulus);
+
+    for (i = 0; i < C->mod_P->length; i++)
+        size += fmpz_size(C->mod_P->prog[i].modulus);
+
+    for (i = 0; i < C->mod_P->moduli_count; i++)
+        size += fmpz_size(C->mod_P->moduli + i);
+
+    /* packed multipliers */
+    for (k = 0, i = 0; k < C->crt_klen; k++)
+    {
+        s = C->step[k];
+        if (s < 0)
+            s = -s - 1;
+
+        size += s*(C->crt_offsets[k] - i);
+        i = C->crt_offsets[k];
+    }
+
+    return size;
+}
+
+static void _fmpz_comb_cache_remove(slong i)
+{
+    _fmpz_comb_cache_entry * E = _fmpz_comb_caches[i];
+
+    fmpz_comb_clear(E->comb);
+    flint_free(E->primes);
+    _fmpz_comb_cache_size -= E->size;
+    flint_free(E);
+
+    _fmpz_comb_cache_len--;
+    _fmpz_comb_caches[i] = _fmpz_comb_caches[_fmpz_comb_cache_len];
+}
+
+void _fmpz_comb_cache_clear(void)
+{
+    while (_fmpz_comb_cache_len > 0)
+        _fmpz_comb_cache_remove(_fmpz_comb_cache_len - 1);
+
+    flint_free(_fmpz_comb_caches);
+    _fmpz_comb_caches = NULL;
+}
+
+const fmpz_comb_struct * _fmpz_comb_cache(mp_srcptr primes, slong num_primes)
+{
+    _fmpz_comb_cache_entry * E;
+    slong i, j;
+
+    for (i = 0; i < _fmpz_comb_cache_len; i++)
+    {
+        E = _fmpz_comb_caches[i];
+
+        if (E->num_primes == num_primes &&
+            memcmp(E->primes, primes, num_primes*sizeof(mp_limb_t)) == 0)
+        {
+            E->last_use = ++_fmpz_comb_cache_time;
+            return E->comb;
+        }
+    }
+
+    if (_fmpz_comb_caches == NULL)
+        flint_register_cleanup_function(_fmpz_comb_cache_clear);
+
+    E = (_fmpz_comb_cache_entry *) flint_malloc(sizeof(_fmpz_comb_cache_entry));
+
+    fmpz_comb_init(E->comb, primes, num_primes);
+
+    E->primes = (mp_ptr) flint_malloc(num_primes*sizeof(mp_limb_t));
+    flint_mpn_copyi(E->primes, primes, num_primes);
+    E->num_primes = num_primes;
+    E->size = _fmpz_comb_size(E->comb);
+    E->last_use = ++_fmpz_comb_cache_time;
+
+    /* evict the least recently used entries until E fits */
+    while (_fmpz_comb_cache_len > 0 &&
+           _fmpz_comb_cache_size + E->size > FMPZ_COMB_CACHE_LIMBS)
+    {
+        for (i = 1, j = 0; i < _fmpz_comb_cache_len; i++)
+            if (_fmpz_comb_caches[i]->last_use < _fmpz_comb_caches[j]->last_use)
+                j = i;
+
+        _fmpz_comb_cache_remove(j);
+    }
+
+    _fmpz_comb_caches = (_fmpz_comb_cache_entry **) flint_realloc(
+                 _fmpz_comb_caches,
+                 (_fmpz_comb_cache_len + 1)*sizeof(_fmpz_comb_cache_entry *));
+    _fmpz_comb_caches[_fmpz_comb_cache_len++] = E;
+    _fmpz_comb_cache_size += E->size;
+
+    return E->comb;
+}
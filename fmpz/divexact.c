@@ -53,7 +53,33 @@ fmpz_divexact(fmpz_t f, const fmpz_t g, const fmpz_t h)
         }
         else  /* both are large */
         {
-            mpz_divexact(mpz_ptr, COEFF_TO_PTR(c1), COEFF_TO_PTR(c2));
+            __mpz_struct * a = COEFF_TO_PTR(c1);
+            __mpz_struct * b = COEFF_TO_PTR(c2);
+            mp_size_t an = FLINT_ABS(a->_mp_size);
+            mp_size_t bn = FLINT_ABS(b->_mp_size);
+
+            if (an <= FMPZ_MPN_INLINE_LIMBS && an >= bn)
+            {
+                /* short dividend: divide the limbs directly on the stack */
+                mp_limb_t q[FMPZ_MPN_INLINE_LIMBS];
+                mp_limb_t r[FMPZ_MPN_INLINE_LIMBS];
+                mp_size_t qn = an - bn + 1;
+                int neg = (a->_mp_size ^ b->_mp_size) < 0;
+
+                if (bn == 1)
+                    mpn_divexact_1(q, a->_mp_d, an, b->_mp_d[0]);
+                else
+                    mpn_tdiv_qr(q, r, 0, a->_mp_d, an, b->_mp_d, bn);
+
+                while (qn > 1 && q[qn - 1] == 0)
+                    qn--;
+
+                flint_mpn_copyi(FLINT_MPZ_REALLOC(mpz_ptr, qn), q, qn);
+                mpz_ptr->_mp_size = neg ? -qn : qn;
+            }
+            else
+                mpz_divexact(mpz_ptr, a, b);
+
             _fmpz_demote_val(f);  /* division by h may result in small value */
         }
     }
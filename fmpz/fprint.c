@@ -10,6 +10,7 @@
 */
 
 #include <stdio.h>
+#include <string.h>
 #include <gmp.h>
 
 #include "fmpz.h"
@@ -18,7 +19,16 @@ int fmpz_fprint(FILE * file, const fmpz_t x)
 {
 	if (!COEFF_IS_MPZ(*x))
         return flint_fprintf(file, "%wd", *x);
-	else 
+	else if (fmpz_size(x) < FMPZ_GET_STR_DC_LIMBS)
         return (int) mpz_out_str(file, 10, COEFF_TO_PTR(*x));
+    else
+    {
+        char * s = fmpz_get_str(NULL, 10, x);
+        int r = (fputs(s, file) < 0) ? 0 : (int) strlen(s);
+
+        flint_free(s);
+
+        return r;
+    }
 }
 
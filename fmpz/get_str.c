@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2010, 2011 Sebastian Pancratz
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -9,10 +10,141 @@
     (at your option) any later version.  See <https://www.gnu.org/licenses/>.
 */
 
+#include <string.h>
 #include <gmp.h>
 #include "flint.h"
 #include "ulong_extras.h"
 #include "fmpz.h"
+#include "thread_support.h"
+
+/*
+   Write the digits of x right aligned, ending just before end, and return
+   a pointer to the first of them. If pad is set, leading zeros are written
+   up to n digits.
+*/
+static char *
+_fmpz_get_str_basecase(char * end, const fmpz_t x, slong n, int b, int pad)
+{
+    mpz_t z;
+    char * t;
+    slong len;
+
+    flint_mpz_init_set_readonly(z, x);
+
+    t = (char *) flint_malloc(mpz_sizeinbase(z, b) + 2);
+    mpz_get_str(t, b, z);
+    len = strlen(t);
+
+    memcpy(end - len, t, len);
+
+    if (pad)
+    {
+        memset(end - n, '0', n - len);
+        len = n;
+    }
+
+    flint_free(t);
+    flint_mpz_clear_readonly(z);
+
+    return end - len;
+}
+
+/* Barrett division of 0 <= x < C->pow[k]^2 by C->pow[k] */
+static void
+_fmpz_radix_divrem(fmpz_t q, fmpz_t r, const fmpz_t x,
+                                  const fmpz_radix_cache_struct * C, slong k)
+{
+    flint_bitcnt_t bits = fmpz_bits(C->pow + k);
+
+    fmpz_fdiv_q_2exp(q, x, bits - 1);
+    _fmpz_radix_mul(q, q, C->inv + k);
+    fmpz_fdiv_q_2exp(q, q, bits + 1);
+
+    _fmpz_radix_mul(r, q, C->pow + k);
+    fmpz_sub(r, x, r);
+
+    while (fmpz_cmp(r, C->pow + k) >= 0)
+    {
+        fmpz_sub(r, r, C->pow + k);
+        fmpz_add_ui(q, q, 1);
+    }
+}
+
+static char * _fmpz_get_str_dc(char * end, const fmpz_t x, slong k,
+                            int b, int pad, const fmpz_radix_cache_struct * C);
+
+typedef struct
+{
+    char * end;
+    const fmpz * x;
+    slong k;
+    int b;
+    const fmpz_radix_cache_struct * C;
+}
+_fmpz_get_str_arg_t;
+
+static void
+_fmpz_get_str_worker(void * varg)
+{
+    _fmpz_get_str_arg_t * arg = (_fmpz_get_str_arg_t *) varg;
+
+    _fmpz_get_str_dc(arg->end, arg->x, arg->k, arg->b, 1, arg->C);
+}
+
+/*
+   Write the digits of 0 <= x < C->pow[k] as for _fmpz_get_str_basecase,
+   padding to digits*2^k digits if pad is set. The quotient and remainder
+   by C->pow[k - 1] are written independently, in parallel if they are
+   large enough.
+*/
+static char *
+_fmpz_get_str_dc(char * end, const fmpz_t x, slong k,
+                             int b, int pad, const fmpz_radix_cache_struct * C)
+{
+    slong half;
+    fmpz_t q, r;
+    char * start;
+
+    if (fmpz_size(x) < FMPZ_GET_STR_DC_LIMBS)
+        return _fmpz_get_str_basecase(end, x, C->digits << k, b, pad);
+
+    if (!pad && fmpz_cmp(x, C->pow + k - 1) < 0)
+        return _fmpz_get_str_dc(end, x, k - 1, b, 0, C);
+
+    half = C->digits << (k - 1);
+
+    fmpz_init(q);
+    fmpz_init(r);
+
+    _fmpz_radix_divrem(q, r, x, C, k - 1);
+
+    if (fmpz_size(r) >= FMPZ_RADIX_THREAD_LIMBS
+        && flint_task_num_threads() > 1)
+    {
+        _fmpz_get_str_arg_t arg;
+        flint_future_t F;
+
+        arg.end = end;
+        arg.x = r;
+        arg.k = k - 1;
+        arg.b = b;
+        arg.C = C;
+
+        flint_future_spawn(F, _fmpz_get_str_worker, &arg);
+        start = _fmpz_get_str_dc(end - half, q, k - 1, b, pad, C);
+        flint_future_wait(F);
+    }
+    else
+    {
+        _fmpz_get_str_dc(end, r, k - 1, b, 1, C);
+        start = _fmpz_get_str_dc(end - half, q, k - 1, b, pad, C);
+    }
+
+    fmpz_clear(q);
+    fmpz_clear(r);
+
+    return start;
+}
 
 char * fmpz_get_str(char * str, int b, const fmpz_t f)
 {
@@ -28,14 +160,48 @@ char * fmpz_get_str(char * str, int b, const fmpz_t f)
         str = mpz_get_str(str, b, z);
         mpz_clear(z);
     }
-    else
+    else if (b < 2 || b > 62 || fmpz_size(f) < FMPZ_GET_STR_DC_LIMBS)
     {
         if (!str) {
           str = flint_malloc(mpz_sizeinbase (COEFF_TO_PTR(*f), b) + 2);
         }
         str = mpz_get_str(str, b, COEFF_TO_PTR(*f));
     }
+    else
+    {
+        const fmpz_radix_cache_struct * C;
+        char * s, * start, * end;
+        fmpz_t x;
+        slong k;
+
+        if (!str) {
+          str = flint_malloc(fmpz_sizeinbase(f, b) + 2);
+        }
+
+        s = str;
+        if (fmpz_sgn(f) < 0)
+            *s++ = '-';
+
+        fmpz_init(x);
+        fmpz_abs(x, f);
+
+        /* find the smallest power in the cache exceeding x */
+        C = _fmpz_radix_cache(b, 1, 0);
+        for (k = 0; fmpz_cmp(C->pow + k, x) <= 0; k++)
+            C = _fmpz_radix_cache(b, k + 2, 0);
+
+        C = _fmpz_radix_cache(b, k + 1, k);
+
+        /* the digits are written right aligned, as their number is
+           only known up to one */
+        end = s + fmpz_sizeinbase(x, b);
+        start = _fmpz_get_str_dc(end, x, k, b, 0, C);
+
+        memmove(s, start, end - start);
+        s[end - start] = '\0';
+
+        fmpz_clear(x);
+    }
 
     return str;
 }
-
@@ -23,6 +23,7 @@
 #include "fmpz_vec.h"
 #include "aprcl.h"
 #include "mpn_extras.h"
+#include "ctrl.h"
 
 int fmpz_is_prime(const fmpz_t n)
 {
@@ -288,9 +289,10 @@ int fmpz_is_prime(const fmpz_t n)
 
    }
 
-   /* aprcl_is_prime() actually throws, but it does not hurt to have
-      this fallback here */
-   if (res < 0)
+   /* aprcl_is_prime() actually throws unless it was stopped by the
+      attached control context, but it does not hurt to have this
+      fallback here */
+   if (res < 0 && !flint_ctrl_stopped())
    {
       flint_printf("Exception in fmpz_is_prime: failed to prove ");
       fmpz_print(n);
@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2014 William Hart
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -101,7 +102,7 @@ int fmpz_is_prime_pocklington(fmpz_t F, fmpz_t R, const fmpz_t n, mp_ptr pm1, sl
    if (!fmpz_is_probabprime_BPSW(R))  
    {
       if (bits > 150 && (fac_found = fmpz_factor_pp1(p, R, bits + 1000, bits/20 + 1000, rand()%100 + 3)
-                    && fmpz_is_prime(p)))
+                    && fmpz_is_prime(p) == 1))
       {
          d = fmpz_remove(R, R, p);
          _fmpz_factor_append(fac, p, d);
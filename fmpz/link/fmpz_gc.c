@@ -127,6 +127,27 @@ void _fmpz_cleanup(void)
 #endif
 }
 
+void _fmpz_mpz_cache_trim(void)
+{
+}
+
+void _fmpz_mpz_cache_stats(fmpz_mpz_cache_stats_t stats)
+{
+#if FLINT_USES_PTHREAD
+    pthread_mutex_lock(&fmpz_lock);
+#endif
+
+    stats->hits = 0;
+    stats->misses = 0;
+    stats->remote_frees = 0;
+    stats->slabs = 0;
+    stats->cached = mpz_free_num;
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_unlock(&fmpz_lock);
+#endif
+}
+
 __mpz_struct * _fmpz_promote(fmpz_t f)
 {
     if (!COEFF_IS_MPZ(*f)) /* f is small so promote it first */
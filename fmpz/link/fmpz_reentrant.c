@@ -35,6 +35,19 @@ void _fmpz_cleanup(void)
 {
 }
 
+void _fmpz_mpz_cache_trim(void)
+{
+}
+
+void _fmpz_mpz_cache_stats(fmpz_mpz_cache_stats_t stats)
+{
+    stats->hits = 0;
+    stats->misses = 0;
+    stats->remote_frees = 0;
+    stats->slabs = 0;
+    stats->cached = 0;
+}
+
 __mpz_struct * _fmpz_promote(fmpz_t f)
 {
     if (!COEFF_IS_MPZ(*f))  /* f is small so promote it first */
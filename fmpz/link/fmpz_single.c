@@ -205,6 +205,26 @@ void _fmpz_cleanup(void)
     mpz_free_arr = NULL;
 }
 
+void _fmpz_mpz_cache_trim(void)
+{
+    ulong i;
+
+    for (i = 0; i < mpz_free_num; i++)
+    {
+        if (mpz_free_arr[i]->_mp_alloc > 2)
+            mpz_realloc2(mpz_free_arr[i], 2*FLINT_BITS);
+    }
+}
+
+void _fmpz_mpz_cache_stats(fmpz_mpz_cache_stats_t stats)
+{
+    stats->hits = 0;
+    stats->misses = 0;
+    stats->remote_frees = 0;
+    stats->slabs = 0;
+    stats->cached = mpz_free_num;
+}
+
 __mpz_struct * _fmpz_promote(fmpz_t f)
 {
     if (!COEFF_IS_MPZ(*f)) /* f is small so promote it first */
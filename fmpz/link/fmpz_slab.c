@@ -0,0 +1,766 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#ifdef __unix__
+#include <unistd.h> /* sysconf */
+#endif
+
+#if defined(_WIN32) || defined(WIN32)
+#include <windows.h> /* GetSytemInfo */
+#endif
+
+#include <stdlib.h>
+#include <string.h>
+
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+
+/*
+    Per-thread slab allocator for the mpz's backing large fmpz's.
+
+    Each thread carves its mpz's out of page aligned slabs that it owns. A
+    slot of a slab is an __mpz_struct followed by FMPZ_SLAB_INLINE_LIMBS
+    limbs, which are the limb data of the mpz until it needs more, so that
+    the header and limbs of a short integer are a single block. GMP knows
+    nothing of this, so the first slab installs GMP memory functions which
+    recognise inline limbs by looking their page up in a page map: GMP
+    reallocating them copies them to the heap and GMP freeing them does
+    nothing.
+
+    Freed mpz's keep their limb data and are cached in one of
+    FMPZ_SLAB_CLASSES size classes according to the number of limbs
+    allocated, class 0 holding those with inline limbs and class c > 0 those
+    with at most 2^c*FMPZ_SLAB_INLINE_LIMBS limbs on the heap. An mpz freed
+    by a thread other than the owner of its slab is pushed onto a lock free
+    stack in the slab header, which the owner drains the next time its cache
+    runs dry. When the owner cleans up, its slabs are orphaned and the last
+    mpz to be returned to an orphaned slab frees it.
+*/
+
+/* number of limbs stored in the same block as the header of an mpz */
+#define FMPZ_SLAB_INLINE_LIMBS FMPZ_MPN_INLINE_LIMBS
+
+#define FMPZ_SLAB_SLOT (sizeof(__mpz_struct) \
+                                + FMPZ_SLAB_INLINE_LIMBS*sizeof(mp_limb_t))
+
+/* bytes at the start of each page holding the pointer back to the slab */
+#define FMPZ_SLAB_PAGE_HEADER (2*sizeof(mp_limb_t))
+
+/* the inline limbs of the mpz in a slot */
+#define FMPZ_SLAB_LIMBS(ptr) ((mp_ptr) ((ptr) + 1))
+
+/* number of size classes, the largest holds up to
+   2^(FMPZ_SLAB_CLASSES - 1)*FMPZ_SLAB_INLINE_LIMBS limbs */
+#define FMPZ_SLAB_CLASSES 4
+
+/* Always free larger mpz's to avoid wasting too much heap space */
+#define FLINT_MPZ_MAX_CACHE_LIMBS \
+                    (FMPZ_SLAB_INLINE_LIMBS << (FMPZ_SLAB_CLASSES - 1))
+
+/* maximum number of cached mpz's with limbs on the heap, per class */
+#define FMPZ_SLAB_CLASS_LIMIT 1024
+
+#define PAGES_PER_SLAB 16
+
+/* value of the remote stack of a slab whose owner has cleaned up */
+#define FMPZ_SLAB_ORPHANED ((__mpz_struct *) WORD(1))
+
+#if (__GNUC__ > 4 || (__GNUC__ == 4 && __GNUC_MINOR__ >= 8)) && FLINT_USES_PTHREAD
+#define FMPZ_SLAB_ATOMICS 1
+#else
+#define FMPZ_SLAB_ATOMICS 0
+#endif
+
+typedef struct fmpz_slab_struct
+{
+    slong live;         /* mpz's handed out and not yet returned to owner */
+    slong count;        /* outstanding mpz's once orphaned */
+    __mpz_struct * remote; /* stack of mpz's freed by other threads */
+    void * owner;       /* thread cache of the owning thread */
+    struct fmpz_slab_struct * next;
+    char * pages;       /* first of the PAGES_PER_SLAB pages */
+    int dead;
+} fmpz_slab_struct;
+
+typedef struct
+{
+    __mpz_struct ** arr[FMPZ_SLAB_CLASSES];
+    ulong num[FMPZ_SLAB_CLASSES];
+    ulong alloc[FMPZ_SLAB_CLASSES];
+    ulong nonempty;     /* bit c is set iff class c is nonempty */
+    int last;           /* class of the most recently cached mpz */
+    fmpz_slab_struct * slabs;
+    ulong hits;
+    ulong misses;
+    ulong remote_frees;
+    ulong num_slabs;
+    int trim_registered;
+} fmpz_slab_cache_struct;
+
+FLINT_TLS_PREFIX fmpz_slab_cache_struct fmpz_slab_cache;
+
+static slong flint_page_size = 0;
+static slong flint_mpz_structs_per_page;
+static slong flint_page_mask;
+
+slong flint_get_page_size()
+{
+#if defined(__unix__)
+   return sysconf(_SC_PAGESIZE);
+#elif defined(_WIN32) || defined(WIN32)
+   SYSTEM_INFO si;
+   GetSystemInfo(&si);
+   return si.dwPageSize;
+#else
+   return 4096;
+#endif
+}
+
+void * flint_align_ptr(void * ptr, slong size)
+{
+    slong mask = ~(size - 1);
+
+    return (void *)((mask & (slong) ptr) + size);
+}
+
+static __inline__ fmpz_slab_struct * _fmpz_slab_of(const __mpz_struct * ptr)
+{
+    return *((fmpz_slab_struct **) ((slong) ptr & flint_page_mask));
+}
+
+/* classes of FMPZ_SLAB_CLASSES and above are not cached */
+static __inline__ int _fmpz_slab_class(slong alloc)
+{
+    return alloc <= FMPZ_SLAB_INLINE_LIMBS ? 0 :
+                        FLINT_BIT_COUNT((alloc - 1)/FMPZ_SLAB_INLINE_LIMBS);
+}
+
+static __inline__ __mpz_struct * _fmpz_slab_load(__mpz_struct ** p)
+{
+#if FMPZ_SLAB_ATOMICS
+    return __atomic_load_n(p, __ATOMIC_ACQUIRE);
+#else
+    return *p;
+#endif
+}
+
+static __inline__ __mpz_struct * _fmpz_slab_take_remote(fmpz_slab_struct * s,
+                                                         __mpz_struct * val)
+{
+#if FMPZ_SLAB_ATOMICS
+    return __atomic_exchange_n(&s->remote, val, __ATOMIC_ACQ_REL);
+#else
+    __mpz_struct * old = s->remote;
+    s->remote = val;
+    return old;
+#endif
+}
+
+static __inline__ slong _fmpz_slab_release(fmpz_slab_struct * s)
+{
+#if FMPZ_SLAB_ATOMICS
+    return __atomic_sub_fetch(&s->count, 1, __ATOMIC_ACQ_REL);
+#else
+    return --s->count;
+#endif
+}
+
+/*
+    Page map from addresses, in units of 2^FMPZ_SLAB_MAP_SHIFT bytes, to the
+    slabs containing them. It is a radix tree with four levels, shared by
+    all threads. Nodes are created on demand and never freed, entries are
+    set when a slab is created and cleared before it is freed.
+*/
+#define FMPZ_SLAB_MAP_SHIFT 12
+#define FMPZ_SLAB_MAP_BITS ((FLINT_BITS - FMPZ_SLAB_MAP_SHIFT + 3)/4)
+#define FMPZ_SLAB_MAP_SIZE (WORD(1) << FMPZ_SLAB_MAP_BITS)
+
+static void * fmpz_slab_map[FMPZ_SLAB_MAP_SIZE];
+
+static __inline__ void * _fmpz_slab_map_load(void ** p)
+{
+#if FMPZ_SLAB_ATOMICS
+    return __atomic_load_n(p, __ATOMIC_ACQUIRE);
+#else
+    return *p;
+#endif
+}
+
+static fmpz_slab_struct * _fmpz_slab_map_find(const void * addr)
+{
+    ulong u = (ulong) addr >> FMPZ_SLAB_MAP_SHIFT;
+    void ** node = fmpz_slab_map;
+    int k;
+
+    for (k = 3; k > 0; k--)
+    {
+        node = (void **) _fmpz_slab_map_load(node +
+                 ((u >> (k*FMPZ_SLAB_MAP_BITS)) & (FMPZ_SLAB_MAP_SIZE - 1)));
+
+        if (node == NULL)
+            return NULL;
+    }
+
+    return (fmpz_slab_struct *)
+             _fmpz_slab_map_load(node + (u & (FMPZ_SLAB_MAP_SIZE - 1)));
+}
+
+static void _fmpz_slab_map_set(const void * addr, fmpz_slab_struct * s)
+{
+    ulong u = (ulong) addr >> FMPZ_SLAB_MAP_SHIFT;
+    void ** node = fmpz_slab_map, ** p, * next;
+    int k;
+
+    for (k = 3; k > 0; k--)
+    {
+        p = node + ((u >> (k*FMPZ_SLAB_MAP_BITS)) & (FMPZ_SLAB_MAP_SIZE - 1));
+        next = _fmpz_slab_map_load(p);
+
+        if (next == NULL)
+        {
+            next = flint_calloc(FMPZ_SLAB_MAP_SIZE, sizeof(void *));
+#if FMPZ_SLAB_ATOMICS
+            {
+                void * old = NULL;
+
+                /* another thread may have created the node first */
+                if (!__atomic_compare_exchange_n(p, &old, next, 0,
+                                        __ATOMIC_ACQ_REL, __ATOMIC_ACQUIRE))
+                {
+                    flint_free(next);
+                    next = old;
+                }
+            }
+#else
+            *p = next;
+#endif
+        }
+
+        node = (void **) next;
+    }
+
+    p = node + (u & (FMPZ_SLAB_MAP_SIZE - 1));
+#if FMPZ_SLAB_ATOMICS
+    __atomic_store_n(p, (void *) s, __ATOMIC_RELEASE);
+#else
+    *p = (void *) s;
+#endif
+}
+
+static void _fmpz_slab_map_pages(fmpz_slab_struct * s, fmpz_slab_struct * val)
+{
+    slong i, n = (PAGES_PER_SLAB*flint_page_size) >> FMPZ_SLAB_MAP_SHIFT;
+
+    for (i = 0; i < n; i++)
+        _fmpz_slab_map_set(s->pages + (i << FMPZ_SLAB_MAP_SHIFT), val);
+}
+
+/* whether p is the inline limb data of a slot of a live slab */
+static int _fmpz_slab_is_inline(const void * p)
+{
+    slong off;
+
+    if (_fmpz_slab_map_find(p) == NULL)
+        return 0;
+
+    off = ((slong) p & ~flint_page_mask) - FMPZ_SLAB_PAGE_HEADER
+                                                    - sizeof(__mpz_struct);
+
+    return off >= 0 && off % FMPZ_SLAB_SLOT == 0;
+}
+
+static void * (*fmpz_slab_gmp_alloc)(size_t);
+static void * (*fmpz_slab_gmp_realloc)(void *, size_t, size_t);
+static void (*fmpz_slab_gmp_free)(void *, size_t);
+
+static void * _fmpz_slab_gmp_realloc(void * p, size_t old_size,
+                                                            size_t new_size)
+{
+    if (old_size == FMPZ_SLAB_INLINE_LIMBS*sizeof(mp_limb_t)
+                                                  && _fmpz_slab_is_inline(p))
+    {
+        void * q = fmpz_slab_gmp_alloc(new_size);
+        memcpy(q, p, FLINT_MIN(old_size, new_size));
+        return q;
+    }
+
+    return fmpz_slab_gmp_realloc(p, old_size, new_size);
+}
+
+static void _fmpz_slab_gmp_free(void * p, size_t size)
+{
+    if (size == FMPZ_SLAB_INLINE_LIMBS*sizeof(mp_limb_t)
+                                                  && _fmpz_slab_is_inline(p))
+        return;
+
+    fmpz_slab_gmp_free(p, size);
+}
+
+static void _fmpz_slab_gmp_init(void)
+{
+    mp_get_memory_functions(&fmpz_slab_gmp_alloc, &fmpz_slab_gmp_realloc,
+                                                        &fmpz_slab_gmp_free);
+    mp_set_memory_functions(fmpz_slab_gmp_alloc, _fmpz_slab_gmp_realloc,
+                                                        _fmpz_slab_gmp_free);
+}
+
+#if FLINT_USES_PTHREAD
+static pthread_once_t fmpz_slab_gmp_init_once = PTHREAD_ONCE_INIT;
+#else
+static int fmpz_slab_gmp_initialised = 0;
+#endif
+
+/* make ptr an empty mpz using the inline limbs of its slot */
+static __inline__ void _fmpz_slab_set_inline(__mpz_struct * ptr)
+{
+    ptr->_mp_alloc = FMPZ_SLAB_INLINE_LIMBS;
+    ptr->_mp_size = 0;
+    ptr->_mp_d = FMPZ_SLAB_LIMBS(ptr);
+}
+
+/* give back the heap limbs of ptr, if any */
+static __inline__ void _fmpz_slab_reset(__mpz_struct * ptr)
+{
+    if (ptr->_mp_d != FMPZ_SLAB_LIMBS(ptr))
+    {
+        mpz_clear(ptr);
+        _fmpz_slab_set_inline(ptr);
+    }
+}
+
+static void _fmpz_slab_free(fmpz_slab_struct * s)
+{
+    _fmpz_slab_map_pages(s, NULL);
+    flint_free(s);
+}
+
+/* the remote stack is linked through the _mp_d field of cleared mpz's */
+#define FMPZ_SLAB_NEXT(ptr) ((__mpz_struct *) (ptr)->_mp_d)
+#define FMPZ_SLAB_SET_NEXT(ptr, nxt) ((ptr)->_mp_d = (mp_limb_t *) (nxt))
+
+static void _fmpz_slab_push(int c, __mpz_struct * ptr)
+{
+    fmpz_slab_cache_struct * cache = &fmpz_slab_cache;
+
+    if (cache->num[c] == cache->alloc[c])
+    {
+        cache->alloc[c] = FLINT_MAX(64, cache->alloc[c] * 2);
+        cache->arr[c] = flint_realloc(cache->arr[c],
+                                   cache->alloc[c] * sizeof(__mpz_struct *));
+    }
+
+    cache->arr[c][cache->num[c]++] = ptr;
+    cache->nonempty |= UWORD(1) << c;
+    cache->last = c;
+}
+
+/* move mpz's freed by other threads back into the cache */
+static slong _fmpz_slab_drain(void)
+{
+    fmpz_slab_cache_struct * cache = &fmpz_slab_cache;
+    fmpz_slab_struct * s;
+    slong n = 0;
+
+    for (s = cache->slabs; s != NULL; s = s->next)
+    {
+        __mpz_struct * ptr, * next;
+
+        if (_fmpz_slab_load(&s->remote) == NULL)
+            continue;
+
+        for (ptr = _fmpz_slab_take_remote(s, NULL); ptr != NULL; ptr = next)
+        {
+            next = FMPZ_SLAB_NEXT(ptr);
+            _fmpz_slab_set_inline(ptr);
+            s->live--;
+            _fmpz_slab_push(0, ptr);
+            n++;
+        }
+    }
+
+    return n;
+}
+
+static void _fmpz_slab_new(void)
+{
+    fmpz_slab_cache_struct * cache = &fmpz_slab_cache;
+    fmpz_slab_struct * s;
+    void * ptr, * aligned_ptr;
+    slong i, j, num;
+
+    if (flint_page_size == 0)
+    {
+        flint_page_size = flint_get_page_size();
+        flint_page_mask = ~(flint_page_size - 1);
+        flint_mpz_structs_per_page =
+                    (flint_page_size - FMPZ_SLAB_PAGE_HEADER)/FMPZ_SLAB_SLOT;
+    }
+
+#if FLINT_USES_PTHREAD
+    pthread_once(&fmpz_slab_gmp_init_once, _fmpz_slab_gmp_init);
+#else
+    if (!fmpz_slab_gmp_initialised)
+    {
+        _fmpz_slab_gmp_init();
+        fmpz_slab_gmp_initialised = 1;
+    }
+#endif
+
+    num = flint_mpz_structs_per_page;
+
+    /* flint_cleanup trims the cache before releasing it */
+    if (!cache->trim_registered)
+    {
+        flint_register_cleanup_function(_fmpz_mpz_cache_trim);
+        cache->trim_registered = 1;
+    }
+
+    /* the slab header goes before the first aligned page */
+    ptr = flint_malloc(PAGES_PER_SLAB*flint_page_size + flint_page_size
+                                                 + sizeof(fmpz_slab_struct));
+    aligned_ptr = flint_align_ptr((char *) ptr + sizeof(fmpz_slab_struct),
+                                                             flint_page_size);
+
+    s = (fmpz_slab_struct *) ptr;
+    s->live = 0;
+    s->count = 0;
+    s->remote = NULL;
+    s->owner = cache;
+    s->dead = 0;
+    s->pages = (char *) aligned_ptr;
+    s->next = cache->slabs;
+    cache->slabs = s;
+    cache->num_slabs++;
+
+    _fmpz_slab_map_pages(s, s);
+
+    for (i = PAGES_PER_SLAB - 1; i >= 0; i--)
+    {
+        char * page_ptr = s->pages + i*flint_page_size;
+
+        *((fmpz_slab_struct **) page_ptr) = s;
+
+        for (j = num - 1; j >= 0; j--)
+        {
+            __mpz_struct * ptr = (__mpz_struct *)
+                          (page_ptr + FMPZ_SLAB_PAGE_HEADER + j*FMPZ_SLAB_SLOT);
+
+            _fmpz_slab_set_inline(ptr);
+            _fmpz_slab_push(0, ptr);
+        }
+    }
+}
+
+__mpz_struct * _fmpz_new_mpz(void)
+{
+    fmpz_slab_cache_struct * cache = &fmpz_slab_cache;
+    __mpz_struct * ptr;
+    int c;
+
+    if (cache->nonempty == 0)
+    {
+        cache->misses++;
+
+        if (_fmpz_slab_drain() == 0)
+            _fmpz_slab_new();
+    }
+    else
+        cache->hits++;
+
+    c = cache->last;
+    if ((cache->nonempty & (UWORD(1) << c)) == 0)
+    {
+        ulong t;
+        count_trailing_zeros(t, cache->nonempty);
+        c = t;
+    }
+
+    ptr = cache->arr[c][--cache->num[c]];
+    if (cache->num[c] == 0)
+        cache->nonempty &= ~(UWORD(1) << c);
+
+    _fmpz_slab_of(ptr)->live++;
+
+    return ptr;
+}
+
+static void _fmpz_slab_free_remote(fmpz_slab_struct * s, __mpz_struct * ptr)
+{
+    mpz_clear(ptr);
+
+    fmpz_slab_cache.remote_frees++;
+
+#if FMPZ_SLAB_ATOMICS
+    {
+        __mpz_struct * head = __atomic_load_n(&s->remote, __ATOMIC_ACQUIRE);
+
+        while (head != FMPZ_SLAB_ORPHANED)
+        {
+            FMPZ_SLAB_SET_NEXT(ptr, head);
+
+            if (__atomic_compare_exchange_n(&s->remote, &head, ptr, 1,
+                                        __ATOMIC_ACQ_REL, __ATOMIC_ACQUIRE))
+                return;
+        }
+    }
+#else
+    if (s->remote != FMPZ_SLAB_ORPHANED)
+    {
+        FMPZ_SLAB_SET_NEXT(ptr, s->remote);
+        s->remote = ptr;
+        return;
+    }
+#endif
+
+    /* the owner has gone, the last mpz back frees the slab */
+    if (_fmpz_slab_release(s) == 0)
+        _fmpz_slab_free(s);
+}
+
+void _fmpz_clear_mpz(fmpz f)
+{
+    fmpz_slab_cache_struct * cache = &fmpz_slab_cache;
+    __mpz_struct * ptr = COEFF_TO_PTR(f);
+    fmpz_slab_struct * s = _fmpz_slab_of(ptr);
+    int c;
+
+    if (s->owner != cache || _fmpz_slab_load(&s->remote) == FMPZ_SLAB_ORPHANED)
+    {
+        _fmpz_slab_free_remote(s, ptr);
+        return;
+    }
+
+    s->live--;
+
+    c = _fmpz_slab_class(ptr->_mp_alloc);
+
+    if (c == 0 || c >= FMPZ_SLAB_CLASSES ||
+                                     cache->num[c] >= FMPZ_SLAB_CLASS_LIMIT)
+    {
+        _fmpz_slab_reset(ptr);
+        c = 0;
+    }
+
+    _fmpz_slab_push(c, ptr);
+}
+
+/* hand a slab over to the threads still holding its mpz's */
+static void _fmpz_slab_orphan(fmpz_slab_struct * s)
+{
+    __mpz_struct * ptr, * next;
+
+    if (s->live == 0)
+    {
+        _fmpz_slab_free(s);
+        return;
+    }
+
+    s->count = s->live;
+
+#if FMPZ_SLAB_ATOMICS
+    __atomic_thread_fence(__ATOMIC_SEQ_CST);
+#endif
+
+    for (ptr = _fmpz_slab_take_remote(s, FMPZ_SLAB_ORPHANED);
+                                                   ptr != NULL; ptr = next)
+    {
+        next = FMPZ_SLAB_NEXT(ptr);
+
+        if (_fmpz_slab_release(s) == 0)
+            _fmpz_slab_free(s);
+    }
+}
+
+void _fmpz_cleanup_mpz_content(void)
+{
+    fmpz_slab_cache_struct * cache = &fmpz_slab_cache;
+    fmpz_slab_struct * s, * next;
+    ulong i;
+    int c;
+
+    for (c = 0; c < FMPZ_SLAB_CLASSES; c++)
+    {
+        for (i = 0; i < cache->num[c]; i++)
+            mpz_clear(cache->arr[c][i]);
+
+        cache->num[c] = 0;
+    }
+
+    cache->nonempty = 0;
+
+    for (s = cache->slabs; s != NULL; s = next)
+    {
+        next = s->next;
+        _fmpz_slab_orphan(s);
+    }
+
+    cache->slabs = NULL;
+    cache->num_slabs = 0;
+}
+
+void _fmpz_cleanup(void)
+{
+    fmpz_slab_cache_struct * cache = &fmpz_slab_cache;
+    int c;
+
+    _fmpz_cleanup_mpz_content();
+
+    for (c = 0; c < FMPZ_SLAB_CLASSES; c++)
+    {
+        flint_free(cache->arr[c]);
+        cache->arr[c] = NULL;
+        cache->alloc[c] = 0;
+    }
+
+    /* the registered cleanup functions have been dropped */
+    cache->trim_registered = 0;
+}
+
+void _fmpz_mpz_cache_trim(void)
+{
+    fmpz_slab_cache_struct * cache = &fmpz_slab_cache;
+    fmpz_slab_struct * s, ** prev;
+    ulong i, j;
+    int c;
+
+    _fmpz_slab_drain();
+
+    /* give back all heap limbs */
+    for (c = 1; c < FMPZ_SLAB_CLASSES; c++)
+    {
+        for (i = 0; i < cache->num[c]; i++)
+        {
+            _fmpz_slab_reset(cache->arr[c][i]);
+            _fmpz_slab_push(0, cache->arr[c][i]);
+        }
+
+        cache->num[c] = 0;
+    }
+
+    cache->nonempty &= UWORD(1);
+    cache->last = 0;
+
+    /* release slabs none of whose mpz's are in use */
+    for (s = cache->slabs; s != NULL; s = s->next)
+        s->dead = (s->live == 0);
+
+    for (i = j = 0; i < cache->num[0]; i++)
+    {
+        __mpz_struct * ptr = cache->arr[0][i];
+
+        if (_fmpz_slab_of(ptr)->dead)
+            mpz_clear(ptr);
+        else
+            cache->arr[0][j++] = ptr;
+    }
+
+    cache->num[0] = j;
+    if (j == 0)
+        cache->nonempty = 0;
+
+    prev = &cache->slabs;
+    while ((s = *prev) != NULL)
+    {
+        if (s->dead)
+        {
+            *prev = s->next;
+            cache->num_slabs--;
+            _fmpz_slab_free(s);
+        }
+        else
+            prev = &s->next;
+    }
+}
+
+void _fmpz_mpz_cache_stats(fmpz_mpz_cache_stats_t stats)
+{
+    fmpz_slab_cache_struct * cache = &fmpz_slab_cache;
+    int c;
+
+    stats->hits = cache->hits;
+    stats->misses = cache->misses;
+    stats->remote_frees = cache->remote_frees;
+    stats->slabs = cache->num_slabs;
+    stats->cached = 0;
+
+    for (c = 0; c < FMPZ_SLAB_CLASSES; c++)
+        stats->cached += cache->num[c];
+}
+
+__mpz_struct * _fmpz_promote(fmpz_t f)
+{
+    if (!COEFF_IS_MPZ(*f)) /* f is small so promote it first */
+    {
+        __mpz_struct * mpz_ptr = _fmpz_new_mpz();
+        (*f) = PTR_TO_COEFF(mpz_ptr);
+        return mpz_ptr;
+    }
+    else /* f is large already, just return the pointer */
+        return COEFF_TO_PTR(*f);
+}
+
+__mpz_struct * _fmpz_promote_val(fmpz_t f)
+{
+    fmpz c = (*f);
+    if (!COEFF_IS_MPZ(c)) /* f is small so promote it */
+    {
+        __mpz_struct * mpz_ptr = _fmpz_new_mpz();
+        (*f) = PTR_TO_COEFF(mpz_ptr);
+        flint_mpz_set_si(mpz_ptr, c);
+        return mpz_ptr;
+    }
+    else /* f is large already, just return the pointer */
+        return COEFF_TO_PTR(c);
+}
+
+void _fmpz_demote_val(fmpz_t f)
+{
+    __mpz_struct * mpz_ptr = COEFF_TO_PTR(*f);
+    int size = mpz_ptr->_mp_size;
+
+    if (size == 1 || size == -1)
+    {
+        ulong uval = mpz_ptr->_mp_d[0];
+
+        if (uval <= (ulong) COEFF_MAX)
+        {
+            _fmpz_clear_mpz(*f);
+            *f = size * (fmpz) uval;
+        }
+    }
+    else if (size == 0)  /* value is 0 */
+    {
+        _fmpz_clear_mpz(*f);
+        *f = 0;
+    }
+
+    /* don't do anything if value has to be multi precision */
+}
+
+void _fmpz_init_readonly_mpz(fmpz_t f, const mpz_t z)
+{
+   __mpz_struct *ptr;
+   *f = WORD(0);
+   ptr = _fmpz_promote(f);
+
+   mpz_clear(ptr);
+   *ptr = *z;
+}
+
+void _fmpz_clear_readonly_mpz(mpz_t z)
+{
+    if (((z->_mp_size == 1 || z->_mp_size == -1) && (z->_mp_d[0] <= COEFF_MAX))
+        || (z->_mp_size == 0))
+    {
+        mpz_clear(z);
+    }
+}
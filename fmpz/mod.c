@@ -60,8 +60,58 @@ fmpz_mod(fmpz_t f, const fmpz_t g, const fmpz_t h)
         }
         else                    /* both are large */
         {
-            __mpz_struct *mpz_ptr = _fmpz_promote(f);
-            mpz_mod(mpz_ptr, COEFF_TO_PTR(c1), COEFF_TO_PTR(c2));
+            __mpz_struct * a = COEFF_TO_PTR(c1);
+            __mpz_struct * b = COEFF_TO_PTR(c2);
+            mp_size_t an = FLINT_ABS(a->_mp_size);
+            mp_size_t bn = FLINT_ABS(b->_mp_size);
+            __mpz_struct * mpz_ptr;
+
+            if (an <= FMPZ_MPN_INLINE_LIMBS && bn <= FMPZ_MPN_INLINE_LIMBS)
+            {
+                /* short operands: reduce the limbs directly on the stack */
+                mp_limb_t q[FMPZ_MPN_INLINE_LIMBS];
+                mp_limb_t r[FMPZ_MPN_INLINE_LIMBS];
+                mp_size_t rn;
+
+                if (an < bn)
+                {
+                    flint_mpn_copyi(r, a->_mp_d, an);
+                    rn = an;
+                }
+                else
+                {
+                    mpn_tdiv_qr(q, r, 0, a->_mp_d, an, b->_mp_d, bn);
+                    rn = bn;
+                    while (rn > 0 && r[rn - 1] == 0)
+                        rn--;
+                }
+
+                /* C division rounds towards zero, move into [0, |h|) */
+                if (a->_mp_size < 0 && rn != 0)
+                {
+                    mpn_sub(q, b->_mp_d, bn, r, rn);
+                    flint_mpn_copyi(r, q, bn);
+                    rn = bn;
+                    while (rn > 0 && r[rn - 1] == 0)
+                        rn--;
+                }
+
+                if (rn == 0)
+                {
+                    fmpz_zero(f);
+                    return;
+                }
+
+                mpz_ptr = _fmpz_promote(f);
+                flint_mpn_copyi(FLINT_MPZ_REALLOC(mpz_ptr, rn), r, rn);
+                mpz_ptr->_mp_size = rn;
+            }
+            else
+            {
+                mpz_ptr = _fmpz_promote(f);
+                mpz_mod(mpz_ptr, a, b);
+            }
+
             _fmpz_demote_val(f);    /* reduction mod h may result in small value */
         }
     }
@@ -41,5 +41,36 @@ fmpz_mul(fmpz_t f, const fmpz_t g, const fmpz_t h)
     if (!COEFF_IS_MPZ(c2))      /* g is large, h is small */
         flint_mpz_mul_si(mpz_ptr, COEFF_TO_PTR(c1), c2);
     else                        /* c1 and c2 are large */
-        mpz_mul(mpz_ptr, COEFF_TO_PTR(c1), COEFF_TO_PTR(c2));
+    {
+        __mpz_struct * a = COEFF_TO_PTR(c1);
+        __mpz_struct * b = COEFF_TO_PTR(c2);
+        mp_size_t an = FLINT_ABS(a->_mp_size);
+        mp_size_t bn = FLINT_ABS(b->_mp_size);
+
+        if (an <= FMPZ_MPN_INLINE_LIMBS && bn <= FMPZ_MPN_INLINE_LIMBS)
+        {
+            /*
+               Short operands: multiply the limbs directly, into f itself
+               unless it is aliased with an input, sizing f once
+            */
+            mp_limb_t t[2*FMPZ_MPN_INLINE_LIMBS];
+            mp_size_t rn;
+            int neg = (a->_mp_size ^ b->_mp_size) < 0;
+            mp_ptr d;
+
+            if (mpz_ptr == a || mpz_ptr == b)
+                d = t;
+            else
+                d = FLINT_MPZ_REALLOC(mpz_ptr, an + bn);
+
+            rn = _fmpz_mpz_mul_limbs(d, a, an, b, bn);
+
+            if (d == t)
+                flint_mpn_copyi(FLINT_MPZ_REALLOC(mpz_ptr, rn), t, rn);
+
+            mpz_ptr->_mp_size = neg ? -rn : rn;
+        }
+        else
+            mpz_mul(mpz_ptr, a, b);
+    }
 }
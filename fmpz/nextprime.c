@@ -54,12 +54,19 @@ void fmpz_nextprime(fmpz_t res, const fmpz_t n, int proved)
 
     if (proved)
     {
-        if (!fmpz_is_prime(res))
+        int r = fmpz_is_prime(res);
+
+        if (r == 0)
         {
             /* Keep searching. No big penalty for recursion here because this
              * will almost never happen.
              */
             fmpz_nextprime(res, res, proved);
         }
+        else if (r == -1)
+        {
+            /* stopped before res could be proved prime */
+            fmpz_zero(res);
+        }
     }
 }
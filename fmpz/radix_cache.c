@@ -0,0 +1,141 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "mpn_extras.h"
+#include "fft.h"
+
+/* caches for the bases 2 to 62, allocated on first use */
+static FLINT_TLS_PREFIX fmpz_radix_cache_struct ** _fmpz_radix_caches = NULL;
+
+void _fmpz_radix_cache_clear(void)
+{
+    slong i, k;
+    fmpz_radix_cache_struct * C;
+
+    if (_fmpz_radix_caches == NULL)
+        return;
+
+    for (i = 0; i < 61; i++)
+    {
+        C = _fmpz_radix_caches[i];
+
+        if (C != NULL)
+        {
+            for (k = 0; k < C->len; k++)
+                fmpz_clear(C->pow + k);
+
+            for (k = 0; k < C->inv_len; k++)
+                fmpz_clear(C->inv + k);
+
+            flint_free(C);
+        }
+    }
+
+    flint_free(_fmpz_radix_caches);
+    _fmpz_radix_caches = NULL;
+}
+
+const fmpz_radix_cache_struct * _fmpz_radix_cache(int b,
+                                                    slong len, slong inv_len)
+{
+    fmpz_radix_cache_struct * C;
+    mp_limb_t p;
+    slong k;
+
+    if (_fmpz_radix_caches == NULL)
+    {
+        _fmpz_radix_caches = (fmpz_radix_cache_struct **)
+                       flint_calloc(61, sizeof(fmpz_radix_cache_struct *));
+        flint_register_cleanup_function(_fmpz_radix_cache_clear);
+    }
+
+    C = _fmpz_radix_caches[b - 2];
+
+    if (C == NULL)
+    {
+        C = (fmpz_radix_cache_struct *)
+                               flint_malloc(sizeof(fmpz_radix_cache_struct));
+
+        for (p = b, C->digits = 1; p <= UWORD_MAX/b; p *= b)
+            C->digits++;
+
+        fmpz_init_set_ui(C->pow + 0, p);
+        C->len = 1;
+        C->inv_len = 0;
+
+        _fmpz_radix_caches[b - 2] = C;
+    }
+
+    len = FLINT_MAX(len, inv_len);
+
+    for (k = C->len; k < len; k++)
+    {
+        fmpz_init(C->pow + k);
+        _fmpz_radix_mul(C->pow + k, C->pow + k - 1, C->pow + k - 1);
+        C->len = k + 1;
+    }
+
+    for (k = C->inv_len; k < inv_len; k++)
+    {
+        fmpz_init(C->inv + k);
+        fmpz_one(C->inv + k);
+        fmpz_mul_2exp(C->inv + k, C->inv + k, 2*fmpz_bits(C->pow + k));
+        fmpz_fdiv_q(C->inv + k, C->inv + k, C->pow + k);
+        C->inv_len = k + 1;
+    }
+
+    return C;
+}
+
+void _fmpz_radix_mul(fmpz_t r, const fmpz_t a, const fmpz_t b)
+{
+    __mpz_struct * A, * B, * R;
+    mp_size_t an, bn;
+    mp_ptr t;
+    int neg;
+
+    if (!COEFF_IS_MPZ(*a) || !COEFF_IS_MPZ(*b))
+    {
+        fmpz_mul(r, a, b);
+        return;
+    }
+
+    A = COEFF_TO_PTR(*a);
+    B = COEFF_TO_PTR(*b);
+    an = FLINT_ABS(A->_mp_size);
+    bn = FLINT_ABS(B->_mp_size);
+
+    if (an < FMPZ_RADIX_FFT_LIMBS || bn < FMPZ_RADIX_FFT_LIMBS)
+    {
+        fmpz_mul(r, a, b);
+        return;
+    }
+
+    t = (mp_ptr) flint_malloc((an + bn)*sizeof(mp_limb_t));
+
+    if (an >= bn)
+        flint_mpn_mul_fft_main(t, A->_mp_d, an, B->_mp_d, bn);
+    else
+        flint_mpn_mul_fft_main(t, B->_mp_d, bn, A->_mp_d, an);
+
+    /* r may be aliased with a or b, so only now overwrite it */
+    neg = (A->_mp_size ^ B->_mp_size) < 0;
+    an += bn - (t[an + bn - 1] == 0);
+
+    R = _fmpz_promote(r);
+    flint_mpn_copyi(FLINT_MPZ_REALLOC(R, an), t, an);
+    R->_mp_size = neg ? -an : an;
+
+    flint_free(t);
+}
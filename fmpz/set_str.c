@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2010 Sebastian Pancratz
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -9,20 +10,196 @@
     (at your option) any later version.  See <https://www.gnu.org/licenses/>.
 */
 
+#include <ctype.h>
+#include <string.h>
 #include <gmp.h>
 #include "flint.h"
 #include "ulong_extras.h"
+#include "mpn_extras.h"
 #include "fmpz.h"
+#include "thread_support.h"
+
+/* value of the digit c in base b as read by mpz_set_str, or b if none */
+static int _fmpz_digit_value(int c, int b)
+{
+    int d;
+
+    if (c >= '0' && c <= '9')
+        d = c - '0';
+    else if (c >= 'a' && c <= 'z')
+        d = c - 'a' + (b <= 36 ? 10 : 36);
+    else if (c >= 'A' && c <= 'Z')
+        d = c - 'A' + 10;
+    else
+        d = b;
+
+    return d < b ? d : b;
+}
+
+/* set f to the number with the n digit values d in base b */
+static void
+_fmpz_set_str_basecase(fmpz_t f, const unsigned char * d, slong n, int b)
+{
+    __mpz_struct * z;
+    mp_size_t len;
+    mp_ptr t;
+
+    while (n > 0 && d[0] == 0)
+    {
+        d++;
+        n--;
+    }
+
+    if (n == 0)
+    {
+        fmpz_zero(f);
+        return;
+    }
+
+    z = _fmpz_promote(f);
+    t = FLINT_MPZ_REALLOC(z, (n*FLINT_BIT_COUNT(b - 1))/FLINT_BITS + 2);
+
+    len = mpn_set_str(t, d, n, b);
+    MPN_NORM(t, len);
+    z->_mp_size = len;
+
+    _fmpz_demote_val(f);
+}
+
+static void _fmpz_set_str_dc(fmpz_t f, const unsigned char * d, slong n,
+                                   int b, const fmpz_radix_cache_struct * C);
+
+typedef struct
+{
+    fmpz * f;
+    const unsigned char * d;
+    slong n;
+    int b;
+    const fmpz_radix_cache_struct * C;
+}
+_fmpz_set_str_arg_t;
+
+static void
+_fmpz_set_str_worker(void * varg)
+{
+    _fmpz_set_str_arg_t * arg = (_fmpz_set_str_arg_t *) varg;
+
+    _fmpz_set_str_dc(arg->f, arg->d, arg->n, arg->b, arg->C);
+}
+
+/*
+   Set f to the number with the n digit values d in base b, as hi*pow[k] + lo
+   where lo has the last digits*2^k digits. The two halves are converted
+   independently, in parallel if they are large enough.
+*/
+static void _fmpz_set_str_dc(fmpz_t f, const unsigned char * d, slong n,
+                                    int b, const fmpz_radix_cache_struct * C)
+{
+    slong k, half;
+    fmpz_t lo;
+
+    if (n*FLINT_BIT_COUNT(b - 1) < FMPZ_SET_STR_DC_LIMBS*FLINT_BITS)
+    {
+        _fmpz_set_str_basecase(f, d, n, b);
+        return;
+    }
+
+    for (k = 0; (C->digits << (k + 1)) < n; k++) ;
+    half = C->digits << k;
+
+    fmpz_init(lo);
+
+    if (half*FLINT_BIT_COUNT(b - 1) >= FMPZ_RADIX_THREAD_LIMBS*FLINT_BITS
+        && flint_task_num_threads() > 1)
+    {
+        _fmpz_set_str_arg_t arg;
+        flint_future_t F;
+
+        arg.f = lo;
+        arg.d = d + n - half;
+        arg.n = half;
+        arg.b = b;
+        arg.C = C;
+
+        flint_future_spawn(F, _fmpz_set_str_worker, &arg);
+        _fmpz_set_str_dc(f, d, n - half, b, C);
+        flint_future_wait(F);
+    }
+    else
+    {
+        _fmpz_set_str_dc(lo, d + n - half, half, b, C);
+        _fmpz_set_str_dc(f, d, n - half, b, C);
+    }
+
+    _fmpz_radix_mul(f, f, C->pow + k);
+    fmpz_add(f, f, lo);
+
+    fmpz_clear(lo);
+}
 
 int fmpz_set_str(fmpz_t f, const char * str, int b)
 {
     int ans;
     mpz_t copy;
+    slong i, n, len;
+    const fmpz_radix_cache_struct * C;
+    unsigned char * d;
+    int neg = 0;
 
-    ans = mpz_init_set_str(copy, (char *) str, b);
-    if (ans == 0)
-        fmpz_set_mpz(f, copy);
-    mpz_clear(copy);
-    return ans;
-}
+    len = strlen(str);
+
+    if (b < 2 || b > 62 || len*FLINT_BIT_COUNT(b - 1)
+                                      < FMPZ_SET_STR_DC_LIMBS*FLINT_BITS)
+    {
+        ans = mpz_init_set_str(copy, (char *) str, b);
+        if (ans == 0)
+            fmpz_set_mpz(f, copy);
+        mpz_clear(copy);
+        return ans;
+    }
+
+    /* read the digits as mpz_set_str does, ignoring white space */
+    while (isspace((unsigned char) *str))
+        str++;
 
+    if (*str == '-')
+    {
+        neg = 1;
+        str++;
+    }
+
+    if (_fmpz_digit_value((unsigned char) *str, b) == b)
+        return -1;
+
+    d = (unsigned char *) flint_malloc(len);
+
+    for (n = 0; *str != '\0'; str++)
+    {
+        if (isspace((unsigned char) *str))
+            continue;
+
+        d[n] = _fmpz_digit_value((unsigned char) *str, b);
+
+        if (d[n] == b)
+        {
+            flint_free(d);
+            return -1;
+        }
+
+        n++;
+    }
+
+    /* powers of b up to half the number of digits */
+    C = _fmpz_radix_cache(b, 1, 0);
+    for (i = 0; (C->digits << (i + 1)) < n; i++)
+        C = _fmpz_radix_cache(b, i + 2, 0);
+
+    _fmpz_set_str_dc(f, d, n, b, C);
+
+    if (neg)
+        fmpz_neg(f, f);
+
+    flint_free(d);
+
+    return 0;
+}
@@ -37,9 +37,7 @@ fmpz_submul(fmpz_t f, const fmpz_t g, const fmpz_t h)
         }
         else                    /* both g and h are large */
         {
-            __mpz_struct *mpz_ptr = _fmpz_promote_val(f);
-            mpz_submul(mpz_ptr, COEFF_TO_PTR(c1), COEFF_TO_PTR(c2));
-            _fmpz_demote_val(f);    /* cancellation may have occurred */
+            _fmpz_addmul_large(f, COEFF_TO_PTR(c1), COEFF_TO_PTR(c2), 1);
         }
     }
 }
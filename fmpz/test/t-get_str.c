@@ -69,6 +69,49 @@ main(void)
         mpz_clear(b);
     }
 
+    /* large values, converted by divide and conquer */
+    for (i = 0; i < 10 * flint_test_multiplier(); i++)
+    {
+        fmpz_t a;
+        mpz_t b;
+        int base;
+        char *str1, *str2;
+
+        fmpz_init(a);
+        mpz_init(b);
+        fmpz_randtest(a, state, n_randint(state, 20) * FMPZ_GET_STR_DC_LIMBS
+                                                           * FLINT_BITS + 1);
+        base = (int) (n_randint(state, 61) + 2);
+
+        /* powers of the base minus one give runs of equal digits */
+        if (n_randint(state, 4) == 0)
+        {
+            fmpz_set_ui(a, base);
+            fmpz_pow_ui(a, a, n_randint(state, 100000));
+            fmpz_sub_ui(a, a, n_randint(state, 2));
+        }
+
+        fmpz_get_mpz(b, a);
+
+        str1 = fmpz_get_str(NULL, base, a);
+        str2 = mpz_get_str(NULL, base, b);
+        result = (strcmp(str1, str2) == 0);
+
+        if (!result)
+        {
+            flint_printf("FAIL (large):\n");
+            flint_printf("bits = %wd\n", fmpz_bits(a));
+            flint_printf("base = %d\n", base);
+            abort();
+        }
+
+        flint_free(str1);
+        flint_free(str2);
+
+        fmpz_clear(a);
+        mpz_clear(b);
+    }
+
     FLINT_TEST_CLEANUP(state);
     
     flint_printf("PASS\n");
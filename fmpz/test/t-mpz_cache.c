@@ -0,0 +1,201 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "thread_pool.h"
+#include "thread_support.h"
+
+typedef struct
+{
+    fmpz * vec;
+    slong len;
+} clear_arg_t;
+
+/* clear fmpz's which were allocated by another thread */
+static void _clear_worker(void * varg)
+{
+    clear_arg_t * arg = (clear_arg_t *) varg;
+
+    _fmpz_vec_clear(arg->vec, arg->len);
+}
+
+int main(void)
+{
+    int i, result;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("mpz_cache....");
+    fflush(stdout);
+
+    /* values survive being recycled through the cache and trimmed */
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        fmpz * a, * b;
+        fmpz_mpz_cache_stats_t s1, s2;
+        slong j, len = n_randint(state, 500) + 1;
+
+        a = _fmpz_vec_init(len);
+        b = _fmpz_vec_init(len);
+
+        _fmpz_vec_randtest(a, state, len, n_randint(state, 50*FLINT_BITS) + 1);
+        _fmpz_vec_set(b, a, len);
+
+        for (j = 0; j < len; j++)
+        {
+            fmpz_t t;
+            fmpz_init(t);
+            fmpz_mul(t, a + j, a + j);
+            fmpz_clear(t);
+        }
+
+        _fmpz_mpz_cache_trim();
+        _fmpz_mpz_cache_stats(s1);
+
+        result = _fmpz_vec_equal(a, b, len);
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("values changed by trim\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        _fmpz_mpz_cache_trim();
+        _fmpz_mpz_cache_stats(s2);
+
+        result = (s2->cached <= s1->cached && s2->slabs <= s1->slabs
+                    && s2->hits == s1->hits && s2->misses == s1->misses);
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("trim grew the cache\n");
+            flint_printf("cached: %wu %wu\n", s1->cached, s2->cached);
+            flint_printf("slabs: %wu %wu\n", s1->slabs, s2->slabs);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        _fmpz_vec_clear(a, len);
+        _fmpz_vec_clear(b, len);
+    }
+
+    /* values growing past and shrinking below the limbs stored inline */
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        fmpz_t a, b;
+        mpz_t c, d, t;
+        slong j;
+
+        fmpz_init(a);
+        fmpz_init(b);
+        mpz_init(c);
+        mpz_init(d);
+        mpz_init(t);
+
+        fmpz_randtest(a, state,
+                      n_randint(state, FMPZ_MPN_INLINE_LIMBS*FLINT_BITS) + 1);
+        fmpz_randtest(b, state, n_randint(state, 2*FLINT_BITS) + 1);
+        fmpz_get_mpz(c, a);
+        fmpz_get_mpz(d, b);
+
+        for (j = 0; j < 8; j++)
+        {
+            flint_bitcnt_t k = n_randint(state, 20*FLINT_BITS);
+
+            switch (n_randint(state, 4))
+            {
+                case 0:
+                    fmpz_mul(a, a, b);
+                    mpz_mul(c, c, d);
+                    break;
+                case 1:
+                    fmpz_mul_2exp(a, a, k);
+                    mpz_mul_2exp(c, c, k);
+                    break;
+                case 2:
+                    fmpz_fdiv_q_2exp(a, a, k);
+                    mpz_fdiv_q_2exp(c, c, k);
+                    break;
+                default:
+                    /* hand the limbs of a to GMP, which clears them */
+                    if (COEFF_IS_MPZ(*a))
+                    {
+                        mpz_set(t, COEFF_TO_PTR(*a));
+                        mpz_swap(COEFF_TO_PTR(*a), t);
+                        mpz_clear(t);
+                        mpz_init(t);
+                    }
+            }
+
+            fmpz_get_mpz(t, a);
+            if (mpz_cmp(c, t) != 0)
+            {
+                flint_printf("FAIL (inline limbs):\n");
+                flint_printf("i = %d, j = %wd\n", i, j);
+                fflush(stdout);
+                flint_abort();
+            }
+        }
+
+        fmpz_clear(a);
+        fmpz_clear(b);
+        mpz_clear(c);
+        mpz_clear(d);
+        mpz_clear(t);
+    }
+
+    /* fmpz's cleared by a different thread than the one allocating them */
+    for (i = 0; i < 10 * flint_test_multiplier(); i++)
+    {
+        thread_pool_handle * threads;
+        slong num_threads, j, len = n_randint(state, 5000) + 1;
+        clear_arg_t arg;
+        fmpz * a;
+
+        flint_set_num_threads(2);
+
+        a = _fmpz_vec_init(len);
+        for (j = 0; j < len; j++)
+            fmpz_randtest_not_zero(a + j, state, 3*FLINT_BITS);
+
+        arg.vec = a;
+        arg.len = len;
+
+        num_threads = flint_request_threads(&threads, 2);
+
+        if (num_threads > 0)
+        {
+            thread_pool_wake(global_thread_pool, threads[0], 0,
+                                                         _clear_worker, &arg);
+            thread_pool_wait(global_thread_pool, threads[0]);
+        }
+        else
+            _clear_worker(&arg);
+
+        flint_give_back_threads(threads, num_threads);
+
+        /* the freed mpz's must be usable again by this thread */
+        a = _fmpz_vec_init(len);
+        for (j = 0; j < len; j++)
+            fmpz_randtest_not_zero(a + j, state, 3*FLINT_BITS);
+        _fmpz_vec_clear(a, len);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
@@ -0,0 +1,126 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <string.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+#include "fmpz.h"
+
+int
+main(void)
+{
+    int i, result;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("set_str....");
+    fflush(stdout);
+
+    /* round trip, small and large values */
+    for (i = 0; i < 1000 * flint_test_multiplier(); i++)
+    {
+        fmpz_t a, b;
+        int base;
+        char * str;
+
+        fmpz_init(a);
+        fmpz_init(b);
+
+        if (i % 100 == 0)
+            fmpz_randtest(a, state, n_randint(state, 20)
+                               * FMPZ_SET_STR_DC_LIMBS * FLINT_BITS + 1);
+        else
+            fmpz_randtest(a, state, 200);
+        base = (int) (n_randint(state, 61) + 2);
+
+        fmpz_randtest(b, state, 200);
+
+        str = fmpz_get_str(NULL, base, a);
+        result = (fmpz_set_str(b, str, base) == 0 && fmpz_equal(a, b));
+
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("bits = %wd\n", fmpz_bits(a));
+            flint_printf("base = %d\n", base);
+            abort();
+        }
+
+        flint_free(str);
+
+        fmpz_clear(a);
+        fmpz_clear(b);
+    }
+
+    /* large strings with white space, leading zeros and invalid digits
+       are read as by mpz_set_str */
+    for (i = 0; i < 20 * flint_test_multiplier(); i++)
+    {
+        fmpz_t a;
+        mpz_t b, c;
+        int base, r1, r2;
+        slong j, len;
+        char * str;
+
+        fmpz_init(a);
+        mpz_init(b);
+        mpz_init(c);
+
+        base = (int) (n_randint(state, 61) + 2);
+        len = FMPZ_SET_STR_DC_LIMBS * FLINT_BITS / 2 + n_randint(state, 300000);
+
+        str = flint_malloc(len + 1);
+        for (j = 0; j < len; j++)
+        {
+            if (n_randint(state, 1000) == 0)
+                str[j] = " \t\n"[n_randint(state, 3)];
+            else
+                str[j] = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+                       "abcdefghijklmnopqrstuvwxyz"[n_randint(state, base)];
+        }
+        str[len] = '\0';
+
+        if (n_randint(state, 2))
+            str[0] = '-';
+        if (n_randint(state, 10) == 0)
+            str[n_randint(state, len)] = "!-+z"[n_randint(state, 4)];
+
+        fmpz_one(a);
+
+        r1 = fmpz_set_str(a, str, base);
+        r2 = mpz_set_str(b, str, base);
+
+        fmpz_get_mpz(c, a);
+        result = (r1 == r2 && (r1 != 0 || mpz_cmp(b, c) == 0));
+
+        if (!result)
+        {
+            flint_printf("FAIL (large):\n");
+            flint_printf("len = %wd\n", len);
+            flint_printf("base = %d\n", base);
+            flint_printf("r1 = %d, r2 = %d\n", r1, r2);
+            abort();
+        }
+
+        flint_free(str);
+
+        fmpz_clear(a);
+        mpz_clear(b);
+        mpz_clear(c);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
@@ -96,6 +96,25 @@ FLINT_DLL int fmpz_factor_pollard_brent_single(fmpz_t p_factor, fmpz_t n_in,
 FLINT_DLL int fmpz_factor_pollard_brent(fmpz_t factor, flint_rand_t state,
                                         fmpz_t n, mp_limb_t max_tries, 
                                         mp_limb_t max_iters);
+/* Batch factoring ***********************************************************/
+
+/* total bits of the entries handled by one product tree */
+#define FMPZ_FACTOR_BATCH_CHUNK_BITS (WORD(1) << 24)
+
+FLINT_DLL slong _fmpz_factor_batch_chunks(slong * starts, const fmpz * vec,
+                                                 slong len, slong chunk_bits);
+
+FLINT_DLL void _fmpz_factor_batch_gcd(fmpz * res, const fmpz * vec,
+                                                 slong len, slong chunk_bits);
+
+FLINT_DLL void fmpz_factor_batch_gcd(fmpz * res, const fmpz * vec, slong len);
+
+FLINT_DLL void _fmpz_factor_batch_smooth(fmpz * res, const fmpz * vec,
+              slong len, mp_srcptr primes, slong num, slong chunk_bits);
+
+FLINT_DLL void fmpz_factor_batch_smooth(fmpz * res, const fmpz * vec,
+                                 slong len, mp_srcptr primes, slong num);
+
 /* Expansion *****************************************************************/
 
 FLINT_DLL void fmpz_factor_expand_iterative(fmpz_t n, const fmpz_factor_t factor);
@@ -130,10 +149,24 @@ typedef struct ecm_s {
     mp_limb_t n_size;
     mp_limb_t normbits;
 
+    int * stop;     /* if not NULL, the curve is abandoned once set */
+
 } ecm_s;
 
 typedef ecm_s ecm_t[1];
 
+#if FLINT_USES_PTHREAD && (__GNUC__ > 4 || (__GNUC__ == 4 && __GNUC_MINOR__ >= 8))
+#define _FMPZ_FACTOR_ECM_STOP_LOAD(p) __atomic_load_n((p), __ATOMIC_RELAXED)
+#define _FMPZ_FACTOR_ECM_STOP_STORE(p, x) \
+    __atomic_store_n((p), (x), __ATOMIC_RELAXED)
+#else
+#define _FMPZ_FACTOR_ECM_STOP_LOAD(p) (*((volatile int *) (p)))
+#define _FMPZ_FACTOR_ECM_STOP_STORE(p, x) (*((volatile int *) (p)) = (x))
+#endif
+
+#define _fmpz_factor_ecm_stopped(ecm_inf) \
+    ((ecm_inf)->stop != NULL && _FMPZ_FACTOR_ECM_STOP_LOAD((ecm_inf)->stop))
+
 FLINT_DLL void fmpz_factor_ecm_init(ecm_t ecm_inf, mp_limb_t sz);
 
 FLINT_DLL void fmpz_factor_ecm_clear(ecm_t ecm_inf);
@@ -0,0 +1,46 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_factor.h"
+
+/*
+    Splits (vec, len) into chunks whose entries have at most chunk_bits bits
+    in total, each chunk having at least one entry. Sets starts[c] to the
+    index of the first entry of chunk c and starts[num] = len, where num is
+    the number of chunks, which is returned. The array starts must have
+    space for len + 1 entries.
+*/
+slong _fmpz_factor_batch_chunks(slong * starts, const fmpz * vec,
+                                                  slong len, slong chunk_bits)
+{
+    slong i, num, bits;
+
+    num = 0;
+    bits = 0;
+
+    for (i = 0; i < len; i++)
+    {
+        if (i == 0 || bits + (slong) fmpz_bits(vec + i) > chunk_bits)
+        {
+            starts[num++] = i;
+            bits = 0;
+        }
+
+        bits += fmpz_bits(vec + i);
+    }
+
+    starts[num] = len;
+
+    return num;
+}
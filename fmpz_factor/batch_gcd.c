@@ -0,0 +1,139 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "fmpz_factor.h"
+#include "thread_support.h"
+
+typedef struct
+{
+    fmpz * res;
+    const fmpz * vec;
+    const slong * starts;
+}
+_batch_gcd_struct;
+
+/* products of the chunks */
+static void
+_batch_gcd_prod_worker(slong start, slong stop, void * varg)
+{
+    _batch_gcd_struct * arg = (_batch_gcd_struct *) varg;
+    slong c;
+
+    for (c = start; c < stop; c++)
+        _fmpz_vec_prod(arg->res + c, arg->vec + arg->starts[c],
+                                     arg->starts[c + 1] - arg->starts[c]);
+}
+
+/* res[i] = gcd(x_i, (P mod x_i^2)/x_i), given P mod x_i^2 in res[i] */
+static void
+_batch_gcd_final_worker(slong start, slong stop, void * varg)
+{
+    _batch_gcd_struct * arg = (_batch_gcd_struct *) varg;
+    slong i;
+
+    for (i = start; i < stop; i++)
+    {
+        fmpz_divexact(arg->res + i, arg->res + i, arg->vec + i);
+        fmpz_gcd(arg->res + i, arg->res + i, arg->vec + i);
+    }
+}
+
+/*
+    Bernstein's batch gcd: with P the product of all entries, the gcd of x
+    and P/x is the gcd of x and (P mod x^2)/x, and P mod x^2 for all x is
+    obtained with a remainder tree.
+
+    To bound the memory used, the product and remainder trees are only
+    built for one chunk at a time. For chunk c with product P_c, we have
+    P mod P_c^2 = (Q_c mod P_c) P_c where Q_c = P/P_c, so that the
+    remainder tree of the chunk is started from (Q_c mod P_c) P_c instead
+    of P. The values Q_c mod P_c are themselves obtained by a batch gcd
+    style remainder tree over the chunk products.
+*/
+void
+_fmpz_factor_batch_gcd(fmpz * res, const fmpz * vec,
+                                                 slong len, slong chunk_bits)
+{
+    _batch_gcd_struct arg;
+    slong c, num, clen, height;
+    slong * starts;
+    fmpz * prods, * rems;
+    fmpz ** tree;
+    fmpz_t x;
+
+    if (len <= 0)
+        return;
+
+    starts = (slong *) flint_malloc((len + 1)*sizeof(slong));
+    num = _fmpz_factor_batch_chunks(starts, vec, len, chunk_bits);
+
+    rems = _fmpz_vec_init(num);
+    fmpz_init(x);
+
+    if (num == 1)
+    {
+        fmpz_one(rems);
+    }
+    else
+    {
+        prods = _fmpz_vec_init(num);
+
+        arg.res = prods;
+        arg.vec = vec;
+        arg.starts = starts;
+        flint_parallel_for(0, num, 1, _batch_gcd_prod_worker, &arg);
+
+        /* rems[c] = Q_c mod P_c */
+        height = _fmpz_vec_product_tree_height(num);
+        tree = _fmpz_vec_product_tree_alloc(num);
+        _fmpz_vec_product_tree_build(tree, prods, num);
+        _fmpz_vec_remainder_tree(rems, tree[height], tree, num, 1);
+        _fmpz_vec_product_tree_free(tree, num);
+
+        for (c = 0; c < num; c++)
+            fmpz_divexact(rems + c, rems + c, prods + c);
+
+        _fmpz_vec_clear(prods, num);
+    }
+
+    for (c = 0; c < num; c++)
+    {
+        clen = starts[c + 1] - starts[c];
+
+        height = _fmpz_vec_product_tree_height(clen);
+        tree = _fmpz_vec_product_tree_alloc(clen);
+        _fmpz_vec_product_tree_build(tree, vec + starts[c], clen);
+
+        /* x = P mod P_c^2 */
+        fmpz_mul(x, rems + c, tree[height]);
+        _fmpz_vec_remainder_tree(res + starts[c], x, tree, clen, 1);
+
+        _fmpz_vec_product_tree_free(tree, clen);
+
+        arg.res = res + starts[c];
+        arg.vec = vec + starts[c];
+        flint_parallel_for(0, clen, 0, _batch_gcd_final_worker, &arg);
+    }
+
+    fmpz_clear(x);
+    _fmpz_vec_clear(rems, num);
+    flint_free(starts);
+}
+
+void
+fmpz_factor_batch_gcd(fmpz * res, const fmpz * vec, slong len)
+{
+    _fmpz_factor_batch_gcd(res, vec, len, FMPZ_FACTOR_BATCH_CHUNK_BITS);
+}
@@ -0,0 +1,106 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "fmpz_factor.h"
+#include "thread_support.h"
+
+typedef struct
+{
+    fmpz * res;
+    const fmpz * vec;
+}
+_batch_smooth_struct;
+
+/*
+    Given y = z mod x in res[i], sets res[i] to gcd(x, y^(2^e) mod x) where
+    2^e >= bits(x). As no prime has exponent larger than bits(x) in x, this
+    is the largest divisor of x composed of primes dividing z.
+*/
+static void
+_batch_smooth_final_worker(slong start, slong stop, void * varg)
+{
+    _batch_smooth_struct * arg = (_batch_smooth_struct *) varg;
+    flint_bitcnt_t b, bits;
+    slong i;
+
+    for (i = start; i < stop; i++)
+    {
+        bits = fmpz_bits(arg->vec + i);
+
+        for (b = 1; b < bits; b *= 2)
+        {
+            fmpz_mul(arg->res + i, arg->res + i, arg->res + i);
+            fmpz_mod(arg->res + i, arg->res + i, arg->vec + i);
+        }
+
+        fmpz_gcd(arg->res + i, arg->res + i, arg->vec + i);
+    }
+}
+
+/*
+    Bernstein's batch smoothness test. With z the product of the primes,
+    z mod x is computed for all x with a remainder tree, one chunk of the
+    entries at a time to bound the memory used.
+*/
+void
+_fmpz_factor_batch_smooth(fmpz * res, const fmpz * vec, slong len,
+                           mp_srcptr primes, slong num, slong chunk_bits)
+{
+    _batch_smooth_struct arg;
+    slong c, i, nchunks, clen;
+    slong * starts;
+    fmpz * t;
+    fmpz ** tree;
+    fmpz_t z;
+
+    if (len <= 0)
+        return;
+
+    /* z = product of the primes */
+    fmpz_init(z);
+    t = _fmpz_vec_init(num);
+    for (i = 0; i < num; i++)
+        fmpz_set_ui(t + i, primes[i]);
+    _fmpz_vec_prod(z, t, num);
+    _fmpz_vec_clear(t, num);
+
+    starts = (slong *) flint_malloc((len + 1)*sizeof(slong));
+    nchunks = _fmpz_factor_batch_chunks(starts, vec, len, chunk_bits);
+
+    for (c = 0; c < nchunks; c++)
+    {
+        clen = starts[c + 1] - starts[c];
+
+        tree = _fmpz_vec_product_tree_alloc(clen);
+        _fmpz_vec_product_tree_build(tree, vec + starts[c], clen);
+        _fmpz_vec_remainder_tree(res + starts[c], z, tree, clen, 0);
+        _fmpz_vec_product_tree_free(tree, clen);
+
+        arg.res = res + starts[c];
+        arg.vec = vec + starts[c];
+        flint_parallel_for(0, clen, 0, _batch_smooth_final_worker, &arg);
+    }
+
+    fmpz_clear(z);
+    flint_free(starts);
+}
+
+void
+fmpz_factor_batch_smooth(fmpz * res, const fmpz * vec, slong len,
+                                                mp_srcptr primes, slong num)
+{
+    _fmpz_factor_batch_smooth(res, vec, len, primes, num,
+                                              FMPZ_FACTOR_BATCH_CHUNK_BITS);
+}
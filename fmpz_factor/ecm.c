@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2015 Kushagra Singh
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -16,6 +17,8 @@
 #include "flint.h"
 #include "fmpz.h"
 #include "mpn_extras.h"
+#include "thread_support.h"
+#include "ctrl.h"
 
 static
 ulong n_ecm_primorial[] =
@@ -43,16 +46,188 @@ ulong n_ecm_primorial[] =
 #define num_n_ecm_primorials 9
 #endif
 
+/* converts sig to the normalised form used by the curve functions */
+static void
+_fmpz_factor_ecm_sig(mp_ptr mpsig, const fmpz_t sig, ecm_t ecm_inf)
+{
+    __mpz_struct * mpz_ptr;
+    mp_limb_t cy;
+
+    mpn_zero(mpsig, ecm_inf->n_size);
+
+    if ((!COEFF_IS_MPZ(*sig)))
+    {
+        mpsig[0] = fmpz_get_ui(sig);
+        if (ecm_inf->normbits)
+        {
+            cy = mpn_lshift(mpsig, mpsig, 1, ecm_inf->normbits);
+            if (cy)
+               mpsig[1] = cy;
+        }
+    }
+    else
+    {
+        mpz_ptr = COEFF_TO_PTR(*sig);
+
+        if (ecm_inf->normbits)
+        {
+            cy = mpn_lshift(mpsig, mpz_ptr->_mp_d, mpz_ptr->_mp_size, ecm_inf->normbits);
+            if (cy)
+                mpsig[mpz_ptr->_mp_size] = cy;
+        } else
+        {
+            flint_mpn_copyi(mpsig, mpz_ptr->_mp_d, mpz_ptr->_mp_size);
+        }
+    }
+}
+
+/*
+    Runs one curve. Returns 0 if no factor is found, otherwise -1, 1 or 2
+    according to whether the factor was found while selecting the curve or
+    in stage I or II, and sets f to the normalised factor of *fn limbs.
+*/
+static int
+_fmpz_factor_ecm_curve(mp_ptr f, mp_size_t * fn, mp_ptr mpsig, mp_ptr n,
+                       const mp_limb_t * prime_array, mp_limb_t num,
+                       mp_limb_t B1, mp_limb_t B2, mp_limb_t P, ecm_t ecm_inf)
+{
+    int ret;
+
+    /************************ SELECT CURVE ************************/
+
+    ret = fmpz_factor_ecm_select_curve(f, mpsig, n, ecm_inf);
+
+    if (ret == -1)
+        return 0;
+
+    if (ret)
+    {
+        /* Found factor while selecting curve,
+           very very lucky :) */
+        *fn = ret;
+        return -1;
+    }
+
+    /************************** STAGE I ***************************/
+
+    ret = fmpz_factor_ecm_stage_I(f, prime_array, num, B1, n, ecm_inf);
+
+    if (ret)
+    {
+        /* Found factor after stage I */
+        *fn = ret;
+        return 1;
+    }
+
+    /************************** STAGE II ***************************/
+
+    ret = fmpz_factor_ecm_stage_II(f, B1, B2, P, n, ecm_inf);
+
+    if (ret)
+    {
+        /* Found factor after stage II */
+        *fn = ret;
+        return 2;
+    }
+
+    return 0;
+}
+
+typedef struct
+{
+    mp_ptr n;
+    ecm_s * ecm_inf;            /* shared tables and inverse of n */
+    const mp_limb_t * prime_array;
+    mp_limb_t num, B1, B2, P;
+    slong curves;
+    mp_srcptr sigs;             /* n_size limbs for each curve */
+    int * found;                /* result of each curve */
+    mp_ptr facs;                /* n_size limbs for each curve */
+    mp_size_t * fns;
+    int * stops;                /* stop flag of each curve */
+    flint_ctrl_struct * ctrl;
+}
+_fmpz_factor_ecm_struct;
+
+/*
+    Abandon the curves from index start on. A curve finding a factor only
+    abandons the curves after it, so that all curves before the first one
+    with a factor run to completion whatever the number of threads.
+*/
+static void
+_fmpz_factor_ecm_stop_from(_fmpz_factor_ecm_struct * arg, slong start)
+{
+    slong k;
+
+    for (k = start; k < arg->curves; k++)
+        _FMPZ_FACTOR_ECM_STOP_STORE(arg->stops + k, 1);
+}
+
+static void
+_fmpz_factor_ecm_worker(slong start, slong stop, void * varg)
+{
+    _fmpz_factor_ecm_struct * arg = (_fmpz_factor_ecm_struct *) varg;
+    ecm_s * shared = arg->ecm_inf;
+    mp_limb_t n_size = shared->n_size;
+    flint_ctrl_struct * prev;
+    mp_ptr mpsig;
+    ecm_t ecm_inf;
+    slong j;
+
+    prev = flint_ctrl_attach(arg->ctrl);
+
+    fmpz_factor_ecm_init(ecm_inf, n_size);
+    mpsig = flint_malloc(n_size * sizeof(mp_limb_t));
+
+    flint_mpn_copyi(ecm_inf->ninv, shared->ninv, n_size);
+    flint_mpn_copyi(ecm_inf->one, shared->one, n_size);
+    ecm_inf->normbits = shared->normbits;
+    ecm_inf->GCD_table = shared->GCD_table;
+    ecm_inf->prime_table = shared->prime_table;
+
+    for (j = start; j < stop; j++)
+    {
+        ecm_inf->stop = arg->stops + j;
+
+        if (_fmpz_factor_ecm_stopped(ecm_inf))
+            break;
+
+        if (flint_ctrl_check("fmpz_factor_ecm", j, arg->curves))
+        {
+            _fmpz_factor_ecm_stop_from(arg, 0);
+            break;
+        }
+
+        flint_mpn_copyi(mpsig, arg->sigs + j * n_size, n_size);
+
+        arg->found[j] = _fmpz_factor_ecm_curve(arg->facs + j * n_size,
+                            arg->fns + j, mpsig, arg->n, arg->prime_array,
+                            arg->num, arg->B1, arg->B2, arg->P, ecm_inf);
+
+        if (arg->found[j] != 0)
+            _fmpz_factor_ecm_stop_from(arg, j + 1);
+    }
+
+    flint_free(mpsig);
+    fmpz_factor_ecm_clear(ecm_inf);
+
+    flint_ctrl_attach(prev);
+}
+
 int
 fmpz_factor_ecm(fmpz_t f, mp_limb_t curves, mp_limb_t B1, mp_limb_t B2,
                 flint_rand_t state, const fmpz_t n_in)
 {
     fmpz_t sig, nm8;
-    mp_limb_t P, num, maxP, mmin, mmax, mdiff, prod, maxj, n_size, cy;
+    mp_limb_t P, num, maxP, mmin, mmax, mdiff, prod, maxj, n_size;
     int i, j, ret;
+    mp_size_t fn;
     ecm_t ecm_inf;
     __mpz_struct *fac, *mpz_ptr;
-    mp_ptr n, mpsig;
+    mp_ptr n;
+    _fmpz_factor_ecm_struct arg;
+    mp_ptr sigs;
+    slong k;
 
     TMP_INIT;
 
@@ -71,7 +246,6 @@ fmpz_factor_ecm(fmpz_t f, mp_limb_t curves, mp_limb_t B1, mp_limb_t B2,
     TMP_START;
 
     n      = TMP_ALLOC(n_size * sizeof(mp_limb_t));
-    mpsig  = TMP_ALLOC(n_size * sizeof(mp_limb_t));
 
     if ((!COEFF_IS_MPZ(* n_in)))
     {
@@ -97,6 +271,7 @@ fmpz_factor_ecm(fmpz_t f, mp_limb_t curves, mp_limb_t B1, mp_limb_t B2,
     fmpz_sub_ui(nm8, n_in, 8);
 
     ret = 0;
+    fn = 0;
     fac = _fmpz_promote(f);
     mpz_realloc(fac, fmpz_size(n_in));
 
@@ -174,97 +349,69 @@ fmpz_factor_ecm(fmpz_t f, mp_limb_t curves, mp_limb_t B1, mp_limb_t B2,
 
     /****************************** TRY "CURVES" *****************************/
 
-    for (j = 0; j < curves; j++)
+    /*
+        The curves are distributed between threads. All values of sigma
+        are drawn first, so that state advances by the same amount and the
+        factor from the first curve in order which found one is returned,
+        whatever the number of threads.
+    */
+    sigs = flint_malloc(curves * n_size * sizeof(mp_limb_t));
+
+    for (k = 0; k < curves; k++)
     {
         fmpz_randm(sig, state, nm8);
         fmpz_add_ui(sig, sig, 7);
 
-        mpn_zero(mpsig, ecm_inf->n_size);
-        
-        if ((!COEFF_IS_MPZ(*sig)))
-        {
-            mpsig[0] = fmpz_get_ui(sig);
-            if (ecm_inf->normbits)
-            {
-                cy = mpn_lshift(mpsig, mpsig, 1, ecm_inf->normbits);
-                if (cy)
-                   mpsig[1] = cy;
-            }
-        }
-        else
-        {
-            mpz_ptr = COEFF_TO_PTR(*sig);
-
-            if (ecm_inf->normbits)
-            {
-                cy = mpn_lshift(mpsig, mpz_ptr->_mp_d, mpz_ptr->_mp_size, ecm_inf->normbits);
-                if (cy)
-                    mpsig[mpz_ptr->_mp_size] = cy;
-            } else
-            {
-                flint_mpn_copyi(mpsig, mpz_ptr->_mp_d, mpz_ptr->_mp_size);
-            }
-        }
-
-        /************************ SELECT CURVE ************************/
+        _fmpz_factor_ecm_sig(sigs + k * n_size, sig, ecm_inf);
+    }
 
-        ret = fmpz_factor_ecm_select_curve(fac->_mp_d, mpsig, n, ecm_inf);
+    arg.n = n;
+    arg.ecm_inf = ecm_inf;
+    arg.prime_array = prime_array;
+    arg.num = num;
+    arg.B1 = B1;
+    arg.B2 = B2;
+    arg.P = P;
+    arg.curves = curves;
+    arg.sigs = sigs;
+    arg.found = flint_calloc(curves, sizeof(int));
+    arg.facs = flint_malloc(curves * n_size * sizeof(mp_limb_t));
+    arg.fns = flint_malloc(curves * sizeof(mp_size_t));
+    arg.stops = flint_calloc(curves, sizeof(int));
+    arg.ctrl = flint_ctrl_current();
+
+    if (curves > 1 && flint_get_num_threads() > 1)
+        flint_parallel_for(0, curves, 1, _fmpz_factor_ecm_worker, &arg);
+    else
+        _fmpz_factor_ecm_worker(0, curves, &arg);
 
-        if (ret)
+    for (k = 0; k < curves; k++)
+    {
+        if (arg.found[k] != 0)
         {
-            /* Found factor while selecting curve,
-               very very lucky :) */
-
-            if (ecm_inf->normbits)
-               mpn_rshift(fac->_mp_d, fac->_mp_d, ret, ecm_inf->normbits);
-            MPN_NORM(fac->_mp_d, ret);
-
-            fac->_mp_size = ret;
-            _fmpz_demote_val(f);    
-            ret = -1;
-            goto cleanup;
+            ret = arg.found[k];
+            fn = arg.fns[k];
+            flint_mpn_copyi(fac->_mp_d, arg.facs + k * n_size, fn);
+            break;
         }
+    }
 
-        if (ret != -1)
-        {
-
-            /************************** STAGE I ***************************/
-
-            ret = fmpz_factor_ecm_stage_I(fac->_mp_d, prime_array, num, B1, n, ecm_inf);
-
-            if (ret)
-            {
-                /* Found factor after stage I */
-                if (ecm_inf->normbits)
-                   mpn_rshift(fac->_mp_d, fac->_mp_d, ret, ecm_inf->normbits);
-                MPN_NORM(fac->_mp_d, ret);
-
-                fac->_mp_size = ret;
-                _fmpz_demote_val(f);    
-                ret = 1;
-                goto cleanup;
-            }  
-            /************************** STAGE II ***************************/
+    flint_free(sigs);
+    flint_free(arg.found);
+    flint_free(arg.facs);
+    flint_free(arg.fns);
+    flint_free(arg.stops);
 
-            ret = fmpz_factor_ecm_stage_II(fac->_mp_d, B1, B2, P, n, ecm_inf);
+    if (ret)
+    {
+        if (ecm_inf->normbits)
+           mpn_rshift(fac->_mp_d, fac->_mp_d, fn, ecm_inf->normbits);
+        MPN_NORM(fac->_mp_d, fn);
 
-            if (ret)
-            {
-                /* Found factor after stage II */
-                if (ecm_inf->normbits)
-                   mpn_rshift(fac->_mp_d, fac->_mp_d, ret, ecm_inf->normbits);
-                MPN_NORM(fac->_mp_d, ret);
-                fac->_mp_size = ret;
-                _fmpz_demote_val(f);  
-                ret = 2;
-                goto cleanup;
-            }
-        }
+        fac->_mp_size = fn;
+        _fmpz_demote_val(f);
     }
 
-    cleanup:
-
-
     flint_free(ecm_inf->GCD_table);
     for (i = 0; i < mdiff; i++)
         flint_free(ecm_inf->prime_table[i]);
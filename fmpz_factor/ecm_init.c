@@ -42,4 +42,5 @@ fmpz_factor_ecm_init(ecm_t ecm_inf, mp_limb_t sz)
     mpn_zero(ecm_inf->one, sz);
 
     ecm_inf->n_size = sz;
+    ecm_inf->stop = NULL;
 }
@@ -26,6 +26,9 @@ fmpz_factor_ecm_stage_I(mp_ptr f, const mp_limb_t *prime_array, mp_limb_t num,
 
     for (i = 0; i < num; i++)
     {
+        if (_fmpz_factor_ecm_stopped(ecm_inf))
+            return 0;
+
         p = n_flog(B1, prime_array[i]);
         times = prime_array[i];
 
@@ -100,6 +100,9 @@ fmpz_factor_ecm_stage_II(mp_ptr f, mp_limb_t B1, mp_limb_t B2, mp_limb_t P,
 
     for (i = mmin; i <= mmax; i ++)
     {
+        if (_fmpz_factor_ecm_stopped(ecm_inf))
+            goto cleanup;
+
         for (j = 1; j <= maxj; j += 2)
         {
             if (ecm_inf->prime_table[i - mmin][j] == 1)
@@ -15,6 +15,7 @@
 #include "fmpz_vec.h"
 #include "mpn_extras.h"
 #include "ulong_extras.h"
+#include "profiler.h"
 
 void
 fmpz_factor(fmpz_factor_t factor, const fmpz_t n)
@@ -71,7 +72,8 @@ fmpz_factor(fmpz_factor_t factor, const fmpz_t n)
 
     while (xsize > 1)
     {
-        found = flint_mpn_factor_trial(xd, xsize, trial_start, trial_stop);
+        FLINT_DISPATCH("fmpz_factor", "trial", xsize, xsize*FLINT_BITS,
+            found = flint_mpn_factor_trial(xd, xsize, trial_start, trial_stop));
 
         if (found)
         {
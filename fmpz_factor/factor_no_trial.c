@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2016 William Hart
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -17,13 +18,16 @@
 #include "ulong_extras.h"
 #include "qsieve.h"
 #include "thread_support.h"
+#include "profiler.h"
+#include "ctrl.h"
 
 void
 fmpz_factor_no_trial(fmpz_factor_t factor, const fmpz_t n)
 {
    int exp, i;
 
-   if (fmpz_is_prime(n))
+   /* if the proof is stopped (-1), n is left as a single factor */
+   if (fmpz_is_prime(n) != 0)
       _fmpz_factor_append(factor, n, 1);
    else
    {
@@ -54,7 +58,8 @@ fmpz_factor_no_trial(fmpz_factor_t factor, const fmpz_t n)
 
 	 done = fmpz_factor_smooth(fac3, n, FLINT_MAX(bits/3 - 17, 2), 1);
 
-         if (!done)
+         /* if stopped, the cofactor is left in fac3 */
+         if (!done && !flint_ctrl_stopped())
 	 {
             fmpz_t n2;
 	    slong exp2;
@@ -75,7 +80,8 @@ fmpz_factor_no_trial(fmpz_factor_t factor, const fmpz_t n)
 	    if (exp2)
                 _fmpz_factor_append(fac, root, exp2);
 	    else
-	        qsieve_factor(fac, n2);
+	        FLINT_DISPATCH("fmpz_factor", "qsieve", fmpz_size(n2),
+                            fmpz_bits(n2), qsieve_factor(fac, n2));
 
             for (i = 0; i < fac->num; i++)
             {
@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2010 Fredrik Johansson
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -15,6 +16,8 @@
 #include "fmpz_vec.h"
 #include "mpn_extras.h"
 #include "ulong_extras.h"
+#include "profiler.h"
+#include "ctrl.h"
 
 static slong trial_cutoff[15] = {4, 4, 4, 6, 11, 18, 31, 54, 97, 172, 309, 564, 1028, 1900, 3512};
 
@@ -38,10 +41,11 @@ static slong ecm_tuning[][3] =
     {100, 470000, 430} 
 };
 
+/* a primality proof which was stopped does not count */
 int _is_prime(const fmpz_t n, int proved)
 {
     if (proved)
-        return fmpz_is_prime(n);
+        return fmpz_is_prime(n) == 1;
     else
     	return fmpz_is_probabprime(n);
 }
@@ -133,7 +137,8 @@ int fmpz_factor_smooth(fmpz_factor_t factor, const fmpz_t n,
     b = fmpz_sizeinbase(n, 2) - exp;
     idx = (slong *) flint_malloc((5 + b/4)*sizeof(slong));
 
-    found = flint_mpn_factor_trial_tree(idx, xd, xsize, trial_stop);
+    FLINT_DISPATCH("fmpz_factor", "trial", xsize, b,
+        found = flint_mpn_factor_trial_tree(idx, xd, xsize, trial_stop));
 
     if (found)
     {
@@ -227,8 +232,14 @@ int fmpz_factor_smooth(fmpz_factor_t factor, const fmpz_t n,
                 /* start with 18-22 bits, advance by 6 bits at a time */
                 for (i = 9 + (bits2 % 3); i <= bits2; i += istride)
                 {
-                    found = fmpz_factor_ecm(f, ecm_tuning[i][2],
-                            ecm_tuning[i][1], ecm_tuning[i][1]*100, state, n2);
+                    /* give up, leaving the cofactor unfactored */
+                    if (flint_ctrl_stopped())
+                        break;
+
+                    FLINT_DISPATCH("fmpz_factor", "ecm", fmpz_size(n2),
+                        fmpz_bits(n2),
+                        found = fmpz_factor_ecm(f, ecm_tuning[i][2],
+                            ecm_tuning[i][1], ecm_tuning[i][1]*100, state, n2));
 
                     if (found != 0)
                     {
@@ -246,8 +257,10 @@ int fmpz_factor_smooth(fmpz_factor_t factor, const fmpz_t n,
                         if (fmpz_sizeinbase(n2, 2) < bits)
                         {
                             fmpz_factor_no_trial(factor, n2);
+                            fmpz_one(n2);
 
-                            ret = 1;
+                            /* if stopped, factors may be composite */
+                            ret = !flint_ctrl_stopped();
 
                             break;
                         }
@@ -272,7 +285,7 @@ int fmpz_factor_smooth(fmpz_factor_t factor, const fmpz_t n,
 
         if (ret != 1 && !fmpz_is_one(n2))
            _fmpz_factor_append(factor, n2, 1); /* place cofactor in factor struct */
-        else
+        else if (!flint_ctrl_stopped())
            ret = 1;
         
         fmpz_clear(n2);
@@ -0,0 +1,94 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "fmpz_factor.h"
+#include "ulong_extras.h"
+
+int main(void)
+{
+    int i, result;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("batch_gcd....");
+    fflush(stdout);
+
+    for (i = 0; i < 300 * flint_test_multiplier(); i++)
+    {
+        fmpz * a, * g;
+        fmpz_t p, t;
+        slong j, k, len, chunk_bits;
+
+        len = n_randint(state, 40) + 1;
+        chunk_bits = n_randint(state, 2) ? FMPZ_FACTOR_BATCH_CHUNK_BITS
+                                         : n_randint(state, 1000) + 1;
+
+        if (n_randint(state, 8) == 0)
+            flint_set_num_threads(n_randint(state, 4) + 2);
+
+        a = _fmpz_vec_init(len);
+        g = _fmpz_vec_init(len);
+        fmpz_init(p);
+        fmpz_init(t);
+
+        for (j = 0; j < len; j++)
+        {
+            fmpz_randprime(a + j, state, n_randint(state, 60) + 2, 0);
+            fmpz_randprime(p, state, n_randint(state, 60) + 2, 0);
+            fmpz_mul(a + j, a + j, p);
+        }
+
+        /* a few entries sharing a prime */
+        fmpz_randprime(p, state, 40, 0);
+        for (j = 0; j < 3; j++)
+            fmpz_mul(a + n_randint(state, len), a + n_randint(state, len), p);
+
+        _fmpz_factor_batch_gcd(g, a, len, chunk_bits);
+
+        result = 1;
+        for (j = 0; j < len && result; j++)
+        {
+            fmpz_one(p);
+            for (k = 0; k < len; k++)
+                if (k != j)
+                    fmpz_mul(p, p, a + k);
+
+            fmpz_gcd(t, p, a + j);
+            result = fmpz_equal(t, g + j);
+        }
+
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("len = %wd, chunk_bits = %wd\n", len, chunk_bits);
+            _fmpz_vec_print(a, len), flint_printf("\n\n");
+            _fmpz_vec_print(g, len), flint_printf("\n\n");
+            abort();
+        }
+
+        _fmpz_vec_clear(a, len);
+        _fmpz_vec_clear(g, len);
+        fmpz_clear(p);
+        fmpz_clear(t);
+
+        flint_set_num_threads(1);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+    
+    flint_printf("PASS\n");
+    return 0;
+}
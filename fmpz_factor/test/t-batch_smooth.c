@@ -0,0 +1,109 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "fmpz_factor.h"
+#include "ulong_extras.h"
+
+int main(void)
+{
+    int i, result;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("batch_smooth....");
+    fflush(stdout);
+
+    for (i = 0; i < 300 * flint_test_multiplier(); i++)
+    {
+        fmpz * a, * s;
+        const mp_limb_t * primes;
+        fmpz_factor_t fac;
+        fmpz_t t, u;
+        slong j, k, len, num, chunk_bits;
+
+        len = n_randint(state, 40) + 1;
+        num = n_randint(state, 200);
+        chunk_bits = n_randint(state, 2) ? FMPZ_FACTOR_BATCH_CHUNK_BITS
+                                         : n_randint(state, 1000) + 1;
+
+        if (n_randint(state, 8) == 0)
+            flint_set_num_threads(n_randint(state, 4) + 2);
+
+        primes = n_primes_arr_readonly(num + 1);
+
+        a = _fmpz_vec_init(len);
+        s = _fmpz_vec_init(len);
+        fmpz_init(t);
+        fmpz_init(u);
+
+        /* smooth parts with high powers, times a random cofactor */
+        for (j = 0; j < len; j++)
+        {
+            fmpz_one(a + j);
+            for (k = n_randint(state, 20); k > 0; k--)
+                fmpz_mul_ui(a + j, a + j, primes[n_randint(state, num + 1)]);
+            fmpz_randtest_unsigned(t, state, 80);
+            fmpz_add_ui(t, t, 1);
+            fmpz_mul(a + j, a + j, t);
+        }
+
+        _fmpz_factor_batch_smooth(s, a, len, primes, num, chunk_bits);
+
+        result = 1;
+        for (j = 0; j < len && result; j++)
+        {
+            fmpz_factor_init(fac);
+            fmpz_factor(fac, a + j);
+
+            /* the part of a[j] made of the first num primes */
+            fmpz_one(t);
+            for (k = 0; k < fac->num; k++)
+            {
+                if (num > 0 && fmpz_cmp_ui(fac->p + k, primes[num - 1]) <= 0)
+                {
+                    fmpz_pow_ui(u, fac->p + k, fac->exp[k]);
+                    fmpz_mul(t, t, u);
+                }
+            }
+
+            result = fmpz_equal(t, s + j);
+
+            fmpz_factor_clear(fac);
+        }
+
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("len = %wd, num = %wd, chunk_bits = %wd\n",
+                                                        len, num, chunk_bits);
+            _fmpz_vec_print(a, len), flint_printf("\n\n");
+            _fmpz_vec_print(s, len), flint_printf("\n\n");
+            abort();
+        }
+
+        _fmpz_vec_clear(a, len);
+        _fmpz_vec_clear(s, len);
+        fmpz_clear(t);
+        fmpz_clear(u);
+
+        flint_set_num_threads(1);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+    
+    flint_printf("PASS\n");
+    return 0;
+}
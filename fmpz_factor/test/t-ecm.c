@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2015 Kushagra Singh
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -68,6 +69,89 @@ int main(void)
         abort();
     }
 
+    /* curves run in parallel */
+    for (i = 0; i < 4 * flint_test_multiplier(); i++)
+    {
+        flint_set_num_threads(n_randint(state, 4) + 2);
+
+        fmpz_set_ui(prime1, n_randprime(state, 40, 1));
+        fmpz_randprime(prime2, state, 70, 0);
+
+        fmpz_mul(primeprod, prime1, prime2);
+
+        k = fmpz_factor_ecm(fac, 200, 2000, 50000, state, primeprod);
+
+        if (k != 0)
+        {
+            fmpz_mod(modval, primeprod, fac);
+
+            if (!fmpz_is_zero(modval) || fmpz_is_one(fac)
+                                      || fmpz_equal(fac, primeprod))
+            {
+                printf("FAIL : Wrong factor calculated (threaded)\n");
+                printf("n : ");
+                fmpz_print(primeprod);
+                printf(" factor calculated : ");
+                fmpz_print(fac);
+                abort();
+            }
+        }
+    }
+
+    /* the result does not depend on the number of threads */
+    for (i = 0; i < 4 * flint_test_multiplier(); i++)
+    {
+        flint_rand_t state1, state2;
+        fmpz_t fac2, r1, r2;
+        mp_limb_t s1, s2;
+        int k2;
+
+        fmpz_init(fac2);
+        fmpz_init(r1);
+        fmpz_init(r2);
+        flint_randinit(state1);
+        flint_randinit(state2);
+
+        s1 = n_randtest(state);
+        s2 = n_randtest(state);
+        flint_randseed(state1, s1, s2);
+        flint_randseed(state2, s1, s2);
+
+        fmpz_set_ui(prime1, n_randprime(state, 40, 1));
+        fmpz_randprime(prime2, state, 70, 0);
+        fmpz_mul(primeprod, prime1, prime2);
+
+        flint_set_num_threads(1);
+        k = fmpz_factor_ecm(fac, 100, 2000, 50000, state1, primeprod);
+
+        flint_set_num_threads(n_randint(state, 4) + 2);
+        k2 = fmpz_factor_ecm(fac2, 100, 2000, 50000, state2, primeprod);
+
+        fmpz_randm(r1, state1, primeprod);
+        fmpz_randm(r2, state2, primeprod);
+
+        if (k != k2 || (k != 0 && !fmpz_equal(fac, fac2))
+                    || !fmpz_equal(r1, r2))
+        {
+            printf("FAIL : Result depends on the number of threads\n");
+            printf("n : ");
+            fmpz_print(primeprod);
+            printf(" factors calculated : ");
+            fmpz_print(fac);
+            printf(", ");
+            fmpz_print(fac2);
+            abort();
+        }
+
+        flint_randclear(state1);
+        flint_randclear(state2);
+        fmpz_clear(fac2);
+        fmpz_clear(r1);
+        fmpz_clear(r2);
+    }
+
+    flint_set_num_threads(1);
+
     /* Tests for hangs and crashes, don't care about result */
 
 #if FLINT64
@@ -12,6 +12,7 @@
 */
 
 #include "fmpz_lll.h"
+#include "ctrl.h"
 
 int
 fmpz_lll_with_removal_ulll(fmpz_mat_t FM, fmpz_mat_t UM, slong new_size,
@@ -20,7 +21,7 @@ fmpz_lll_with_removal_ulll(fmpz_mat_t FM, fmpz_mat_t UM, slong new_size,
     int newd;
     if (fl->rt == Z_BASIS)
     {
-        slong r, c, mbits, prev_mbits, i, j;
+        slong r, c, mbits, prev_mbits, i, j, pass = 0;
         int full_prec = 1, done = 0, is_U_I;
         fmpz_mat_t U, big_td, trunc_data;
 
@@ -57,6 +58,13 @@ fmpz_lll_with_removal_ulll(fmpz_mat_t FM, fmpz_mat_t UM, slong new_size,
 
         while (done == 0)
         {
+            /* give up, leaving FM a basis of the same lattice */
+            if (flint_ctrl_check("fmpz_lll", pass++, 0))
+            {
+                newd = r;
+                break;
+            }
+
             if (full_prec == 0)
             {
                 fmpz_lll_wrapper_with_removal_knapsack(big_td, UM, gs_B, fl);
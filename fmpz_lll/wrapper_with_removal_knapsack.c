@@ -12,6 +12,7 @@
 */
 
 #include "fmpz_lll.h"
+#include "ctrl.h"
 
 int
 fmpz_lll_wrapper_with_removal_knapsack(fmpz_mat_t B, fmpz_mat_t U,
@@ -22,6 +23,10 @@ fmpz_lll_wrapper_with_removal_knapsack(fmpz_mat_t B, fmpz_mat_t U,
     if ((res == -1)
         || (!fmpz_lll_is_reduced_with_removal(B, fl, gs_B, res, D_BITS)))
     {
+        /* give up rather than try the slower variants, removing no rows */
+        if (flint_ctrl_check("fmpz_lll", 0, 0))
+            return B->r;
+
         if (fl->rt == Z_BASIS && fl->gt == APPROX)
         {
             res = fmpz_lll_d_heuristic_with_removal(B, U, gs_B, fl);
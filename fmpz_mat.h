@@ -187,6 +187,10 @@ int fmpz_mat_read(fmpz_mat_t mat)
     return fmpz_mat_fread(stdin, mat);
 }
 
+FLINT_DLL int fmpz_mat_fwrite_bin(FILE * file, const fmpz_mat_t mat);
+
+FLINT_DLL int fmpz_mat_fread_bin(FILE * file, fmpz_mat_t mat);
+
 /* Random matrix generation  *************************************************/
 
 FLINT_DLL void fmpz_mat_randbits(fmpz_mat_t mat, flint_rand_t state, flint_bitcnt_t bits);
@@ -0,0 +1,51 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_mat.h"
+#include "binfile.h"
+
+int fmpz_mat_fread_bin(FILE * file, fmpz_mat_t mat)
+{
+    flint_bin_header_t h;
+    slong r, c;
+
+    if (!flint_bin_header_fread(file, h, FLINT_BIN_FMPZ_MAT) ||
+        h->dims[0] > WORD_MAX || h->dims[1] > WORD_MAX || h->data != 0 ||
+        (h->dims[1] != 0 && h->dims[0] > WORD_MAX/h->dims[1]) ||
+        h->num != h->dims[0]*h->dims[1])
+        return 0;
+
+    r = h->dims[0];
+    c = h->dims[1];
+
+    /* if the input is 0 by 0 then set the dimensions to r and c */
+    if (mat->r == 0 && mat->c == 0)
+    {
+        fmpz_mat_clear(mat);
+        fmpz_mat_init(mat, r, c);
+    }
+    else if (mat->r != r || mat->c != c)
+        return 0;
+    else
+        fmpz_mat_zero(mat);
+
+    if (!_flint_bin_fread(file, h, mat->rows, r, c, NULL, 0, 0))
+    {
+        fmpz_mat_zero(mat);
+        return 0;
+    }
+
+    return 1;
+}
@@ -11,6 +11,8 @@
 */
 
 #include "fmpz_mat.h"
+#include "tuning.h"
+#include "profiler.h"
 
 void _fmpz_mat_mul_small_1(fmpz_mat_t C, const fmpz_mat_t A, const fmpz_mat_t B)
 {
@@ -108,7 +110,7 @@ fmpz_mat_mul(fmpz_mat_t C, const fmpz_mat_t A, const fmpz_mat_t B)
     slong ar, br, bc;
     slong abits, bbits;
     flint_bitcnt_t cbits;
-    slong i, j, dim, limit;
+    slong i, j, dim, limit, cutoff;
     int sign;
 
     ar = fmpz_mat_nrows(A);
@@ -192,8 +194,17 @@ fmpz_mat_mul(fmpz_mat_t C, const fmpz_mat_t A, const fmpz_mat_t B)
         else
             limit = 200 + 8*FLINT_BIT_COUNT(cbits);
 
-        if (dim > limit && _fmpz_mat_mul_blas(C, A, abits, B, bbits, sign, cbits))
-            return;
+        if (dim > limit)
+        {
+            int done;
+
+            FLINT_DISPATCH("fmpz_mat_mul", done ? "blas" : "blas_failed",
+                dim, cbits,
+                done = _fmpz_mat_mul_blas(C, A, abits, B, bbits, sign, cbits));
+
+            if (done)
+                return;
+        }
     }
 #endif
 
@@ -210,34 +221,44 @@ fmpz_mat_mul(fmpz_mat_t C, const fmpz_mat_t A, const fmpz_mat_t B)
         if (ar < 9 || ar + br < 20)
         {
             if (cbits <= FLINT_BITS - 2)
-                _fmpz_mat_mul_small_1(C, A, B);
+                FLINT_DISPATCH("fmpz_mat_mul", "small_1", dim, cbits,
+                    _fmpz_mat_mul_small_1(C, A, B));
             else if (cbits <= 2*FLINT_BITS - 1)
-                _fmpz_mat_mul_small_2a(C, A, B);
+                FLINT_DISPATCH("fmpz_mat_mul", "small_2a", dim, cbits,
+                    _fmpz_mat_mul_small_2a(C, A, B));
             else
-                _fmpz_mat_mul_small_2b(C, A, B);
+                FLINT_DISPATCH("fmpz_mat_mul", "small_2b", dim, cbits,
+                    _fmpz_mat_mul_small_2b(C, A, B));
 
             return;
         }
 
-        if (dim > 1000)
+        cutoff = (cbits <= FLINT_BITS - 2)
+                   ? FLINT_TUNE(FLINT_TUNE_FMPZ_MAT_MUL_STRASSEN)
+                   : FLINT_TUNE(FLINT_TUNE_FMPZ_MAT_MUL_MULTI_MOD);
+
+        if (dim > cutoff)
         {
             /* do more mul_small with more threads */
             limit = 300*flint_get_num_threads();
 
-            if (cbits <= FLINT_BITS - 2 && dim - 1000 > limit)
+            if (cbits <= FLINT_BITS - 2 && dim - cutoff > limit)
             {
                 /* strassen avoids big fmpz intermediates */
-                fmpz_mat_mul_strassen(C, A, B);
+                FLINT_DISPATCH("fmpz_mat_mul", "strassen", dim, cbits,
+                    fmpz_mat_mul_strassen(C, A, B));
                 return;
             }
-            else if (cbits > FLINT_BITS - 2 && dim - 4000 > limit)
+            else if (cbits > FLINT_BITS - 2 && dim - cutoff > limit)
             {
-                _fmpz_mat_mul_multi_mod(C, A, B, sign, cbits);
+                FLINT_DISPATCH("fmpz_mat_mul", "multi_mod", dim, cbits,
+                    _fmpz_mat_mul_multi_mod(C, A, B, sign, cbits));
                 return;
             }
         }
 
-        _fmpz_mat_mul_small_internal(C, A, B, cbits);
+        FLINT_DISPATCH("fmpz_mat_mul", "small", dim, cbits,
+            _fmpz_mat_mul_small_internal(C, A, B, cbits));
         return;
     }
     else if (abits + sign <= 2*FLINT_BITS && bbits + sign <= 2*FLINT_BITS)
@@ -252,29 +273,36 @@ fmpz_mat_mul(fmpz_mat_t C, const fmpz_mat_t A, const fmpz_mat_t B)
         if (sign)
             dim = 2*dim;
 
-        if (dim > 300)
+        cutoff = FLINT_TUNE(FLINT_TUNE_FMPZ_MAT_MUL_DOUBLE_WORD);
+
+        if (dim > cutoff)
         {
             /* do more mul_double_word with more threads and more cbits */
             limit = (cbits - 2*FLINT_BITS)/8;
             limit = limit*limit*flint_get_num_threads();
-            if (dim - 300 > limit)
+            if (dim - cutoff > limit)
             {
-                _fmpz_mat_mul_multi_mod(C, A, B, sign, cbits);
+                FLINT_DISPATCH("fmpz_mat_mul", "multi_mod", dim, cbits,
+                    _fmpz_mat_mul_multi_mod(C, A, B, sign, cbits));
                 return;
             }
         }
 
-        _fmpz_mat_mul_double_word_internal(C, A, B, sign, cbits);
+        FLINT_DISPATCH("fmpz_mat_mul", "double_word", dim, cbits,
+            _fmpz_mat_mul_double_word_internal(C, A, B, sign, cbits));
         return;
     }
     else
     {
         if (dim >= 3 * FLINT_BIT_COUNT(cbits))  /* tuning param */
-            _fmpz_mat_mul_multi_mod(C, A, B, sign, cbits);
+            FLINT_DISPATCH("fmpz_mat_mul", "multi_mod", dim, cbits,
+                _fmpz_mat_mul_multi_mod(C, A, B, sign, cbits));
         else if (abits >= 500 && bbits >= 500 && dim >= 8)  /* tuning param */
-            fmpz_mat_mul_strassen(C, A, B);
+            FLINT_DISPATCH("fmpz_mat_mul", "strassen", dim, cbits,
+                fmpz_mat_mul_strassen(C, A, B));
         else
-            fmpz_mat_mul_classical_inline(C, A, B);
+            FLINT_DISPATCH("fmpz_mat_mul", "classical", dim, cbits,
+                fmpz_mat_mul_classical_inline(C, A, B));
     }
 }
 
@@ -1,6 +1,7 @@
 /*
     Copyright (C) 2010, 2018 Fredrik Johansson
     Copyright (C) 2021 Daniel Schultz
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -55,26 +56,24 @@ static void _mod_worker(void * varg)
 
     if (comb != NULL)
     {
-        mp_limb_t * residues;
+        mp_ptr * residues;
         fmpz_comb_temp_t comb_temp;
 
-        residues = FLINT_ARRAY_ALLOC(num_primes, mp_limb_t);
+        residues = FLINT_ARRAY_ALLOC(num_primes, mp_ptr);
         fmpz_comb_temp_init(comb_temp, comb);
 
         for (i = Astartrow; i < Astoprow; i++)
-        for (j = 0; j < k; j++)
         {
-            fmpz_multi_mod_ui(residues, &Arows[i][j], comb, comb_temp);
             for (l = 0; l < num_primes; l++)
-                mod_A[l]->rows[i][j] = residues[l];
+                residues[l] = mod_A[l]->rows[i];
+            _fmpz_vec_multi_mod_ui(residues, Arows[i], k, comb, comb_temp);
         }
 
         for (i = Bstartrow; i < Bstoprow; i++)
-        for (j = 0; j < n; j++)
         {
-            fmpz_multi_mod_ui(residues, &Brows[i][j], comb, comb_temp);
             for (l = 0; l < num_primes; l++)
-                mod_B[l]->rows[i][j] = residues[l];
+                residues[l] = mod_B[l]->rows[i];
+            _fmpz_vec_multi_mod_ui(residues, Brows[i], n, comb, comb_temp);
         }
 
         flint_free(residues);
@@ -118,19 +117,17 @@ static void _crt_worker(void * varg)
 
     if (comb != NULL)
     {
-        mp_limb_t * residues;
+        mp_srcptr * residues;
         fmpz_comb_temp_t comb_temp;
 
-        residues = FLINT_ARRAY_ALLOC(num_primes, mp_limb_t);
+        residues = FLINT_ARRAY_ALLOC(num_primes, mp_srcptr);
         fmpz_comb_temp_init(comb_temp, comb);
 
         for (i = Cstartrow; i < Cstoprow; i++)
-        for (j = 0; j < n; j++)
         {
             for (l = 0; l < num_primes; l++)
-                residues[l] = mod_C[l]->rows[i][j];
-
-            fmpz_multi_CRT_ui(&Crows[i][j], residues, comb, comb_temp, sign);
+                residues[l] = mod_C[l]->rows[i];
+            _fmpz_vec_multi_CRT_ui(Crows[i], residues, n, comb, comb_temp, sign);
         }
 
         flint_free(residues);
@@ -293,7 +290,6 @@ void _fmpz_mat_mul_multi_mod(
     flint_bitcnt_t primes_bits;
     _worker_arg mainarg;
     _worker_arg * args;
-    fmpz_comb_t comb;
     slong num_workers;
     thread_pool_handle * handles;
     slong limit;
@@ -354,9 +350,8 @@ void _fmpz_mat_mul_multi_mod(
     /* TUNING */
     if (mainarg.num_primes > 200)
     {
-        /* use comb */
-        fmpz_comb_init(comb, mainarg.primes, mainarg.num_primes);
-        mainarg.comb = comb;
+        /* use comb, the primes only depend on bits */
+        mainarg.comb = _fmpz_comb_cache(mainarg.primes, mainarg.num_primes);
     }
     else
     {
@@ -460,9 +455,6 @@ crt_single:
     }
 
     /* Cleanup */
-    if (mainarg.comb != NULL)
-        fmpz_comb_clear(comb);
-
     for (i = 0; i < mainarg.num_primes; i++)
     {
         nmod_mat_clear(mainarg.mod_A[i]);
@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2011 Fredrik Johansson
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -16,29 +17,28 @@ fmpz_mat_multi_CRT_ui_precomp(fmpz_mat_t mat,
     nmod_mat_t * const residues, slong nres,
     const fmpz_comb_t comb, fmpz_comb_temp_t temp, int sign)
 {
-    slong i, j, k;
-    mp_ptr r;
+    slong i, k;
+    mp_srcptr * r;
 
-    r = _nmod_vec_init(nres);
+    r = (mp_srcptr *) flint_malloc(nres*sizeof(mp_srcptr));
 
     for (i = 0; i < fmpz_mat_nrows(mat); i++)
     {
-        for (j = 0; j < fmpz_mat_ncols(mat); j++)
-        {
-            for (k = 0; k < nres; k++)
-                r[k] = nmod_mat_entry(residues[k], i, j);
-            fmpz_multi_CRT_ui(fmpz_mat_entry(mat, i, j), r, comb, temp, sign);
-        }
+        for (k = 0; k < nres; k++)
+            r[k] = residues[k]->rows[i];
+
+        _fmpz_vec_multi_CRT_ui(mat->rows[i], r, fmpz_mat_ncols(mat),
+                                                           comb, temp, sign);
     }
 
-    _nmod_vec_clear(r);
+    flint_free(r);
 }
 
 void
 fmpz_mat_multi_CRT_ui(fmpz_mat_t mat, nmod_mat_t * const residues,
     slong nres, int sign)
 {
-    fmpz_comb_t comb;
+    const fmpz_comb_struct * comb;
     fmpz_comb_temp_t temp;
     mp_ptr primes;
     slong i;
@@ -47,12 +47,11 @@ fmpz_mat_multi_CRT_ui(fmpz_mat_t mat, nmod_mat_t * const residues,
     for (i = 0; i < nres; i++)
         primes[i] = residues[i]->mod.n;
 
-    fmpz_comb_init(comb, primes, nres);
+    comb = _fmpz_comb_cache(primes, nres);
     fmpz_comb_temp_init(temp, comb);
 
     fmpz_mat_multi_CRT_ui_precomp(mat, residues, nres, comb, temp, sign);
 
-    fmpz_comb_clear(comb);
     fmpz_comb_temp_clear(temp);
     _nmod_vec_clear(primes);
 }
@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2011 Fredrik Johansson
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -15,28 +16,27 @@ void
 fmpz_mat_multi_mod_ui_precomp(nmod_mat_t * residues, slong nres, 
     const fmpz_mat_t mat, const fmpz_comb_t comb, fmpz_comb_temp_t temp)
 {
-    slong i, j, k;
-    mp_ptr r;
+    slong i, k;
+    mp_ptr * r;
 
-    r = _nmod_vec_init(nres);
+    r = (mp_ptr *) flint_malloc(nres*sizeof(mp_ptr));
 
     for (i = 0; i < fmpz_mat_nrows(mat); i++)
     {
-        for (j = 0; j < fmpz_mat_ncols(mat); j++)
-        {
-            fmpz_multi_mod_ui(r, fmpz_mat_entry(mat, i, j), comb, temp);
-            for (k = 0; k < nres; k++)
-                nmod_mat_entry(residues[k], i, j) = r[k];
-        }
+        for (k = 0; k < nres; k++)
+            r[k] = residues[k]->rows[i];
+
+        _fmpz_vec_multi_mod_ui(r, mat->rows[i], fmpz_mat_ncols(mat),
+                                                                 comb, temp);
     }
 
-    _nmod_vec_clear(r);
+    flint_free(r);
 }
 
 void
 fmpz_mat_multi_mod_ui(nmod_mat_t * residues, slong nres, const fmpz_mat_t mat)
 {
-    fmpz_comb_t comb;
+    const fmpz_comb_struct * comb;
     fmpz_comb_temp_t temp;
     mp_ptr primes;
     slong i;
@@ -44,12 +44,12 @@ fmpz_mat_multi_mod_ui(nmod_mat_t * residues, slong nres, const fmpz_mat_t mat)
     primes = _nmod_vec_init(nres);
     for (i = 0; i < nres; i++)
         primes[i] = residues[i]->mod.n;
-    fmpz_comb_init(comb, primes, nres);
+
+    comb = _fmpz_comb_cache(primes, nres);
     fmpz_comb_temp_init(temp, comb);
 
     fmpz_mat_multi_mod_ui_precomp(residues, nres, mat, comb, temp);
 
-    fmpz_comb_clear(comb);
     fmpz_comb_temp_clear(temp);
     _nmod_vec_clear(primes);
 }
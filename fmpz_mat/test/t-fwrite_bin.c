@@ -0,0 +1,85 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_mat.h"
+#include "ulong_extras.h"
+
+int main(void)
+{
+    int i, result;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("fwrite_bin....");
+    fflush(stdout);
+
+    for (i = 0; i < 1000 * flint_test_multiplier(); i++)
+    {
+        fmpz_mat_t A, B, C;
+        slong r, c;
+        FILE * file;
+
+        r = n_randint(state, 10);
+        c = n_randint(state, 10);
+
+        fmpz_mat_init(A, r, c);
+        fmpz_mat_init(B, 0, 0);
+        fmpz_mat_init(C, r, c);
+
+        fmpz_mat_randtest(A, state, n_randint(state, 200) + 1);
+        fmpz_mat_randtest(C, state, n_randint(state, 200) + 1);
+
+        /* the rows of A need not be in the order of its entries */
+        if (r > 1)
+            fmpz_mat_swap_rows(A, NULL, 0, r - 1);
+
+        file = tmpfile();
+        if (file == NULL)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("could not open a temporary file\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        result = fmpz_mat_fwrite_bin(file, A);
+        result = result && fmpz_mat_fwrite_bin(file, A);
+        rewind(file);
+
+        /* into a 0 by 0 matrix, then into one of the right shape */
+        result = result && fmpz_mat_fread_bin(file, B);
+        result = result && fmpz_mat_fread_bin(file, C);
+        result = result && fmpz_mat_equal(A, B) && fmpz_mat_equal(A, C);
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            fmpz_mat_print_pretty(A); flint_printf("\n\n");
+            fmpz_mat_print_pretty(B); flint_printf("\n\n");
+            fmpz_mat_print_pretty(C); flint_printf("\n\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        fclose(file);
+
+        fmpz_mat_clear(A);
+        fmpz_mat_clear(B);
+        fmpz_mat_clear(C);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
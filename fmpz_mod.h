@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2017 - 2021 Daniel Schultz
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -230,6 +231,40 @@ FLINT_DLL void fmpz_mod_rand(fmpz_t a, flint_rand_t state,
 FLINT_DLL void fmpz_mod_rand_not_zero(fmpz_t a, flint_rand_t state,
                                                      const fmpz_mod_ctx_t ctx);
 
+/* discrete logs a la Pollard rho *******************************************/
+
+#define FMPZ_MOD_DISCRETE_LOG_RHO_CUTOFF 16384
+#define FMPZ_MOD_DISCRETE_LOG_RHO_STEPS_BITS 5
+#define FMPZ_MOD_DISCRETE_LOG_RHO_MAX_POINTS 16384
+
+typedef struct fmpz_mod_discrete_log_rho_struct {
+    fmpz_t gamma;       /* of prime order */
+    ulong prime;
+    fmpz * steps;       /* gamma^step_exps[j] */
+    ulong * step_exps;
+    int dist_bits;      /* distinguished points have dist_bits zero bits */
+    slong alloc;        /* hash table of distinguished points */
+    slong length;
+    fmpz * points;      /* zero for an empty slot */
+    ulong * logs;
+    ulong * owners;     /* zero if the log is known, else the run whose w
+                           it is relative to */
+    ulong runs;
+#if FLINT_USES_PTHREAD
+    pthread_mutex_t mutex;
+#endif
+} fmpz_mod_discrete_log_rho_struct;
+
+typedef fmpz_mod_discrete_log_rho_struct fmpz_mod_discrete_log_rho_t[1];
+
+FLINT_DLL void fmpz_mod_discrete_log_rho_init(fmpz_mod_discrete_log_rho_t R,
+             const fmpz_t gamma, ulong prime, const fmpz_mod_ctx_t ctx);
+
+FLINT_DLL void fmpz_mod_discrete_log_rho_clear(fmpz_mod_discrete_log_rho_t R);
+
+FLINT_DLL ulong fmpz_mod_discrete_log_rho_run(fmpz_mod_discrete_log_rho_t R,
+                                  const fmpz_t w, const fmpz_mod_ctx_t ctx);
+
 /* discrete logs a la Pohlig - Hellman ***************************************/
 
 typedef struct {
@@ -249,6 +284,7 @@ typedef struct {
     ulong cbound;
     ulong dbound;
     fmpz_mod_discrete_log_pohlig_hellman_table_entry_struct * table; /* length cbound */
+    struct fmpz_mod_discrete_log_rho_struct * rho; /* used if table is NULL */
 } fmpz_mod_discrete_log_pohlig_hellman_entry_struct;
 
 typedef struct {
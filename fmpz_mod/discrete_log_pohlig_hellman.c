@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2019 Daniel Schultz
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -22,6 +23,10 @@
     p - 1 = p1^e1 * ... * pn^en for ulong pi and ei
 
     The assumption p is prime could be removed, but then phi(p) needs to be calculated by someone somewhere.
+
+    The logs in the subgroups of order pi are found by baby-step giant-step
+    for pi <= FMPZ_MOD_DISCRETE_LOG_RHO_CUTOFF and by Pollard rho otherwise,
+    whose table of distinguished points is kept in L for the next runs.
 */
 
 static int fmpz_mod_discrete_log_pohlig_hellman_table_entry_struct_cmp(
@@ -68,6 +73,11 @@ void fmpz_mod_discrete_log_pohlig_hellman_clear(fmpz_mod_discrete_log_pohlig_hel
             fmpz_clear(Li->table[c].gammapow);
         }
         flint_free(Li->table);
+        if (Li->rho != NULL)
+        {
+            fmpz_mod_discrete_log_rho_clear(Li->rho);
+            flint_free(Li->rho);
+        }
     }
 
     if (L->entries)
@@ -137,6 +147,7 @@ double fmpz_mod_discrete_log_pohlig_hellman_precompute_prime(
         fmpz_init(Li->startingbeta);
         fmpz_init(Li->gamma);
         fmpz_init(Li->gammainv);
+        Li->rho = NULL;
 
         if (!fmpz_abs_fits_ui(factors->p + i))
         {
@@ -200,6 +211,18 @@ try_alpha:
         fmpz_mod_inv(Li->gammainv, Li->gamma, L->fpctx);
         fmpz_mod_pow_fmpz(Li->startingbeta, L->alphainv, Li->co, L->fpctx);
 
+        if (Li->prime > FMPZ_MOD_DISCRETE_LOG_RHO_CUTOFF)
+        {
+            Li->dbound = 0;
+            Li->cbound = 0;
+            Li->table = NULL;
+            Li->rho = (fmpz_mod_discrete_log_rho_struct *) flint_malloc(
+                                     sizeof(fmpz_mod_discrete_log_rho_struct));
+            fmpz_mod_discrete_log_rho_init(Li->rho, Li->gamma, Li->prime,
+                                                                    L->fpctx);
+            continue;
+        }
+
         Li->dbound = ceil(sqrt((double) Li->prime));
         Li->cbound = (Li->prime + Li->dbound - 1)/Li->dbound;
         while (Li->cbound > 100)
@@ -245,7 +268,10 @@ try_alpha:
         j = 0;
         do {
             this_cost += _pow_fmpz_cost(e);
-            this_cost += Li->dbound*(1 + log(Li->cbound)); /* bsgs search */
+            if (Li->rho != NULL)
+                this_cost += 2*sqrt(Li->prime); /* rho walks */
+            else
+                this_cost += Li->dbound*(1 + log(Li->cbound)); /* bsgs search */
             this_cost += 2*log(Li->prime); /* some power < Li->prime */
             fmpz_divexact_ui(e, e, Li->prime);
         } while (++j < Li->exp);
@@ -334,6 +360,11 @@ void fmpz_mod_discrete_log_pohlig_hellman_run(
         do {
             fmpz_mod_pow_fmpz(w, z, e, L->fpctx);
             /* solve Li->gamma ^ g == w mod p */
+            if (Li->rho != NULL)
+            {
+                g = fmpz_mod_discrete_log_rho_run(Li->rho, w, L->fpctx);
+                goto found_g;
+            }
             d = 0;
             while (1)
             {
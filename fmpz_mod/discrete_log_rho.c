@@ -0,0 +1,344 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include "fmpz_mod.h"
+#include "thread_support.h"
+
+/*
+    Pollard rho with distinguished points in the group of prime order q
+    generated by gamma.
+
+    All walks multiply by the same r = 2^STEPS_BITS powers gamma^s_j, the
+    step being chosen by the value of the current point, so that a walk
+    started at gamma^a, whose points have known logs, and one started at
+    w*gamma^a, whose points have logs log(w) + a, coincide from the first
+    point they share. Each walk runs to its first distinguished point, which
+    is looked up in a hash table. A point reached by both kinds of walks
+    gives the log of w. Once it is known, the points of the walks from w
+    also have known logs, so the table only grows and later runs with the
+    same gamma need fewer walks. The table has a bounded size, beyond which
+    points are no longer stored.
+
+    Several runs may share the table. The points of the walks from w are
+    tagged with the number of their run, which alone fixes them up, and
+    the table is only accessed under the mutex.
+*/
+
+/* the done flag of a run is read by its walks without the mutex */
+#if FLINT_USES_PTHREAD && (__GNUC__ > 4 || (__GNUC__ == 4 && __GNUC_MINOR__ >= 8))
+#define RHO_DONE_LOAD(p) __atomic_load_n((p), __ATOMIC_RELAXED)
+#define RHO_DONE_STORE(p, x) __atomic_store_n((p), (x), __ATOMIC_RELAXED)
+#else
+#define RHO_DONE_LOAD(p) (*((volatile int *) (p)))
+#define RHO_DONE_STORE(p, x) (*((volatile int *) (p)) = (x))
+#endif
+
+#if FLINT64
+#define RHO_HASH_MULT UWORD(0x9e3779b97f4a7c15)
+#else
+#define RHO_HASH_MULT UWORD(0x9e3779b9)
+#endif
+
+static ulong _fmpz_low_limb(const fmpz_t x)
+{
+    if (COEFF_IS_MPZ(*x))
+        return COEFF_TO_PTR(*x)->_mp_d[0];
+    else
+        return (ulong) *x;
+}
+
+/* the slot holding x, or the empty slot where it belongs */
+static slong _rho_find(const fmpz_mod_discrete_log_rho_struct * R,
+                                                                const fmpz_t x)
+{
+    slong i, bits = FLINT_BIT_COUNT(R->alloc) - 1;
+
+    i = ((_fmpz_low_limb(x) >> R->dist_bits)*RHO_HASH_MULT)
+                                                        >> (FLINT_BITS - bits);
+
+    while (!fmpz_is_zero(R->points + i) && !fmpz_equal(R->points + i, x))
+        i = (i + 1) & (R->alloc - 1);
+
+    return i;
+}
+
+static void _rho_fit_alloc(fmpz_mod_discrete_log_rho_struct * R,
+                                                                  slong alloc)
+{
+    fmpz * points = R->points;
+    ulong * logs = R->logs;
+    ulong * owners = R->owners;
+    slong i, j, old_alloc = R->alloc;
+
+    R->alloc = alloc;
+    R->points = _fmpz_vec_init(alloc);
+    R->logs = (ulong *) flint_malloc(alloc*sizeof(ulong));
+    R->owners = (ulong *) flint_malloc(alloc*sizeof(ulong));
+
+    if (points == NULL)
+        return;
+
+    for (i = 0; i < old_alloc; i++)
+    {
+        if (fmpz_is_zero(points + i))
+            continue;
+
+        j = _rho_find(R, points + i);
+        fmpz_swap(R->points + j, points + i);
+        R->logs[j] = logs[i];
+        R->owners[j] = owners[i];
+    }
+
+    _fmpz_vec_clear(points, old_alloc);
+    flint_free(logs);
+    flint_free(owners);
+}
+
+void fmpz_mod_discrete_log_rho_init(fmpz_mod_discrete_log_rho_t R,
+                 const fmpz_t gamma, ulong prime, const fmpz_mod_ctx_t ctx)
+{
+    slong j, r = WORD(1) << FMPZ_MOD_DISCRETE_LOG_RHO_STEPS_BITS;
+    slong bits = FLINT_BIT_COUNT(prime);
+    flint_rand_t state;
+
+    FLINT_ASSERT(prime > 2);
+
+    fmpz_init_set(R->gamma, gamma);
+    R->prime = prime;
+
+    /* about sqrt(q)/2^dist_bits distinguished points per run, and for
+       a small group every point, since it may have no others */
+    if (bits <= 12)
+        R->dist_bits = 0;
+    else
+        R->dist_bits = (bits + 1)/2 - FLINT_MIN(8, bits/4);
+
+    R->steps = _fmpz_vec_init(r);
+    R->step_exps = (ulong *) flint_malloc(r*sizeof(ulong));
+
+    flint_randinit(state);
+    for (j = 0; j < r; j++)
+    {
+        R->step_exps[j] = 1 + n_randint(state, prime - 1);
+        fmpz_mod_pow_ui(R->steps + j, gamma, R->step_exps[j], ctx);
+    }
+    flint_randclear(state);
+
+    R->length = 0;
+    R->alloc = 0;
+    R->points = NULL;
+    R->logs = NULL;
+    R->owners = NULL;
+    _rho_fit_alloc(R, 64);
+
+    R->runs = 0;
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_init(&R->mutex, NULL);
+#endif
+}
+
+void fmpz_mod_discrete_log_rho_clear(fmpz_mod_discrete_log_rho_t R)
+{
+    fmpz_clear(R->gamma);
+    _fmpz_vec_clear(R->steps, WORD(1) << FMPZ_MOD_DISCRETE_LOG_RHO_STEPS_BITS);
+    flint_free(R->step_exps);
+    _fmpz_vec_clear(R->points, R->alloc);
+    flint_free(R->logs);
+    flint_free(R->owners);
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_destroy(&R->mutex);
+#endif
+}
+
+typedef struct
+{
+    fmpz_mod_discrete_log_rho_struct * R;
+    const fmpz * w;
+    const fmpz_mod_ctx_struct * ctx;
+    ulong run;
+    int done;
+    ulong log;
+}
+_rho_arg_t;
+
+/*
+    The distinguished point x is gamma^a if known is set and w*gamma^a
+    otherwise. Points from the w of other runs are of no use. Return 1 if
+    the table has room for more points.
+*/
+static int _rho_distinguished(_rho_arg_t * arg, const fmpz_t x,
+                                                         ulong a, int known)
+{
+    fmpz_mod_discrete_log_rho_struct * R = arg->R;
+    ulong q = R->prime;
+    slong i;
+    int room;
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_lock(&R->mutex);
+#endif
+
+    if (!arg->done)
+    {
+        if (R->length + 1 > R->alloc/2 &&
+            R->alloc < 2*FMPZ_MOD_DISCRETE_LOG_RHO_MAX_POINTS)
+        {
+            _rho_fit_alloc(R, 2*R->alloc);
+        }
+
+        i = _rho_find(R, x);
+
+        if (!fmpz_is_zero(R->points + i))
+        {
+            if (R->owners[i] == 0 && !known)
+            {
+                arg->log = n_submod(R->logs[i], a, q);
+                RHO_DONE_STORE(&arg->done, 1);
+            }
+            else if (R->owners[i] == arg->run && known)
+            {
+                arg->log = n_submod(a, R->logs[i], q);
+                RHO_DONE_STORE(&arg->done, 1);
+            }
+        }
+        else if (R->length < FMPZ_MOD_DISCRETE_LOG_RHO_MAX_POINTS)
+        {
+            fmpz_set(R->points + i, x);
+            R->logs[i] = a;
+            R->owners[i] = known ? 0 : arg->run;
+            R->length++;
+        }
+    }
+
+    room = R->length < FMPZ_MOD_DISCRETE_LOG_RHO_MAX_POINTS;
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_unlock(&R->mutex);
+#endif
+
+    return room;
+}
+
+static void _rho_worker(slong c0, slong c1, void * varg)
+{
+    _rho_arg_t * arg = (_rho_arg_t *) varg;
+    fmpz_mod_discrete_log_rho_struct * R = arg->R;
+    const fmpz_mod_ctx_struct * ctx = arg->ctx;
+    ulong a, x, j, s, r, q = R->prime;
+    ulong mask = (UWORD(1) << R->dist_bits) - 1;
+    ulong maxlen = UWORD(16) << R->dist_bits;
+    flint_rand_t state;
+    fmpz_t X;
+    int known, room = 1;
+
+    flint_randinit(state);
+    flint_randseed(state, c0 + 1, arg->run);
+    fmpz_init(X);
+
+    for (r = 0; !RHO_DONE_LOAD(&arg->done); r++)
+    {
+        /* only walks from w once the table is full */
+        known = (r & 1) && room;
+
+        a = n_randint(state, q);
+        fmpz_mod_pow_ui(X, R->gamma, a, ctx);
+        if (!known)
+            fmpz_mod_mul(X, X, arg->w, ctx);
+
+        /* a walk may also cycle without reaching a distinguished point */
+        for (s = 0; s < maxlen; s++)
+        {
+            x = _fmpz_low_limb(X);
+
+            if ((x & mask) == 0)
+            {
+                room = _rho_distinguished(arg, X, a, known);
+                break;
+            }
+
+            j = (x*RHO_HASH_MULT) >> (FLINT_BITS -
+                                       FMPZ_MOD_DISCRETE_LOG_RHO_STEPS_BITS);
+            fmpz_mod_mul(X, X, R->steps + j, ctx);
+            a = n_addmod(a, R->step_exps[j], q);
+
+            if ((s % 256) == 255 && RHO_DONE_LOAD(&arg->done))
+                break;
+        }
+    }
+
+    fmpz_clear(X);
+    flint_randclear(state);
+}
+
+/* return the log of w, which must lie in the group generated by gamma */
+ulong fmpz_mod_discrete_log_rho_run(fmpz_mod_discrete_log_rho_t R,
+                                       const fmpz_t w, const fmpz_mod_ctx_t ctx)
+{
+    _rho_arg_t arg;
+    slong i;
+
+    if (fmpz_is_one(w))
+        return 0;
+
+    arg.R = R;
+    arg.w = w;
+    arg.ctx = ctx;
+    arg.done = 0;
+    arg.log = 0;
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_lock(&R->mutex);
+#endif
+
+    /* nonzero, so that it does not mark points as known */
+    arg.run = ++R->runs;
+    if (arg.run == 0)
+        arg.run = ++R->runs;
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_unlock(&R->mutex);
+#endif
+
+    /* one walk per thread, each until the log is found */
+    flint_parallel_for(0, flint_task_num_threads(), 1, _rho_worker, &arg);
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_lock(&R->mutex);
+#endif
+
+    /* the points reached from w now have known logs */
+    for (i = 0; i < R->alloc; i++)
+    {
+        if (!fmpz_is_zero(R->points + i) && R->owners[i] == arg.run)
+        {
+            R->logs[i] = n_addmod(R->logs[i], arg.log, R->prime);
+            R->owners[i] = 0;
+        }
+    }
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_unlock(&R->mutex);
+#endif
+
+#if FLINT_WANT_ASSERT
+    {
+        fmpz_t t;
+        fmpz_init(t);
+        fmpz_mod_pow_ui(t, R->gamma, arg.log, ctx);
+        FLINT_ASSERT(fmpz_equal(t, w));
+        fmpz_clear(t);
+    }
+#endif
+
+    return arg.log;
+}
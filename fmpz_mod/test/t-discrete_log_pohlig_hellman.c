@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2019 Daniel Schultz
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -10,6 +11,36 @@
 */
 
 #include "fmpz_mod.h"
+#include "thread_support.h"
+
+typedef struct
+{
+    const fmpz_mod_discrete_log_pohlig_hellman_struct * L;
+    const fmpz * x;
+    const fmpz * y;
+    int fail;
+}
+worker_arg_t;
+
+/* each task finds some of the logs with the shared L */
+static void
+worker(slong start, slong stop, void * varg)
+{
+    worker_arg_t * arg = (worker_arg_t *) varg;
+    fmpz_t xr;
+    slong k;
+
+    fmpz_init(xr);
+
+    for (k = start; k < stop; k++)
+    {
+        fmpz_mod_discrete_log_pohlig_hellman_run(xr, arg->L, arg->y + k);
+        if (!fmpz_equal(xr, arg->x + k))
+            arg->fail = 1;
+    }
+
+    fmpz_clear(xr);
+}
 
 int
 main(void)
@@ -149,6 +180,127 @@ main(void)
         fmpz_mod_discrete_log_pohlig_hellman_clear(L);
     }
 
+    /* check primes p = 2*q*r + 1 with a large prime q, solved by rho */
+    for (i = 0; i < 4 * flint_test_multiplier(); i++)
+    {
+        fmpz_t p, q, pm1;
+        fmpz_mod_ctx_t fpctx;
+        fmpz_mod_discrete_log_pohlig_hellman_t L;
+        flint_bitcnt_t qbits = 15 + n_randint(state, 18);
+        ulong r;
+
+        flint_set_num_threads(1 + n_randint(state, 4));
+
+        fmpz_init(p);
+        fmpz_init(q);
+        fmpz_init(pm1);
+
+        do {
+            fmpz_set_ui(q, n_randprime(state, qbits, 0));
+            r = 1 + n_randint(state, 1000);
+            fmpz_mul_ui(p, q, 2*r);
+            fmpz_add_ui(p, p, 1);
+        } while (!fmpz_is_probabprime(p));
+
+        fmpz_sub_ui(pm1, p, 1);
+        fmpz_mod_ctx_init(fpctx, p);
+        fmpz_mod_discrete_log_pohlig_hellman_init(L);
+        fmpz_mod_discrete_log_pohlig_hellman_precompute_prime(L, p);
+
+        /* the table of distinguished points is reused for each k */
+        for (k = 0; k < 10; k++)
+        {
+            fmpz_t x, y, xr;
+            const fmpz * alpha = fmpz_mod_discrete_log_pohlig_hellman_primitive_root(L);
+            fmpz_init(x);
+            fmpz_init(y);
+            fmpz_init(xr);
+
+            fmpz_randm(x, state, pm1);
+            fmpz_mod_pow_fmpz(y, alpha, x, fpctx);
+            fmpz_mod_discrete_log_pohlig_hellman_run(xr, L, y);
+            if (!fmpz_equal(x, xr))
+            {
+                printf("FAIL\ncheck large prime factor\n");
+                flint_printf("i = %wd, k = %wd\n", i, k);
+                flint_abort();
+            }
+
+            fmpz_clear(x);
+            fmpz_clear(y);
+            fmpz_clear(xr);
+        }
+
+        fmpz_mod_discrete_log_pohlig_hellman_clear(L);
+        fmpz_mod_ctx_clear(fpctx);
+        fmpz_clear(p);
+        fmpz_clear(q);
+        fmpz_clear(pm1);
+    }
+
+    /* several runs at the same time on one L */
+    for (i = 0; i < 4 * flint_test_multiplier(); i++)
+    {
+        fmpz_t p, q, pm1;
+        fmpz * x, * y;
+        fmpz_mod_ctx_t fpctx;
+        fmpz_mod_discrete_log_pohlig_hellman_t L;
+        worker_arg_t arg;
+        flint_bitcnt_t qbits = 15 + n_randint(state, 18);
+        slong num = 20;
+        ulong r;
+
+        flint_set_num_threads(2 + n_randint(state, 3));
+
+        fmpz_init(p);
+        fmpz_init(q);
+        fmpz_init(pm1);
+        x = _fmpz_vec_init(num);
+        y = _fmpz_vec_init(num);
+
+        do {
+            fmpz_set_ui(q, n_randprime(state, qbits, 0));
+            r = 1 + n_randint(state, 1000);
+            fmpz_mul_ui(p, q, 2*r);
+            fmpz_add_ui(p, p, 1);
+        } while (!fmpz_is_probabprime(p));
+
+        fmpz_sub_ui(pm1, p, 1);
+        fmpz_mod_ctx_init(fpctx, p);
+        fmpz_mod_discrete_log_pohlig_hellman_init(L);
+        fmpz_mod_discrete_log_pohlig_hellman_precompute_prime(L, p);
+
+        for (k = 0; k < num; k++)
+        {
+            fmpz_randm(x + k, state, pm1);
+            fmpz_mod_pow_fmpz(y + k,
+                fmpz_mod_discrete_log_pohlig_hellman_primitive_root(L),
+                                                            x + k, fpctx);
+        }
+
+        arg.L = L;
+        arg.x = x;
+        arg.y = y;
+        arg.fail = 0;
+
+        flint_parallel_for(0, num, 1, worker, &arg);
+
+        if (arg.fail)
+        {
+            printf("FAIL\ncheck concurrent runs\n");
+            flint_printf("i = %wd\n", i);
+            flint_abort();
+        }
+
+        _fmpz_vec_clear(x, num);
+        _fmpz_vec_clear(y, num);
+        fmpz_mod_discrete_log_pohlig_hellman_clear(L);
+        fmpz_mod_ctx_clear(fpctx);
+        fmpz_clear(p);
+        fmpz_clear(q);
+        fmpz_clear(pm1);
+    }
+
     FLINT_TEST_CLEANUP(state);
     
     flint_printf("PASS\n");
@@ -0,0 +1,87 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include "fmpz_mod.h"
+#include "thread_support.h"
+
+int
+main(void)
+{
+    slong i, k;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("discrete_log_rho....");
+    fflush(stdout);
+
+    for (i = 0; i < 10 * flint_test_multiplier(); i++)
+    {
+        fmpz_t p, e, gamma, w;
+        fmpz_mod_ctx_t ctx;
+        fmpz_mod_discrete_log_rho_t R;
+        ulong q, r, x, xr;
+
+        flint_set_num_threads(1 + n_randint(state, 4));
+
+        fmpz_init(p);
+        fmpz_init(e);
+        fmpz_init(gamma);
+        fmpz_init(w);
+
+        /* p = q*r + 1 for a prime q */
+        do {
+            q = n_randprime(state, 3 + n_randint(state, 26), 0);
+            r = 2 + 2*n_randint(state, 1000);
+            fmpz_set_ui(p, q);
+            fmpz_mul_ui(p, p, r);
+            fmpz_add_ui(p, p, 1);
+        } while (q == 2 || !fmpz_is_probabprime(p));
+
+        fmpz_mod_ctx_init(ctx, p);
+
+        /* gamma of order q */
+        fmpz_set_ui(e, r);
+        do {
+            fmpz_mod_rand_not_zero(gamma, state, ctx);
+            fmpz_mod_pow_fmpz(gamma, gamma, e, ctx);
+        } while (fmpz_is_one(gamma));
+
+        fmpz_mod_discrete_log_rho_init(R, gamma, q, ctx);
+
+        for (k = 0; k < 10; k++)
+        {
+            x = n_randint(state, q);
+            fmpz_mod_pow_ui(w, gamma, x, ctx);
+
+            xr = fmpz_mod_discrete_log_rho_run(R, w, ctx);
+
+            if (x != xr)
+            {
+                flint_printf("FAIL\n");
+                flint_printf("i = %wd, k = %wd\n", i, k);
+                flint_printf("q = %wu, x = %wu, xr = %wu\n", q, x, xr);
+                fflush(stdout);
+                flint_abort();
+            }
+        }
+
+        fmpz_mod_discrete_log_rho_clear(R);
+        fmpz_mod_ctx_clear(ctx);
+        fmpz_clear(p);
+        fmpz_clear(e);
+        fmpz_clear(gamma);
+        fmpz_clear(w);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
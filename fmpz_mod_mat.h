@@ -26,6 +26,7 @@
 #endif
 
 #define FMPZ_MOD_MAT_MUL_TRANSPOSE_CUTOFF 10
+#define FMPZ_MOD_MAT_RREF_MONT_CUTOFF 8
 
 typedef struct
 {
@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2019 Tommy Hofmann
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -9,9 +10,110 @@
     (at your option) any later version.  See <https://www.gnu.org/licenses/>.
 */
 
+#include "mpn_extras.h"
+#include "fmpz_mod_vec.h"
 #include "fmpz_mod_mat.h"
 
+/*
+   As for fmpz_mat_rref_mod, but with the rows packed. The entries are
+   ordinary values and the multipliers are in Montgomery form.
+*/
+static slong _fmpz_mod_mat_rref_mont(slong * perm, fmpz_mod_mat_t mat,
+                                                const fmpz_mod_mont_ctx_t M)
+{
+    fmpz_mat_struct * A = mat->mat;
+    slong m, n, j, rank, r, pivot_row, pivot_col, nlimbs = M->nlimbs;
+    mp_limb_t c[FMPZ_MOD_MONT_MAX_LIMBS];
+    mp_ptr P, * rows, u;
+    fmpz_t t, inv;
+
+    m = A->r;
+    n = A->c;
+    rank = pivot_row = pivot_col = 0;
+
+    fmpz_init(t);
+    fmpz_init(inv);
+
+    P = _fmpz_mod_mont_vec_init(m*n, M);
+    rows = (mp_ptr *) flint_malloc(m*sizeof(mp_ptr));
+
+    for (j = 0; j < m; j++)
+    {
+        rows[j] = P + j*n*nlimbs;
+        _fmpz_mod_mont_vec_pack(rows[j], A->rows[j], n, M);
+    }
+
+    while (pivot_row < m && pivot_col < n)
+    {
+        for (r = pivot_row; r < m; r++)
+            if (!flint_mpn_zero_p(rows[r] + pivot_col*nlimbs, nlimbs))
+                break;
+
+        if (r == m)
+        {
+            pivot_col++;
+            continue;
+        }
+        else if (r != pivot_row)
+        {
+            fmpz_mat_swap_rows(A, perm, pivot_row, r);
+
+            u = rows[r];
+            rows[r] = rows[pivot_row];
+            rows[pivot_row] = u;
+        }
+        rank++;
+
+        _fmpz_mod_mont_vec_unpack(t, rows[pivot_row] + pivot_col*nlimbs, 1, M);
+        fmpz_invmod(inv, t, mat->mod);
+        _fmpz_mod_mont_set_fmpz(c, inv, M);
+
+        /* pivot row */
+        u = rows[pivot_row] + pivot_col*nlimbs;
+        _fmpz_mod_mont_vec_scalar_mul(u + nlimbs, u + nlimbs,
+                                                    n - pivot_col - 1, c, M);
+        flint_mpn_zero(u, nlimbs);
+        u[0] = 1;
+
+        /* other rows */
+        for (j = 0; j < m; j++)
+        {
+            mp_ptr v = rows[j] + pivot_col*nlimbs;
+
+            if (j == pivot_row || flint_mpn_zero_p(v, nlimbs))
+                continue;
+
+            _fmpz_mod_mont_mul(c, v, M->r2, M);
+            _fmpz_mod_mont_vec_scalar_submul(v + nlimbs, u + nlimbs,
+                                                    n - pivot_col - 1, c, M);
+            flint_mpn_zero(v, nlimbs);
+        }
+
+        pivot_row++;
+        pivot_col++;
+    }
+
+    for (j = 0; j < m; j++)
+        _fmpz_mod_mont_vec_unpack(A->rows[j], rows[j], n, M);
+
+    _fmpz_mod_mont_vec_clear(P);
+    flint_free(rows);
+
+    fmpz_clear(inv);
+    fmpz_clear(t);
+
+    return rank;
+}
+
 slong fmpz_mod_mat_rref(slong * perm, fmpz_mod_mat_t mat)
 {
+    fmpz_mod_mont_ctx_t M;
+
+    if (FLINT_MIN(mat->mat->r, mat->mat->c) >= FMPZ_MOD_MAT_RREF_MONT_CUTOFF
+        && fmpz_mod_mont_ctx_init(M, mat->mod))
+    {
+        return _fmpz_mod_mat_rref_mont(perm, mat, M);
+    }
+
     return fmpz_mat_rref_mod(perm, mat->mat, mat->mod);
 }
@@ -169,6 +169,67 @@ main(void)
         flint_free(perm);
     }
 
+    /* Moduli of several limbs, compared with fmpz_mat_rref_mod */
+    for (i = 0; i < 300; i++)
+    {
+        fmpz_mat_t B;
+        slong * perm2, rank2;
+
+        m = n_randint(state, 20);
+        n = n_randint(state, 20);
+        perm = flint_malloc(FLINT_MAX(1, m) * sizeof(slong));
+        perm2 = flint_malloc(FLINT_MAX(1, m) * sizeof(slong));
+
+        fmpz_init(p);
+        fmpz_randprime(p, state, n_randint(state, 20 * FLINT_BITS) + 2, 0);
+
+        for (r = 0; r <= FLINT_MIN(m, n); r++)
+        {
+            d = n_randint(state, 2 * m * n + 1);
+
+            fmpz_mod_mat_init(A, m, n, p);
+            fmpz_mod_mat_randrank(A, state, r);
+
+            fmpz_mat_randops(A->mat, state, d);
+
+            _fmpz_mod_mat_reduce(A);
+
+            fmpz_mat_init_set(B, A->mat);
+
+            for (d = 0; d < m; d++)
+                perm[d] = perm2[d] = d;
+
+            rank = fmpz_mod_mat_rref(perm, A);
+            rank2 = fmpz_mat_rref_mod(perm2, B, p);
+
+            if (rank != rank2 || !fmpz_mat_equal(A->mat, B))
+            {
+                flint_printf("FAIL:\n");
+                flint_printf("rref differs from fmpz_mat_rref_mod\n");
+                abort();
+            }
+
+            for (d = 0; d < m; d++)
+            {
+                if (perm[d] != perm2[d])
+                {
+                    flint_printf("FAIL:\n");
+                    flint_printf("permutation differs\n");
+                    abort();
+                }
+            }
+
+            check_rref(A);
+
+            fmpz_mat_clear(B);
+            fmpz_mod_mat_clear(A);
+        }
+
+        fmpz_clear(p);
+        flint_free(perm);
+        flint_free(perm2);
+    }
+
     FLINT_TEST_CLEANUP(state);
     
     flint_printf("PASS\n");
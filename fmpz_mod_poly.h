@@ -42,6 +42,9 @@
 
 #define FMPZ_MOD_POLY_INV_NEWTON_CUTOFF  64 /* Inv series newton: Basecase -> Newton */
 
+#define FMPZ_MOD_POLY_DIVREM_MONT_CUTOFF  8 /* Divrem basecase: fmpz -> Montgomery */
+#define FMPZ_MOD_POLY_EVALUATE_MONT_CUTOFF  8 /* Evaluate: fmpz -> Montgomery */
+
 /*  Type definitions *********************************************************/
 
 typedef struct
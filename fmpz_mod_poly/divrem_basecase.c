@@ -1,6 +1,6 @@
 /*
     Copyright (C) 2011, 2010 Sebastian Pancratz
-    Copyright (C) 2008, 2009 William Hart
+    Copyright (C) 2008, 2009, 2021 William Hart
 
     This file is part of FLINT.
 
@@ -12,15 +12,75 @@
 
 #include <stdlib.h>
 #include "fmpz_vec.h"
+#include "fmpz_mod_vec.h"
 #include "fmpz_mod_poly.h"
 
+/*
+   Each coefficient of Q and R is computed as a dot product of the quotient
+   so far with the reversal of B, which is stored in Montgomery form, so that
+   the dot products of ordinary values with it are ordinary values.
+*/
+static void _fmpz_mod_poly_divrem_basecase_mont(fmpz * Q, fmpz * R,
+    const fmpz * A, slong lenA, const fmpz * B, slong lenB,
+    const fmpz_t invB, const fmpz_mod_mont_ctx_t M)
+{
+    slong i, j, lenQ = lenA - lenB + 1, nlimbs = M->nlimbs;
+    mp_ptr W, V, T;
+    mp_limb_t inv[FMPZ_MOD_MONT_MAX_LIMBS], d[FMPZ_MOD_MONT_MAX_LIMBS];
+
+    W = _fmpz_mod_mont_vec_init(lenA, M);
+    V = _fmpz_mod_mont_vec_init(lenB, M);
+    T = _fmpz_mod_mont_vec_init(lenQ, M);
+
+    _fmpz_mod_mont_vec_pack(W, A, lenA, M);
+
+    for (i = 0; i < lenB; i++)
+        _fmpz_mod_mont_vec_pack(V + i*nlimbs, B + lenB - 1 - i, 1, M);
+    _fmpz_mod_mont_vec_scalar_mul(V, V, lenB, M->r2, M);
+
+    _fmpz_mod_mont_set_fmpz(inv, invB, M);
+
+    for (i = lenQ - 1; i >= 0; i--)
+    {
+        j = FLINT_MIN(lenQ - 1 - i, lenB - 1);
+
+        _fmpz_mod_mont_vec_dot(d, T + (i + 1)*nlimbs, V + nlimbs, j, M);
+        _fmpz_mod_mont_vec_sub(d, W + (i + lenB - 1)*nlimbs, d, 1, M);
+        _fmpz_mod_mont_mul(T + i*nlimbs, d, inv, M);
+    }
+
+    for (j = 0; j < lenB - 1; j++)
+    {
+        i = FLINT_MIN(j, lenQ - 1);
+
+        _fmpz_mod_mont_vec_dot(d, T, V + (lenB - 1 - j)*nlimbs, i + 1, M);
+        _fmpz_mod_mont_vec_sub(W + j*nlimbs, W + j*nlimbs, d, 1, M);
+    }
+
+    _fmpz_mod_mont_vec_unpack(Q, T, lenQ, M);
+    _fmpz_mod_mont_vec_unpack(R, W, lenB - 1, M);
+
+    _fmpz_mod_mont_vec_clear(W);
+    _fmpz_mod_mont_vec_clear(V);
+    _fmpz_mod_mont_vec_clear(T);
+}
+
 void _fmpz_mod_poly_divrem_basecase(fmpz *Q, fmpz *R, 
     const fmpz *A, slong lenA, const fmpz *B, slong lenB, 
     const fmpz_t invB, const fmpz_t p)
 {
     slong iQ, iR;
     fmpz * W;
+    fmpz_mod_mont_ctx_t M;
     TMP_INIT;
+
+    /* the conversion of B only pays off if the quotient is long enough */
+    if (lenA - lenB + 1 >= FLINT_MAX(FMPZ_MOD_POLY_DIVREM_MONT_CUTOFF, lenB/2)
+        && fmpz_mod_mont_ctx_init(M, p))
+    {
+        _fmpz_mod_poly_divrem_basecase_mont(Q, R, A, lenA, B, lenB, invB, M);
+        return;
+    }
 	
 	TMP_START;
 	
@@ -11,8 +11,30 @@
 
 #include <gmp.h>
 #include "flint.h"
+#include "fmpz_mod_vec.h"
 #include "fmpz_mod_poly.h"
 
+/* Horner with the value in Montgomery form, so that products are ordinary */
+static void _fmpz_mod_poly_evaluate_fmpz_mont(fmpz_t res, const fmpz * poly,
+                  slong len, const fmpz_t a, const fmpz_mod_mont_ctx_t M)
+{
+    mp_limb_t r[FMPZ_MOD_MONT_MAX_LIMBS], c[FMPZ_MOD_MONT_MAX_LIMBS],
+              x[FMPZ_MOD_MONT_MAX_LIMBS];
+    slong i;
+
+    _fmpz_mod_mont_set_fmpz(x, a, M);
+    _fmpz_mod_mont_vec_pack(r, poly + len - 1, 1, M);
+
+    for (i = len - 2; i >= 0; i--)
+    {
+        _fmpz_mod_mont_mul(r, r, x, M);
+        _fmpz_mod_mont_vec_pack(c, poly + i, 1, M);
+        _fmpz_mod_mont_vec_add(r, r, c, 1, M);
+    }
+
+    _fmpz_mod_mont_vec_unpack(res, r, 1, M);
+}
+
 void _fmpz_mod_poly_evaluate_fmpz(fmpz_t res, const fmpz *poly, slong len, 
                                   const fmpz_t a, const fmpz_t p)
 {
@@ -28,6 +50,14 @@ void _fmpz_mod_poly_evaluate_fmpz(fmpz_t res, const fmpz *poly, slong len,
     {
         slong i = len - 1;
         fmpz_t t;
+        fmpz_mod_mont_ctx_t M;
+
+        if (len >= FMPZ_MOD_POLY_EVALUATE_MONT_CUTOFF
+            && fmpz_mod_mont_ctx_init(M, p))
+        {
+            _fmpz_mod_poly_evaluate_fmpz_mont(res, poly, len, a, M);
+            return;
+        }
 
         fmpz_init(t);
         fmpz_set(res, poly + i);
@@ -88,6 +88,63 @@ main(void)
         fmpz_clear(p);
     }
 
+    /* Check q*b + r = a for moduli of several limbs */
+    for (i = 0; i < 200 * flint_test_multiplier(); i++)
+    {
+        fmpz_t p;
+        fmpz_mod_poly_t a, b, q, r, t;
+
+        fmpz_init(p);
+        fmpz_randtest_unsigned(p, state, 20 * FLINT_BITS);
+        fmpz_add_ui(p, p, 2);
+        fmpz_mod_ctx_set_modulus(ctx, p);
+
+        fmpz_mod_poly_init(a, ctx);
+        fmpz_mod_poly_init(b, ctx);
+        fmpz_mod_poly_init(q, ctx);
+        fmpz_mod_poly_init(r, ctx);
+        fmpz_mod_poly_init(t, ctx);
+        fmpz_mod_poly_randtest(a, state, n_randint(state, 100), ctx);
+        fmpz_mod_poly_randtest_not_zero(b, state, n_randint(state, 50) + 1, ctx);
+
+        {
+            fmpz_t d;
+            fmpz *leadB = fmpz_mod_poly_lead(b, ctx);
+
+            fmpz_init(d);
+            fmpz_gcd(d, p, leadB);
+            while (!fmpz_is_one(d))
+            {
+                fmpz_divexact(leadB, leadB, d);
+                fmpz_gcd(d, p, leadB);
+            }
+            fmpz_clear(d);
+        }
+
+        fmpz_mod_poly_divrem_basecase(q, r, a, b, ctx);
+        fmpz_mod_poly_mul(t, q, b, ctx);
+        fmpz_mod_poly_add(t, t, r, ctx);
+
+        result = (fmpz_mod_poly_equal(a, t, ctx) && r->length < b->length);
+        if (!result)
+        {
+            flint_printf("FAIL (multi-limb):\n");
+            flint_printf("p = "), fmpz_print(p), flint_printf("\n\n");
+            flint_printf("a = "), fmpz_mod_poly_print(a, ctx), flint_printf("\n\n");
+            flint_printf("b = "), fmpz_mod_poly_print(b, ctx), flint_printf("\n\n");
+            flint_printf("q = "), fmpz_mod_poly_print(q, ctx), flint_printf("\n\n");
+            flint_printf("r = "), fmpz_mod_poly_print(r, ctx), flint_printf("\n\n");
+            flint_abort();
+        }
+
+        fmpz_mod_poly_clear(a, ctx);
+        fmpz_mod_poly_clear(b, ctx);
+        fmpz_mod_poly_clear(q, ctx);
+        fmpz_mod_poly_clear(r, ctx);
+        fmpz_mod_poly_clear(t, ctx);
+        fmpz_clear(p);
+    }
+
     /* Alias a and q, b and r */
     for (i = 0; i < 50 * flint_test_multiplier(); i++)
     {
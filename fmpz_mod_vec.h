@@ -50,6 +50,111 @@ FLINT_DLL void _fmpz_mod_vec_dot(fmpz_t d, const fmpz * A, const fmpz * B,
 FLINT_DLL void _fmpz_mod_vec_dot_rev(fmpz_t r, const fmpz * a,
 		          const fmpz * b, slong len, const fmpz_mod_ctx_t ctx);
 
+/* batch inversion and exponentiation */
+
+#define FMPZ_MOD_VEC_THREAD_LEN 256   /* minimum entries per thread */
+
+FLINT_DLL int _fmpz_mod_vec_inv(fmpz * A, const fmpz * B, slong len,
+                                                     const fmpz_mod_ctx_t ctx);
+
+FLINT_DLL int _fmpz_mod_vec_pow_fmpz(fmpz * A, const fmpz * B, slong len,
+                                    const fmpz_t e, const fmpz_mod_ctx_t ctx);
+
+FLINT_DLL void _fmpz_mod_vec_fmpz_pow_fmpz_vec(fmpz * A, const fmpz_t b,
+                        const fmpz * E, slong len, const fmpz_mod_ctx_t ctx);
+
+/* packed vectors in Montgomery form ****************************************/
+
+/*
+    Residues modulo an odd n of FMPZ_MOD_MONT_MIN_LIMBS to
+    FMPZ_MOD_MONT_MAX_LIMBS limbs can be stored packed, each in exactly
+    nlimbs limbs, so that vectors of them need no allocation per entry.
+    Products are Montgomery products a*b/R mod n with R = 2^(FLINT_BITS*nlimbs),
+    so that x is usually stored as x*R mod n.
+*/
+
+#define FMPZ_MOD_MONT_MIN_LIMBS 2
+#define FMPZ_MOD_MONT_MAX_LIMBS 16
+
+typedef struct
+{
+    slong nlimbs;
+    mp_limb_t ninv;                         /* -1/n mod 2^FLINT_BITS */
+    mp_limb_t n[FMPZ_MOD_MONT_MAX_LIMBS];
+    mp_limb_t r2[FMPZ_MOD_MONT_MAX_LIMBS];  /* R^2 mod n */
+    mp_limb_t r3[FMPZ_MOD_MONT_MAX_LIMBS];  /* R^3 mod n */
+} fmpz_mod_mont_ctx_struct;
+
+typedef fmpz_mod_mont_ctx_struct fmpz_mod_mont_ctx_t[1];
+
+FLINT_DLL int fmpz_mod_mont_ctx_init(fmpz_mod_mont_ctx_t M, const fmpz_t n);
+
+FMPZ_MOD_VEC_INLINE
+mp_ptr _fmpz_mod_mont_vec_init(slong len, const fmpz_mod_mont_ctx_t M)
+{
+    return (mp_ptr) flint_calloc(len*M->nlimbs, sizeof(mp_limb_t));
+}
+
+FMPZ_MOD_VEC_INLINE
+void _fmpz_mod_mont_vec_clear(mp_ptr A)
+{
+    flint_free(A);
+}
+
+FLINT_DLL void _fmpz_mod_mont_redc(mp_ptr r, mp_ptr t,
+                                            const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_mul(mp_ptr r, mp_srcptr a, mp_srcptr b,
+                                            const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL int _fmpz_mod_mont_inv(mp_ptr r, mp_srcptr a,
+                                            const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_set_fmpz(mp_ptr a, const fmpz_t b,
+                                            const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_get_fmpz(fmpz_t a, mp_srcptr b,
+                                            const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_vec_set_fmpz_vec(mp_ptr A, const fmpz * B,
+                                 slong len, const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_vec_get_fmpz_vec(fmpz * A, mp_srcptr B,
+                                 slong len, const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_vec_pack(mp_ptr A, const fmpz * B, slong len,
+                                            const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_vec_unpack(fmpz * A, mp_srcptr B, slong len,
+                                            const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_vec_add(mp_ptr A, mp_srcptr B, mp_srcptr C,
+                                 slong len, const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_vec_sub(mp_ptr A, mp_srcptr B, mp_srcptr C,
+                                 slong len, const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_vec_neg(mp_ptr A, mp_srcptr B,
+                                 slong len, const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_vec_mul(mp_ptr A, mp_srcptr B, mp_srcptr C,
+                                 slong len, const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_vec_scalar_mul(mp_ptr A, mp_srcptr B,
+                     slong len, mp_srcptr c, const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_vec_scalar_addmul(mp_ptr A, mp_srcptr B,
+                     slong len, mp_srcptr c, const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_vec_scalar_submul(mp_ptr A, mp_srcptr B,
+                     slong len, mp_srcptr c, const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL void _fmpz_mod_mont_vec_dot(mp_ptr d, mp_srcptr A, mp_srcptr B,
+                                 slong len, const fmpz_mod_mont_ctx_t M);
+
+FLINT_DLL int _fmpz_mod_mont_vec_inv(mp_ptr A, mp_srcptr B,
+                                 slong len, const fmpz_mod_mont_ctx_t M);
+
 #ifdef __cplusplus
 }
 #endif
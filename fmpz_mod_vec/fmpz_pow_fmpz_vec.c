@@ -0,0 +1,291 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz_vec.h"
+#include "fmpz_mod_vec.h"
+#include "thread_support.h"
+
+#define FMPZ_MOD_VEC_BASE_POW_MAX_WINDOW 12
+
+/* bits pos to pos + w - 1 of e >= 0 */
+static ulong _fmpz_get_window(const fmpz_t e, flint_bitcnt_t pos, int w)
+{
+    ulong v;
+
+    if (!COEFF_IS_MPZ(*e))
+    {
+        v = (pos < FLINT_BITS) ? ((ulong) *e) >> pos : 0;
+    }
+    else
+    {
+        __mpz_struct * z = COEFF_TO_PTR(*e);
+        slong i = pos/FLINT_BITS, sh = pos % FLINT_BITS;
+
+        if (i >= z->_mp_size)
+            return 0;
+
+        v = z->_mp_d[i] >> sh;
+        if (sh + w > FLINT_BITS && i + 1 < z->_mp_size)
+            v |= z->_mp_d[i + 1] << (FLINT_BITS - sh);
+    }
+
+    return v & ((UWORD(1) << w) - 1);
+}
+
+/*
+   The table holds b^(d*2^(w*j)) for 0 < d < 2^w and a chunk of consecutive
+   windows j, so that the part of b^e for these windows is a product of one
+   table entry per nonzero window of e and no squarings are needed. The
+   chunks are processed in turn, reusing the table, and the partial powers
+   are kept in R between chunks.
+*/
+typedef struct
+{
+    fmpz * A;
+    const fmpz * E;
+    const fmpz * T;
+    fmpz * R;
+    mp_srcptr P;
+    mp_ptr RP;
+    slong j0;
+    slong nw;
+    int last;
+    int w;
+    const fmpz_mod_ctx_struct * ctx;
+    const fmpz_mod_mont_ctx_struct * M;
+}
+_fmpz_mod_vec_base_pow_arg_t;
+
+static void _fmpz_mod_vec_base_pow_worker(slong start, slong stop, void * varg)
+{
+    _fmpz_mod_vec_base_pow_arg_t * arg = (_fmpz_mod_vec_base_pow_arg_t *) varg;
+    const fmpz_mod_mont_ctx_struct * M = arg->M;
+    mp_limb_t r[FMPZ_MOD_MONT_MAX_LIMBS];
+    slong i, j, size = (WORD(1) << arg->w) - 1;
+    ulong d;
+    int first;
+    fmpz_t t;
+
+    /* A[i] is only written once E[i] has been read, so that A may alias E */
+    fmpz_init(t);
+
+    for (i = start; i < stop; i++)
+    {
+        first = (arg->j0 == 0);
+
+        if (!first)
+        {
+            if (M != NULL)
+                flint_mpn_copyi(r, arg->RP + i*M->nlimbs, M->nlimbs);
+            else
+                fmpz_swap(t, arg->R + i);
+        }
+
+        for (j = 0; j < arg->nw; j++)
+        {
+            d = _fmpz_get_window(arg->E + i, (arg->j0 + j)*arg->w, arg->w);
+
+            if (d == 0)
+                continue;
+
+            if (M != NULL)
+            {
+                mp_srcptr u = arg->P + (j*size + d - 1)*M->nlimbs;
+
+                if (first)
+                    flint_mpn_copyi(r, u, M->nlimbs);
+                else
+                    _fmpz_mod_mont_mul(r, r, u, M);
+            }
+            else
+            {
+                if (first)
+                    fmpz_set(t, arg->T + j*size + d - 1);
+                else
+                    fmpz_mod_mul(t, t, arg->T + j*size + d - 1, arg->ctx);
+            }
+
+            first = 0;
+        }
+
+        if (first && arg->last)
+        {
+            fmpz_mod_set_ui(arg->A + i, 1, arg->ctx);
+            continue;
+        }
+
+        if (first)
+            fmpz_mod_set_ui(t, 1, arg->ctx);
+
+        if (M != NULL)
+        {
+            if (first)
+                _fmpz_mod_mont_set_fmpz(r, t, M);
+
+            if (arg->last)
+                _fmpz_mod_mont_get_fmpz(arg->A + i, r, M);
+            else
+                flint_mpn_copyi(arg->RP + i*M->nlimbs, r, M->nlimbs);
+        }
+        else
+        {
+            fmpz_swap(arg->last ? arg->A + i : arg->R + i, t);
+        }
+    }
+
+    fmpz_clear(t);
+}
+
+void _fmpz_mod_vec_fmpz_pow_fmpz_vec(fmpz * A, const fmpz_t b,
+                          const fmpz * E, slong len, const fmpz_mod_ctx_t ctx)
+{
+    _fmpz_mod_vec_base_pow_arg_t arg;
+    fmpz_mod_mont_ctx_t M;
+    flint_bitcnt_t bits = 0;
+    slong i, j, size, num, nw, j0, cap;
+    int w, best_w;
+    double cost, best;
+
+    if (len <= 0)
+        return;
+
+    for (i = 0; i < len; i++)
+    {
+        FLINT_ASSERT(fmpz_sgn(E + i) >= 0);
+        bits = FLINT_MAX(bits, fmpz_bits(E + i));
+    }
+
+    if (bits == 0)
+    {
+        for (i = 0; i < len; i++)
+            fmpz_mod_set_ui(A + i, 1, ctx);
+        return;
+    }
+
+    /* the table costs 2^w - 1 products per window and each power at most
+       one per window; the table holds at most cap entries, so the windows
+       are split into chunks if there are too many of them */
+    cap = FLINT_MAX(len, 256);
+
+    best_w = 1;
+    best = -1;
+    for (w = 1; w <= FMPZ_MOD_VEC_BASE_POW_MAX_WINDOW; w++)
+    {
+        num = (bits + w - 1)/w;
+        cost = (double) num*((WORD(1) << w) - 1 + len);
+
+        if ((WORD(1) << w) - 1 > cap)
+            break;
+
+        if (best < 0 || cost < best)
+        {
+            best = cost;
+            best_w = w;
+        }
+    }
+
+    w = best_w;
+    size = (WORD(1) << w) - 1;
+    num = (bits + w - 1)/w;
+    nw = FLINT_MIN(num, cap/size);
+
+    arg.A = A;
+    arg.E = E;
+    arg.T = NULL;
+    arg.R = NULL;
+    arg.P = NULL;
+    arg.RP = NULL;
+    arg.w = w;
+    arg.ctx = ctx;
+    arg.M = NULL;
+
+    if (fmpz_mod_mont_ctx_init(M, fmpz_mod_ctx_modulus(ctx)))
+    {
+        mp_ptr P = _fmpz_mod_mont_vec_init(nw*size, M);
+        slong nlimbs = M->nlimbs;
+
+        arg.M = M;
+        arg.P = P;
+        if (nw < num)
+            arg.RP = _fmpz_mod_mont_vec_init(len, M);
+
+        _fmpz_mod_mont_set_fmpz(P, b, M);
+
+        for (j0 = 0; j0 < num; j0 += nw)
+        {
+            arg.j0 = j0;
+            arg.nw = FLINT_MIN(nw, num - j0);
+            arg.last = (j0 + arg.nw == num);
+
+            for (j = 0; j < arg.nw; j++)
+            {
+                mp_ptr t = P + j*size*nlimbs;
+
+                /* b^(2^(w*j)) from the previous window, which for the first
+                   window of a chunk is the last one of the previous chunk */
+                if (j > 0)
+                    _fmpz_mod_mont_mul(t, t - nlimbs, t - size*nlimbs, M);
+                else if (j0 > 0)
+                    _fmpz_mod_mont_mul(t, P + (nw*size - 1)*nlimbs,
+                                          P + (nw - 1)*size*nlimbs, M);
+
+                for (i = 1; i < size; i++)
+                    _fmpz_mod_mont_mul(t + i*nlimbs, t + (i - 1)*nlimbs, t, M);
+            }
+
+            flint_parallel_for(0, len, FMPZ_MOD_VEC_THREAD_LEN/4,
+                                          _fmpz_mod_vec_base_pow_worker, &arg);
+        }
+
+        _fmpz_mod_mont_vec_clear(P);
+        if (arg.RP != NULL)
+            _fmpz_mod_mont_vec_clear(arg.RP);
+    }
+    else
+    {
+        fmpz * T = _fmpz_vec_init(nw*size);
+
+        arg.T = T;
+        if (nw < num)
+            arg.R = _fmpz_vec_init(len);
+
+        fmpz_mod_set_fmpz(T, b, ctx);
+
+        for (j0 = 0; j0 < num; j0 += nw)
+        {
+            arg.j0 = j0;
+            arg.nw = FLINT_MIN(nw, num - j0);
+            arg.last = (j0 + arg.nw == num);
+
+            for (j = 0; j < arg.nw; j++)
+            {
+                fmpz * t = T + j*size;
+
+                if (j > 0)
+                    fmpz_mod_mul(t, t - 1, t - size, ctx);
+                else if (j0 > 0)
+                    fmpz_mod_mul(t, T + nw*size - 1, T + (nw - 1)*size, ctx);
+
+                for (i = 1; i < size; i++)
+                    fmpz_mod_mul(t + i, t + i - 1, t, ctx);
+            }
+
+            flint_parallel_for(0, len, FMPZ_MOD_VEC_THREAD_LEN/4,
+                                          _fmpz_mod_vec_base_pow_worker, &arg);
+        }
+
+        _fmpz_vec_clear(T, nw*size);
+        if (arg.R != NULL)
+            _fmpz_vec_clear(arg.R, len);
+    }
+}
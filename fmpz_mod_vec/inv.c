@@ -0,0 +1,127 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include "fmpz_vec.h"
+#include "fmpz_mod_vec.h"
+#include "thread_support.h"
+
+/* Montgomery's trick: one inversion and 3(len - 1) multiplications */
+static int _fmpz_mod_vec_inv_chunk(fmpz * A, const fmpz * B, slong len,
+                    const fmpz_mod_ctx_t ctx, const fmpz_mod_mont_ctx_struct * M)
+{
+    slong i;
+    fmpz * T;
+    fmpz_t inv;
+    int ok;
+
+    if (M != NULL)
+    {
+        mp_ptr P = _fmpz_mod_mont_vec_init(len, M);
+
+        _fmpz_mod_mont_vec_set_fmpz_vec(P, B, len, M);
+        ok = _fmpz_mod_mont_vec_inv(P, P, len, M);
+        if (ok)
+            _fmpz_mod_mont_vec_get_fmpz_vec(A, P, len, M);
+
+        _fmpz_mod_mont_vec_clear(P);
+
+        return ok;
+    }
+
+    /* prefix products T[i] = B[0]*...*B[i] */
+    T = _fmpz_vec_init(len);
+    fmpz_init(inv);
+
+    fmpz_set(T + 0, B + 0);
+    for (i = 1; i < len; i++)
+        fmpz_mod_mul(T + i, T + i - 1, B + i, ctx);
+
+    ok = fmpz_invmod(inv, T + len - 1, fmpz_mod_ctx_modulus(ctx));
+
+    if (ok)
+    {
+        /* inv = 1/(B[0]*...*B[i]) at step i, B[i] is read before A[i]
+           is written */
+        for (i = len - 1; i > 0; i--)
+        {
+            fmpz_mod_mul(T + i, T + i - 1, inv, ctx);
+            fmpz_mod_mul(inv, inv, B + i, ctx);
+            fmpz_swap(A + i, T + i);
+        }
+
+        fmpz_swap(A + 0, inv);
+    }
+
+    _fmpz_vec_clear(T, len);
+    fmpz_clear(inv);
+
+    return ok;
+}
+
+typedef struct
+{
+    fmpz * A;
+    const fmpz * B;
+    slong len;
+    slong num;
+    int * ok;
+    const fmpz_mod_ctx_struct * ctx;
+    const fmpz_mod_mont_ctx_struct * M;
+}
+_fmpz_mod_vec_inv_arg_t;
+
+static void _fmpz_mod_vec_inv_worker(slong c0, slong c1, void * varg)
+{
+    _fmpz_mod_vec_inv_arg_t * arg = (_fmpz_mod_vec_inv_arg_t *) varg;
+    slong c, start, stop;
+
+    for (c = c0; c < c1; c++)
+    {
+        start = (c*arg->len)/arg->num;
+        stop = ((c + 1)*arg->len)/arg->num;
+
+        arg->ok[c] = _fmpz_mod_vec_inv_chunk(arg->A + start, arg->B + start,
+                                         stop - start, arg->ctx, arg->M);
+    }
+}
+
+int _fmpz_mod_vec_inv(fmpz * A, const fmpz * B, slong len,
+                                                      const fmpz_mod_ctx_t ctx)
+{
+    _fmpz_mod_vec_inv_arg_t arg;
+    fmpz_mod_mont_ctx_t M;
+    slong c;
+    int ok = 1;
+
+    if (len <= 0)
+        return 1;
+
+    /* one inversion per thread */
+    arg.num = FLINT_MIN(flint_task_num_threads(),
+                                               len/FMPZ_MOD_VEC_THREAD_LEN);
+    arg.num = FLINT_MAX(arg.num, 1);
+
+    arg.A = A;
+    arg.B = B;
+    arg.len = len;
+    arg.ok = (int *) flint_malloc(arg.num*sizeof(int));
+    arg.ctx = ctx;
+    arg.M = fmpz_mod_mont_ctx_init(M, fmpz_mod_ctx_modulus(ctx)) ? M : NULL;
+
+    flint_parallel_for(0, arg.num, 1, _fmpz_mod_vec_inv_worker, &arg);
+
+    for (c = 0; c < arg.num; c++)
+        ok &= arg.ok[c];
+
+    flint_free(arg.ok);
+
+    return ok;
+}
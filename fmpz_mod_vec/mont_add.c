@@ -0,0 +1,54 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "mpn_extras.h"
+#include "fmpz_mod_vec.h"
+
+void _fmpz_mod_mont_vec_add(mp_ptr A, mp_srcptr B, mp_srcptr C,
+                                   slong len, const fmpz_mod_mont_ctx_t M)
+{
+    slong i, nlimbs = M->nlimbs;
+
+    for (i = 0; i < len*nlimbs; i += nlimbs)
+    {
+        if (mpn_add_n(A + i, B + i, C + i, nlimbs)
+            || mpn_cmp(A + i, M->n, nlimbs) >= 0)
+            mpn_sub_n(A + i, A + i, M->n, nlimbs);
+    }
+}
+
+void _fmpz_mod_mont_vec_sub(mp_ptr A, mp_srcptr B, mp_srcptr C,
+                                   slong len, const fmpz_mod_mont_ctx_t M)
+{
+    slong i, nlimbs = M->nlimbs;
+
+    for (i = 0; i < len*nlimbs; i += nlimbs)
+    {
+        if (mpn_sub_n(A + i, B + i, C + i, nlimbs))
+            mpn_add_n(A + i, A + i, M->n, nlimbs);
+    }
+}
+
+void _fmpz_mod_mont_vec_neg(mp_ptr A, mp_srcptr B,
+                                   slong len, const fmpz_mod_mont_ctx_t M)
+{
+    slong i, nlimbs = M->nlimbs;
+
+    for (i = 0; i < len*nlimbs; i += nlimbs)
+    {
+        if (flint_mpn_zero_p(B + i, nlimbs))
+            flint_mpn_zero(A + i, nlimbs);
+        else
+            mpn_sub_n(A + i, M->n, B + i, nlimbs);
+    }
+}
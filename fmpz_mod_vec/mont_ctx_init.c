@@ -0,0 +1,49 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz_mod_vec.h"
+
+int fmpz_mod_mont_ctx_init(fmpz_mod_mont_ctx_t M, const fmpz_t n)
+{
+    __mpz_struct * z;
+    mp_limb_t inv, t[2*FMPZ_MOD_MONT_MAX_LIMBS + 1], q[FMPZ_MOD_MONT_MAX_LIMBS + 2];
+    slong i, nlimbs;
+
+    if (!COEFF_IS_MPZ(*n) || fmpz_sgn(n) < 0 || fmpz_is_even(n))
+        return 0;
+
+    z = COEFF_TO_PTR(*n);
+    nlimbs = z->_mp_size;
+
+    if (nlimbs < FMPZ_MOD_MONT_MIN_LIMBS || nlimbs > FMPZ_MOD_MONT_MAX_LIMBS)
+        return 0;
+
+    M->nlimbs = nlimbs;
+    flint_mpn_copyi(M->n, z->_mp_d, nlimbs);
+
+    /* Newton iteration for 1/n mod 2^FLINT_BITS, correct to 3 bits at first */
+    inv = M->n[0];
+    for (i = 0; i < 5; i++)
+        inv *= 2 - M->n[0]*inv;
+    M->ninv = -inv;
+
+    /* R^2 = 2^(2*FLINT_BITS*nlimbs) mod n */
+    flint_mpn_zero(t, 2*nlimbs);
+    t[2*nlimbs] = 1;
+    mpn_tdiv_qr(q, M->r2, 0, t, 2*nlimbs + 1, M->n, nlimbs);
+
+    /* R^3 = R^2 * R^2 / R mod n */
+    _fmpz_mod_mont_mul(M->r3, M->r2, M->r2, M);
+
+    return 1;
+}
@@ -0,0 +1,45 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz_mod_vec.h"
+
+/*
+   The unreduced products are summed in 2*nlimbs + 1 limbs and the sum is
+   reduced only once at the end, which is valid for len < 2^FLINT_BITS.
+*/
+void _fmpz_mod_mont_vec_dot(mp_ptr d, mp_srcptr A, mp_srcptr B,
+                                   slong len, const fmpz_mod_mont_ctx_t M)
+{
+    slong i, nlimbs = M->nlimbs;
+    mp_limb_t s[2*FMPZ_MOD_MONT_MAX_LIMBS + 1];
+    mp_limb_t t[2*FMPZ_MOD_MONT_MAX_LIMBS];
+    mp_limb_t q[FMPZ_MOD_MONT_MAX_LIMBS + 2];
+
+    flint_mpn_zero(s, 2*nlimbs + 1);
+
+    for (i = 0; i < len*nlimbs; i += nlimbs)
+    {
+        mpn_mul_n(t, A + i, B + i, nlimbs);
+        s[2*nlimbs] += mpn_add_n(s, s, t, 2*nlimbs);
+    }
+
+    /* the sum must be less than nR for the reduction */
+    if (s[2*nlimbs] != 0 || mpn_cmp(s + nlimbs, M->n, nlimbs) >= 0)
+    {
+        mpn_tdiv_qr(q, t, 0, s, 2*nlimbs + 1, M->n, nlimbs);
+        flint_mpn_copyi(s, t, nlimbs);
+        flint_mpn_zero(s + nlimbs, nlimbs);
+    }
+
+    _fmpz_mod_mont_redc(d, s, M);
+}
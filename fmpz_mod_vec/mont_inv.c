@@ -0,0 +1,78 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz_mod_vec.h"
+
+int _fmpz_mod_mont_inv(mp_ptr r, mp_srcptr a, const fmpz_mod_mont_ctx_t M)
+{
+    fmpz_t x, n;
+    int ok;
+
+    fmpz_init(x);
+    fmpz_init(n);
+
+    fmpz_set_ui_array(x, a, M->nlimbs);
+    fmpz_set_ui_array(n, M->n, M->nlimbs);
+
+    /* 1/(xR) = 1/(x R) mod n, then R^3 takes it to R/x */
+    ok = fmpz_invmod(x, x, n);
+
+    if (ok)
+    {
+        _fmpz_mod_mont_vec_pack(r, x, 1, M);
+        _fmpz_mod_mont_mul(r, r, M->r3, M);
+    }
+
+    fmpz_clear(x);
+    fmpz_clear(n);
+
+    return ok;
+}
+
+int _fmpz_mod_mont_vec_inv(mp_ptr A, mp_srcptr B, slong len,
+                                                const fmpz_mod_mont_ctx_t M)
+{
+    slong i, nlimbs = M->nlimbs;
+    mp_limb_t inv[FMPZ_MOD_MONT_MAX_LIMBS];
+    mp_ptr P;
+
+    if (len == 0)
+        return 1;
+
+    /* prefix products P[i] = B[0]*...*B[i] */
+    P = (mp_ptr) flint_malloc(len*nlimbs*sizeof(mp_limb_t));
+
+    flint_mpn_copyi(P, B, nlimbs);
+    for (i = 1; i < len; i++)
+        _fmpz_mod_mont_mul(P + i*nlimbs, P + (i - 1)*nlimbs, B + i*nlimbs, M);
+
+    if (!_fmpz_mod_mont_inv(inv, P + (len - 1)*nlimbs, M))
+    {
+        flint_free(P);
+        return 0;
+    }
+
+    /* inv = 1/(B[0]*...*B[i]) at step i */
+    for (i = len - 1; i > 0; i--)
+    {
+        _fmpz_mod_mont_mul(P + i*nlimbs, inv, P + (i - 1)*nlimbs, M);
+        _fmpz_mod_mont_mul(inv, inv, B + i*nlimbs, M);
+        flint_mpn_copyi(A + i*nlimbs, P + i*nlimbs, nlimbs);
+    }
+
+    flint_mpn_copyi(A, inv, nlimbs);
+
+    flint_free(P);
+
+    return 1;
+}
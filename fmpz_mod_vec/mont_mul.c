@@ -0,0 +1,46 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz_mod_vec.h"
+
+/*
+   Set r to t/R mod n, where t < nR has 2*nlimbs limbs. The low half of t
+   is destroyed.
+*/
+void _fmpz_mod_mont_redc(mp_ptr r, mp_ptr t, const fmpz_mod_mont_ctx_t M)
+{
+    slong i, nlimbs = M->nlimbs;
+    mp_limb_t cy;
+
+    /* clear a limb of t at a time, keeping the carry in the cleared limb */
+    for (i = 0; i < nlimbs; i++)
+        t[i] = mpn_addmul_1(t + i, M->n, nlimbs, t[i]*M->ninv);
+
+    cy = mpn_add_n(r, t + nlimbs, t, nlimbs);
+
+    if (cy || mpn_cmp(r, M->n, nlimbs) >= 0)
+        mpn_sub_n(r, r, M->n, nlimbs);
+}
+
+void _fmpz_mod_mont_mul(mp_ptr r, mp_srcptr a, mp_srcptr b,
+                                                const fmpz_mod_mont_ctx_t M)
+{
+    mp_limb_t t[2*FMPZ_MOD_MONT_MAX_LIMBS];
+
+    if (a == b)
+        mpn_sqr(t, a, M->nlimbs);
+    else
+        mpn_mul_n(t, a, b, M->nlimbs);
+
+    _fmpz_mod_mont_redc(r, t, M);
+}
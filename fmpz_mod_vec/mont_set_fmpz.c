@@ -0,0 +1,110 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "mpn_extras.h"
+#include "fmpz_mod_vec.h"
+
+/* set a to the limbs of b mod n */
+static void _fmpz_mod_mont_pack(mp_ptr a, const fmpz_t b,
+                                                const fmpz_mod_mont_ctx_t M)
+{
+    slong len, nlimbs = M->nlimbs;
+
+    if (!COEFF_IS_MPZ(*b))
+    {
+        /* |b| < n as n has at least two limbs */
+        a[0] = FLINT_ABS(*b);
+        len = (*b != 0);
+    }
+    else
+    {
+        __mpz_struct * z = COEFF_TO_PTR(*b);
+
+        len = FLINT_ABS(z->_mp_size);
+
+        if (len < nlimbs || (len == nlimbs
+                             && mpn_cmp(z->_mp_d, M->n, nlimbs) < 0))
+        {
+            flint_mpn_copyi(a, z->_mp_d, len);
+        }
+        else
+        {
+            mp_ptr q = (mp_ptr) flint_malloc((len - nlimbs + 1)
+                                                         *sizeof(mp_limb_t));
+            mpn_tdiv_qr(q, a, 0, z->_mp_d, len, M->n, nlimbs);
+            flint_free(q);
+            len = nlimbs;
+        }
+    }
+
+    if (len < nlimbs)
+        flint_mpn_zero(a + len, nlimbs - len);
+
+    if (fmpz_sgn(b) < 0 && !flint_mpn_zero_p(a, nlimbs))
+        mpn_sub_n(a, M->n, a, nlimbs);
+}
+
+void _fmpz_mod_mont_vec_pack(mp_ptr A, const fmpz * B, slong len,
+                                                const fmpz_mod_mont_ctx_t M)
+{
+    slong i;
+
+    for (i = 0; i < len; i++)
+        _fmpz_mod_mont_pack(A + i*M->nlimbs, B + i, M);
+}
+
+void _fmpz_mod_mont_vec_unpack(fmpz * A, mp_srcptr B, slong len,
+                                                const fmpz_mod_mont_ctx_t M)
+{
+    slong i;
+
+    for (i = 0; i < len; i++)
+        fmpz_set_ui_array(A + i, B + i*M->nlimbs, M->nlimbs);
+}
+
+void _fmpz_mod_mont_set_fmpz(mp_ptr a, const fmpz_t b,
+                                                const fmpz_mod_mont_ctx_t M)
+{
+    _fmpz_mod_mont_pack(a, b, M);
+    _fmpz_mod_mont_mul(a, a, M->r2, M);
+}
+
+void _fmpz_mod_mont_get_fmpz(fmpz_t a, mp_srcptr b,
+                                                const fmpz_mod_mont_ctx_t M)
+{
+    mp_limb_t t[2*FMPZ_MOD_MONT_MAX_LIMBS];
+
+    flint_mpn_copyi(t, b, M->nlimbs);
+    flint_mpn_zero(t + M->nlimbs, M->nlimbs);
+    _fmpz_mod_mont_redc(t, t, M);
+
+    fmpz_set_ui_array(a, t, M->nlimbs);
+}
+
+void _fmpz_mod_mont_vec_set_fmpz_vec(mp_ptr A, const fmpz * B, slong len,
+                                                const fmpz_mod_mont_ctx_t M)
+{
+    slong i;
+
+    for (i = 0; i < len; i++)
+        _fmpz_mod_mont_set_fmpz(A + i*M->nlimbs, B + i, M);
+}
+
+void _fmpz_mod_mont_vec_get_fmpz_vec(fmpz * A, mp_srcptr B, slong len,
+                                                const fmpz_mod_mont_ctx_t M)
+{
+    slong i;
+
+    for (i = 0; i < len; i++)
+        _fmpz_mod_mont_get_fmpz(A + i, B + i*M->nlimbs, M);
+}
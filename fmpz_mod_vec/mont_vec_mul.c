@@ -0,0 +1,23 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz_mod_vec.h"
+
+void _fmpz_mod_mont_vec_mul(mp_ptr A, mp_srcptr B, mp_srcptr C,
+                                   slong len, const fmpz_mod_mont_ctx_t M)
+{
+    slong i, nlimbs = M->nlimbs;
+
+    for (i = 0; i < len*nlimbs; i += nlimbs)
+        _fmpz_mod_mont_mul(A + i, B + i, C + i, M);
+}
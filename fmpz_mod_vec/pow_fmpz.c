@@ -0,0 +1,73 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include "fmpz_mod_vec.h"
+#include "thread_support.h"
+
+typedef struct
+{
+    fmpz * A;
+    const fmpz * B;
+    const fmpz * e;
+    const fmpz * n;
+}
+_fmpz_mod_vec_pow_arg_t;
+
+static void _fmpz_mod_vec_pow_worker(slong start, slong stop, void * varg)
+{
+    _fmpz_mod_vec_pow_arg_t * arg = (_fmpz_mod_vec_pow_arg_t *) varg;
+    slong i;
+
+    for (i = start; i < stop; i++)
+        fmpz_powm(arg->A + i, arg->B + i, arg->e, arg->n);
+}
+
+/*
+   The powers are computed independently by fmpz_powm, which already uses
+   a sliding window and Montgomery multiplication, but in parallel, and
+   a negative exponent costs a single inversion.
+*/
+int _fmpz_mod_vec_pow_fmpz(fmpz * A, const fmpz * B, slong len,
+                                     const fmpz_t e, const fmpz_mod_ctx_t ctx)
+{
+    _fmpz_mod_vec_pow_arg_t arg;
+    fmpz_t f;
+
+    if (len <= 0)
+        return 1;
+
+    fmpz_init(f);
+
+    if (fmpz_sgn(e) < 0)
+    {
+        if (!_fmpz_mod_vec_inv(A, B, len, ctx))
+        {
+            fmpz_clear(f);
+            return 0;
+        }
+
+        B = A;
+    }
+
+    fmpz_abs(f, e);
+
+    arg.A = A;
+    arg.B = B;
+    arg.e = f;
+    arg.n = fmpz_mod_ctx_modulus(ctx);
+
+    flint_parallel_for(0, len, FMPZ_MOD_VEC_THREAD_LEN/16,
+                                               _fmpz_mod_vec_pow_worker, &arg);
+
+    fmpz_clear(f);
+
+    return 1;
+}
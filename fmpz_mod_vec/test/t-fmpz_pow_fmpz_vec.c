@@ -0,0 +1,95 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include "fmpz_vec.h"
+#include "fmpz_mod_vec.h"
+
+int
+main(void)
+{
+    slong i, j;
+    int result;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("fmpz_pow_fmpz_vec....");
+    fflush(stdout);
+
+    for (i = 0; i < 300 * flint_test_multiplier(); i++)
+    {
+        fmpz_mod_ctx_t ctx;
+        fmpz_t n, b;
+        fmpz * e, * a, * c;
+        slong len;
+
+        fmpz_init(n);
+        fmpz_init(b);
+
+        fmpz_randtest_unsigned(n, state, n_randint(state, 20*FLINT_BITS) + 1);
+        fmpz_add_ui(n, n, 1);
+        if (n_randint(state, 4) == 0)
+            fmpz_nextprime(n, n, 0);
+
+        fmpz_mod_ctx_init(ctx, n);
+
+        flint_set_num_threads(n_randint(state, 4) + 1);
+
+        fmpz_mod_rand(b, state, ctx);
+
+        len = n_randint(state, 10) == 0 ? n_randint(state, 1000)
+                                        : n_randint(state, 50);
+
+        e = _fmpz_vec_init(len);
+        a = _fmpz_vec_init(len);
+        c = _fmpz_vec_init(len);
+
+        for (j = 0; j < len; j++)
+        {
+            fmpz_randtest_unsigned(e + j, state, n_randint(state, 600));
+            fmpz_mod_pow_fmpz(c + j, b, e + j, ctx);
+        }
+
+        _fmpz_mod_vec_fmpz_pow_fmpz_vec(a, b, e, len, ctx);
+
+        result = _fmpz_vec_equal(a, c, len);
+
+        /* aliasing */
+        if (n_randint(state, 4) == 0)
+        {
+            _fmpz_mod_vec_fmpz_pow_fmpz_vec(e, b, e, len, ctx);
+            result = result && _fmpz_vec_equal(e, c, len);
+        }
+
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("n = "); fmpz_print(n); flint_printf("\n");
+            flint_printf("b = "); fmpz_print(b); flint_printf("\n");
+            flint_printf("len = %wd\n", len);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        _fmpz_vec_clear(e, len);
+        _fmpz_vec_clear(a, len);
+        _fmpz_vec_clear(c, len);
+
+        fmpz_mod_ctx_clear(ctx);
+        fmpz_clear(n);
+        fmpz_clear(b);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
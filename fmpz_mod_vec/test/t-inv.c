@@ -0,0 +1,96 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include "fmpz_vec.h"
+#include "fmpz_mod_vec.h"
+
+int
+main(void)
+{
+    slong i, j;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("inv....");
+    fflush(stdout);
+
+    for (i = 0; i < 300 * flint_test_multiplier(); i++)
+    {
+        fmpz_mod_ctx_t ctx;
+        fmpz_t n, d;
+        fmpz * a, * b, * c;
+        slong len;
+        int ok1, ok2;
+
+        fmpz_init(n);
+        fmpz_init(d);
+
+        fmpz_randtest_unsigned(n, state, n_randint(state, 20*FLINT_BITS) + 2);
+        fmpz_add_ui(n, n, 2);
+        if (n_randint(state, 4) == 0)
+            fmpz_nextprime(n, n, 0);
+
+        fmpz_mod_ctx_init(ctx, n);
+
+        flint_set_num_threads(n_randint(state, 4) + 1);
+
+        len = n_randint(state, 10) == 0 ? n_randint(state, 3000)
+                                        : n_randint(state, 50);
+
+        a = _fmpz_vec_init(len);
+        b = _fmpz_vec_init(len);
+        c = _fmpz_vec_init(len);
+
+        ok2 = 1;
+        for (j = 0; j < len; j++)
+        {
+            fmpz_mod_rand(a + j, state, ctx);
+            fmpz_gcd(d, a + j, n);
+            if (!fmpz_is_one(d))
+                ok2 = 0;
+            else
+                fmpz_invmod(c + j, a + j, n);
+        }
+
+        if (n_randint(state, 2))
+        {
+            ok1 = _fmpz_mod_vec_inv(b, a, len, ctx);
+        }
+        else
+        {
+            _fmpz_vec_set(b, a, len);
+            ok1 = _fmpz_mod_vec_inv(b, b, len, ctx);
+        }
+
+        if (ok1 != ok2 || (ok1 && !_fmpz_vec_equal(b, c, len)))
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("n = "); fmpz_print(n); flint_printf("\n");
+            flint_printf("len = %wd, ok1 = %d, ok2 = %d\n", len, ok1, ok2);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        _fmpz_vec_clear(a, len);
+        _fmpz_vec_clear(b, len);
+        _fmpz_vec_clear(c, len);
+
+        fmpz_mod_ctx_clear(ctx);
+        fmpz_clear(n);
+        fmpz_clear(d);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
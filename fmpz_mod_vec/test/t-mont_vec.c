@@ -0,0 +1,272 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include "fmpz_vec.h"
+#include "fmpz_mod_vec.h"
+
+int
+main(void)
+{
+    slong i, j;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("mont_vec....");
+    fflush(stdout);
+
+    /* moduli which are not supported */
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        fmpz_mod_mont_ctx_t M;
+        fmpz_t n;
+        slong bits;
+
+        fmpz_init(n);
+
+        bits = n_randint(state, (FMPZ_MOD_MONT_MAX_LIMBS + 2)*FLINT_BITS) + 2;
+        fmpz_randtest_unsigned(n, state, bits);
+        if (n_randint(state, 4) == 0)
+            fmpz_neg(n, n);
+
+        if (fmpz_mod_mont_ctx_init(M, n) != (fmpz_sgn(n) > 0
+                     && fmpz_is_odd(n)
+                     && fmpz_size(n) >= FMPZ_MOD_MONT_MIN_LIMBS
+                     && fmpz_size(n) <= FMPZ_MOD_MONT_MAX_LIMBS))
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("n = "); fmpz_print(n); flint_printf("\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        fmpz_clear(n);
+    }
+
+    /* check the vector operations against fmpz arithmetic */
+    for (i = 0; i < 1000 * flint_test_multiplier(); i++)
+    {
+        fmpz_mod_ctx_t ctx;
+        fmpz_mod_mont_ctx_t M;
+        fmpz_t n, c, d, e;
+        fmpz * a, * b, * r, * s;
+        mp_ptr A, B, R, C;
+        slong len, nlimbs;
+        int ok1, ok2;
+
+        fmpz_init(n);
+        fmpz_init(c);
+        fmpz_init(d);
+        fmpz_init(e);
+
+        nlimbs = n_randint(state, FMPZ_MOD_MONT_MAX_LIMBS
+                               - FMPZ_MOD_MONT_MIN_LIMBS + 1)
+                                                   + FMPZ_MOD_MONT_MIN_LIMBS;
+        do {
+            fmpz_randtest_unsigned(n, state, nlimbs*FLINT_BITS);
+            if (n_randint(state, 10) == 0)
+                fmpz_randprime(n, state, nlimbs*FLINT_BITS, 0);
+            fmpz_setbit(n, 0);
+        } while (fmpz_size(n) < FMPZ_MOD_MONT_MIN_LIMBS);
+
+        fmpz_mod_ctx_init(ctx, n);
+
+        if (!fmpz_mod_mont_ctx_init(M, n))
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("n = "); fmpz_print(n); flint_printf("\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        len = n_randint(state, 20);
+
+        a = _fmpz_vec_init(len);
+        b = _fmpz_vec_init(len);
+        r = _fmpz_vec_init(len);
+        s = _fmpz_vec_init(len);
+        A = _fmpz_mod_mont_vec_init(len, M);
+        B = _fmpz_mod_mont_vec_init(len, M);
+        R = _fmpz_mod_mont_vec_init(len, M);
+        C = _fmpz_mod_mont_vec_init(1, M);
+
+        for (j = 0; j < len; j++)
+        {
+            fmpz_randm(a + j, state, n);
+            fmpz_randm(b + j, state, n);
+            if (n_randint(state, 20) == 0)
+                fmpz_sub_ui(a + j, n, 1);
+        }
+
+        fmpz_randm(c, state, n);
+
+        /* conversions */
+        _fmpz_mod_mont_vec_set_fmpz_vec(A, a, len, M);
+        _fmpz_mod_mont_vec_get_fmpz_vec(r, A, len, M);
+        _fmpz_mod_mont_vec_pack(B, a, len, M);
+        _fmpz_mod_mont_vec_unpack(s, B, len, M);
+
+        if (!_fmpz_vec_equal(r, a, len) || !_fmpz_vec_equal(s, a, len))
+        {
+            flint_printf("FAIL (conversion):\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        /* values which are not reduced */
+        for (j = 0; j < len; j++)
+        {
+            fmpz_randtest(r + j, state, n_randint(state, 3*nlimbs*FLINT_BITS));
+            fmpz_mod(s + j, r + j, n);
+        }
+
+        _fmpz_mod_mont_vec_pack(B, r, len, M);
+        _fmpz_mod_mont_vec_unpack(r, B, len, M);
+
+        if (!_fmpz_vec_equal(r, s, len))
+        {
+            flint_printf("FAIL (reduction):\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        _fmpz_mod_mont_vec_set_fmpz_vec(A, a, len, M);
+        _fmpz_mod_mont_vec_set_fmpz_vec(B, b, len, M);
+        _fmpz_mod_mont_set_fmpz(C, c, M);
+
+        /* add, sub, neg and mul with aliasing */
+        _fmpz_mod_mont_vec_set_fmpz_vec(R, a, len, M);
+        switch (n_randint(state, 4))
+        {
+            case 0:
+                _fmpz_mod_mont_vec_add(R, R, B, len, M);
+                for (j = 0; j < len; j++)
+                    fmpz_mod_add(s + j, a + j, b + j, ctx);
+                break;
+            case 1:
+                _fmpz_mod_mont_vec_sub(R, R, B, len, M);
+                _fmpz_mod_vec_sub(s, a, b, len, ctx);
+                break;
+            case 2:
+                _fmpz_mod_mont_vec_neg(R, R, len, M);
+                _fmpz_mod_vec_neg(s, a, len, ctx);
+                break;
+            default:
+                _fmpz_mod_mont_vec_mul(R, R, B, len, M);
+                _fmpz_mod_vec_mul(s, a, b, len, ctx);
+        }
+
+        _fmpz_mod_mont_vec_get_fmpz_vec(r, R, len, M);
+
+        if (!_fmpz_vec_equal(r, s, len))
+        {
+            flint_printf("FAIL (arithmetic):\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        /* scalar operations */
+        _fmpz_mod_mont_vec_set_fmpz_vec(R, a, len, M);
+        _fmpz_vec_set(s, a, len);
+        switch (n_randint(state, 3))
+        {
+            case 0:
+                _fmpz_mod_mont_vec_scalar_mul(R, B, len, C, M);
+                _fmpz_mod_vec_scalar_mul_fmpz_mod(s, b, len, c, ctx);
+                break;
+            case 1:
+                _fmpz_mod_mont_vec_scalar_addmul(R, B, len, C, M);
+                for (j = 0; j < len; j++)
+                {
+                    fmpz_addmul(s + j, b + j, c);
+                    fmpz_mod(s + j, s + j, n);
+                }
+                break;
+            default:
+                _fmpz_mod_mont_vec_scalar_submul(R, B, len, C, M);
+                for (j = 0; j < len; j++)
+                {
+                    fmpz_submul(s + j, b + j, c);
+                    fmpz_mod(s + j, s + j, n);
+                }
+        }
+
+        _fmpz_mod_mont_vec_get_fmpz_vec(r, R, len, M);
+
+        if (!_fmpz_vec_equal(r, s, len))
+        {
+            flint_printf("FAIL (scalar):\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        /* dot product */
+        _fmpz_mod_mont_vec_dot(C, A, B, len, M);
+        _fmpz_mod_mont_get_fmpz(d, C, M);
+        _fmpz_mod_vec_dot(e, a, b, len, ctx);
+
+        if (!fmpz_equal(d, e))
+        {
+            flint_printf("FAIL (dot):\n");
+            flint_printf("d = "); fmpz_print(d); flint_printf("\n");
+            flint_printf("e = "); fmpz_print(e); flint_printf("\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        /* batch inversion, in place */
+        ok1 = _fmpz_mod_mont_vec_inv(A, A, len, M);
+        ok2 = 1;
+        for (j = 0; j < len; j++)
+            ok2 = ok2 && fmpz_invmod(s + j, a + j, n);
+
+        if (ok1 != ok2)
+        {
+            flint_printf("FAIL (inv):\n");
+            flint_printf("ok1 = %d, ok2 = %d\n", ok1, ok2);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        if (ok1)
+        {
+            _fmpz_mod_mont_vec_get_fmpz_vec(r, A, len, M);
+
+            if (!_fmpz_vec_equal(r, s, len))
+            {
+                flint_printf("FAIL (inv values):\n");
+                fflush(stdout);
+                flint_abort();
+            }
+        }
+
+        _fmpz_vec_clear(a, len);
+        _fmpz_vec_clear(b, len);
+        _fmpz_vec_clear(r, len);
+        _fmpz_vec_clear(s, len);
+        _fmpz_mod_mont_vec_clear(A);
+        _fmpz_mod_mont_vec_clear(B);
+        _fmpz_mod_mont_vec_clear(R);
+        _fmpz_mod_mont_vec_clear(C);
+
+        fmpz_mod_ctx_clear(ctx);
+
+        fmpz_clear(n);
+        fmpz_clear(c);
+        fmpz_clear(d);
+        fmpz_clear(e);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
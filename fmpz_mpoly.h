@@ -246,6 +246,12 @@ int fmpz_mpoly_print_pretty(const fmpz_mpoly_t A,
    return fmpz_mpoly_fprint_pretty(stdout, A, x, ctx);
 }
 
+FLINT_DLL int fmpz_mpoly_fwrite_bin(FILE * file, const fmpz_mpoly_t A,
+                                                   const fmpz_mpoly_ctx_t ctx);
+
+FLINT_DLL int fmpz_mpoly_fread_bin(FILE * file, fmpz_mpoly_t A,
+                                                   const fmpz_mpoly_ctx_t ctx);
+
 
 /*  Basic manipulation *******************************************************/
 
@@ -0,0 +1,57 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+#include <stdio.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_mpoly.h"
+#include "binfile.h"
+
+/*
+    The file is only checked for consistency with ctx; the terms are assumed
+    to be in canonical form as they were when written.
+*/
+int fmpz_mpoly_fread_bin(FILE * file, fmpz_mpoly_t A,
+                                                   const fmpz_mpoly_ctx_t ctx)
+{
+    flint_bin_header_t h;
+    flint_bitcnt_t bits;
+    slong N, len;
+
+    if (!flint_bin_header_fread(file, h, FLINT_BIN_FMPZ_MPOLY))
+        return 0;
+
+    bits = h->dims[1];
+
+    if (h->dims[2] != (ulong) ctx->minfo->nvars ||
+        h->dims[3] != (ulong) ctx->minfo->ord ||
+        bits < MPOLY_MIN_BITS ||
+        (bits > FLINT_BITS && bits % FLINT_BITS != 0) ||
+        bits/FLINT_BITS > (ulong) (WORD_MAX/(ctx->minfo->nfields + 1)) ||
+        h->num != h->dims[0] || h->num > WORD_MAX)
+        return 0;
+
+    len = h->num;
+    N = mpoly_words_per_exp(bits, ctx->minfo);
+
+    if ((N != 0 && len > WORD_MAX/N) || h->data != (ulong) (N*len))
+        return 0;
+
+    _fmpz_mpoly_set_length(A, 0, ctx);
+    fmpz_mpoly_fit_length_reset_bits(A, len, bits, ctx);
+
+    if (!_flint_bin_fread(file, h, &A->coeffs, 1, len, &A->exps, 1, N*len))
+        return 0;
+
+    _fmpz_mpoly_set_length(A, len, ctx);
+
+    return 1;
+}
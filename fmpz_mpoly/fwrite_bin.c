@@ -0,0 +1,33 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+#include <stdio.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_mpoly.h"
+#include "binfile.h"
+
+int fmpz_mpoly_fwrite_bin(FILE * file, const fmpz_mpoly_t A,
+                                                   const fmpz_mpoly_ctx_t ctx)
+{
+    flint_bin_header_t h;
+    slong N = mpoly_words_per_exp(A->bits, ctx->minfo);
+
+    flint_bin_header_init(h, FLINT_BIN_FMPZ_MPOLY);
+    h->dims[0] = A->length;
+    h->dims[1] = A->bits;
+    h->dims[2] = ctx->minfo->nvars;
+    h->dims[3] = ctx->minfo->ord;
+
+    /* the exponents are written packed as they are */
+    return _flint_bin_fwrite(file, h, &A->coeffs, 1, A->length,
+                                                      &A->exps, 1, N*A->length);
+}
@@ -0,0 +1,92 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+#include <stdio.h>
+#include <stdlib.h>
+#include "fmpz_mpoly.h"
+
+int
+main(void)
+{
+    int i, result;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("fwrite_bin....");
+    fflush(stdout);
+
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        fmpz_mpoly_ctx_t ctx, ctx2;
+        fmpz_mpoly_t f, g, h;
+        slong len;
+        flint_bitcnt_t coeff_bits, exp_bits;
+        FILE * file;
+
+        fmpz_mpoly_ctx_init_rand(ctx, state, 20);
+        fmpz_mpoly_ctx_init(ctx2, ctx->minfo->nvars + 1, ctx->minfo->ord);
+
+        fmpz_mpoly_init(f, ctx);
+        fmpz_mpoly_init(g, ctx);
+        fmpz_mpoly_init(h, ctx2);
+
+        len = n_randint(state, 100);
+        exp_bits = n_randint(state, 200) + 2;
+        coeff_bits = n_randint(state, 200);
+
+        fmpz_mpoly_randtest_bits(f, state, len, coeff_bits, exp_bits, ctx);
+        fmpz_mpoly_randtest_bits(g, state, len, coeff_bits, exp_bits, ctx);
+
+        file = tmpfile();
+        if (file == NULL)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("could not open a temporary file\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        result = fmpz_mpoly_fwrite_bin(file, f, ctx);
+        rewind(file);
+        result = result && fmpz_mpoly_fread_bin(file, g, ctx);
+        fmpz_mpoly_assert_canonical(g, ctx);
+        result = result && fmpz_mpoly_equal(f, g, ctx) && g->bits == f->bits;
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("Check read back equals written\ni = %wd\n", i);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        /* the number of variables must match */
+        rewind(file);
+        result = !fmpz_mpoly_fread_bin(file, h, ctx2);
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("Check context mismatch\ni = %wd\n", i);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        fclose(file);
+
+        fmpz_mpoly_clear(f, ctx);
+        fmpz_mpoly_clear(g, ctx);
+        fmpz_mpoly_clear(h, ctx2);
+        fmpz_mpoly_ctx_clear(ctx);
+        fmpz_mpoly_ctx_clear(ctx2);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
@@ -1195,6 +1195,10 @@ int fmpz_poly_read_pretty(fmpz_poly_t poly, char **x)
     return fmpz_poly_fread_pretty(stdin, poly, x);
 }
 
+FLINT_DLL int fmpz_poly_fwrite_bin(FILE * file, const fmpz_poly_t poly);
+
+FLINT_DLL int fmpz_poly_fread_bin(FILE * file, fmpz_poly_t poly);
+
 FMPZ_POLY_INLINE
 void fmpz_poly_debug(const fmpz_poly_t poly)
 {
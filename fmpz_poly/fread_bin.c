@@ -0,0 +1,43 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_poly.h"
+#include "binfile.h"
+
+int fmpz_poly_fread_bin(FILE * file, fmpz_poly_t poly)
+{
+    flint_bin_header_t h;
+    slong len;
+
+    if (!flint_bin_header_fread(file, h, FLINT_BIN_FMPZ_POLY) ||
+        h->num != h->dims[0] || h->data != 0 || h->num > WORD_MAX)
+        return 0;
+
+    len = h->num;
+
+    _fmpz_poly_set_length(poly, 0);
+    fmpz_poly_fit_length(poly, len);
+
+    if (!_flint_bin_fread(file, h, &poly->coeffs, 1, len, NULL, 0, 0))
+    {
+        _fmpz_vec_zero(poly->coeffs, len);
+        return 0;
+    }
+
+    _fmpz_poly_set_length(poly, len);
+    _fmpz_poly_normalise(poly);
+
+    return 1;
+}
@@ -0,0 +1,28 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_poly.h"
+#include "binfile.h"
+
+int fmpz_poly_fwrite_bin(FILE * file, const fmpz_poly_t poly)
+{
+    flint_bin_header_t h;
+
+    flint_bin_header_init(h, FLINT_BIN_FMPZ_POLY);
+    h->dims[0] = poly->length;
+
+    return _flint_bin_fwrite(file, h, &poly->coeffs, 1, poly->length,
+                                                                 NULL, 0, 0);
+}
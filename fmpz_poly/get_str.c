@@ -45,7 +45,11 @@ _fmpz_poly_get_str(const fmpz * poly, slong len)
         if (!COEFF_IS_MPZ(*poly))
             str += flint_sprintf(str, " %wd", *poly);
         else
-            str += gmp_sprintf(str, " %Zd", COEFF_TO_PTR(*poly));
+        {
+            *str++ = ' ';
+            fmpz_get_str(str, 10, poly);
+            str += strlen(str);
+        }
     } while (poly++, --len);
 
     return strbase;
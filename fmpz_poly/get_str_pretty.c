@@ -60,7 +60,11 @@ _fmpz_poly_get_str_pretty(const fmpz * poly, slong len, const char *x)
     else if (!COEFF_IS_MPZ(poly[i]))
         off += flint_sprintf(str + off, "%wd*", poly[i]);
     else
-        off += gmp_sprintf(str + off, "%Zd*", COEFF_TO_PTR(poly[i]));
+    {
+        fmpz_get_str(str + off, 10, poly + i);
+        off += strlen(str + off);
+        str[off++] = '*';
+    }
     if (i > 1)
         off += flint_sprintf(str + off, "%s^%wd", x, i);
     else
@@ -79,7 +83,11 @@ _fmpz_poly_get_str_pretty(const fmpz * poly, slong len, const char *x)
             if (!COEFF_IS_MPZ(poly[i]))
                 off += flint_sprintf(str + off, "%wd*", poly[i]);
             else
-                off += gmp_sprintf(str + off, "%Zd*", COEFF_TO_PTR(poly[i]));
+            {
+                fmpz_get_str(str + off, 10, poly + i);
+                off += strlen(str + off);
+                str[off++] = '*';
+            }
         }
         if (i > 1)
             off += flint_sprintf(str + off, "%s^%wd", x, i);
@@ -94,7 +102,10 @@ _fmpz_poly_get_str_pretty(const fmpz * poly, slong len, const char *x)
         if (!COEFF_IS_MPZ(poly[i]))
             off += flint_sprintf(str + off, "%wd", poly[i]);
         else
-            off += gmp_sprintf(str + off, "%Zd", COEFF_TO_PTR(poly[i]));
+        {
+            fmpz_get_str(str + off, 10, poly + i);
+            off += strlen(str + off);
+        }
     }
 
     return str;
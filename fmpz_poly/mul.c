@@ -15,6 +15,8 @@
 #include "fmpz.h"
 #include "fmpz_vec.h"
 #include "fmpz_poly.h"
+#include "tuning.h"
+#include "profiler.h"
 
 void
 _fmpz_poly_mul_tiny1(fmpz * res, const fmpz * poly1,
@@ -102,13 +104,15 @@ _fmpz_poly_mul(fmpz * res, const fmpz * poly1,
 
     if (len2 == 1)
     {
-        _fmpz_vec_scalar_mul_fmpz(res, poly1, len1, poly2);
+        FLINT_DISPATCH("fmpz_poly_mul", "scalar", len1, 0,
+                     _fmpz_vec_scalar_mul_fmpz(res, poly1, len1, poly2));
         return;
     }
 
     if (poly1 == poly2 && len1 == len2)
     {
-        _fmpz_poly_sqr(res, poly1, len1);
+        FLINT_DISPATCH("fmpz_poly_mul", "sqr", len1, 0,
+                     _fmpz_poly_sqr(res, poly1, len1));
         return;
     }
 
@@ -124,19 +128,23 @@ _fmpz_poly_mul(fmpz * res, const fmpz * poly1,
 
         if (rbits <= FLINT_BITS - 2)
         {
-            _fmpz_poly_mul_tiny1(res, poly1, len1, poly2, len2);
+            FLINT_DISPATCH("fmpz_poly_mul", "tiny1", len1, rbits,
+                _fmpz_poly_mul_tiny1(res, poly1, len1, poly2, len2));
             return;
         }
         else if (rbits <= 2 * FLINT_BITS - 1)
         {
-            _fmpz_poly_mul_tiny2(res, poly1, len1, poly2, len2);
+            FLINT_DISPATCH("fmpz_poly_mul", "tiny2", len1, rbits,
+                _fmpz_poly_mul_tiny2(res, poly1, len1, poly2, len2));
             return;
         }
     }
 
-    if (len2 < 7)
+    if (len2 < FLINT_TUNE(FLINT_TUNE_FMPZ_POLY_MUL_CLASSICAL))
     {
-        _fmpz_poly_mul_classical(res, poly1, len1, poly2, len2);
+        FLINT_DISPATCH("fmpz_poly_mul", "classical", len1,
+            FLINT_MAX(bits1, bits2),
+            _fmpz_poly_mul_classical(res, poly1, len1, poly2, len2));
         return;
     }
 
@@ -144,15 +152,26 @@ _fmpz_poly_mul(fmpz * res, const fmpz * poly1,
     limbs2 = (bits2 + FLINT_BITS - 1) / FLINT_BITS;
 
     if (len1 < 16 && (limbs1 > 12 || limbs2 > 12))
-        _fmpz_poly_mul_karatsuba(res, poly1, len1, poly2, len2);
-    else if (limbs1 + limbs2 <= 8)
-        _fmpz_poly_mul_KS(res, poly1, len1, poly2, len2);
+        FLINT_DISPATCH("fmpz_poly_mul", "karatsuba", len1,
+            FLINT_MAX(bits1, bits2),
+            _fmpz_poly_mul_karatsuba(res, poly1, len1, poly2, len2));
+    else if (limbs1 + limbs2 <= FLINT_TUNE(FLINT_TUNE_FMPZ_POLY_MUL_KS_LIMBS))
+        FLINT_DISPATCH("fmpz_poly_mul", "KS", len1,
+            FLINT_MAX(bits1, bits2),
+            _fmpz_poly_mul_KS(res, poly1, len1, poly2, len2));
     else if ((limbs1+limbs2)/2048 > len1 + len2)
-        _fmpz_poly_mul_KS(res, poly1, len1, poly2, len2);
-    else if ((limbs1 + limbs2)*FLINT_BITS*4 < len1 + len2)
-       _fmpz_poly_mul_KS(res, poly1, len1, poly2, len2);
+        FLINT_DISPATCH("fmpz_poly_mul", "KS", len1,
+            FLINT_MAX(bits1, bits2),
+            _fmpz_poly_mul_KS(res, poly1, len1, poly2, len2));
+    else if ((limbs1 + limbs2)*FLINT_BITS
+                 *FLINT_TUNE(FLINT_TUNE_FMPZ_POLY_MUL_SS_RATIO) < len1 + len2)
+        FLINT_DISPATCH("fmpz_poly_mul", "KS", len1,
+            FLINT_MAX(bits1, bits2),
+            _fmpz_poly_mul_KS(res, poly1, len1, poly2, len2));
     else
-       _fmpz_poly_mul_SS(res, poly1, len1, poly2, len2);
+        FLINT_DISPATCH("fmpz_poly_mul", "SS", len1,
+            FLINT_MAX(bits1, bits2),
+            _fmpz_poly_mul_SS(res, poly1, len1, poly2, len2));
 }
 
 void
@@ -28,6 +28,7 @@ _fmpz_poly_mul_KS(fmpz * res, const fmpz * poly1, slong len1,
     slong bits1, bits2, bits;
     mp_limb_t *arr1, *arr2, *arr3;
     slong sign = 0;
+    FLINT_ARENA_INIT;
 
     FMPZ_VEC_NORM(poly1, len1);
     FMPZ_VEC_NORM(poly2, len2);
@@ -61,6 +62,8 @@ _fmpz_poly_mul_KS(fmpz * res, const fmpz * poly1, slong len1,
     else
         bits2 = bits1;
 
+    FLINT_ARENA_START;
+
     loglen = FLINT_BIT_COUNT(FLINT_MIN(len1, len2));
     bits = bits1 + bits2 + loglen + sign;
 
@@ -69,19 +72,21 @@ _fmpz_poly_mul_KS(fmpz * res, const fmpz * poly1, slong len1,
 
     if (poly1 == poly2)
     {
-        arr1 = (mp_limb_t *) flint_calloc(limbs1, sizeof(mp_limb_t));
+        arr1 = FLINT_ARENA_ARRAY_ALLOC(limbs1, mp_limb_t);
+        flint_mpn_zero(arr1, limbs1);
         arr2 = arr1;
         _fmpz_poly_bit_pack(arr1, poly1, len1, bits, neg1);
     }
     else
     {
-        arr1 = (mp_limb_t *) flint_calloc(limbs1 + limbs2, sizeof(mp_limb_t));
+        arr1 = FLINT_ARENA_ARRAY_ALLOC(limbs1 + limbs2, mp_limb_t);
+        flint_mpn_zero(arr1, limbs1 + limbs2);
         arr2 = arr1 + limbs1;
         _fmpz_poly_bit_pack(arr1, poly1, len1, bits, neg1);
         _fmpz_poly_bit_pack(arr2, poly2, len2, bits, neg2);
     }
 
-    arr3 = (mp_limb_t *) flint_malloc((limbs1 + limbs2) * sizeof(mp_limb_t));
+    arr3 = FLINT_ARENA_ARRAY_ALLOC(limbs1 + limbs2, mp_limb_t);
 
     if (limbs1 == limbs2)
     {
@@ -111,8 +116,7 @@ _fmpz_poly_mul_KS(fmpz * res, const fmpz * poly1, slong len1,
     if ((len1 < in1_len) | (len2 < in2_len))
         _fmpz_vec_zero(res + (len1 + len2 - 1), (in1_len - len1) + (in2_len - len2));
 
-    flint_free(arr1);
-    flint_free(arr3);
+    FLINT_ARENA_END;
 }
 
 void
@@ -12,7 +12,7 @@
 #include <stdlib.h>
 #include "fmpz_poly.h"
 #include "fft.h"
-#include "fft_tuning.h"
+#include "tuning.h"
 #include "flint.h"
 
 void _fmpz_poly_mullow_SS(fmpz * output, const fmpz * input1, slong len1, 
@@ -47,7 +47,8 @@ void _fmpz_poly_mullow_SS(fmpz * output, const fmpz * input1, slong len1,
     output_bits = (((output_bits - 1) >> (loglen - 2)) + 1) << (loglen - 2);
 
     limbs = (output_bits - 1) / FLINT_BITS + 1; /* initial size of FFT coeffs */
-    if (limbs > FFT_MULMOD_2EXPP1_CUTOFF) /* can't be worse than next power of 2 limbs */
+    /* can't be worse than next power of 2 limbs */
+    if (limbs > FLINT_TUNE(FLINT_TUNE_FFT_MULMOD_2EXPP1))
         limbs = (WORD(1) << FLINT_CLOG2(limbs));
     size = limbs + 1;
 
@@ -12,7 +12,7 @@
 #include <stdlib.h>
 #include "fmpz_poly.h"
 #include "fft.h"
-#include "fft_tuning.h"
+#include "tuning.h"
 #include "flint.h"
 
 void fmpz_poly_mul_SS_precache_init(fmpz_poly_mul_precache_t pre,
@@ -43,7 +43,8 @@ void fmpz_poly_mul_SS_precache_init(fmpz_poly_mul_precache_t pre,
 
     pre->limbs = (output_bits - 1) / FLINT_BITS + 1; /* initial size of FFT coeffs */
 
-    if (pre->limbs > FFT_MULMOD_2EXPP1_CUTOFF) /* can't be worse than next power of 2 limbs */
+    /* can't be worse than next power of 2 limbs */
+    if (pre->limbs > FLINT_TUNE(FLINT_TUNE_FFT_MULMOD_2EXPP1))
         pre->limbs = (WORD(1) << FLINT_CLOG2(pre->limbs));
     size = pre->limbs + 1;
 
@@ -1,6 +1,6 @@
 /*
     Copyright (C) 2014 Fredrik Johansson
-    Copyright (C) 2020 William Hart
+    Copyright (C) 2020, 2021 William Hart
 
     This file is part of FLINT.
 
@@ -17,91 +17,6 @@
 #include "fmpz_poly.h"
 #include "thread_support.h"
 
-typedef struct
-{
-    fmpz * vec;
-    mp_ptr * residues;
-    slong n0;
-    slong n1;
-    mp_srcptr primes;
-    slong num_primes;
-    int crt;  /* reduce if 0, lift if 1 */
-}
-mod_ui_arg_t;
-
-void
-_fmpz_vec_multi_mod_ui_worker(void * arg_ptr)
-{
-    mod_ui_arg_t arg = *((mod_ui_arg_t *) arg_ptr);
-    mp_ptr tmp;
-    slong i, j;
-
-    fmpz_comb_t comb;
-    fmpz_comb_temp_t comb_temp;
-
-    tmp = flint_malloc(sizeof(mp_limb_t) * arg.num_primes);
-    fmpz_comb_init(comb, arg.primes, arg.num_primes);
-    fmpz_comb_temp_init(comb_temp, comb);
-
-    for (i = arg.n0; i < arg.n1; i++)
-    {
-        if (arg.crt)
-        {
-            for (j = 0; j < arg.num_primes; j++)
-                tmp[j] = arg.residues[j][i];
-            fmpz_multi_CRT_ui(arg.vec + i, tmp, comb, comb_temp, 1);
-        }
-        else
-        {
-            fmpz_multi_mod_ui(tmp, arg.vec + i, comb, comb_temp);
-            for (j = 0; j < arg.num_primes; j++)
-                arg.residues[j][i] = tmp[j];
-        }
-    }
-
-    flint_free(tmp);
-    fmpz_comb_clear(comb);
-    fmpz_comb_temp_clear(comb_temp);
-}
-
-void
-_fmpz_vec_multi_mod_ui_threaded(mp_ptr * residues, fmpz * vec, slong len,
-    mp_srcptr primes, slong num_primes, int crt)
-{
-    mod_ui_arg_t * args;
-    slong i, num_threads;
-    thread_pool_handle * threads;
-
-    num_threads = flint_request_threads(&threads, flint_get_num_threads());
-
-    args = (mod_ui_arg_t *)
-                          flint_malloc(sizeof(mod_ui_arg_t)*(num_threads + 1));
-
-    for (i = 0; i < num_threads + 1; i++)
-    {
-        args[i].vec = vec;
-        args[i].residues = residues;
-        args[i].n0 = (len * i) / (num_threads + 1);
-        args[i].n1 = (len * (i + 1)) / (num_threads + 1);
-        args[i].primes = (mp_ptr) primes;
-        args[i].num_primes = num_primes;
-        args[i].crt = crt;
-    }
-
-    for (i = 0; i < num_threads; i++)
-        thread_pool_wake(global_thread_pool, threads[i], 0,
-                               _fmpz_vec_multi_mod_ui_worker, &args[i]);
-
-    _fmpz_vec_multi_mod_ui_worker(&args[num_threads]);
-
-    for (i = 0; i < num_threads; i++)
-        thread_pool_wait(global_thread_pool, threads[i]);
-
-    flint_give_back_threads(threads, num_threads);
-
-    flint_free(args);
-}
-
 typedef struct
 {
     mp_ptr * residues;
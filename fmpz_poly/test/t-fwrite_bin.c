@@ -0,0 +1,86 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_poly.h"
+#include "fmpz_mat.h"
+#include "ulong_extras.h"
+
+int main(void)
+{
+    int i, result;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("fwrite_bin....");
+    fflush(stdout);
+
+    for (i = 0; i < 1000 * flint_test_multiplier(); i++)
+    {
+        fmpz_poly_t a, b;
+        fmpz_mat_t m;
+        FILE * file;
+
+        fmpz_poly_init(a);
+        fmpz_poly_init(b);
+        fmpz_mat_init(m, 0, 0);
+
+        fmpz_poly_randtest(a, state, n_randint(state, 100),
+                                                 n_randint(state, 300) + 1);
+        fmpz_poly_randtest(b, state, n_randint(state, 100),
+                                                 n_randint(state, 300) + 1);
+
+        file = tmpfile();
+        if (file == NULL)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("could not open a temporary file\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        result = fmpz_poly_fwrite_bin(file, a);
+        rewind(file);
+        result = result && fmpz_poly_fread_bin(file, b);
+        result = result && fmpz_poly_equal(a, b);
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            fmpz_poly_print(a); flint_printf("\n\n");
+            fmpz_poly_print(b); flint_printf("\n\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        /* a polynomial is not a matrix */
+        rewind(file);
+        result = !fmpz_mat_fread_bin(file, m);
+        if (!result)
+        {
+            flint_printf("FAIL (type):\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        fclose(file);
+
+        fmpz_poly_clear(a);
+        fmpz_poly_clear(b);
+        fmpz_mat_clear(m);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
@@ -14,6 +14,7 @@
 #include "fmpz_mat.h"
 #include "fmpz_lll.h"
 #include "fmpz_poly.h"
+#include "ctrl.h"
 
 slong _heuristic_van_hoeij_starting_precision(const fmpz_poly_t f, 
                                                             slong r, ulong p)
@@ -173,6 +174,13 @@ void fmpz_poly_factor_van_hoeij(fmpz_poly_factor_t final_fac,
 
    while (!fmpz_poly_factor_van_hoeij_check_if_solved(M, final_fac, lifted_fac, f, P, exp, lc))
    {
+      /* give up, leaving f unfactored */
+      if (flint_ctrl_check("fmpz_poly_factor", hensel_loops, 0))
+      {
+         fmpz_poly_factor_insert(final_fac, f, exp);
+         goto cleanup;
+      }
+
       if (hensel_loops < 3 && 3*r > N + 1)
          num_coeffs = r > 200 ? 50 : 30;
       else
@@ -12,6 +12,7 @@
 
 #include <stdlib.h>
 #include "fmpz_poly.h"
+#include "ctrl.h"
 
 #define TRACE_ZASSENHAUS 0
 
@@ -173,7 +174,7 @@ void _fmpz_poly_factor_zassenhaus(fmpz_poly_factor_t final_fac,
 
         p = (fac->p + 0)->mod.n;
             
-        if (r == 1 && r <= cutoff)
+        if ((r == 1 && r <= cutoff) || flint_ctrl_check("fmpz_poly_factor", 0, 0))
         {
             fmpz_poly_factor_insert(final_fac, f, exp);
         }
@@ -14,6 +14,7 @@
 
 #include <stdlib.h>
 #include "fmpz_poly.h"
+#include "ctrl.h"
 
 
 static void _fmpz_poly_product(
@@ -113,6 +114,10 @@ void fmpz_poly_factor_zassenhaus_recombination(
     len = r;
     for (k = 1; k <= len/2; k++)
     {
+        /* if stopped, what remains of f is inserted unfactored */
+        if (flint_ctrl_check("fmpz_poly_factor", k - 1, len/2))
+            break;
+
         zassenhaus_subset_first(subset, len, k);
         while (1)
         {
@@ -194,6 +199,10 @@ void fmpz_poly_factor_zassenhaus_recombination_with_prune(
     len = r;
     for (k = 1; k <= len/2; k++)
     {
+        /* if stopped, what remains of f is inserted unfactored */
+        if (flint_ctrl_check("fmpz_poly_factor", k - 1, len/2))
+            break;
+
         zassenhaus_subset_first(subset, len, k);
         while (1)
         {
@@ -113,6 +113,10 @@ int _fmpz_vec_read(fmpz ** vec, slong * len)
     return _fmpz_vec_fread(stdin, vec, len);
 }
 
+FLINT_DLL int _fmpz_vec_fwrite_bin(FILE * file, const fmpz * vec, slong len);
+
+FLINT_DLL int _fmpz_vec_fread_bin(FILE * file, fmpz ** vec, slong * len);
+
 /*  Conversions  *************************************************************/
 
 FLINT_DLL void _fmpz_vec_set_nmod_vec(fmpz * res, 
@@ -258,6 +262,31 @@ FLINT_DLL void _fmpz_vec_content_chained(fmpz_t res, const fmpz * vec, slong len
 
 FLINT_DLL void _fmpz_vec_lcm(fmpz_t res, const fmpz * vec, slong len);
 
+/*  Product and remainder trees  *********************************************/
+
+FLINT_DLL slong _fmpz_vec_product_tree_height(slong len);
+
+FLINT_DLL fmpz ** _fmpz_vec_product_tree_alloc(slong len);
+
+FLINT_DLL void _fmpz_vec_product_tree_free(fmpz ** tree, slong len);
+
+FLINT_DLL void _fmpz_vec_product_tree_build(fmpz ** tree,
+                                                const fmpz * vec, slong len);
+
+FLINT_DLL void _fmpz_vec_remainder_tree(fmpz * res, const fmpz_t x,
+                                        fmpz ** tree, slong len, int square);
+
+/*  Multi-modular reduction and reconstruction  ******************************/
+
+FLINT_DLL void _fmpz_vec_multi_mod_ui(mp_ptr * out, const fmpz * in,
+                  slong len, const fmpz_comb_t comb, fmpz_comb_temp_t temp);
+
+FLINT_DLL void _fmpz_vec_multi_CRT_ui(fmpz * out, mp_srcptr * in, slong len,
+                  const fmpz_comb_t comb, fmpz_comb_temp_t temp, int sign);
+
+FLINT_DLL void _fmpz_vec_multi_mod_ui_threaded(mp_ptr * residues, fmpz * vec,
+                  slong len, mp_srcptr primes, slong num_primes, int crt);
+
 /*  Dot product  *************************************************************/
 
 FLINT_DLL void _fmpz_vec_dot(fmpz_t res, const fmpz * vec1, const fmpz * vec2, slong len2);
@@ -0,0 +1,57 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "binfile.h"
+
+int _fmpz_vec_fread_bin(FILE * file, fmpz ** vec, slong * len)
+{
+    flint_bin_header_t h;
+    int alloc = (*vec == NULL);
+
+    if (!flint_bin_header_fread(file, h, FLINT_BIN_FMPZ_VEC) ||
+        h->num != h->dims[0] || h->data != 0 || h->num > WORD_MAX)
+    {
+        if (alloc)
+            *len = 0;
+        return 0;
+    }
+
+    if (alloc)
+    {
+        *len = h->num;
+        *vec = _fmpz_vec_init(*len);
+    }
+    else
+    {
+        if ((ulong) *len != h->num)
+            return 0;
+
+        _fmpz_vec_zero(*vec, *len);
+    }
+
+    if (!_flint_bin_fread(file, h, vec, 1, *len, NULL, 0, 0))
+    {
+        if (alloc)
+        {
+            _fmpz_vec_clear(*vec, *len);
+            *vec = NULL;
+            *len = 0;
+        }
+        return 0;
+    }
+
+    return 1;
+}
@@ -0,0 +1,28 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "binfile.h"
+
+int _fmpz_vec_fwrite_bin(FILE * file, const fmpz * vec, slong len)
+{
+    flint_bin_header_t h;
+    fmpz * v = (fmpz *) vec;
+
+    flint_bin_header_init(h, FLINT_BIN_FMPZ_VEC);
+    h->dims[0] = len;
+
+    return _flint_bin_fwrite(file, h, &v, 1, len, NULL, 0, 0);
+}
@@ -0,0 +1,34 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+
+void _fmpz_vec_multi_CRT_ui(fmpz * out, mp_srcptr * in, slong len,
+                            const fmpz_comb_t C, fmpz_comb_temp_t CT, int sign)
+{
+    slong e, l, num_primes = C->num_primes;
+    mp_ptr r;
+
+    r = (mp_ptr) flint_malloc(num_primes*sizeof(mp_limb_t));
+
+    for (e = 0; e < len; e++)
+    {
+        for (l = 0; l < num_primes; l++)
+            r[l] = in[l][e];
+
+        fmpz_multi_CRT_ui(out + e, r, C, CT, sign);
+    }
+
+    flint_free(r);
+}
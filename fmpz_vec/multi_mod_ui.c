@@ -0,0 +1,109 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "nmod_vec.h"
+
+/*
+    number of entries split at the high level before the lower levels, the
+    split values of a block are kept small enough to stay in cache
+*/
+#define FMPZ_VEC_MULTI_MOD_BLOCK 32
+#define FMPZ_VEC_MULTI_MOD_BLOCK_SPLITS 128
+
+/*
+    As for fmpz_multi_mod_ui, but each level below the high level split is
+    done for a block of entries at a time, so that each modulus of the
+    mid and low levels is set up once per block.
+*/
+void _fmpz_vec_multi_mod_ui(mp_ptr * out, const fmpz * in, slong len,
+                                      const fmpz_comb_t C, fmpz_comb_temp_t CT)
+{
+    slong e, e0, e1, i, k, l, block;
+    slong klen = C->mod_klen;
+    const mod_lut_entry * lu = C->mod_lu;
+    const slong * offsets = C->mod_offsets;
+    const fmpz * a;
+    fmpz * A = NULL;
+    mp_limb_t t;
+
+    block = FMPZ_VEC_MULTI_MOD_BLOCK_SPLITS/klen;
+    block = FLINT_MAX(block, 1);
+    block = FLINT_MIN(block, FMPZ_VEC_MULTI_MOD_BLOCK);
+
+    if (klen > 1)
+        A = _fmpz_vec_init(block*klen);
+
+    for (e0 = 0; e0 < len; e0 = e1)
+    {
+        e1 = FLINT_MIN(len, e0 + block);
+
+        /* high level split */
+        if (klen > 1)
+        {
+            for (e = e0; e < e1; e++)
+                _fmpz_multi_mod_precomp(A + (e - e0)*klen, C->mod_P,
+                                                           in + e, -1, CT->T);
+        }
+
+        for (k = 0, i = 0, l = 0; k < klen; k++)
+        {
+            for ( ; i < offsets[k]; i++)
+            {
+                nmod_t mod = lu[i].mod;
+
+                /* mid level split: depends on FMPZ_MOD_UI_CUTOFF */
+                a = (klen > 1) ? A + k : in + e0;
+
+                /* low level split: 1, 2, or 3 small primes */
+                if (lu[i].mod2.n != 0)
+                {
+                    FLINT_ASSERT(l + 3 <= C->num_primes);
+                    for (e = e0; e < e1; e++, a += (klen > 1) ? klen : 1)
+                    {
+                        t = fmpz_get_nmod(a, mod);
+                        NMOD_RED(out[l + 0][e], t, lu[i].mod0);
+                        NMOD_RED(out[l + 1][e], t, lu[i].mod1);
+                        NMOD_RED(out[l + 2][e], t, lu[i].mod2);
+                    }
+                    l += 3;
+                }
+                else if (lu[i].mod1.n != 0)
+                {
+                    FLINT_ASSERT(l + 2 <= C->num_primes);
+                    for (e = e0; e < e1; e++, a += (klen > 1) ? klen : 1)
+                    {
+                        t = fmpz_get_nmod(a, mod);
+                        NMOD_RED(out[l + 0][e], t, lu[i].mod0);
+                        NMOD_RED(out[l + 1][e], t, lu[i].mod1);
+                    }
+                    l += 2;
+                }
+                else
+                {
+                    FLINT_ASSERT(l + 1 <= C->num_primes);
+                    for (e = e0; e < e1; e++, a += (klen > 1) ? klen : 1)
+                        out[l][e] = fmpz_get_nmod(a, mod);
+                    l += 1;
+                }
+            }
+        }
+
+        FLINT_ASSERT(l == C->num_primes);
+    }
+
+    if (klen > 1)
+        _fmpz_vec_clear(A, block*klen);
+}
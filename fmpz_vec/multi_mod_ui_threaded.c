@@ -0,0 +1,68 @@
+/*
+    Copyright (C) 2014 Fredrik Johansson
+    Copyright (C) 2020, 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "thread_support.h"
+
+typedef struct
+{
+    fmpz * vec;
+    mp_ptr * residues;
+    const fmpz_comb_struct * comb;
+    int crt;  /* reduce if 0, lift if 1 */
+}
+_fmpz_vec_multi_mod_arg_t;
+
+static void _fmpz_vec_multi_mod_worker(slong start, slong stop, void * varg)
+{
+    _fmpz_vec_multi_mod_arg_t * arg = (_fmpz_vec_multi_mod_arg_t *) varg;
+    const fmpz_comb_struct * comb = arg->comb;
+    fmpz_comb_temp_t comb_temp;
+    mp_ptr * r;
+    slong l;
+
+    r = (mp_ptr *) flint_malloc(comb->num_primes*sizeof(mp_ptr));
+    for (l = 0; l < comb->num_primes; l++)
+        r[l] = arg->residues[l] + start;
+
+    fmpz_comb_temp_init(comb_temp, comb);
+
+    if (arg->crt)
+        _fmpz_vec_multi_CRT_ui(arg->vec + start, (mp_srcptr *) r,
+                                        stop - start, comb, comb_temp, 1);
+    else
+        _fmpz_vec_multi_mod_ui(r, arg->vec + start,
+                                        stop - start, comb, comb_temp);
+
+    fmpz_comb_temp_clear(comb_temp);
+    flint_free(r);
+}
+
+/* the comb is shared by all threads and kept for the next call */
+void _fmpz_vec_multi_mod_ui_threaded(mp_ptr * residues, fmpz * vec,
+                   slong len, mp_srcptr primes, slong num_primes, int crt)
+{
+    _fmpz_vec_multi_mod_arg_t arg;
+
+    if (len <= 0)
+        return;
+
+    arg.vec = vec;
+    arg.residues = residues;
+    arg.comb = _fmpz_comb_cache(primes, num_primes);
+    arg.crt = crt;
+
+    flint_parallel_for(0, len, 0, _fmpz_vec_multi_mod_worker, &arg);
+}
@@ -0,0 +1,156 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "thread_support.h"
+
+/* level k of the tree has this many nodes */
+#define TREE_LEN(len, k) (((len) + (WORD(1) << (k)) - 1) >> (k))
+
+slong _fmpz_vec_product_tree_height(slong len)
+{
+    return (len <= 1) ? 0 : FLINT_CLOG2(len);
+}
+
+fmpz ** _fmpz_vec_product_tree_alloc(slong len)
+{
+    slong k, height = _fmpz_vec_product_tree_height(len);
+    fmpz ** tree;
+
+    tree = (fmpz **) flint_malloc((height + 1)*sizeof(fmpz *));
+
+    for (k = 0; k <= height; k++)
+        tree[k] = _fmpz_vec_init(TREE_LEN(len, k));
+
+    return tree;
+}
+
+void _fmpz_vec_product_tree_free(fmpz ** tree, slong len)
+{
+    slong k, height = _fmpz_vec_product_tree_height(len);
+
+    for (k = 0; k <= height; k++)
+        _fmpz_vec_clear(tree[k], TREE_LEN(len, k));
+
+    flint_free(tree);
+}
+
+typedef struct
+{
+    fmpz * res;
+    const fmpz * prev;
+    slong prev_len;
+}
+_product_tree_level_struct;
+
+static void
+_product_tree_level_worker(slong start, slong stop, void * varg)
+{
+    _product_tree_level_struct * arg = (_product_tree_level_struct *) varg;
+    slong j;
+
+    for (j = start; j < stop; j++)
+    {
+        if (2*j + 1 < arg->prev_len)
+            fmpz_mul(arg->res + j, arg->prev + 2*j, arg->prev + 2*j + 1);
+        else
+            fmpz_set(arg->res + j, arg->prev + 2*j);
+    }
+}
+
+void _fmpz_vec_product_tree_build(fmpz ** tree, const fmpz * vec, slong len)
+{
+    _product_tree_level_struct arg;
+    slong k, height = _fmpz_vec_product_tree_height(len);
+
+    _fmpz_vec_set(tree[0], vec, len);
+
+    for (k = 1; k <= height; k++)
+    {
+        arg.res = tree[k];
+        arg.prev = tree[k - 1];
+        arg.prev_len = TREE_LEN(len, k - 1);
+
+        flint_parallel_for(0, TREE_LEN(len, k), 0,
+                                       _product_tree_level_worker, &arg);
+    }
+}
+
+typedef struct
+{
+    fmpz * res;
+    const fmpz * prev;
+    const fmpz * mod;
+    int square;
+}
+_remainder_tree_level_struct;
+
+static void
+_remainder_tree_level_worker(slong start, slong stop, void * varg)
+{
+    _remainder_tree_level_struct * arg = (_remainder_tree_level_struct *) varg;
+    fmpz_t t;
+    slong j;
+
+    fmpz_init(t);
+
+    for (j = start; j < stop; j++)
+    {
+        if (arg->square)
+        {
+            fmpz_mul(t, arg->mod + j, arg->mod + j);
+            fmpz_mod(arg->res + j, arg->prev + j/2, t);
+        }
+        else
+        {
+            fmpz_mod(arg->res + j, arg->prev + j/2, arg->mod + j);
+        }
+    }
+
+    fmpz_clear(t);
+}
+
+void _fmpz_vec_remainder_tree(fmpz * res, const fmpz_t x,
+                                      fmpz ** tree, slong len, int square)
+{
+    _remainder_tree_level_struct arg;
+    slong k, height = _fmpz_vec_product_tree_height(len);
+    fmpz * a, * b, * t;
+
+    if (len <= 0)
+        return;
+
+    /* remainders of the current level, alternating between a and b */
+    a = _fmpz_vec_init(len);
+    b = _fmpz_vec_init(len);
+
+    /* the single remainder at the top is taken from x */
+    arg.prev = x;
+    arg.square = square;
+
+    for (k = height; k >= 0; k--)
+    {
+        arg.res = (k == 0) ? res : a;
+        arg.mod = tree[k];
+
+        flint_parallel_for(0, TREE_LEN(len, k), 0,
+                                     _remainder_tree_level_worker, &arg);
+
+        arg.prev = a;
+        t = a; a = b; b = t;
+    }
+
+    _fmpz_vec_clear(a, len);
+    _fmpz_vec_clear(b, len);
+}
@@ -0,0 +1,119 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "ulong_extras.h"
+
+int main(void)
+{
+    int i, result;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("fwrite_bin....");
+    fflush(stdout);
+
+    for (i = 0; i < 1000 * flint_test_multiplier(); i++)
+    {
+        fmpz * a, * b = NULL, * c;
+        slong len, blen, clen;
+        long pos;
+        FILE * file;
+
+        len = n_randint(state, 100);
+        a = _fmpz_vec_init(len);
+        _fmpz_vec_randtest(a, state, len, n_randint(state, 300) + 1);
+
+        file = tmpfile();
+        if (file == NULL)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("could not open a temporary file\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        result = _fmpz_vec_fwrite_bin(file, a, len);
+        pos = ftell(file);
+        rewind(file);
+
+        /* read into a new vector */
+        result = result && _fmpz_vec_fread_bin(file, &b, &blen);
+        result = result && blen == len && _fmpz_vec_equal(a, b, len);
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("len = %wd\n", len);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        /* read over an existing vector of the right length */
+        clen = len;
+        c = _fmpz_vec_init(clen);
+        _fmpz_vec_randtest(c, state, clen, 200);
+        rewind(file);
+
+        result = _fmpz_vec_fread_bin(file, &c, &clen);
+        result = result && _fmpz_vec_equal(a, c, len);
+        if (!result)
+        {
+            flint_printf("FAIL (read over):\n");
+            flint_printf("len = %wd\n", len);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        _fmpz_vec_clear(c, clen);
+        fclose(file);
+
+        /* truncated files must be rejected */
+        file = tmpfile();
+        _fmpz_vec_fwrite_bin(file, a, len);
+        rewind(file);
+        {
+            char * buf = flint_malloc(pos);
+            long cut = n_randint(state, pos);
+
+            result = (fread(buf, 1, pos, file) == pos);
+            fclose(file);
+
+            file = tmpfile();
+            result = result && (fwrite(buf, 1, cut, file) == cut);
+            rewind(file);
+            flint_free(buf);
+        }
+
+        c = NULL;
+        result = result && !_fmpz_vec_fread_bin(file, &c, &clen);
+        result = result && c == NULL && clen == 0;
+        if (!result)
+        {
+            flint_printf("FAIL (truncated):\n");
+            flint_printf("len = %wd\n", len);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        fclose(file);
+
+        _fmpz_vec_clear(a, len);
+        _fmpz_vec_clear(b, blen);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
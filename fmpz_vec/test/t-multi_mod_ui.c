@@ -0,0 +1,193 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "thread_support.h"
+
+int
+main(void)
+{
+    slong i, j, k, len, num_primes = 0;
+    mp_limb_t * primes = NULL;
+    fmpz_t prod, t;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("multi_mod_ui....");
+    fflush(stdout);
+
+    fmpz_init(prod);
+    fmpz_init(t);
+
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        const fmpz_comb_struct * comb;
+        fmpz_comb_temp_t comb_temp;
+        fmpz * A, * B;
+        mp_ptr * R;
+        int sign = n_randint(state, 2);
+
+        flint_set_num_threads(1 + n_randint(state, 4));
+
+        /* sometimes reuse the primes, which should hit the cache */
+        if (primes == NULL || n_randint(state, 2))
+        {
+            flint_bitcnt_t bits = n_randint(state, FLINT_BITS - 2) + 2;
+
+            flint_free(primes);
+            num_primes = 1 + n_randint(state, 300);
+            primes = FLINT_ARRAY_ALLOC(num_primes, mp_limb_t);
+
+            primes[0] = n_nextprime(n_randbits(state, bits), 1);
+            for (j = 1; j < num_primes; j++)
+                primes[j] = n_nextprime(primes[j - 1], 1);
+        }
+
+        fmpz_one(prod);
+        for (j = 0; j < num_primes; j++)
+            fmpz_mul_ui(prod, prod, primes[j]);
+
+        len = n_randint(state, 100);
+
+        A = _fmpz_vec_init(len);
+        B = _fmpz_vec_init(len);
+        R = FLINT_ARRAY_ALLOC(num_primes, mp_ptr);
+        for (j = 0; j < num_primes; j++)
+            R[j] = _nmod_vec_init(len);
+
+        for (k = 0; k < len; k++)
+            fmpz_randtest(A + k, state, n_randint(state, 2*num_primes*FLINT_BITS) + 1);
+
+        if (n_randint(state, 2))
+        {
+            _fmpz_vec_multi_mod_ui_threaded(R, A, len, primes, num_primes, 0);
+        }
+        else
+        {
+            comb = _fmpz_comb_cache(primes, num_primes);
+            fmpz_comb_temp_init(comb_temp, comb);
+            _fmpz_vec_multi_mod_ui(R, A, len, comb, comb_temp);
+            fmpz_comb_temp_clear(comb_temp);
+        }
+
+        for (k = 0; k < len; k++)
+        {
+            for (j = 0; j < num_primes; j++)
+            {
+                if (R[j][k] != fmpz_fdiv_ui(A + k, primes[j]))
+                {
+                    flint_printf("FAIL: check multi_mod_ui output\n");
+                    flint_printf("i = %wd, j = %wd, k = %wd\n", i, j, k);
+                    fflush(stdout);
+                    flint_abort();
+                }
+            }
+        }
+
+        if (sign && n_randint(state, 2))
+        {
+            _fmpz_vec_multi_mod_ui_threaded(R, B, len, primes, num_primes, 1);
+        }
+        else
+        {
+            comb = _fmpz_comb_cache(primes, num_primes);
+            fmpz_comb_temp_init(comb_temp, comb);
+            _fmpz_vec_multi_CRT_ui(B, (mp_srcptr *) R, len, comb, comb_temp, sign);
+            fmpz_comb_temp_clear(comb_temp);
+        }
+
+        for (k = 0; k < len; k++)
+        {
+            if (sign ? fmpz_cmp2abs(prod, B + k) < 0 :
+                       (fmpz_sgn(B + k) < 0 || fmpz_cmp(prod, B + k) <= 0))
+            {
+                flint_printf("FAIL: check crt output range\n");
+                flint_printf("i = %wd, k = %wd\n", i, k);
+                fflush(stdout);
+                flint_abort();
+            }
+
+            fmpz_sub(t, B + k, A + k);
+            if (!fmpz_divisible(t, prod))
+            {
+                flint_printf("FAIL: check crt modulo product of primes\n");
+                flint_printf("i = %wd, k = %wd\n", i, k);
+                fflush(stdout);
+                flint_abort();
+            }
+        }
+
+        _fmpz_vec_clear(A, len);
+        _fmpz_vec_clear(B, len);
+        for (j = 0; j < num_primes; j++)
+            _nmod_vec_clear(R[j]);
+        flint_free(R);
+    }
+
+    /* large prime sets, which evict each other from the cache */
+    for (i = 0; i < 16 * flint_test_multiplier(); i++)
+    {
+        const fmpz_comb_struct * comb;
+        fmpz_comb_temp_t comb_temp;
+        mp_ptr * R;
+
+        flint_set_num_threads(1);
+
+        flint_free(primes);
+        num_primes = 1000 + n_randint(state, 1000);
+        primes = FLINT_ARRAY_ALLOC(num_primes, mp_limb_t);
+
+        /* few distinct sets, so that evicted ones are requested again */
+        primes[0] = n_nextprime(UWORD(1) << (FLINT_BITS - 2 - n_randint(state, 3)), 1);
+        for (j = 1; j < num_primes; j++)
+            primes[j] = n_nextprime(primes[j - 1], 1);
+
+        R = FLINT_ARRAY_ALLOC(num_primes, mp_ptr);
+        for (j = 0; j < num_primes; j++)
+            R[j] = _nmod_vec_init(1);
+
+        fmpz_randtest(t, state, n_randint(state, num_primes*(FLINT_BITS - 2)) + 1);
+
+        comb = _fmpz_comb_cache(primes, num_primes);
+        fmpz_comb_temp_init(comb_temp, comb);
+        _fmpz_vec_multi_mod_ui(R, t, 1, comb, comb_temp);
+        fmpz_comb_temp_clear(comb_temp);
+
+        for (j = 0; j < num_primes; j++)
+        {
+            if (R[j][0] != fmpz_fdiv_ui(t, primes[j]))
+            {
+                flint_printf("FAIL: check multi_mod_ui with cache eviction\n");
+                flint_printf("i = %wd, j = %wd\n", i, j);
+                fflush(stdout);
+                flint_abort();
+            }
+        }
+
+        for (j = 0; j < num_primes; j++)
+            _nmod_vec_clear(R[j]);
+        flint_free(R);
+    }
+
+    flint_free(primes);
+    fmpz_clear(prod);
+    fmpz_clear(t);
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
@@ -0,0 +1,99 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "ulong_extras.h"
+
+int
+main(void)
+{
+    int i, result;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("product_tree....");
+    fflush(stdout);
+
+    for (i = 0; i < 1000 * flint_test_multiplier(); i++)
+    {
+        fmpz * a, * r;
+        fmpz ** tree;
+        fmpz_t x, p, m;
+        slong j, len, height;
+        int square;
+
+        len = n_randint(state, 50) + 1;
+        square = n_randint(state, 2);
+
+        if (n_randint(state, 8) == 0)
+            flint_set_num_threads(n_randint(state, 4) + 2);
+
+        a = _fmpz_vec_init(len);
+        r = _fmpz_vec_init(len);
+        fmpz_init(x);
+        fmpz_init(p);
+        fmpz_init(m);
+
+        for (j = 0; j < len; j++)
+        {
+            fmpz_randtest_unsigned(a + j, state, 100);
+            fmpz_add_ui(a + j, a + j, 1);
+        }
+
+        fmpz_randtest_unsigned(x, state, 100*len + 200);
+
+        height = _fmpz_vec_product_tree_height(len);
+        tree = _fmpz_vec_product_tree_alloc(len);
+        _fmpz_vec_product_tree_build(tree, a, len);
+        _fmpz_vec_remainder_tree(r, x, tree, len, square);
+
+        _fmpz_vec_prod(p, a, len);
+        result = fmpz_equal(p, tree[height]);
+
+        for (j = 0; j < len && result; j++)
+        {
+            if (square)
+                fmpz_mul(m, a + j, a + j);
+            else
+                fmpz_set(m, a + j);
+
+            fmpz_mod(p, x, m);
+            result = fmpz_equal(p, r + j);
+        }
+
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("len = %wd, square = %d\n", len, square);
+            _fmpz_vec_print(a, len), flint_printf("\n\n");
+            fmpz_print(x), flint_printf("\n\n");
+            abort();
+        }
+
+        _fmpz_vec_product_tree_free(tree, len);
+        _fmpz_vec_clear(a, len);
+        _fmpz_vec_clear(r, len);
+        fmpz_clear(x);
+        fmpz_clear(p);
+        fmpz_clear(m);
+
+        flint_set_num_threads(1);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+    
+    flint_printf("PASS\n");
+    return 0;
+}
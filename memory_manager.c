@@ -162,6 +162,221 @@ void flint_free(void * ptr)
    (*__flint_free_func)(ptr);
 }
 
+/*
+   Per-thread arenas: memory is carved off the top of a chain of chunks and
+   given back in LIFO order by releasing to a mark. Chunks are kept after a
+   release so that scratch heavy code running in a loop does not go back to
+   the allocator, as long as they amount to at most FLINT_ARENA_KEEP bytes
+   not in use, so that a thread does not hold on to its peak scratch space.
+*/
+
+/* allocations from an arena are aligned to this many bytes */
+#define FLINT_ARENA_ALIGN 16
+
+/* usable size of the first chunk of an arena */
+#define FLINT_ARENA_CHUNK (WORD(1) << 16)
+
+typedef struct flint_arena_chunk_struct
+{
+    struct flint_arena_chunk_struct * prev;
+    struct flint_arena_chunk_struct * next;
+    size_t start;   /* arena offset of the first byte of this chunk */
+    size_t size;    /* usable bytes in this chunk */
+} flint_arena_chunk_struct;
+
+/* chunk data starts this many bytes after the chunk header */
+#define FLINT_ARENA_HEADER \
+   (((sizeof(flint_arena_chunk_struct) - 1)/FLINT_ARENA_ALIGN + 1)*FLINT_ARENA_ALIGN)
+
+typedef struct
+{
+    flint_arena_chunk_struct * chunk; /* chunk containing the top */
+    size_t used;                      /* arena offset of the top */
+    size_t high_water;
+    size_t reserved;
+} flint_arena_struct;
+
+static void _flint_arena_free_chunks(flint_arena_chunk_struct * c)
+{
+    flint_arena_chunk_struct * next;
+
+    for ( ; c != NULL; c = next)
+    {
+        next = c->next;
+        flint_free(c);
+    }
+}
+
+#if FLINT_REENTRANT && !FLINT_USES_TLS
+
+static pthread_once_t arena_key_initialised = PTHREAD_ONCE_INIT;
+static pthread_key_t arena_key;
+
+static void _flint_arena_destroy(void * arg)
+{
+    flint_arena_struct * A = (flint_arena_struct *) arg;
+    flint_arena_chunk_struct * c = A->chunk;
+
+    while (c != NULL && c->prev != NULL)
+        c = c->prev;
+
+    _flint_arena_free_chunks(c);
+    flint_free(A);
+}
+
+static void _flint_arena_key_init(void)
+{
+    pthread_key_create(&arena_key, _flint_arena_destroy);
+}
+
+static flint_arena_struct * _flint_arena(void)
+{
+    flint_arena_struct * A;
+
+    pthread_once(&arena_key_initialised, _flint_arena_key_init);
+
+    A = (flint_arena_struct *) pthread_getspecific(arena_key);
+
+    if (A == NULL)
+    {
+        A = (flint_arena_struct *) flint_calloc(1, sizeof(flint_arena_struct));
+        pthread_setspecific(arena_key, A);
+    }
+
+    return A;
+}
+
+#else
+
+static FLINT_TLS_PREFIX flint_arena_struct _flint_arena_tls;
+
+#define _flint_arena() (&_flint_arena_tls)
+
+#endif
+
+size_t flint_arena_mark(void)
+{
+    return _flint_arena()->used;
+}
+
+void * flint_arena_alloc(size_t size)
+{
+    flint_arena_struct * A = _flint_arena();
+    flint_arena_chunk_struct * c = A->chunk;
+    void * ptr;
+
+    size = ((size + FLINT_ARENA_ALIGN - 1)/FLINT_ARENA_ALIGN)*FLINT_ARENA_ALIGN;
+
+    if (c == NULL || A->used + size > c->start + c->size)
+    {
+        if (c != NULL && c->next != NULL && c->next->size >= size)
+        {
+            c = c->next;
+        }
+        else
+        {
+            flint_arena_chunk_struct * d;
+            size_t n;
+
+            /* chunks after the top are too small to be reused */
+            if (c != NULL)
+            {
+                for (d = c->next; d != NULL; d = d->next)
+                    A->reserved -= d->size;
+
+                _flint_arena_free_chunks(c->next);
+                c->next = NULL;
+            }
+
+            n = (c == NULL) ? FLINT_ARENA_CHUNK : 2*c->size;
+            n = FLINT_MAX(n, size);
+
+            d = (flint_arena_chunk_struct *) flint_malloc(FLINT_ARENA_HEADER + n);
+            d->prev = c;
+            d->next = NULL;
+            d->size = n;
+            d->start = (c == NULL) ? 0 : c->start + c->size;
+
+            if (c != NULL)
+                c->next = d;
+
+            A->reserved += n;
+            c = d;
+        }
+
+        A->chunk = c;
+        A->used = c->start;
+    }
+
+    ptr = (char *) c + FLINT_ARENA_HEADER + (A->used - c->start);
+
+    A->used += size;
+    if (A->used > A->high_water)
+        A->high_water = A->used;
+
+    return ptr;
+}
+
+void flint_arena_release(size_t mark)
+{
+    flint_arena_struct * A = _flint_arena();
+    flint_arena_chunk_struct * c = A->chunk;
+
+    if (c == NULL)
+        return;
+
+    while (c->prev != NULL && mark < c->start)
+        c = c->prev;
+
+    A->chunk = c;
+    A->used = mark;
+
+    /* c->start + c->size is the number of bytes in chunks up to c */
+    if (A->reserved > FLINT_ARENA_KEEP)
+    {
+        flint_arena_chunk_struct * d = c;
+
+        while (d->next != NULL &&
+                   d->next->start + d->next->size - mark <= FLINT_ARENA_KEEP)
+            d = d->next;
+
+        A->reserved = d->start + d->size;
+        _flint_arena_free_chunks(d->next);
+        d->next = NULL;
+
+        if (mark == 0 && A->reserved > FLINT_ARENA_KEEP)
+        {
+            _flint_arena_free_chunks(c);
+            A->chunk = NULL;
+            A->reserved = 0;
+        }
+    }
+}
+
+void flint_arena_stats(flint_arena_stats_t stats)
+{
+    flint_arena_struct * A = _flint_arena();
+
+    stats->used = A->used;
+    stats->high_water = A->high_water;
+    stats->reserved = A->reserved;
+}
+
+void flint_arena_clear(void)
+{
+    flint_arena_struct * A = _flint_arena();
+    flint_arena_chunk_struct * c = A->chunk;
+
+    while (c != NULL && c->prev != NULL)
+        c = c->prev;
+
+    _flint_arena_free_chunks(c);
+
+    A->chunk = NULL;
+    A->used = 0;
+    A->high_water = 0;
+    A->reserved = 0;
+}
 
 FLINT_TLS_PREFIX size_t flint_num_cleanup_functions = 0;
 
@@ -195,6 +410,8 @@ void flint_register_cleanup_function(flint_cleanup_function_t cleanup_function)
 
 void _fmpz_cleanup();
 
+void n_cleanup_primes(void);
+
 void _flint_cleanup()
 {
     size_t i;
@@ -212,6 +429,7 @@ void _flint_cleanup()
 
     mpfr_free_cache();
     _fmpz_cleanup();
+    flint_arena_clear();
     
 #if FLINT_REENTRANT && !FLINT_USES_TLS
     pthread_mutex_unlock(&register_lock);
@@ -234,4 +452,7 @@ void flint_cleanup_master()
         global_thread_pool_initialized = 0;
     }
     _flint_cleanup();
+
+    /* also freed if threads which used it did not call flint_cleanup */
+    n_cleanup_primes();
 }
@@ -131,6 +131,10 @@ FLINT_DLL void nmod_mat_randtriu(nmod_mat_t mat, flint_rand_t state, int unit);
 
 FLINT_DLL void nmod_mat_print_pretty(const nmod_mat_t mat);
 
+FLINT_DLL int nmod_mat_fwrite_bin(FILE * file, const nmod_mat_t mat);
+
+FLINT_DLL int nmod_mat_fread_bin(FILE * file, nmod_mat_t mat);
+
 FLINT_DLL int nmod_mat_equal(const nmod_mat_t mat1, const nmod_mat_t mat2);
 
 FLINT_DLL void nmod_mat_zero(nmod_mat_t mat);
@@ -0,0 +1,60 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <gmp.h>
+#include "flint.h"
+#include "nmod_mat.h"
+#include "binfile.h"
+
+int nmod_mat_fread_bin(FILE * file, nmod_mat_t mat)
+{
+    flint_bin_header_t h;
+    slong i, j, r, c;
+
+    if (!flint_bin_header_fread(file, h, FLINT_BIN_NMOD_MAT) ||
+        h->dims[0] > WORD_MAX || h->dims[1] > WORD_MAX || h->num != 0 ||
+        (h->dims[1] != 0 && h->dims[0] > WORD_MAX/h->dims[1]) ||
+        h->data != h->dims[0]*h->dims[1] || h->dims[2] == 0)
+        return 0;
+
+    r = h->dims[0];
+    c = h->dims[1];
+
+    /* if the input is 0 by 0 then take the dimensions and modulus */
+    if (mat->r == 0 && mat->c == 0)
+    {
+        nmod_mat_clear(mat);
+        nmod_mat_init(mat, r, c, h->dims[2]);
+    }
+    else if (mat->r != r || mat->c != c || mat->mod.n != h->dims[2])
+        return 0;
+
+    if (!_flint_bin_fread(file, h, NULL, 0, 0, mat->rows, r, c))
+    {
+        nmod_mat_zero(mat);
+        return 0;
+    }
+
+    for (i = 0; i < r; i++)
+    {
+        for (j = 0; j < c; j++)
+        {
+            if (mat->rows[i][j] >= mat->mod.n)
+            {
+                nmod_mat_zero(mat);
+                return 0;
+            }
+        }
+    }
+
+    return 1;
+}
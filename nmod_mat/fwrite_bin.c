@@ -0,0 +1,28 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <gmp.h>
+#include "flint.h"
+#include "nmod_mat.h"
+#include "binfile.h"
+
+int nmod_mat_fwrite_bin(FILE * file, const nmod_mat_t mat)
+{
+    flint_bin_header_t h;
+
+    flint_bin_header_init(h, FLINT_BIN_NMOD_MAT);
+    h->dims[0] = mat->r;
+    h->dims[1] = mat->c;
+    h->dims[2] = mat->mod.n;
+
+    return _flint_bin_fwrite(file, h, NULL, 0, 0, mat->rows, mat->r, mat->c);
+}
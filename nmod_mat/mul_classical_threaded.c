@@ -1,6 +1,7 @@
 /*
     Copyright (C) 2010, 2012 Fredrik Johansson
     Copyright (C) 2020 William Hart
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -68,24 +69,50 @@ typedef struct
     int op;
 } nmod_mat_transpose_arg_t;
 
+static void
+_nmod_mat_addmul_transpose_tile(const nmod_mat_transpose_arg_t * arg,
+                                                             slong i, slong j)
+{
+    slong iend, jend, jstart;
+    slong k = arg->k;
+    const mp_ptr * A = arg->A;
+    const mp_ptr * C = arg->C;
+    mp_ptr * D = arg->D;
+    mp_ptr tmp = arg->tmp;
+    nmod_t mod = arg->mod;
+    slong nlimbs = arg->nlimbs;
+    int op = arg->op;
+    mp_limb_t c;
+
+    iend = FLINT_MIN(i + arg->block, arg->m);
+    jend = FLINT_MIN(j + arg->block, arg->n);
+    jstart = j;
+
+    for ( ; i < iend; i++)
+    {
+        for (j = jstart ; j < jend; j++)
+        {
+            c = _nmod_vec_dot(A[i], tmp + j*k, k, mod, nlimbs);
+
+            if (op == 1)
+                c = nmod_add(C[i][j], c, mod);
+            else if (op == -1)
+                c = nmod_sub(C[i][j], c, mod);
+
+            D[i][j] = c;
+        }
+    }
+}
+
 void
 _nmod_mat_addmul_transpose_worker(void * arg_ptr)
 {
     nmod_mat_transpose_arg_t arg = *((nmod_mat_transpose_arg_t *) arg_ptr);
-    slong i, j, iend, jend, jstart;
+    slong i, j;
     slong block = arg.block;
-    slong k = arg.k;
     slong m = arg.m;
     slong n = arg.n;
-    slong nlimbs = arg.nlimbs;
-    const mp_ptr * A = arg.A;
-    const mp_ptr * C = arg.C;
-    mp_ptr * D = arg.D;
-    mp_ptr tmp = arg.tmp;
-    nmod_t mod = arg.mod;
-    int op = arg.op;
-    mp_limb_t c;
-    
+
     while (1)
     {
 #if FLINT_USES_PTHREAD
@@ -107,32 +134,33 @@ _nmod_mat_addmul_transpose_worker(void * arg_ptr)
         if (i >= m)
             return;
 
-        iend = FLINT_MIN(i + block, m);
-        jend = FLINT_MIN(j + block, n);
-        jstart = j;
-
-        for ( ; i < iend; i++)
-        {
-            for (j = jstart ; j < jend; j++)
-            {
-                c = _nmod_vec_dot(A[i], tmp + j*k, k, mod, nlimbs);
+        _nmod_mat_addmul_transpose_tile(&arg, i, j);
+    }
+}
 
-                if (op == 1)
-                    c = nmod_add(C[i][j], c, mod);
-                else if (op == -1)
-                    c = nmod_sub(C[i][j], c, mod);
+/* tiles [t0, t1) in row major order, for the task scheduler */
+static void
+_nmod_mat_addmul_transpose_tiles(slong t0, slong t1, void * arg_ptr)
+{
+    const nmod_mat_transpose_arg_t * arg =
+                                   (const nmod_mat_transpose_arg_t *) arg_ptr;
+    slong nb = (arg->n + arg->block - 1)/arg->block;
 
-                D[i][j] = c;
-            }
-        }
-    }
+    for ( ; t0 < t1; t0++)
+        _nmod_mat_addmul_transpose_tile(arg,
+                               (t0 / nb)*arg->block, (t0 % nb)*arg->block);
 }
 
+/*
+    If use_tasks is set the tiles are handed to the task scheduler and
+    threads is ignored, otherwise they are shared out between the given
+    threads and this one, so that num_threads = 0 runs serially.
+*/
 static __inline__ void
 _nmod_mat_addmul_transpose_threaded_pool_op(mp_ptr * D, const mp_ptr * C,
                             const mp_ptr * A, const mp_ptr * B, slong m,
                           slong k, slong n, int op, nmod_t mod, int nlimbs,
-                               thread_pool_handle * threads, slong num_threads)
+              thread_pool_handle * threads, slong num_threads, int use_tasks)
 {
     mp_ptr tmp;
     slong i, j, block;
@@ -142,6 +170,9 @@ _nmod_mat_addmul_transpose_threaded_pool_op(mp_ptr * D, const mp_ptr * C,
     pthread_mutex_t mutex;
 #endif
 
+    if (use_tasks)
+        num_threads = flint_task_num_threads() - 1;
+
     tmp = flint_malloc(sizeof(mp_limb_t) * k * n);
 	    
     /* transpose B */
@@ -181,17 +212,25 @@ _nmod_mat_addmul_transpose_threaded_pool_op(mp_ptr * D, const mp_ptr * C,
     pthread_mutex_init(&mutex, NULL);
 #endif
 
-    for (i = 0; i < num_threads; i++)
+    if (use_tasks)
     {
-        thread_pool_wake(global_thread_pool, threads[i], 0,
-                _nmod_mat_addmul_transpose_worker, &args[i]);
+        flint_parallel_for(0, ((m + block - 1)/block)*((n + block - 1)/block),
+                                 1, _nmod_mat_addmul_transpose_tiles, args);
     }
+    else
+    {
+        for (i = 0; i < num_threads; i++)
+        {
+            thread_pool_wake(global_thread_pool, threads[i], 0,
+                    _nmod_mat_addmul_transpose_worker, &args[i]);
+        }
 
-    _nmod_mat_addmul_transpose_worker(&args[num_threads]);
+        _nmod_mat_addmul_transpose_worker(&args[num_threads]);
 
-    for (i = 0; i < num_threads; i++)
-    {
-        thread_pool_wait(global_thread_pool, threads[i]);
+        for (i = 0; i < num_threads; i++)
+        {
+            thread_pool_wait(global_thread_pool, threads[i]);
+        }
     }
 
 #if FLINT_USES_PTHREAD
@@ -226,28 +265,77 @@ typedef struct
     int op;
 } nmod_mat_packed_arg_t;
 
+static void
+_nmod_mat_addmul_packed_tile(const nmod_mat_packed_arg_t * arg,
+                                                             slong i, slong j)
+{
+    slong k, iend, jend, jstart;
+    slong K = arg->K;
+    slong N = arg->N;
+    const mp_ptr * A = arg->A;
+    const mp_ptr * C = arg->C;
+    mp_ptr * D = arg->D;
+    mp_ptr tmp = arg->tmp;
+    nmod_t mod = arg->mod;
+    mp_limb_t mask = arg->mask;
+    int pack = arg->pack;
+    int pack_bits = arg->pack_bits;
+    int op = arg->op;
+    mp_limb_t c, d;
+    mp_ptr Aptr, Tptr;
+
+    iend = FLINT_MIN(i + arg->block, arg->M);
+    jend = FLINT_MIN(j + arg->block, arg->Kpack);
+    jstart = j;
+
+    /* multiply */
+    for ( ; i < iend; i++)
+    {
+        for (j = jstart; j < jend; j++)
+        {
+            Aptr = A[i];
+            Tptr = tmp + j * N;
+
+            c = 0;
+
+            /* unroll by 4 */
+            for (k = 0; k + 4 <= N; k += 4)
+            {
+                c += Aptr[k + 0] * Tptr[k + 0];
+                c += Aptr[k + 1] * Tptr[k + 1];
+                c += Aptr[k + 2] * Tptr[k + 2];
+                c += Aptr[k + 3] * Tptr[k + 3];
+            }
+
+            for ( ; k < N; k++)
+                c += Aptr[k] * Tptr[k];
+
+            /* unpack and reduce */
+            for (k = 0; k < pack && j * pack + k < K; k++)
+            {
+                d = (c >> (k * pack_bits)) & mask;
+                NMOD_RED(d, d, mod);
+
+                if (op == 1)
+                    d = nmod_add(C[i][j * pack + k], d, mod);
+                else if (op == -1)
+                    d = nmod_sub(C[i][j * pack + k], d, mod);
+
+                D[i][j * pack + k] = d;
+            }
+        }
+    }
+}
+
 void
 _nmod_mat_addmul_packed_worker(void * arg_ptr)
 {
     nmod_mat_packed_arg_t arg = *((nmod_mat_packed_arg_t *) arg_ptr);
-    slong i, j, k, iend, jend, jstart;
+    slong i, j;
     slong block = arg.block;
     slong M = arg.M;
-    slong K = arg.K;
-    slong N = arg.N;
     slong Kpack = arg.Kpack;
-    const mp_ptr * A = arg.A;
-    const mp_ptr * C = arg.C;
-    mp_ptr * D = arg.D;
-    mp_ptr tmp = arg.tmp;
-    nmod_t mod = arg.mod;
-    mp_limb_t mask = arg.mask;
-    int pack = arg.pack;
-    int pack_bits = arg.pack_bits;
-    int op = arg.op;
-    mp_limb_t c, d;
-    mp_ptr Aptr, Tptr;
-    
+
     while (1)
     {
 #if FLINT_USES_PTHREAD
@@ -269,56 +357,28 @@ _nmod_mat_addmul_packed_worker(void * arg_ptr)
         if (i >= M)
             return;
 
-        iend = FLINT_MIN(i + block, M);
-        jend = FLINT_MIN(j + block, Kpack);
-        jstart = j;
-
-        /* multiply */
-        for ( ; i < iend; i++)
-        {
-            for (j = jstart; j < jend; j++)
-            {
-                Aptr = A[i];
-                Tptr = tmp + j * N;
-
-                c = 0;
-
-                /* unroll by 4 */
-                for (k = 0; k + 4 <= N; k += 4)
-                {
-                    c += Aptr[k + 0] * Tptr[k + 0];
-                    c += Aptr[k + 1] * Tptr[k + 1];
-                    c += Aptr[k + 2] * Tptr[k + 2];
-                    c += Aptr[k + 3] * Tptr[k + 3];
-                }
-
-                for ( ; k < N; k++)
-                    c += Aptr[k] * Tptr[k];
-
-                /* unpack and reduce */
-                for (k = 0; k < pack && j * pack + k < K; k++)
-                {
-                    d = (c >> (k * pack_bits)) & mask;
-                    NMOD_RED(d, d, mod);
-
-                    if (op == 1)
-                        d = nmod_add(C[i][j * pack + k], d, mod);
-                    else if (op == -1)
-                        d = nmod_sub(C[i][j * pack + k], d, mod);
-
-                    D[i][j * pack + k] = d;
-                }
-            }
-        }
+        _nmod_mat_addmul_packed_tile(&arg, i, j);
     }
 }
 
-/* requires nlimbs = 1 */
+/* tiles [t0, t1) in row major order, for the task scheduler */
+static void
+_nmod_mat_addmul_packed_tiles(slong t0, slong t1, void * arg_ptr)
+{
+    const nmod_mat_packed_arg_t * arg = (const nmod_mat_packed_arg_t *) arg_ptr;
+    slong nb = (arg->Kpack + arg->block - 1)/arg->block;
+
+    for ( ; t0 < t1; t0++)
+        _nmod_mat_addmul_packed_tile(arg,
+                               (t0 / nb)*arg->block, (t0 % nb)*arg->block);
+}
+
+/* requires nlimbs = 1, use_tasks as for the transpose version */
 void
 _nmod_mat_addmul_packed_threaded_pool_op(mp_ptr * D,
       const mp_ptr * C, const mp_ptr * A, const mp_ptr * B,
           slong M, slong N, slong K, int op, nmod_t mod, int nlimbs,
-                               thread_pool_handle * threads, slong num_threads)
+              thread_pool_handle * threads, slong num_threads, int use_tasks)
 {
     slong i, j, k;
     slong Kpack, block;
@@ -331,6 +391,9 @@ _nmod_mat_addmul_packed_threaded_pool_op(mp_ptr * D,
     pthread_mutex_t mutex;
 #endif
 
+    if (use_tasks)
+        num_threads = flint_task_num_threads() - 1;
+
     /* bound unreduced entry */
     c = N * (mod.n-1) * (mod.n-1);
     pack_bits = FLINT_BIT_COUNT(c);
@@ -393,17 +456,25 @@ _nmod_mat_addmul_packed_threaded_pool_op(mp_ptr * D,
     pthread_mutex_init(&mutex, NULL);
 #endif
 
-    for (i = 0; i < num_threads; i++)
+    if (use_tasks)
     {
-        thread_pool_wake(global_thread_pool, threads[i],
-             0, _nmod_mat_addmul_packed_worker, &args[i]);
+        flint_parallel_for(0, ((M + block - 1)/block)*((Kpack + block - 1)/block),
+                                    1, _nmod_mat_addmul_packed_tiles, args);
     }
+    else
+    {
+        for (i = 0; i < num_threads; i++)
+        {
+            thread_pool_wake(global_thread_pool, threads[i],
+                 0, _nmod_mat_addmul_packed_worker, &args[i]);
+        }
 
-    _nmod_mat_addmul_packed_worker(&args[num_threads]);
+        _nmod_mat_addmul_packed_worker(&args[num_threads]);
 
-    for (i = 0; i < num_threads; i++)
-    {
-        thread_pool_wait(global_thread_pool, threads[i]);
+        for (i = 0; i < num_threads; i++)
+        {
+            thread_pool_wait(global_thread_pool, threads[i]);
+        }
     }
 
 #if FLINT_USES_PTHREAD
@@ -415,10 +486,10 @@ _nmod_mat_addmul_packed_threaded_pool_op(mp_ptr * D,
     _nmod_vec_clear(tmp);
 }
 
-void
-_nmod_mat_mul_classical_threaded_pool_op(nmod_mat_t D, const nmod_mat_t C,
+static void
+_nmod_mat_mul_classical_threaded_op_mode(nmod_mat_t D, const nmod_mat_t C,
                             const nmod_mat_t A, const nmod_mat_t B, int op,
-                               thread_pool_handle * threads, slong num_threads)
+              thread_pool_handle * threads, slong num_threads, int use_tasks)
 {
     slong m, k, n;
     int nlimbs;
@@ -434,7 +505,8 @@ _nmod_mat_mul_classical_threaded_pool_op(nmod_mat_t D, const nmod_mat_t C,
     if (nlimbs == 1 && m > 10 && k > 10 && n > 10)
     {
         _nmod_mat_addmul_packed_threaded_pool_op(D->rows, (op == 0) ? NULL : C->rows,
-            A->rows, B->rows, m, k, n, op, D->mod, nlimbs, threads, num_threads);
+            A->rows, B->rows, m, k, n, op, D->mod, nlimbs,
+                                               threads, num_threads, use_tasks);
     }
     else
     {
@@ -442,17 +514,24 @@ _nmod_mat_mul_classical_threaded_pool_op(nmod_mat_t D, const nmod_mat_t C,
             nlimbs = 1;
 
         _nmod_mat_addmul_transpose_threaded_pool_op(D->rows, (op == 0) ? NULL : C->rows,
-            A->rows, B->rows, m, k, n, op, D->mod, nlimbs, threads, num_threads);
+            A->rows, B->rows, m, k, n, op, D->mod, nlimbs,
+                                               threads, num_threads, use_tasks);
     }
 }
 
+void
+_nmod_mat_mul_classical_threaded_pool_op(nmod_mat_t D, const nmod_mat_t C,
+                            const nmod_mat_t A, const nmod_mat_t B, int op,
+                               thread_pool_handle * threads, slong num_threads)
+{
+    _nmod_mat_mul_classical_threaded_op_mode(D, C, A, B, op,
+                                                      threads, num_threads, 0);
+}
+
 void
 _nmod_mat_mul_classical_threaded_op(nmod_mat_t D, const nmod_mat_t C,
             const nmod_mat_t A, const nmod_mat_t B, int op)
 {
-    thread_pool_handle * threads;
-    slong num_threads;
-    
     if (A->c == 0)
     {
         if (op == 0)
@@ -475,11 +554,9 @@ _nmod_mat_mul_classical_threaded_op(nmod_mat_t D, const nmod_mat_t C,
         return;
     }
 
-    num_threads = flint_request_threads(&threads, flint_get_num_threads());
-
-    _nmod_mat_mul_classical_threaded_pool_op(D, C, A, B, op, threads, num_threads);
-
-    flint_give_back_threads(threads, num_threads);
+    /* the tiles are scheduled as tasks, which also lets this run in
+       parallel when called from inside another parallel region */
+    _nmod_mat_mul_classical_threaded_op_mode(D, C, A, B, op, NULL, 0, 1);
 }
 
 void
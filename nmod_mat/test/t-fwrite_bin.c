@@ -0,0 +1,89 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "nmod_mat.h"
+#include "ulong_extras.h"
+
+int main(void)
+{
+    int i, result;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("fwrite_bin....");
+    fflush(stdout);
+
+    for (i = 0; i < 1000 * flint_test_multiplier(); i++)
+    {
+        nmod_mat_t A, B, C;
+        slong r, c;
+        mp_limb_t n;
+        FILE * file;
+
+        r = n_randint(state, 10);
+        c = n_randint(state, 10);
+        n = n_randtest_not_zero(state);
+
+        nmod_mat_init(A, r, c, n);
+        nmod_mat_init(B, 0, 0, 2);
+        nmod_mat_init(C, r, c, n == 1 ? 2 : n - 1);
+
+        nmod_mat_randtest(A, state);
+
+        if (r > 1)
+            nmod_mat_swap_rows(A, NULL, 0, r - 1);
+
+        file = tmpfile();
+        if (file == NULL)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("could not open a temporary file\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        result = nmod_mat_fwrite_bin(file, A);
+        rewind(file);
+        result = result && nmod_mat_fread_bin(file, B);
+        result = result && nmod_mat_equal(A, B) && B->mod.n == n;
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            nmod_mat_print_pretty(A); flint_printf("\n\n");
+            nmod_mat_print_pretty(B); flint_printf("\n\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        /* the modulus must match unless the matrix is 0 by 0 */
+        rewind(file);
+        result = (r == 0 && c == 0) || !nmod_mat_fread_bin(file, C);
+        if (!result)
+        {
+            flint_printf("FAIL (modulus):\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        fclose(file);
+
+        nmod_mat_clear(A);
+        nmod_mat_clear(B);
+        nmod_mat_clear(C);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
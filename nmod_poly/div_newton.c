@@ -22,8 +22,11 @@ void _nmod_poly_div_newton(mp_ptr Q, mp_srcptr A, slong lenA,
 {
     const slong lenQ = lenA - lenB + 1;
     mp_ptr Arev, Brev;
+    FLINT_ARENA_INIT;
 
-    Arev = _nmod_vec_init(2 * lenQ);
+    FLINT_ARENA_START;
+
+    Arev = FLINT_ARENA_ARRAY_ALLOC(2 * lenQ, mp_limb_t);
     Brev = Arev + lenQ;
 
     _nmod_poly_reverse(Arev, A + (lenA - lenQ), lenQ, lenQ);
@@ -43,7 +46,7 @@ void _nmod_poly_div_newton(mp_ptr Q, mp_srcptr A, slong lenA,
 
     _nmod_poly_reverse(Q, Q, lenQ, lenQ);
 
-    _nmod_vec_clear(Arev);
+    FLINT_ARENA_END;
 }
 
 void nmod_poly_div_newton(nmod_poly_t Q, const nmod_poly_t A,
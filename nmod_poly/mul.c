@@ -15,6 +15,7 @@
 #include "flint.h"
 #include "nmod_vec.h"
 #include "nmod_poly.h"
+#include "tuning.h"
 
 void _nmod_poly_mul(mp_ptr res, mp_srcptr poly1, slong len1, 
                              mp_srcptr poly2, slong len2, nmod_t mod)
@@ -32,9 +33,10 @@ void _nmod_poly_mul(mp_ptr res, mp_srcptr poly1, slong len1,
 
     if (3 * cutoff_len < 2 * FLINT_MAX(bits, 10))
         _nmod_poly_mul_classical(res, poly1, len1, poly2, len2, mod);
-    else if (cutoff_len * bits < 800)
+    else if (cutoff_len * bits < FLINT_TUNE(FLINT_TUNE_NMOD_POLY_MUL_KS2))
         _nmod_poly_mul_KS(res, poly1, len1, poly2, len2, 0, mod);
-    else if (cutoff_len * (bits + 1) * (bits + 1) < 100000)
+    else if (cutoff_len * (bits + 1) * (bits + 1)
+                                  < FLINT_TUNE(FLINT_TUNE_NMOD_POLY_MUL_KS4))
         _nmod_poly_mul_KS2(res, poly1, len1, poly2, len2, mod);
     else
         _nmod_poly_mul_KS4(res, poly1, len1, poly2, len2, mod);
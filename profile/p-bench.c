@@ -0,0 +1,835 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+/*
+    Unified benchmark driver.
+
+    A registry of kernels is swept over sizes, bit sizes and thread counts.
+    Each configuration is timed over a number of repetitions and the median
+    and median absolute deviation (MAD) of the time per call are reported.
+    Results can be written as JSON and two result files can be compared,
+    flagging regressions. Run with -h for the options.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <gmp.h>
+#include "profiler.h"
+#include "flint.h"
+#include "ulong_extras.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "fmpz_poly.h"
+#include "fmpz_mat.h"
+#include "fmpz_mpoly.h"
+#include "nmod_poly.h"
+#include "nmod_mat.h"
+#include "fft.h"
+
+#define MAX_LIST 64
+#define MAX_REPS 1000
+
+/*
+    A kernel sets up its operands for a given size and bit size, is run
+    repeatedly on them, and then cleared. The meaning of "size" and "bits"
+    is up to the kernel and is described in the registry below.
+*/
+typedef struct
+{
+    const char * name;
+    const char * desc;
+    void * (*init)(slong size, slong bits, flint_rand_t state);
+    void (*run)(void * data);
+    void (*clear)(void * data);
+    slong sizes[8];   /* default sweep, zero terminated */
+    slong bits[8];
+    int threaded;
+} bench_kernel_struct;
+
+/******************************************************************************
+
+    Kernels
+
+******************************************************************************/
+
+typedef struct
+{
+    fmpz * a;
+    fmpz * b;
+    fmpz * c;
+    slong len;
+} fmpz_vec_data_t;
+
+static void * fmpz_mul_init(slong size, slong bits, flint_rand_t state)
+{
+    fmpz_vec_data_t * d = flint_malloc(sizeof(fmpz_vec_data_t));
+
+    d->len = size;
+    d->a = _fmpz_vec_init(size);
+    d->b = _fmpz_vec_init(size);
+    d->c = _fmpz_vec_init(size);
+    _fmpz_vec_randtest(d->a, state, size, bits);
+    _fmpz_vec_randtest(d->b, state, size, bits);
+
+    return d;
+}
+
+static void fmpz_mul_run(void * data)
+{
+    fmpz_vec_data_t * d = data;
+    slong i;
+
+    for (i = 0; i < d->len; i++)
+        fmpz_mul(d->c + i, d->a + i, d->b + i);
+}
+
+static void fmpz_mul_clear(void * data)
+{
+    fmpz_vec_data_t * d = data;
+
+    _fmpz_vec_clear(d->a, d->len);
+    _fmpz_vec_clear(d->b, d->len);
+    _fmpz_vec_clear(d->c, d->len);
+    flint_free(d);
+}
+
+typedef struct
+{
+    mp_ptr a;
+    mp_ptr b;
+    mp_ptr c;
+    slong n;
+} mpn_data_t;
+
+static void * mpn_mul_fft_init(slong size, slong bits, flint_rand_t state)
+{
+    mpn_data_t * d = flint_malloc(sizeof(mpn_data_t));
+
+    d->n = size;
+    d->a = flint_malloc(size*sizeof(mp_limb_t));
+    d->b = flint_malloc(size*sizeof(mp_limb_t));
+    d->c = flint_malloc(2*size*sizeof(mp_limb_t));
+    flint_mpn_urandomb(d->a, state->gmp_state, size*FLINT_BITS);
+    flint_mpn_urandomb(d->b, state->gmp_state, size*FLINT_BITS);
+
+    return d;
+}
+
+static void mpn_mul_fft_run(void * data)
+{
+    mpn_data_t * d = data;
+
+    flint_mpn_mul_fft_main(d->c, d->a, d->n, d->b, d->n);
+}
+
+static void mpn_mul_fft_clear(void * data)
+{
+    mpn_data_t * d = data;
+
+    flint_free(d->a);
+    flint_free(d->b);
+    flint_free(d->c);
+    flint_free(d);
+}
+
+typedef struct
+{
+    nmod_poly_t a;
+    nmod_poly_t b;
+    nmod_poly_t c;
+} nmod_poly_data_t;
+
+static void * nmod_poly_mul_init(slong size, slong bits, flint_rand_t state)
+{
+    nmod_poly_data_t * d = flint_malloc(sizeof(nmod_poly_data_t));
+    mp_limb_t n = n_randprime(state, FLINT_MAX(2, FLINT_MIN(bits, FLINT_BITS)), 0);
+
+    nmod_poly_init(d->a, n);
+    nmod_poly_init(d->b, n);
+    nmod_poly_init(d->c, n);
+    nmod_poly_randtest(d->a, state, size);
+    nmod_poly_randtest(d->b, state, size);
+
+    return d;
+}
+
+static void nmod_poly_mul_run(void * data)
+{
+    nmod_poly_data_t * d = data;
+
+    nmod_poly_mul(d->c, d->a, d->b);
+}
+
+static void nmod_poly_mul_clear(void * data)
+{
+    nmod_poly_data_t * d = data;
+
+    nmod_poly_clear(d->a);
+    nmod_poly_clear(d->b);
+    nmod_poly_clear(d->c);
+    flint_free(d);
+}
+
+typedef struct
+{
+    fmpz_poly_t a;
+    fmpz_poly_t b;
+    fmpz_poly_t c;
+} fmpz_poly_data_t;
+
+static void * fmpz_poly_mul_init(slong size, slong bits, flint_rand_t state)
+{
+    fmpz_poly_data_t * d = flint_malloc(sizeof(fmpz_poly_data_t));
+
+    fmpz_poly_init(d->a);
+    fmpz_poly_init(d->b);
+    fmpz_poly_init(d->c);
+    fmpz_poly_randtest(d->a, state, size, bits);
+    fmpz_poly_randtest(d->b, state, size, bits);
+
+    return d;
+}
+
+static void fmpz_poly_mul_run(void * data)
+{
+    fmpz_poly_data_t * d = data;
+
+    fmpz_poly_mul(d->c, d->a, d->b);
+}
+
+static void fmpz_poly_mul_clear(void * data)
+{
+    fmpz_poly_data_t * d = data;
+
+    fmpz_poly_clear(d->a);
+    fmpz_poly_clear(d->b);
+    fmpz_poly_clear(d->c);
+    flint_free(d);
+}
+
+typedef struct
+{
+    nmod_mat_t a;
+    nmod_mat_t b;
+    nmod_mat_t c;
+} nmod_mat_data_t;
+
+static void * nmod_mat_mul_init(slong size, slong bits, flint_rand_t state)
+{
+    nmod_mat_data_t * d = flint_malloc(sizeof(nmod_mat_data_t));
+    mp_limb_t n = n_randprime(state, FLINT_MAX(2, FLINT_MIN(bits, FLINT_BITS)), 0);
+
+    nmod_mat_init(d->a, size, size, n);
+    nmod_mat_init(d->b, size, size, n);
+    nmod_mat_init(d->c, size, size, n);
+    nmod_mat_randfull(d->a, state);
+    nmod_mat_randfull(d->b, state);
+
+    return d;
+}
+
+static void nmod_mat_mul_run(void * data)
+{
+    nmod_mat_data_t * d = data;
+
+    nmod_mat_mul(d->c, d->a, d->b);
+}
+
+static void nmod_mat_mul_clear(void * data)
+{
+    nmod_mat_data_t * d = data;
+
+    nmod_mat_clear(d->a);
+    nmod_mat_clear(d->b);
+    nmod_mat_clear(d->c);
+    flint_free(d);
+}
+
+typedef struct
+{
+    fmpz_mat_t a;
+    fmpz_mat_t b;
+    fmpz_mat_t c;
+} fmpz_mat_data_t;
+
+static void * fmpz_mat_mul_init(slong size, slong bits, flint_rand_t state)
+{
+    fmpz_mat_data_t * d = flint_malloc(sizeof(fmpz_mat_data_t));
+
+    fmpz_mat_init(d->a, size, size);
+    fmpz_mat_init(d->b, size, size);
+    fmpz_mat_init(d->c, size, size);
+    fmpz_mat_randbits(d->a, state, bits);
+    fmpz_mat_randbits(d->b, state, bits);
+
+    return d;
+}
+
+static void fmpz_mat_mul_run(void * data)
+{
+    fmpz_mat_data_t * d = data;
+
+    fmpz_mat_mul(d->c, d->a, d->b);
+}
+
+static void fmpz_mat_mul_clear(void * data)
+{
+    fmpz_mat_data_t * d = data;
+
+    fmpz_mat_clear(d->a);
+    fmpz_mat_clear(d->b);
+    fmpz_mat_clear(d->c);
+    flint_free(d);
+}
+
+typedef struct
+{
+    fmpz_mpoly_ctx_t ctx;
+    fmpz_mpoly_t a;
+    fmpz_mpoly_t b;
+    fmpz_mpoly_t c;
+} fmpz_mpoly_data_t;
+
+static void * fmpz_mpoly_mul_init(slong size, slong bits, flint_rand_t state)
+{
+    fmpz_mpoly_data_t * d = flint_malloc(sizeof(fmpz_mpoly_data_t));
+
+    fmpz_mpoly_ctx_init(d->ctx, 4, ORD_DEGREVLEX);
+    fmpz_mpoly_init(d->a, d->ctx);
+    fmpz_mpoly_init(d->b, d->ctx);
+    fmpz_mpoly_init(d->c, d->ctx);
+    fmpz_mpoly_randtest_bound(d->a, state, size, bits, 20, d->ctx);
+    fmpz_mpoly_randtest_bound(d->b, state, size, bits, 20, d->ctx);
+
+    return d;
+}
+
+static void fmpz_mpoly_mul_run(void * data)
+{
+    fmpz_mpoly_data_t * d = data;
+
+    fmpz_mpoly_mul(d->c, d->a, d->b, d->ctx);
+}
+
+static void fmpz_mpoly_mul_clear(void * data)
+{
+    fmpz_mpoly_data_t * d = data;
+
+    fmpz_mpoly_clear(d->a, d->ctx);
+    fmpz_mpoly_clear(d->b, d->ctx);
+    fmpz_mpoly_clear(d->c, d->ctx);
+    fmpz_mpoly_ctx_clear(d->ctx);
+    flint_free(d);
+}
+
+static const bench_kernel_struct bench_kernels[] =
+{
+    {"fmpz_mul", "size = number of products, bits = operand bits",
+        fmpz_mul_init, fmpz_mul_run, fmpz_mul_clear,
+        {1000, 0}, {30, 62, 200, 2000, 20000, 0}, 0},
+    {"mpn_mul_fft", "size = operand limbs, bits unused",
+        mpn_mul_fft_init, mpn_mul_fft_run, mpn_mul_fft_clear,
+        {1000, 10000, 100000, 0}, {64, 0}, 0},
+    {"nmod_poly_mul", "size = length, bits = modulus bits",
+        nmod_poly_mul_init, nmod_poly_mul_run, nmod_poly_mul_clear,
+        {10, 100, 1000, 10000, 0}, {20, 40, 64, 0}, 0},
+    {"fmpz_poly_mul", "size = length, bits = coefficient bits",
+        fmpz_poly_mul_init, fmpz_poly_mul_run, fmpz_poly_mul_clear,
+        {10, 100, 1000, 10000, 0}, {10, 64, 1000, 0}, 0},
+    {"nmod_mat_mul", "size = dimension, bits = modulus bits",
+        nmod_mat_mul_init, nmod_mat_mul_run, nmod_mat_mul_clear,
+        {50, 200, 500, 0}, {20, 64, 0}, 1},
+    {"fmpz_mat_mul", "size = dimension, bits = entry bits",
+        fmpz_mat_mul_init, fmpz_mat_mul_run, fmpz_mat_mul_clear,
+        {20, 100, 300, 0}, {10, 64, 500, 0}, 1},
+    {"fmpz_mpoly_mul", "size = terms, bits = coefficient bits (4 vars)",
+        fmpz_mpoly_mul_init, fmpz_mpoly_mul_run, fmpz_mpoly_mul_clear,
+        {100, 1000, 5000, 0}, {10, 200, 0}, 1}
+};
+
+#define NUM_KERNELS (sizeof(bench_kernels)/sizeof(bench_kernel_struct))
+
+/******************************************************************************
+
+    Timing and statistics
+
+******************************************************************************/
+
+static double wall_seconds(void)
+{
+    struct timeval tv;
+
+    gettimeofday(&tv, 0);
+
+    return tv.tv_sec + tv.tv_usec*1e-6;
+}
+
+static int cmp_double(const void * a, const void * b)
+{
+    double x = *(const double *) a, y = *(const double *) b;
+
+    return (x > y) - (x < y);
+}
+
+/* median of the sorted array t of length n */
+static double median_sorted(const double * t, slong n)
+{
+    return (n % 2) ? t[n/2] : 0.5*(t[n/2 - 1] + t[n/2]);
+}
+
+typedef struct
+{
+    double median;
+    double mad;
+    double min;
+    slong count;
+} bench_result_t;
+
+/*
+    Time k->run on data. The number of calls per sample is chosen so that a
+    sample lasts at least min_time seconds, then reps samples are taken.
+*/
+static void bench_time(bench_result_t * res, const bench_kernel_struct * k,
+                                      void * data, slong reps, double min_time)
+{
+    double t[MAX_REPS], dev[MAX_REPS], t0, t1;
+    slong i, j, count = 1;
+
+    /* warm up and calibrate */
+    while (1)
+    {
+        t0 = wall_seconds();
+        for (j = 0; j < count; j++)
+            k->run(data);
+        t1 = wall_seconds();
+
+        if (t1 - t0 >= min_time || count >= (WORD(1) << 30))
+            break;
+
+        if (t1 - t0 <= min_time/100)
+            count *= 10;
+        else
+            count = (slong) (count*1.2*min_time/(t1 - t0)) + 1;
+    }
+
+    for (i = 0; i < reps; i++)
+    {
+        t0 = wall_seconds();
+        for (j = 0; j < count; j++)
+            k->run(data);
+        t1 = wall_seconds();
+        t[i] = (t1 - t0)/count;
+    }
+
+    qsort(t, reps, sizeof(double), cmp_double);
+    res->median = median_sorted(t, reps);
+    res->min = t[0];
+    res->count = count;
+
+    for (i = 0; i < reps; i++)
+        dev[i] = t[i] > res->median ? t[i] - res->median : res->median - t[i];
+
+    qsort(dev, reps, sizeof(double), cmp_double);
+    res->mad = median_sorted(dev, reps);
+}
+
+/******************************************************************************
+
+    Comparison of two result files
+
+******************************************************************************/
+
+typedef struct
+{
+    char kernel[64];
+    slong size;
+    slong bits;
+    slong threads;
+    double median;
+    double mad;
+} bench_entry_t;
+
+/* value following "key": on line, or NULL */
+static const char * json_field(const char * line, const char * key)
+{
+    char pat[80];
+    const char * s;
+
+    flint_sprintf(pat, "\"%s\":", key);
+    s = strstr(line, pat);
+
+    if (s == NULL)
+        return NULL;
+
+    s += strlen(pat);
+    while (*s == ' ')
+        s++;
+
+    return s;
+}
+
+/*
+    Read the results of a file written by this program, which puts one
+    result object per line. Returns the number of entries or -1.
+*/
+static slong bench_read(bench_entry_t ** entries, const char * filename)
+{
+    FILE * f;
+    char line[1024];
+    slong n = 0, alloc = 16;
+    const char * s;
+
+    f = fopen(filename, "r");
+    if (f == NULL)
+        return -1;
+
+    *entries = flint_malloc(alloc*sizeof(bench_entry_t));
+
+    while (fgets(line, sizeof(line), f) != NULL)
+    {
+        bench_entry_t * e;
+        size_t l;
+
+        if ((s = json_field(line, "kernel")) == NULL || *s != '"')
+            continue;
+
+        if (n == alloc)
+        {
+            alloc *= 2;
+            *entries = flint_realloc(*entries, alloc*sizeof(bench_entry_t));
+        }
+
+        e = *entries + n;
+
+        s++;
+        for (l = 0; s[l] != '"' && s[l] != '\0' && l < sizeof(e->kernel) - 1; l++)
+            e->kernel[l] = s[l];
+        e->kernel[l] = '\0';
+
+        if ((s = json_field(line, "size")) == NULL)
+            continue;
+        e->size = strtol(s, NULL, 10);
+
+        if ((s = json_field(line, "bits")) == NULL)
+            continue;
+        e->bits = strtol(s, NULL, 10);
+
+        if ((s = json_field(line, "threads")) == NULL)
+            continue;
+        e->threads = strtol(s, NULL, 10);
+
+        if ((s = json_field(line, "median")) == NULL)
+            continue;
+        e->median = strtod(s, NULL);
+
+        if ((s = json_field(line, "mad")) == NULL)
+            continue;
+        e->mad = strtod(s, NULL);
+
+        n++;
+    }
+
+    fclose(f);
+
+    return n;
+}
+
+/*
+    A configuration regresses if its median got slower by more than tol
+    (a fraction) and the difference is not explained by the noise, taken
+    to be three times the sum of the MADs.
+*/
+static int bench_compare(const char * oldfile, const char * newfile, double tol)
+{
+    bench_entry_t * old, * new;
+    slong nold, nnew, i, j, regressions = 0, matched = 0;
+
+    nold = bench_read(&old, oldfile);
+    if (nold < 0)
+    {
+        flint_printf("could not read %s\n", oldfile);
+        return 2;
+    }
+
+    nnew = bench_read(&new, newfile);
+    if (nnew < 0)
+    {
+        flint_printf("could not read %s\n", newfile);
+        flint_free(old);
+        return 2;
+    }
+
+    flint_printf("%-16s %8s %6s %4s %12s %12s %8s\n",
+              "kernel", "size", "bits", "thr", "old (s)", "new (s)", "ratio");
+
+    for (i = 0; i < nnew; i++)
+    {
+        bench_entry_t * b = new + i;
+
+        for (j = 0; j < nold; j++)
+        {
+            bench_entry_t * a = old + j;
+            double ratio, noise;
+            const char * flag = "";
+
+            if (strcmp(a->kernel, b->kernel) != 0 || a->size != b->size ||
+                a->bits != b->bits || a->threads != b->threads)
+                continue;
+
+            matched++;
+            ratio = b->median/a->median;
+            noise = 3*(a->mad + b->mad);
+
+            if (ratio > 1 + tol && b->median - a->median > noise)
+            {
+                flag = "  REGRESSION";
+                regressions++;
+            }
+            else if (ratio < 1 - tol && a->median - b->median > noise)
+                flag = "  improved";
+
+            flint_printf("%-16s %8wd %6wd %4wd %12.4e %12.4e %8.3f%s\n",
+                      b->kernel, b->size, b->bits, b->threads,
+                      a->median, b->median, ratio, flag);
+            break;
+        }
+    }
+
+    flint_printf("%wd configurations compared, %wd regressions (tolerance %.1f%%)\n",
+                                              matched, regressions, 100*tol);
+
+    flint_free(old);
+    flint_free(new);
+
+    return regressions != 0;
+}
+
+/******************************************************************************
+
+    Driver
+
+******************************************************************************/
+
+/* parse a comma separated list of integers, returns the number read */
+static slong parse_list(slong * list, const char * s)
+{
+    slong n = 0;
+    char * end;
+
+    while (*s != '\0' && n < MAX_LIST - 1)
+    {
+        list[n++] = strtol(s, &end, 10);
+        if (end == s)
+            return -1;
+        s = end;
+        if (*s == ',')
+            s++;
+    }
+
+    list[n] = 0;
+    return n;
+}
+
+static int kernel_selected(const char * name, const char * list)
+{
+    size_t l = strlen(name);
+    const char * s = list;
+
+    if (list == NULL)
+        return 1;
+
+    while ((s = strstr(s, name)) != NULL)
+    {
+        if ((s == list || s[-1] == ',') && (s[l] == ',' || s[l] == '\0'))
+            return 1;
+        s += l;
+    }
+
+    return 0;
+}
+
+static void usage(void)
+{
+    flint_printf(
+"usage: p-bench [options]\n"
+"       p-bench -c old.json new.json [-x tolerance]\n\n"
+"  -l             list the kernels\n"
+"  -k k1,k2,...   kernels to run (default: all)\n"
+"  -n n1,n2,...   sizes (default: per kernel)\n"
+"  -b b1,b2,...   bit sizes (default: per kernel)\n"
+"  -t t1,t2,...   thread counts for threaded kernels (default: 1)\n"
+"  -r reps        repetitions per configuration (default: 11)\n"
+"  -m ms          minimum time of one repetition (default: 20)\n"
+"  -o file        write the results as JSON to file\n"
+"  -c old new     compare two result files, exit status 1 on regression\n"
+"  -x tol         relative slowdown flagged by -c (default: 0.05)\n");
+}
+
+int main(int argc, char ** argv)
+{
+    slong sizes[MAX_LIST], bits[MAX_LIST], threads[MAX_LIST];
+    slong nsizes = 0, nbits = 0, nthreads = 1;
+    slong reps = 11, i, j, si, bi, ti, nresults = 0;
+    double min_time = 0.02, tol = 0.05;
+    const char * klist = NULL, * outfile = NULL;
+    const char * cmp_old = NULL, * cmp_new = NULL;
+    FILE * out = NULL;
+    FLINT_TEST_INIT(state);
+
+    threads[0] = 1;
+    threads[1] = 0;
+
+    for (i = 1; i < argc; i++)
+    {
+        const char * a = argv[i];
+        const char * v = (i + 1 < argc) ? argv[i + 1] : NULL;
+
+        if (strcmp(a, "-l") == 0)
+        {
+            for (j = 0; j < NUM_KERNELS; j++)
+                flint_printf("%-16s %s%s\n", bench_kernels[j].name,
+                   bench_kernels[j].desc, bench_kernels[j].threaded ?
+                                                          " [threaded]" : "");
+            flint_randclear(state);
+            return 0;
+        }
+        else if (strcmp(a, "-c") == 0 && i + 2 < argc)
+        {
+            cmp_old = argv[++i];
+            cmp_new = argv[++i];
+            continue;
+        }
+        else if (v == NULL || a[0] != '-' || a[1] == '\0' || a[2] != '\0')
+        {
+            usage();
+            flint_randclear(state);
+            return 2;
+        }
+
+        i++;
+
+        switch (a[1])
+        {
+            case 'k': klist = v; break;
+            case 'n': nsizes = parse_list(sizes, v); break;
+            case 'b': nbits = parse_list(bits, v); break;
+            case 't': nthreads = parse_list(threads, v); break;
+            case 'r': reps = strtol(v, NULL, 10); break;
+            case 'm': min_time = strtod(v, NULL)*1e-3; break;
+            case 'o': outfile = v; break;
+            case 'x': tol = strtod(v, NULL); break;
+            default: nsizes = -1;
+        }
+
+        if (nsizes < 0 || nbits < 0 || nthreads <= 0 || reps < 1 || reps > MAX_REPS)
+        {
+            usage();
+            flint_randclear(state);
+            return 2;
+        }
+    }
+
+    if (cmp_old != NULL)
+    {
+        flint_randclear(state);
+        return bench_compare(cmp_old, cmp_new, tol);
+    }
+
+    for (j = 0; j < NUM_KERNELS; j++)
+        if (kernel_selected(bench_kernels[j].name, klist))
+            break;
+
+    if (j == NUM_KERNELS)
+    {
+        flint_printf("no such kernel, use -l to list them\n");
+        flint_randclear(state);
+        return 2;
+    }
+
+    if (outfile != NULL)
+    {
+        out = fopen(outfile, "w");
+        if (out == NULL)
+        {
+            flint_printf("could not open %s\n", outfile);
+            flint_randclear(state);
+            return 2;
+        }
+
+        flint_fprintf(out, "{\n  \"flint_version\": \"%s\",\n", flint_version);
+        flint_fprintf(out, "  \"bits\": %d,\n", FLINT_BITS);
+        flint_fprintf(out, "  \"reps\": %wd,\n", reps);
+        flint_fprintf(out, "  \"results\": [\n");
+    }
+
+    flint_printf("%-16s %8s %6s %4s %12s %12s %10s\n",
+               "kernel", "size", "bits", "thr", "median (s)", "mad (s)", "calls");
+
+    for (j = 0; j < NUM_KERNELS; j++)
+    {
+        const bench_kernel_struct * k = bench_kernels + j;
+        const slong * ks = nsizes ? sizes : k->sizes;
+        const slong * kb = nbits ? bits : k->bits;
+
+        if (!kernel_selected(k->name, klist))
+            continue;
+
+        for (si = 0; ks[si] != 0; si++)
+        {
+            for (bi = 0; kb[bi] != 0; bi++)
+            {
+                /* unthreaded kernels only run once, with one thread */
+                for (ti = 0; ti < (k->threaded ? nthreads : 1); ti++)
+                {
+                    bench_result_t res;
+                    slong t = k->threaded ? threads[ti] : 1;
+                    void * data;
+
+                    flint_set_num_threads(t);
+
+                    data = k->init(ks[si], kb[bi], state);
+                    bench_time(&res, k, data, reps, min_time);
+                    k->clear(data);
+
+                    flint_printf("%-16s %8wd %6wd %4wd %12.4e %12.4e %10wd\n",
+                                k->name, ks[si], kb[bi], t,
+                                res.median, res.mad, res.count);
+                    fflush(stdout);
+
+                    if (out != NULL)
+                    {
+                        flint_fprintf(out, "%s    {\"kernel\": \"%s\", "
+                           "\"size\": %wd, \"bits\": %wd, \"threads\": %wd, "
+                           "\"median\": %.6e, \"mad\": %.6e, \"min\": %.6e, "
+                           "\"calls\": %wd}", nresults ? ",\n" : "",
+                           k->name, ks[si], kb[bi], t,
+                           res.median, res.mad, res.min, res.count);
+                    }
+
+                    nresults++;
+                }
+            }
+        }
+    }
+
+    flint_set_num_threads(1);
+
+    if (out != NULL)
+    {
+        flint_fprintf(out, "\n  ]\n}\n");
+        fclose(out);
+    }
+
+    flint_randclear(state);
+    flint_cleanup_master();
+    return 0;
+}
@@ -139,3 +139,182 @@ void get_memory_usage(meminfo_t meminfo)
     fclose(file);
 }
 
+
+/* algorithm dispatch tracing ************************************************/
+
+#if FLINT_USES_PTHREAD
+#include <pthread.h>
+
+static pthread_mutex_t _flint_dispatch_lock = PTHREAD_MUTEX_INITIALIZER;
+#endif
+
+#define FLINT_DISPATCH_MAX_RECORDS 256
+
+static flint_dispatch_record_struct
+                          _flint_dispatch_records[FLINT_DISPATCH_MAX_RECORDS];
+static slong _flint_dispatch_num = 0;
+static int _flint_dispatch_atexit = 0;
+
+ulong flint_dispatch_clock(void)
+{
+#if (defined( _MSC_VER ) || (GMP_LIMB_BITS == 64 && defined (__amd64__)) || \
+	                    (GMP_LIMB_BITS == 32 && (defined (__i386__) || \
+			       defined (__i486__) || defined(__amd64__))))
+    return (ulong) get_cycle_counter();
+#else
+    return (ulong) clock();
+#endif
+}
+
+static void _flint_dispatch_dump(void)
+{
+    const char * path = getenv(FLINT_DISPATCH_TRACE_ENV);
+    FILE * file;
+
+    if (path == NULL || path[0] == '\0')
+        return;
+
+    file = fopen(path, "w");
+    if (file != NULL)
+    {
+        flint_dispatch_trace_fprint_json(file);
+        fclose(file);
+    }
+}
+
+void flint_dispatch_record(const char * entry, const char * alg,
+                                          ulong len, ulong bits, ulong cycles)
+{
+    flint_dispatch_record_struct * r = NULL;
+    slong i;
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_lock(&_flint_dispatch_lock);
+#endif
+
+    if (!_flint_dispatch_atexit)
+    {
+        /* dump the trace at exit if asked to */
+        _flint_dispatch_atexit = 1;
+        atexit(_flint_dispatch_dump);
+    }
+
+    /* names are usually the same string literal, so compare pointers first */
+    for (i = 0; i < _flint_dispatch_num; i++)
+    {
+        r = _flint_dispatch_records + i;
+
+        if ((r->entry == entry || strcmp(r->entry, entry) == 0) &&
+            (r->alg == alg || strcmp(r->alg, alg) == 0))
+            break;
+    }
+
+    if (i == _flint_dispatch_num)
+    {
+        if (i < FLINT_DISPATCH_MAX_RECORDS)
+        {
+            r = _flint_dispatch_records + i;
+            memset(r, 0, sizeof(flint_dispatch_record_struct));
+            r->entry = entry;
+            r->alg = alg;
+            _flint_dispatch_num++;
+        }
+        else
+            r = NULL;
+    }
+
+    if (r != NULL)
+    {
+        r->calls++;
+        r->cycles += cycles;
+        r->len_hist[FLINT_BIT_COUNT(len)]++;
+        r->bits_hist[FLINT_BIT_COUNT(bits)]++;
+    }
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_unlock(&_flint_dispatch_lock);
+#endif
+}
+
+slong flint_dispatch_trace_get(flint_dispatch_record_struct * out, slong max)
+{
+    slong n;
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_lock(&_flint_dispatch_lock);
+#endif
+
+    n = FLINT_MIN(max, _flint_dispatch_num);
+    if (n > 0)
+        memcpy(out, _flint_dispatch_records,
+                                      n*sizeof(flint_dispatch_record_struct));
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_unlock(&_flint_dispatch_lock);
+#endif
+
+    return n;
+}
+
+void flint_dispatch_trace_reset(void)
+{
+#if FLINT_USES_PTHREAD
+    pthread_mutex_lock(&_flint_dispatch_lock);
+#endif
+
+    _flint_dispatch_num = 0;
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_unlock(&_flint_dispatch_lock);
+#endif
+}
+
+static void _flint_dispatch_fprint_hist(FILE * file, const char * name,
+                                                          const ulong * hist)
+{
+    slong i;
+    int first = 1;
+
+    /* sparse: bucket b holds values with bit count b */
+    flint_fprintf(file, "\"%s\": {", name);
+    for (i = 0; i <= FLINT_BITS; i++)
+    {
+        if (hist[i] != 0)
+        {
+            flint_fprintf(file, "%s\"%wd\": %wu", first ? "" : ", ", i, hist[i]);
+            first = 0;
+        }
+    }
+    flint_fprintf(file, "}");
+}
+
+int flint_dispatch_trace_fprint_json(FILE * file)
+{
+    flint_dispatch_record_struct * R;
+    slong i, n;
+
+    /* take a snapshot so that the lock is not held while writing */
+    R = (flint_dispatch_record_struct *) flint_malloc(
+                FLINT_DISPATCH_MAX_RECORDS*sizeof(flint_dispatch_record_struct));
+    n = flint_dispatch_trace_get(R, FLINT_DISPATCH_MAX_RECORDS);
+
+    flint_fprintf(file, "{\"enabled\": %d, \"records\": [", FLINT_DISPATCH_TRACE);
+
+    for (i = 0; i < n; i++)
+    {
+        flint_fprintf(file, "%s\n  {\"entry\": \"%s\", \"alg\": \"%s\", "
+                            "\"calls\": %wu, \"cycles\": %wu, ",
+                            i == 0 ? "" : ",",
+                            R[i].entry, R[i].alg, R[i].calls, R[i].cycles);
+        _flint_dispatch_fprint_hist(file, "len", R[i].len_hist);
+        flint_fprintf(file, ", ");
+        _flint_dispatch_fprint_hist(file, "bits", R[i].bits_hist);
+        flint_fprintf(file, "}");
+    }
+
+    flint_fprintf(file, "\n]}\n");
+
+    flint_free(R);
+
+    return !ferror(file);
+}
@@ -16,6 +16,7 @@
 
 #undef ulong
 #define ulong ulongxx /* interferes with system includes */
+#include <stdio.h>
 #include <time.h>
 #if defined( _MSC_VER )
 #include <intrin.h>
@@ -194,6 +195,57 @@ FLINT_DLL void prof_repeat(double* min, double* max, profile_target_t target, vo
 
 #endif
 
+/******************************************************************************
+
+    Algorithm dispatch tracing
+
+    Compiled in with FLINT_DISPATCH_TRACE (configure --enable-dispatch-trace).
+    Each traced dispatch point records, per entry point and algorithm, the
+    number of calls, a histogram of operand lengths and bit sizes by bit
+    count, and the total number of clock cycles spent.
+
+******************************************************************************/
+
+#ifndef FLINT_DISPATCH_TRACE
+#define FLINT_DISPATCH_TRACE 0
+#endif
+
+#define FLINT_DISPATCH_TRACE_ENV "FLINT_DISPATCH_TRACE_FILE"
+
+typedef struct
+{
+    const char * entry;
+    const char * alg;
+    ulong calls;
+    ulong cycles;
+    ulong len_hist[FLINT_BITS + 1];     /* calls by FLINT_BIT_COUNT(len) */
+    ulong bits_hist[FLINT_BITS + 1];    /* calls by FLINT_BIT_COUNT(bits) */
+} flint_dispatch_record_struct;
+
+FLINT_DLL ulong flint_dispatch_clock(void);
+
+FLINT_DLL void flint_dispatch_record(const char * entry, const char * alg,
+                                         ulong len, ulong bits, ulong cycles);
+
+FLINT_DLL slong flint_dispatch_trace_get(flint_dispatch_record_struct * out,
+                                                                 slong max);
+
+FLINT_DLL void flint_dispatch_trace_reset(void);
+
+FLINT_DLL int flint_dispatch_trace_fprint_json(FILE * file);
+
+#if FLINT_DISPATCH_TRACE
+#define FLINT_DISPATCH(entry, alg, len, bits, call) \
+    do { \
+        ulong __dispatch_t0 = flint_dispatch_clock(); \
+        call; \
+        flint_dispatch_record(entry, alg, len, bits, \
+                                   flint_dispatch_clock() - __dispatch_t0); \
+    } while (0)
+#else
+#define FLINT_DISPATCH(entry, alg, len, bits, call) call
+#endif
+
 /******************************************************************************
 
     Simple timing macros
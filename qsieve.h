@@ -36,6 +36,14 @@
 
 #define BLOCK_SIZE (4*65536) /* size of sieving cache block */
 
+#define QS_LP_MULT 60 /* large primes are less than this times the largest FB prime */
+
+#define QS_DLP_BITS 270 /* use double large primes for kn of at least this many bits */
+
+/* length of sieve array a thread sieves at once */
+#define QS_SIEVE_LEN(qs_inf) \
+   ((qs_inf)->sieve_size < 2*BLOCK_SIZE ? (qs_inf)->sieve_size : BLOCK_SIZE)
+
 typedef struct prime_t
 {
    mp_limb_t pinv;     /* precomputed inverse */
@@ -56,17 +64,32 @@ typedef struct la_col_t  /* matrix column */
    slong orig;         /* Original relation number */
 } la_col_t;
 
+typedef struct la_mat_t  /* matrix in compressed column storage */
+{
+   slong nrows;
+   slong ncols;
+   slong dense_rows;
+   slong * start;      /* column i has rows data[start[i]], ..., data[start[i + 1] - 1] */
+   uint32_t * data;    /* occupied sparse rows of all columns */
+   uint32_t * dense;   /* bits of the dense rows of each column, or NULL */
+} la_mat_t;
+
 
 typedef struct hash_t   /* entry in hash table */
 {
    mp_limb_t prime;    /* value of prime */
    mp_limb_t next;     /* next prime which have same hash value as 'prime' */
    mp_limb_t count;    /* number of occurrence of 'prime' */
+   slong first;        /* last stored partial with this prime, if count > 0 */
+   slong parent;       /* parent in the spanning forest of partials, or -1 */
+   slong edge;         /* partial joining this prime to its parent */
+   slong size;         /* number of primes in the tree, if a root */
 } hash_t;
 
 typedef struct relation_t  /* format for relation */
 {
    mp_limb_t lp;          /* large prime, is 1, if relation is full */
+   mp_limb_t lp2;         /* second, smaller large prime, or 1 */
    slong num_factors;     /* number of factors, excluding small factor */
    slong small_primes;   /* number of small factors */
    slong * small;         /* exponent of small factors */
@@ -74,6 +97,33 @@ typedef struct relation_t  /* format for relation */
    fmpz_t Y;              /* square root of sieve value for relation */
 } relation_t;
 
+/*
+   Relations are stored in memory, packed into words as
+
+      lp, lp2, next, num_factors, small[small_primes], (ind, exp)[num_factors]
+
+   where next is the index of the previous partial with the same large prime
+   lp, or -1. Each partial is an edge between its large primes lp and lp2 in
+   a graph whose vertices are the large primes and 1. Whenever a partial
+   closes a cycle in this graph, the partials around the cycle are merged
+   into a full relation, so that the full relations are always available in
+   the list full.
+*/
+typedef struct qs_rel_store_s
+{
+   slong * data;       /* packed relations */
+   slong length;       /* number of words used in data */
+   slong alloc;        /* number of words allocated for data */
+   slong * offset;     /* offset of each relation in data */
+   fmpz * Y;           /* Y value of each relation */
+   slong num;          /* number of relations stored */
+   slong num_alloc;    /* number of relations allocated */
+   slong * full;       /* indices of full and merged relations */
+   slong num_full;     /* number of full and merged relations */
+} qs_rel_store_s;
+
+typedef qs_rel_store_s qs_rel_store_t[1];
+
 typedef struct qs_poly_s
 {
    fmpz_t B;          /* current B coeff of poly */
@@ -84,6 +134,7 @@ typedef struct qs_poly_s
    slong * small;     /* exponents of small prime factors in relations */
    fac_t * factor;    /* factors for a relation */
    slong num_factors; /* number of factors found in a relation */
+   slong offset;      /* start of the sieve block in the sieve interval */
 } qs_poly_s;
 
 typedef qs_poly_s qs_poly_t[1];
@@ -176,14 +227,13 @@ typedef struct qs_s
                        RELATION DATA
    ***************************************************************************/
 
-   FILE * siqs;           /* pointer to file for storing relations */
-   char * fname;          /* name of file used for relations */
+   qs_rel_store_t store;  /* full and partial relations found so far */
 
    slong full_relation;   /* number of full relations */
-   slong num_cycles;      /* number of possible full relations from partials */
+   slong num_cycles;      /* number of full relations merged from partials */
 
    slong vertices;        /* number of different primes in partials */
-   slong components;      /* equal to 1 */
+   slong components;      /* connected components of the graph of partials */
    slong edges;           /* total number of partials */
 
    slong table_size;      /* size of table */
@@ -196,6 +246,7 @@ typedef struct qs_s
    fmpz * Y_arr;          /* array of Y's corresponding to relations */
    slong * curr_rel;      /* current relation in array of relations */
    slong * relation;      /* relation array */
+   slong * rel_offset;    /* offset of each relation in relation array */
 
    slong buffer_size;     /* size of buffer of relations */
    slong num_relations;   /* number of relations so far */
@@ -298,7 +349,10 @@ static const mp_limb_t qsieve_tune[][6] =
    {270, 800, 35000, 27,   28 *  65536, 102}, /* 82 digits */
    {280, 900, 40000, 29,   28 *  65536, 104}, /* 85 digits */
    {290, 1000, 60000, 29,  32 *  65536, 106}, /* 88 digits */
-   {300, 1100, 140000, 30,  32 * 65536, 108} /* 91 digits */ 
+   {300, 1100, 140000, 30,  32 * 65536, 108}, /* 91 digits */
+   {310, 1200, 150000, 30,  40 * 65536, 110}, /* 94 digits */
+   {320, 1300, 160000, 31,  40 * 65536, 112}, /* 97 digits */
+   {330, 1400, 180000, 32,  48 * 65536, 114}  /* 100 digits */
 };
 
 #endif
@@ -359,15 +413,21 @@ FLINT_DLL int qsieve_relations_cmp(const void * a, const void * b);
 
 FLINT_DLL slong qsieve_merge_relations(qs_t qs_inf);
 
-FLINT_DLL void qsieve_write_to_file(qs_t qs_inf, mp_limb_t prime,
-                                                     fmpz_t Y, qs_poly_t poly);
+FLINT_DLL void qsieve_rel_store_init(qs_rel_store_t store);
+
+FLINT_DLL void qsieve_rel_store_clear(qs_rel_store_t store);
+
+FLINT_DLL void qsieve_rel_store_reset(qs_rel_store_t store);
+
+FLINT_DLL relation_t qsieve_rel_store_get(qs_t qs_inf, slong i);
+
+FLINT_DLL int qsieve_add_relation(qs_t qs_inf, mp_limb_t prime,
+                                  mp_limb_t prime2, fmpz_t Y, qs_poly_t poly);
 
 FLINT_DLL hash_t * qsieve_get_table_entry(qs_t qs_inf, mp_limb_t prime);
 
 FLINT_DLL void qsieve_add_to_hashtable(qs_t qs_inf, mp_limb_t prime);
 
-FLINT_DLL relation_t qsieve_parse_relation(qs_t qs_inf, char * str);
-
 FLINT_DLL relation_t qsieve_merge_relation(qs_t qs_inf, relation_t  a, relation_t  b);
 
 FLINT_DLL int qsieve_compare_relation(const void * a, const void * b);
@@ -423,6 +483,13 @@ FLINT_DLL uint64_t get_null_entry(uint64_t * nullrows, slong i, slong l);
 
 FLINT_DLL void reduce_matrix(qs_t qs_inf, slong *nrows, slong *ncols, la_col_t *cols);
 
+FLINT_DLL void la_mat_init(la_mat_t * M, la_col_t * cols, slong nrows,
+                              slong dense_rows, slong ncols, int release);
+
+FLINT_DLL void la_mat_clear(la_mat_t * M);
+
+FLINT_DLL uint64_t * block_lanczos_mat(flint_rand_t state, const la_mat_t * B);
+
 FLINT_DLL uint64_t * block_lanczos(flint_rand_t state, slong nrows,
 			slong dense_rows, slong ncols, la_col_t *B);
 
@@ -246,21 +246,22 @@ static void precompute_Nx64_64x64(uint64_t *x, uint64_t *c) {
 }
 
 /*-------------------------------------------------------------------*/
-static void mul_Nx64_64x64_acc(uint64_t *v, uint64_t *x, uint64_t *c, 
-				uint64_t *y, slong n) {
+typedef struct
+{
+	uint64_t *v;
+	uint64_t *c;
+	uint64_t *y;
+}
+_mul_Nx64_64x64_struct;
 
-	/* let v[][] be a n x 64 matrix with elements in GF(2), 
-	   represented as an array of n 64-bit words. Let c[][]
-	   be an 8 x 256 scratch matrix of 64-bit words.
-	   This code multiplies v[][] by the 64x64 matrix 
-	   x[][], then XORs the n x 64 result into y[][] */
+static void _mul_Nx64_64x64_acc_worker(slong start, slong stop, void *varg) {
 
-    slong i;
+	_mul_Nx64_64x64_struct *arg = (_mul_Nx64_64x64_struct *)varg;
+	uint64_t *v = arg->v, *c = arg->c, *y = arg->y;
 	uint64_t word;
+	slong i;
 
-	precompute_Nx64_64x64(x, c);
-
-	for (i = 0; i < n; i++) {
+	for (i = start; i < stop; i++) {
 		word = v[i];
 		y[i] ^=  c[ 0*256 + ((word>> 0) & 0xff) ]
 		       ^ c[ 1*256 + ((word>> 8) & 0xff) ]
@@ -273,32 +274,94 @@ static void mul_Nx64_64x64_acc(uint64_t *v, uint64_t *x, uint64_t *c,
 	}
 }
 
+static void mul_Nx64_64x64_acc(uint64_t *v, uint64_t *x, uint64_t *c, 
+				uint64_t *y, slong n) {
+
+	/* let v[][] be a n x 64 matrix with elements in GF(2), 
+	   represented as an array of n 64-bit words. Let c[][]
+	   be an 8 x 256 scratch matrix of 64-bit words.
+	   This code multiplies v[][] by the 64x64 matrix 
+	   x[][], then XORs the n x 64 result into y[][].
+	   The rows are shared out between the threads */
+
+	_mul_Nx64_64x64_struct arg;
+
+	precompute_Nx64_64x64(x, c);
+
+	arg.v = v;
+	arg.c = c;
+	arg.y = y;
+
+	flint_parallel_for(0, n, 0, _mul_Nx64_64x64_acc_worker, &arg);
+}
+
 /*-------------------------------------------------------------------*/
+typedef struct
+{
+	uint64_t *x;
+	uint64_t *y;
+	uint64_t *c;
+	slong n;
+	slong nblocks;
+}
+_mul_64xN_Nx64_struct;
+
+static void _mul_64xN_Nx64_worker(slong start, slong stop, void *varg) {
+
+	/* block t accumulates rows [t*n/nblocks, (t+1)*n/nblocks)
+	   into its own 256 x 8 table */
+
+	_mul_64xN_Nx64_struct *arg = (_mul_64xN_Nx64_struct *)varg;
+	slong i, t;
+
+	for (t = start; t < stop; t++) {
+		uint64_t *c = arg->c + t * 256 * 8;
+		slong lo = (t * arg->n) / arg->nblocks;
+		slong hi = ((t + 1) * arg->n) / arg->nblocks;
+
+		memset(c, 0, 256 * 8 * sizeof(uint64_t));
+
+		for (i = lo; i < hi; i++) {
+			uint64_t xi = arg->x[i];
+			uint64_t yi = arg->y[i];
+			c[ 0*256 + ( xi        & 0xff) ] ^= yi;
+			c[ 1*256 + ((xi >>  8) & 0xff) ] ^= yi;
+			c[ 2*256 + ((xi >> 16) & 0xff) ] ^= yi;
+			c[ 3*256 + ((xi >> 24) & 0xff) ] ^= yi;
+			c[ 4*256 + ((xi >> 32) & 0xff) ] ^= yi;
+			c[ 5*256 + ((xi >> 40) & 0xff) ] ^= yi;
+			c[ 6*256 + ((xi >> 48) & 0xff) ] ^= yi;
+			c[ 7*256 + ((xi >> 56)       ) ] ^= yi;
+		}
+	}
+}
+
 static void mul_64xN_Nx64(uint64_t *x, uint64_t *y,
-			   uint64_t *c, uint64_t *xy, slong n) {
+			   uint64_t *c, uint64_t *xy, slong n, slong nblocks) {
 
 	/* Let x and y be n x 64 matrices. This routine computes
 	   the 64 x 64 matrix xy[][] given by transpose(x) * y.
-	   c[][] is a 256 x 8 scratch matrix of 64-bit words. */
+	   c[][] is scratch space for nblocks 256 x 8 matrices of
+	   64-bit words, one for each block of rows; the blocks
+	   are processed in parallel and their tables summed */
 
-	slong i;
+	_mul_64xN_Nx64_struct arg;
+	slong i, t;
 
-	memset(c, 0, 256 * 8 * sizeof(uint64_t));
-	memset(xy, 0, 64 * sizeof(uint64_t));
+	arg.x = x;
+	arg.y = y;
+	arg.c = c;
+	arg.n = n;
+	arg.nblocks = nblocks;
 
-	for (i = 0; i < n; i++) {
-		uint64_t xi = x[i];
-		uint64_t yi = y[i];
-		c[ 0*256 + ( xi        & 0xff) ] ^= yi;
-		c[ 1*256 + ((xi >>  8) & 0xff) ] ^= yi;
-		c[ 2*256 + ((xi >> 16) & 0xff) ] ^= yi;
-		c[ 3*256 + ((xi >> 24) & 0xff) ] ^= yi;
-		c[ 4*256 + ((xi >> 32) & 0xff) ] ^= yi;
-		c[ 5*256 + ((xi >> 40) & 0xff) ] ^= yi;
-		c[ 6*256 + ((xi >> 48) & 0xff) ] ^= yi;
-		c[ 7*256 + ((xi >> 56)       ) ] ^= yi;
+	flint_parallel_for(0, nblocks, 1, _mul_64xN_Nx64_worker, &arg);
+
+	for (t = 1; t < nblocks; t++) {
+		for (i = 0; i < 256 * 8; i++)
+			c[i] ^= c[t * 256 * 8 + i];
 	}
 
+	memset(xy, 0, 64 * sizeof(uint64_t));
 
 	for(i = 0; i < 8; i++) {
 
@@ -552,6 +615,213 @@ void mul_trans_MxN_Nx64(slong dense_rows, slong ncols,
 	}
 }
 
+/*-----------------------------------------------------------------------*/
+void la_mat_init(la_mat_t *M, la_col_t *cols, slong nrows,
+		slong dense_rows, slong ncols, int release) {
+
+	/* Pack the columns cols[] into the compressed column
+	   storage M. Row indices are stored as 32-bit words
+	   in one array, which takes a quarter of the memory
+	   of the separately allocated columns. If release is
+	   set, the data of each column is freed as soon as it
+	   has been copied, so that both copies of the matrix
+	   never exist in full at the same time */
+
+	slong i, j, k;
+	slong dwords = (dense_rows + 31) / 32;
+
+	if (nrows > (slong) UWORD(0xffffffff)) {
+		flint_printf("Exception (la_mat_init). Too many rows.\n");
+		flint_abort();
+	}
+
+	M->nrows = nrows;
+	M->ncols = ncols;
+	M->dense_rows = dense_rows;
+
+	M->start = (slong *)flint_malloc((ncols + 1) * sizeof(slong));
+	M->start[0] = 0;
+	for (i = 0; i < ncols; i++)
+		M->start[i + 1] = M->start[i] + cols[i].weight;
+
+	M->data = (uint32_t *)flint_malloc(FLINT_MAX(M->start[ncols], 1) *
+						sizeof(uint32_t));
+	M->dense = NULL;
+	if (dense_rows)
+		M->dense = (uint32_t *)flint_malloc(ncols * dwords * 
+						sizeof(uint32_t));
+
+	for (i = 0; i < ncols; i++) {
+		la_col_t *col = cols + i;
+		uint32_t *row_entries = M->data + M->start[i];
+
+		for (j = 0; j < col->weight; j++)
+			row_entries[j] = (uint32_t) col->data[j];
+
+		for (k = 0; k < dwords; k++)
+			M->dense[i * dwords + k] = 
+				(uint32_t) col->data[col->weight + k];
+
+		if (release) {
+			free_col(col);
+			col->data = NULL;
+			clear_col(col);
+		}
+	}
+}
+
+/*-----------------------------------------------------------------------*/
+void la_mat_clear(la_mat_t *M) {
+
+	flint_free(M->start);
+	flint_free(M->data);
+	flint_free(M->dense);
+}
+
+/*-----------------------------------------------------------------------*/
+typedef struct
+{
+	const la_mat_t *A;
+	uint64_t *x;
+	uint64_t *b;
+	uint64_t **acc;
+	slong nblocks;
+	slong vsize;
+}
+_la_mat_mul_struct;
+
+static void _la_mat_mul_worker(slong start, slong stop, void *varg) {
+
+	/* block t scatters the columns [t*ncols/nblocks,
+	   (t+1)*ncols/nblocks) into its own accumulator */
+
+	_la_mat_mul_struct *arg = (_la_mat_mul_struct *)varg;
+	const la_mat_t *A = arg->A;
+	slong dense_rows = A->dense_rows;
+	slong dwords = (dense_rows + 31) / 32;
+	slong i, j, t;
+
+	for (t = start; t < stop; t++) {
+		uint64_t *b = arg->acc[t];
+		slong lo = (t * A->ncols) / arg->nblocks;
+		slong hi = ((t + 1) * A->ncols) / arg->nblocks;
+
+		memset(b, 0, arg->vsize * sizeof(uint64_t));
+
+		for (i = lo; i < hi; i++) {
+			uint32_t *row_entries = A->data + A->start[i];
+			slong weight = A->start[i + 1] - A->start[i];
+			uint64_t tmp = arg->x[i];
+
+			for (j = 0; j < weight; j++)
+				b[row_entries[j]] ^= tmp;
+		}
+
+		if (dense_rows) {
+			for (i = lo; i < hi; i++) {
+				uint32_t *row_entries = A->dense + i * dwords;
+				uint64_t tmp = arg->x[i];
+
+				for (j = 0; j < dense_rows; j++) {
+					if (row_entries[j / 32] &
+						((uint32_t)1 << (j % 32))) {
+						b[j] ^= tmp;
+					}
+				}
+			}
+		}
+	}
+}
+
+static void _la_mat_mul_reduce_worker(slong start, slong stop, void *varg) {
+
+	_la_mat_mul_struct *arg = (_la_mat_mul_struct *)varg;
+	uint64_t *b = arg->acc[0];
+	slong i, t;
+
+	for (t = 1; t < arg->nblocks; t++) {
+		uint64_t *acc = arg->acc[t];
+
+		for (i = start; i < stop; i++)
+			b[i] ^= acc[i];
+	}
+}
+
+static void la_mat_mul_MxN_Nx64(slong vsize, const la_mat_t *A,
+		uint64_t *x, uint64_t *b, uint64_t **acc, slong nblocks) {
+
+	/* As for mul_MxN_Nx64, but with A in compressed storage.
+	   The columns are split into nblocks ranges, each of
+	   which is multiplied in parallel into a separate
+	   accumulator; acc[1], ..., acc[nblocks - 1] must have
+	   room for vsize words each, acc[0] is set to b. The
+	   accumulators are then summed into b, split by rows */
+
+	_la_mat_mul_struct arg;
+
+	acc[0] = b;
+
+	arg.A = A;
+	arg.x = x;
+	arg.b = b;
+	arg.acc = acc;
+	arg.nblocks = nblocks;
+	arg.vsize = vsize;
+
+	flint_parallel_for(0, nblocks, 1, _la_mat_mul_worker, &arg);
+
+	if (nblocks > 1)
+		flint_parallel_for(0, vsize, 0, _la_mat_mul_reduce_worker, &arg);
+}
+
+static void _la_mat_mul_trans_worker(slong start, slong stop, void *varg) {
+
+	_la_mat_mul_struct *arg = (_la_mat_mul_struct *)varg;
+	const la_mat_t *A = arg->A;
+	slong dense_rows = A->dense_rows;
+	slong dwords = (dense_rows + 31) / 32;
+	slong i, j;
+
+	for (i = start; i < stop; i++) {
+		uint32_t *row_entries = A->data + A->start[i];
+		slong weight = A->start[i + 1] - A->start[i];
+		uint64_t accum = 0;
+
+		for (j = 0; j < weight; j++)
+			accum ^= arg->x[row_entries[j]];
+
+		if (dense_rows) {
+			row_entries = A->dense + i * dwords;
+
+			for (j = 0; j < dense_rows; j++) {
+				if (row_entries[j / 32] &
+					((uint32_t)1 << (j % 32))) {
+					accum ^= arg->x[j];
+				}
+			}
+		}
+
+		arg->b[i] = accum;
+	}
+}
+
+static void la_mat_mul_trans_MxN_Nx64(const la_mat_t *A,
+					uint64_t *x, uint64_t *b) {
+
+	/* As for mul_trans_MxN_Nx64, but with A in compressed
+	   storage. Each entry of b[] only depends on one column
+	   of A, so the columns are simply shared out between
+	   the threads */
+
+	_la_mat_mul_struct arg;
+
+	arg.A = A;
+	arg.x = x;
+	arg.b = b;
+
+	flint_parallel_for(0, A->ncols, 0, _la_mat_mul_trans_worker, &arg);
+}
+
 /*-----------------------------------------------------------------------*/
 static void transpose_vector(slong ncols, uint64_t *v, uint64_t **trans) {
 
@@ -695,8 +965,7 @@ void combine_cols(slong ncols,
 }
 
 /*-----------------------------------------------------------------------*/
-uint64_t * block_lanczos(flint_rand_t state, slong nrows, 
-			slong dense_rows, slong ncols, la_col_t *B) {
+uint64_t * block_lanczos_mat(flint_rand_t state, const la_mat_t *B) {
 	
 	/* Solve Bx = 0 for some nonzero x; the computed
 	   solution, containing up to 64 of these nullspace
@@ -705,11 +974,14 @@ uint64_t * block_lanczos(flint_rand_t state, slong nrows,
 	uint64_t *vnext, *v[3], *x, *v0;
 	uint64_t *winv[3];
 	uint64_t *vt_a_v[2], *vt_a2_v[2];
-	uint64_t *scratch;
+	uint64_t *scratch, *tables;
+	uint64_t **acc;
 	uint64_t *d, *e, *f, *f2;
 	uint64_t *tmp;
 	slong s[2][64];
-	slong i, iter;
+	slong i, iter, nblocks;
+	slong nrows = B->nrows;
+	slong ncols = B->ncols;
 	slong n = ncols;
 	slong dim0, dim1;
 	uint64_t mask0, mask1;
@@ -728,7 +1000,18 @@ uint64_t * block_lanczos(flint_rand_t state, slong nrows,
 	vnext = (uint64_t *)flint_malloc(vsize * sizeof(uint64_t));
 	x = (uint64_t *)flint_malloc(vsize * sizeof(uint64_t));
 	v0 = (uint64_t *)flint_malloc(vsize * sizeof(uint64_t));
-	scratch = (uint64_t *)flint_malloc(FLINT_MAX(vsize, 256 * 8) * sizeof(uint64_t));
+	scratch = (uint64_t *)flint_malloc(vsize * sizeof(uint64_t));
+
+	/* the matrix products are split into one block per thread;
+	   each block needs its own accumulator for B*v and its own
+	   table for the 64xN inner products */
+
+	nblocks = FLINT_MAX(flint_get_num_threads(), 1);
+	nblocks = FLINT_MIN(nblocks, FLINT_MAX(n / 1024, 1));
+	tables = (uint64_t *)flint_malloc(nblocks * 256 * 8 * sizeof(uint64_t));
+	acc = (uint64_t **)flint_malloc(nblocks * sizeof(uint64_t *));
+	for (i = 1; i < nblocks; i++)
+		acc[i] = (uint64_t *)flint_malloc(vsize * sizeof(uint64_t));
 
 	/* allocate all the 64x64 variables */
 
@@ -777,8 +1060,8 @@ uint64_t * block_lanczos(flint_rand_t state, slong nrows,
 #endif
 
 	memcpy(x, v[0], vsize * sizeof(uint64_t));
-	mul_MxN_Nx64(vsize, dense_rows, ncols, B, v[0], scratch);
-	mul_trans_MxN_Nx64(dense_rows, ncols, B, scratch, v[0]);
+	la_mat_mul_MxN_Nx64(vsize, B, v[0], scratch, acc, nblocks);
+	la_mat_mul_trans_MxN_Nx64(B, scratch, v[0]);
 	memcpy(v0, v[0], vsize * sizeof(uint64_t));
 
 	/* perform the iteration */
@@ -790,13 +1073,13 @@ uint64_t * block_lanczos(flint_rand_t state, slong nrows,
 		   version of B, or B'B (apostrophe means 
 		   transpose). Use "A" to refer to B'B  */
 
-		mul_MxN_Nx64(vsize, dense_rows, ncols, B, v[0], scratch);
-		mul_trans_MxN_Nx64(dense_rows, ncols, B, scratch, vnext);
+		la_mat_mul_MxN_Nx64(vsize, B, v[0], scratch, acc, nblocks);
+		la_mat_mul_trans_MxN_Nx64(B, scratch, vnext);
 
 		/* compute v0'*A*v0 and (A*v0)'(A*v0) */
 
-		mul_64xN_Nx64(v[0], vnext, scratch, vt_a_v[0], n);
-		mul_64xN_Nx64(vnext, vnext, scratch, vt_a2_v[0], n);
+		mul_64xN_Nx64(v[0], vnext, tables, vt_a_v[0], n, nblocks);
+		mul_64xN_Nx64(vnext, vnext, tables, vt_a2_v[0], n, nblocks);
 
 		/* if the former is orthogonal to itself, then
 		   the iteration has finished */
@@ -863,15 +1146,15 @@ uint64_t * block_lanczos(flint_rand_t state, slong nrows,
 		for (i = 0; i < n; i++)
 			vnext[i] = vnext[i] & mask0;
 
-		mul_Nx64_64x64_acc(v[0], d, scratch, vnext, n);
-		mul_Nx64_64x64_acc(v[1], e, scratch, vnext, n);
-		mul_Nx64_64x64_acc(v[2], f, scratch, vnext, n);
+		mul_Nx64_64x64_acc(v[0], d, tables, vnext, n);
+		mul_Nx64_64x64_acc(v[1], e, tables, vnext, n);
+		mul_Nx64_64x64_acc(v[2], f, tables, vnext, n);
 		
 		/* update the computed solution 'x' */
 
-		mul_64xN_Nx64(v[0], v0, scratch, d, n);
+		mul_64xN_Nx64(v[0], v0, tables, d, n, nblocks);
 		mul_64x64_64x64(winv[0], d, d);
-		mul_Nx64_64x64_acc(v[0], d, scratch, x, n);
+		mul_Nx64_64x64_acc(v[0], d, tables, x, n);
 
 		/* rotate all the variables */
 
@@ -903,6 +1186,7 @@ uint64_t * block_lanczos(flint_rand_t state, slong nrows,
 
     flint_free(vnext);
 	flint_free(scratch);
+	flint_free(tables);
 	flint_free(v0);
 	flint_free(vt_a_v[0]);
 	flint_free(vt_a_v[1]);
@@ -927,20 +1211,23 @@ uint64_t * block_lanczos(flint_rand_t state, slong nrows,
 		flint_free(v[0]);
 		flint_free(v[1]);
 		flint_free(v[2]);
+		for (i = 1; i < nblocks; i++)
+			flint_free(acc[i]);
+		flint_free(acc);
 		return NULL;
 	}
 
 	/* convert the output of the iteration to an actual
 	   collection of nullspace vectors */
 
-	mul_MxN_Nx64(vsize, dense_rows, ncols, B, x, v[1]);
-	mul_MxN_Nx64(vsize, dense_rows, ncols, B, v[0], v[2]);
+	la_mat_mul_MxN_Nx64(vsize, B, x, v[1], acc, nblocks);
+	la_mat_mul_MxN_Nx64(vsize, B, v[0], v[2], acc, nblocks);
 
 	combine_cols(ncols, x, v[0], v[1], v[2]);
 
 	/* verify that these really are linear dependencies of B */
 
-	mul_MxN_Nx64(vsize, dense_rows, ncols, B, x, v[0]);
+	la_mat_mul_MxN_Nx64(vsize, B, x, v[0], acc, nblocks);
 	
 	for (i = 0; i < ncols; i++) {
 		if (v[0][i] != 0)
@@ -954,5 +1241,25 @@ uint64_t * block_lanczos(flint_rand_t state, slong nrows,
 	flint_free(v[0]);
 	flint_free(v[1]);
 	flint_free(v[2]);
+	for (i = 1; i < nblocks; i++)
+		flint_free(acc[i]);
+	flint_free(acc);
+	return x;
+}
+
+/*-----------------------------------------------------------------------*/
+uint64_t * block_lanczos(flint_rand_t state, slong nrows, 
+			slong dense_rows, slong ncols, la_col_t *B) {
+
+	/* As for block_lanczos_mat, with the matrix given as an
+	   array of columns, which is left untouched */
+
+	la_mat_t M;
+	uint64_t *x;
+
+	la_mat_init(&M, B, nrows, dense_rows, ncols, 0);
+	x = block_lanczos_mat(state, &M);
+	la_mat_clear(&M);
+
 	return x;
 }
@@ -78,15 +78,19 @@ void qsieve_do_sieving(qs_t qs_inf, unsigned char * sieve, qs_poly_t poly)
 }
 
 /*
-   Second sieving routine. This version breaks sieve array into blocks then
-   sieves each block, with the whole factor base at once.
+   Second sieving routine, for sieve intervals of at least 2*BLOCK_SIZE. This
+   sieves the block of length BLOCK_SIZE starting at poly->offset in the sieve
+   interval, with the whole factor base at once, into sieve. The blocks must
+   be sieved in order, as the positions reached in one block are saved for
+   the next one.
 */
 void qsieve_do_sieving2(qs_t qs_inf, unsigned char * sieve, qs_poly_t poly)
 {
-    slong b, d1, d2, i;
+    slong d1, d2, i;
     slong pind, size;
     mp_limb_t p;
     slong num_primes = qs_inf->num_primes;
+    slong offset = poly->offset;
     int * soln1 = poly->soln1;
     int * soln2 = poly->soln2;
     int * posn1 = poly->posn1;
@@ -98,112 +102,158 @@ void qsieve_do_sieving2(qs_t qs_inf, unsigned char * sieve, qs_poly_t poly)
     register unsigned char * pos;
 
     /* fill sieve with initial values and put sentinel at end */
-    memset(sieve, qs_inf->sieve_fill, qs_inf->sieve_size + sizeof(ulong));
-    sieve[qs_inf->sieve_size] = (char) 255;
+    memset(sieve, qs_inf->sieve_fill, BLOCK_SIZE + sizeof(ulong));
+    sieve[BLOCK_SIZE] = (char) 255;
 
     /* 
-       initial values for positions (which must be saved at the end of each
-       sieve block in preparation for start of next sieve block)
+       initial values for positions, relative to the start of the sieve
+       interval (which must be saved at the end of each sieve block in
+       preparation for start of next sieve block)
     */
-    for (i = 0; i < num_primes; i++)
+    if (offset == 0)
     {
-        posn1[i] = soln1[i];
-        posn2[i] = soln2[i] - posn1[i];
+        for (i = 0; i < num_primes; i++)
+        {
+            posn1[i] = soln1[i];
+            posn2[i] = soln2[i] - posn1[i];
+        }
     }
 
-    /* break sieve into blocks of size BLOCK_SIZE */
-    for (b = 1; b <= qs_inf->sieve_size / BLOCK_SIZE; b++)
+    /* end of current sieve block */
+    B = sieve + BLOCK_SIZE;
+
+    /*
+        deal with small to medium sized primes first
+        these hit sieve block multiple times, making unrolling worthwhile
+    */
+    for (pind = qs_inf->small_primes; pind < qs_inf->second_prime; pind++)
     {
-        /* end of current sieve block */
-        B = sieve + b * BLOCK_SIZE;
-
-        /*
-            deal with small to medium sized primes first
-            these hit sieve block multiple times, making unrolling worthwhile
-        */
-        for (pind = qs_inf->small_primes; pind < qs_inf->second_prime; pind++)
+        if (soln2[pind] == 0) /* skip primes dividing A */
+            continue;
+
+        p = factor_base[pind].p;
+        size = factor_base[pind].size;
+        d1 = posn2[pind];
+        d2 = p - d1;
+        Bp = B - 2*d1 - d2;
+        pos = sieve + (posn1[pind] - offset);
+
+        while (pos < Bp)
         {
-            if (soln2[pind] == 0) /* skip primes dividing A */
-                continue;
+            (*pos) += size, (*(pos + d1)) += size, pos += p;
+            (*pos) += size, (*(pos + d1)) += size, pos += p;
+        }
 
-            p = factor_base[pind].p;
-            size = factor_base[pind].size;
-            d1 = posn2[pind];
-            d2 = p - d1;
-            Bp = B - 2*d1 - d2;
-            pos = sieve + posn1[pind];
+        Bp = B - d1;
 
-            while (pos < Bp)
-            {
-                (*pos) += size, (*(pos + d1)) += size, pos += p;
-                (*pos) += size, (*(pos + d1)) += size, pos += p;
-            }
+        while (pos < Bp)
+        {
+            (*pos) += size, 
+            (*(pos + d1)) += size, pos += p;
+        }
 
-            Bp = B - d1;
+        if (pos < B)
+        {
+            (*pos) += size, pos += d1;
+            posn2[pind] = d2;
+        }
+        else 
+        { 
+            posn2[pind] = d1;
+        }
 
-            while (pos < Bp)
-            {
-                (*pos) += size, 
-                (*(pos + d1)) += size, pos += p;
-            }
+        posn1[pind] = (pos - sieve) + offset;
+    }
 
-            if (pos < B)
-            {
-                (*pos) += size, pos += d1;
-                posn2[pind] = d2;
-            }
-            else 
-            { 
-                posn2[pind] = d1;
-            }
+    /*
+        now deal with larger primes which are likely to only hit sieve
+        block once, if at all
+    */
+    for (pind = qs_inf->second_prime; pind < num_primes; pind++)
+    {
+        p = factor_base[pind].p;
 
-            posn1[pind] = (pos - sieve);
-        }
+        if (soln2[pind] == 0)
+            continue;
 
-        /*
-            now deal with larger primes which are likely to only hit sieve
-            block once, if at all
-        */
-        for (pind = qs_inf->second_prime; pind < num_primes; pind++)
-        {
-            p = factor_base[pind].p;
+        size = factor_base[pind].size;
 
-            if (soln2[pind] == 0)
-                continue;
+        if (posn1[pind] - offset < BLOCK_SIZE) /* hits the sieve block */
+        {
+            pos = sieve + (posn1[pind] - offset);
 
-            size = factor_base[pind].size;
-            pos = sieve + posn1[pind];
+            (*pos) += size;
+            pos += posn2[pind];
 
-            if (pos < B) /* hits the sieve block */
+            if (pos < B)
             {
                 (*pos) += size;
-                pos += posn2[pind];
-
-                if (pos < B)
-                {
-                    (*pos) += size;
-                    pos += p - posn2[pind];
-                } else
-                {
-                    posn2[pind] = p - posn2[pind];
-                }
-
-                posn1[pind] = (pos - sieve);
-            } else /* doesn't hit this sieve block, save posn for next block */
+                pos += p - posn2[pind];
+            } else
             {
-                posn1[pind] = (pos - sieve);
+                posn2[pind] = p - posn2[pind];
             }
+
+            posn1[pind] = (pos - sieve) + offset;
         }
+
+        /* otherwise it doesn't hit this sieve block, posn is kept for next */
     }
 }
 
 /*
-    check position i in sieve array for smoothness
+   If the cofactor c, which is at least lp_bound but less than its square, is
+   the product of two primes less than lp_bound, return the larger one and
+   set prime2 to the other, otherwise return 0.
+*/
+static mp_limb_t _qsieve_split_cofactor(mp_limb_t * prime2, mp_limb_t c,
+                                                          mp_limb_t lp_bound)
+{
+   mp_limb_t p, q;
+
+   if (n_is_prime(c)) /* too large for a single large prime */
+      return 0;
+
+   if (n_is_square(c))
+      p = n_sqrt(c);
+   else
+   {
+      p = 0;
+#if FLINT64
+      if (c < FLINT_FACTOR_ONE_LINE_MAX)
+         p = n_factor_one_line(c, FLINT_FACTOR_ONE_LINE_ITERS);
+#endif
+      if (p == 0)
+         p = n_factor_SQUFOF(c, FLINT_FACTOR_SQUFOF_ITERS);
+      if (p == 0)
+         return 0;
+   }
+
+   q = c / p;
+
+   if (p > q)
+   {
+      *prime2 = q;
+      q = p;
+      p = *prime2;
+   }
+
+   if (q >= lp_bound || !n_is_prime(p) || !n_is_prime(q))
+      return 0;
+
+   *prime2 = p;
+
+   return q;
+}
+
+/*
+    check position i in sieve array for smoothness, the sieve array holding
+    the part of the sieve interval starting at poly->offset
 */
 slong qsieve_evaluate_candidate(qs_t qs_inf, ulong i, unsigned char * sieve, qs_poly_t poly)
 {
    slong bits, exp, extra_bits;
-   mp_limb_t modp, prime;
+   mp_limb_t modp, prime, prime2, cofactor, lp_bound;
    slong num_primes = qs_inf->num_primes;
    prime_t * factor_base = qs_inf->factor_base;
    slong * small = poly->small; /* exponents of small primes and mult. */
@@ -226,7 +276,7 @@ slong qsieve_evaluate_candidate(qs_t qs_inf, ulong i, unsigned char * sieve, qs_
 
    qsieve_compute_C(C, qs_inf, poly);   
       
-   fmpz_set_si(X, i - qs_inf->sieve_size / 2); /* X */
+   fmpz_set_si(X, i + poly->offset - qs_inf->sieve_size / 2); /* X */
 
    fmpz_mul(Y, X, qs_inf->A);
    fmpz_add(Y, Y, poly->B); /* Y = AX+B */
@@ -239,12 +289,20 @@ slong qsieve_evaluate_candidate(qs_t qs_inf, ulong i, unsigned char * sieve, qs_
    printf("res = "); fmpz_print(res); printf("\n");
    flint_printf("Poly: "); fmpz_print(qs_inf->A); flint_printf("*x^2 + 2*");
    fmpz_print(poly->B); flint_printf("*x + "); fmpz_print(C); printf("\n");
-   flint_printf("x = %wd\n", i - qs_inf->sieve_size / 2);
+   flint_printf("x = %wd\n", i + poly->offset - qs_inf->sieve_size / 2);
 #endif
 
    sieve[i] -= qs_inf->sieve_fill; /* adjust sieve entry to number of bits */
    bits = FLINT_ABS(fmpz_bits(res)); /* compute bits of poly value */
    bits -= BITS_ADJUST; /* adjust for log approximations */
+
+   /*
+      a large prime is taken heuristically to be < 60 times largest FB prime;
+      with double large primes, leave room for a product of two of them
+   */
+   lp_bound = QS_LP_MULT*factor_base[qs_inf->num_primes - 1].p;
+   if (qs_inf->bits >= QS_DLP_BITS)
+      bits -= FLINT_BIT_COUNT(lp_bound);
    extra_bits = 0; /* bits for mult. and small primes we didn't sieve with */
 
    if (factor_base[0].p != 1) /* divide out powers of the multiplier */
@@ -278,7 +336,7 @@ slong qsieve_evaluate_candidate(qs_t qs_inf, ulong i, unsigned char * sieve, qs_
    {
       prime = factor_base[j].p;
       pinv = factor_base[j].pinv;
-      modp = n_mod2_preinv(i, prime, pinv);
+      modp = n_mod2_preinv(i + poly->offset, prime, pinv);
 
       if (modp == soln1[j] || modp == soln2[j])
       {
@@ -312,7 +370,7 @@ slong qsieve_evaluate_candidate(qs_t qs_inf, ulong i, unsigned char * sieve, qs_
       {
          prime = factor_base[j].p;
          pinv = factor_base[j].pinv;
-         modp = n_mod2_preinv(i, prime, pinv);
+         modp = n_mod2_preinv(i + poly->offset, prime, pinv);
 
          if (soln2[j] != 0) /* not a prime dividing A */
          {
@@ -372,7 +430,7 @@ slong qsieve_evaluate_candidate(qs_t qs_inf, ulong i, unsigned char * sieve, qs_
 #if FLINT_USES_PTHREAD
          pthread_mutex_lock(&qs_inf->mutex);
 #endif
-	 qsieve_write_to_file(qs_inf, 1, Y, poly);
+         qsieve_add_relation(qs_inf, 1, 1, Y, poly);
          
          qs_inf->full_relation++;
 
@@ -390,17 +448,26 @@ slong qsieve_evaluate_candidate(qs_t qs_inf, ulong i, unsigned char * sieve, qs_
           } else
               small[2] = 0;
 
-          /* if we have a small cofactor (at most 30 bits) */
-          if (fmpz_bits(res) <= 30)
+          /* if we have a small cofactor (at most one word) */
+          if (fmpz_abs_fits_ui(res))
           {
-              prime = fmpz_get_ui(res);
-              
+              cofactor = fmpz_get_ui(res);
+
+              /* larger cofactors may split into two large primes */
+              if (cofactor < lp_bound)
+              {
+                  prime = cofactor;
+                  prime2 = 1;
+              } else if (qs_inf->bits >= QS_DLP_BITS && cofactor/lp_bound < lp_bound)
+                  prime = _qsieve_split_cofactor(&prime2, cofactor, lp_bound);
+              else
+                  prime = 0;
+
               /*
-                 a large prime is taken heuristically to be < 60 times largest
-                 FB prime; skip values not coprime with multiplier, as this
-                 will lead to factors of kn, not n
+                 skip values not coprime with multiplier, as this will lead
+                 to factors of kn, not n
               */ 
-              if (prime < 60*factor_base[qs_inf->num_primes - 1].p && n_gcd(prime, qs_inf->k) == 1)
+              if (prime != 0 && n_gcd(prime, qs_inf->k) == 1 && n_gcd(prime2, qs_inf->k) == 1)
               {
                   for (k = 0; k < qs_inf->s; k++)  /* commit any outstanding A factors */
                   {
@@ -416,13 +483,10 @@ slong qsieve_evaluate_candidate(qs_t qs_inf, ulong i, unsigned char * sieve, qs_
 #if FLINT_USES_PTHREAD
                   pthread_mutex_lock(&qs_inf->mutex);
 #endif
-                  /* store this partial in file */
+                  /* store this partial, unless it is a duplicate */
 
-                  qsieve_write_to_file(qs_inf, prime, Y, poly);
-
-                  qs_inf->edges++;
-
-                  qsieve_add_to_hashtable(qs_inf, prime);
+                  if (qsieve_add_relation(qs_inf, prime, prime2, Y, poly))
+                     qs_inf->edges++;
 
 #if FLINT_USES_PTHREAD
                   pthread_mutex_unlock(&qs_inf->mutex);
@@ -454,9 +518,10 @@ slong qsieve_evaluate_sieve(qs_t qs_inf, unsigned char * sieve, qs_poly_t poly)
     slong i = 0, j = 0;
     ulong * sieve2 = (ulong *) sieve;
     unsigned char bits = qs_inf->sieve_bits;
+    slong len = QS_SIEVE_LEN(qs_inf);
     slong rels = 0;
 
-    while (j < qs_inf->sieve_size / sizeof(ulong))
+    while (j < len / sizeof(ulong))
     {
         /* scan 4 or 8 bytes at once for sieve entries over threshold */
 #if FLINT64
@@ -471,7 +536,7 @@ slong qsieve_evaluate_sieve(qs_t qs_inf, unsigned char * sieve, qs_poly_t poly)
         i = j * sizeof(ulong);
 
         /* check bytes individually in word */
-        while (i < (j + 1) * sizeof(ulong) && i < qs_inf->sieve_size)
+        while (i < (j + 1) * sizeof(ulong) && i < len)
         {
             /* if we are over the threshold, check candidate for smoothness */
             if (sieve[i] > bits)
@@ -505,7 +570,7 @@ static void qsieve_collect_relations_worker(void * varg)
     qs_s * qs_inf = arg->inf;
     qs_poly_s * thread_poly = arg->thread_poly;
     unsigned char * thread_sieve = arg->thread_sieve;
-    slong j, iterations = (1 << (qs_inf->s - 1));
+    slong j, offset, iterations = (1 << (qs_inf->s - 1));
 
     while (1)
     {
@@ -529,11 +594,22 @@ static void qsieve_collect_relations_worker(void * varg)
             return;
 
         if (qs_inf->sieve_size < 2*BLOCK_SIZE)
+        {
+           thread_poly->offset = 0;
            qsieve_do_sieving(qs_inf, thread_sieve, thread_poly);
+           arg->rels += qsieve_evaluate_sieve(qs_inf, thread_sieve, thread_poly);
+        }
         else
-           qsieve_do_sieving2(qs_inf, thread_sieve, thread_poly);
-
-        arg->rels += qsieve_evaluate_sieve(qs_inf, thread_sieve, thread_poly);
+        {
+           /* sieve and evaluate one block at a time, so that only one
+              block of sieve array is needed per thread */
+           for (offset = 0; offset < qs_inf->sieve_size; offset += BLOCK_SIZE)
+           {
+              thread_poly->offset = offset;
+              qsieve_do_sieving2(qs_inf, thread_sieve, thread_poly);
+              arg->rels += qsieve_evaluate_sieve(qs_inf, thread_sieve, thread_poly);
+           }
+        }
     }
 }
 
@@ -557,7 +633,7 @@ slong qsieve_collect_relations(qs_t qs_inf, unsigned char * sieve)
         args[i].inf = qs_inf;
         args[i].thread_idx = i;
         args[i].thread_poly = qs_inf->poly + i;
-        args[i].thread_sieve = sieve + (qs_inf->sieve_size + sizeof(ulong) + 64)*i;
+        args[i].thread_sieve = sieve + (QS_SIEVE_LEN(qs_inf) + sizeof(ulong) + 64)*i;
         args[i].rels = 0;
     }
 
@@ -1,5 +1,5 @@
 /*
-    Copyright (C) 2006, 2011, 2016, 2020 William Hart
+    Copyright (C) 2006, 2011, 2016, 2020, 2021 William Hart
     Copyright (C) 2015 Nitin Kumar
     Copyright (C) 2020 Dan Schultz
 
@@ -14,6 +14,7 @@
 #include "qsieve.h"
 #include "fmpz_factor.h"
 #include "thread_support.h"
+#include "ctrl.h"
 
 #include <inttypes.h>
 #define _STDC_FORMAT_MACROS
@@ -21,14 +22,6 @@
 #include <stdlib.h>
 #include <string.h>
 
-#include <sys/types.h>
-#if (!defined (__WIN32) || defined(__CYGWIN__)) && !defined(_MSC_VER)
-#include <unistd.h>
-#endif
-#if defined (__WIN32) && !defined(__CYGWIN__)
-#include <windows.h>
-#endif
-
 int compare_facs(const void * a, const void * b)
 {
    fmpz * x = (fmpz *) a;
@@ -49,13 +42,14 @@ void qsieve_factor(fmpz_factor_t factors, const fmpz_t n)
     ulong expt = 0;
     unsigned char * sieve;
     slong ncols, nrows, i, j = 0, count, relation = 0, num_primes;
+    slong sieve_threads;
     uint64_t * nullrows = NULL;
     uint64_t mask;
     flint_rand_t state;
+    la_mat_t mat;
     fmpz_t temp, temp2, X, Y;
     slong num_facs;
     fmpz * facs;
-    int nchars;
 
     if (fmpz_sgn(n) < 0)
     {
@@ -193,24 +187,15 @@ void qsieve_factor(fmpz_factor_t factors, const fmpz_t n)
 #endif
 
     qs_inf->num_handles = flint_request_threads(&qs_inf->handles, flint_get_num_threads());
+    sieve_threads = qs_inf->num_handles + 1; /* the sieve has room for these */
 
     /* ensure cache lines don't overlap if num_handles > 0 */
-    sieve = flint_malloc((qs_inf->sieve_size + sizeof(ulong)
+    sieve = flint_malloc((QS_SIEVE_LEN(qs_inf) + sizeof(ulong)
                + (qs_inf->num_handles > 0 ? 64 : 0))*(qs_inf->num_handles + 1));
 
 #if FLINT_USES_PTHREAD
     pthread_mutex_init(&qs_inf->mutex, NULL);
 #endif
-    
-#if defined (__WIN32) && !defined(__CYGWIN__)
-    srand((int) GetCurrentProcessId());
-#else
-    srand((int) getpid());
-#endif
-    nchars = sprintf(qs_inf->fname, "%d", (int) rand());
-    strcat(qs_inf->fname + nchars, "siqs.dat");
-
-    qs_inf->siqs = fopen(qs_inf->fname, "w");
 
     for (j = qs_inf->small_primes; j < qs_inf->num_primes; j++)
     {
@@ -237,8 +222,15 @@ void qsieve_factor(fmpz_factor_t factors, const fmpz_t n)
         do
         {           
             relation += qsieve_collect_relations(qs_inf, sieve);
-                
-            qs_inf->num_cycles = qs_inf->edges + qs_inf->components - qs_inf->vertices;
+
+            /* give up, returning n unfactored */
+            if (flint_ctrl_check("qsieve_factor",
+                    qs_inf->full_relation + qs_inf->num_cycles,
+                    (slong) (1.10*qs_inf->num_primes) + qs_inf->ks_primes + qs_inf->extra_rels))
+            {
+                _fmpz_factor_append(factors, qs_inf->n, 1);
+                goto cleanup;
+            }
 
 #if QS_DEBUG
             flint_printf("full relations = %wd, num cycles = %wd, ks_primes = %wd, "
@@ -252,8 +244,6 @@ void qsieve_factor(fmpz_factor_t factors, const fmpz_t n)
             {
                 int ok;
 
-                fclose(qs_inf->siqs);
-
                 ok = qsieve_process_relation(qs_inf);
 
                 if (ok == -1)
@@ -291,13 +281,24 @@ void qsieve_factor(fmpz_factor_t factors, const fmpz_t n)
                     flint_printf("\nBlock Lanczos\n");
 #endif
  
+                    /* the matrix products run on the task scheduler,
+                       which needs the threads held by the sieve */
+                    flint_give_back_threads(qs_inf->handles, qs_inf->num_handles);
+                    qs_inf->handles = NULL;
+                    qs_inf->num_handles = 0;
+
                     flint_randinit(state); /* initialise the random generator */
 
+                    /* pack the columns, releasing them as we go */
+                    la_mat_init(&mat, qs_inf->matrix, nrows, 0, ncols, 1);
+
                     do /* repeat block lanczos until it succeeds */
                     {
-                        nullrows = block_lanczos(state, nrows, 0, ncols, qs_inf->matrix);
+                        nullrows = block_lanczos_mat(state, &mat);
                     } while (nullrows == NULL);
 
+                    la_mat_clear(&mat);
+
                     for (i = 0, mask = 0; i < ncols; i++) /* create mask of nullspace vectors */
                         mask |= nullrows[i];
 
@@ -366,8 +367,11 @@ void qsieve_factor(fmpz_factor_t factors, const fmpz_t n)
 
                     _fmpz_vec_clear(facs, 100);
 
-                    qs_inf->siqs = fopen(qs_inf->fname, "w");
+                    qsieve_rel_store_reset(qs_inf->store);
                     qs_inf->num_primes = num_primes; /* linear algebra adjusts this */
+
+                    /* take the threads back for sieving */
+                    qs_inf->num_handles = flint_request_threads(&qs_inf->handles, sieve_threads);
                     goto more_primes; /* factoring failed, may need more primes */
                 }
             }
@@ -445,7 +449,6 @@ cleanup:
     flint_give_back_threads(qs_inf->handles, qs_inf->num_handles);
 
     flint_free(sieve);
-    remove(qs_inf->fname);
     qsieve_clear(qs_inf);
     qsieve_linalg_clear(qs_inf);
     qsieve_poly_clear(qs_inf);
@@ -10,7 +10,6 @@
     (at your option) any later version.  See <https://www.gnu.org/licenses/>.
 */
 
-#include <ctype.h>
 #include "qsieve.h"
 
 #define HASH_MULT (2654435761U)       /* hash function, taken from 'msieve' */
@@ -29,7 +28,7 @@ void qsieve_display_relation(qs_t qs_inf, relation_t a)
 {
     slong i;
 
-    flint_printf("%wu ", a.lp);
+    flint_printf("%wu %wu ", a.lp, a.lp2);
 
     for (i = 0; i < qs_inf->small_primes; i++)
         flint_printf("%wd ", a.small[i]);
@@ -73,6 +72,7 @@ int qsieve_is_relation(qs_t qs_inf, relation_t a)
     }
 
     fmpz_mul_ui(temp2, temp2, a.lp);
+    fmpz_mul_ui(temp2, temp2, a.lp2);
     fmpz_pow_ui(temp, a.Y, UWORD(2));
     fmpz_mod(temp, temp, qs_inf->kn);
     fmpz_mod(temp2, temp2, qs_inf->kn);
@@ -88,31 +88,388 @@ int qsieve_is_relation(qs_t qs_inf, relation_t a)
     return 1;
 }
 
+/******************************************************************************
+ * 
+ *  Relation store
+ * 
+ *****************************************************************************/
+
+void qsieve_rel_store_init(qs_rel_store_t store)
+{
+    store->data = NULL;
+    store->length = 0;
+    store->alloc = 0;
+    store->offset = NULL;
+    store->Y = NULL;
+    store->num = 0;
+    store->num_alloc = 0;
+    store->full = NULL;
+    store->num_full = 0;
+}
+
+void qsieve_rel_store_clear(qs_rel_store_t store)
+{
+    qsieve_rel_store_reset(store);
+
+    flint_free(store->data);
+    flint_free(store->offset);
+    flint_free(store->Y);
+    flint_free(store->full);
+
+    qsieve_rel_store_init(store);
+}
+
 /*
-    Write partial or full relation to file
+   discard all relations, keeping the allocated space
 */
-void qsieve_write_to_file(qs_t qs_inf, mp_limb_t prime, fmpz_t Y, qs_poly_t poly)
+void qsieve_rel_store_reset(qs_rel_store_t store)
 {
     slong i;
-    char * str = NULL;
-    slong num_factors = poly->num_factors;
-    slong * small = poly->small;
-    fac_t * factor = poly->factor;
 
-    flint_fprintf(qs_inf->siqs, "%X ", prime); /* write large prime */
+    for (i = 0; i < store->num; i++)
+        fmpz_clear(store->Y + i);
+
+    store->length = 0;
+    store->num = 0;
+    store->num_full = 0;
+}
+
+/*
+   append a relation to the store and return its index
+*/
+static slong _qsieve_rel_store_append(qs_rel_store_t store, mp_limb_t lp,
+                   mp_limb_t lp2, slong next, const slong * small,
+                   slong small_primes, const fac_t * factor, slong num_factors,
+                   const fmpz_t Y)
+{
+    slong i, len = 4 + small_primes + 2*num_factors;
+    slong * rec;
+
+    if (store->length + len > store->alloc)
+    {
+        store->alloc = FLINT_MAX(2*store->alloc, store->length + len);
+        store->data = flint_realloc(store->data, store->alloc*sizeof(slong));
+    }
+
+    if (store->num == store->num_alloc)
+    {
+        store->num_alloc = FLINT_MAX(2*store->num_alloc, 256);
+        store->offset = flint_realloc(store->offset,
+                                           store->num_alloc*sizeof(slong));
+        store->Y = flint_realloc(store->Y, store->num_alloc*sizeof(fmpz));
+        store->full = flint_realloc(store->full,
+                                           store->num_alloc*sizeof(slong));
+    }
+
+    rec = store->data + store->length;
+
+    rec[0] = lp;
+    rec[1] = lp2;
+    rec[2] = next;
+    rec[3] = num_factors;
+
+    for (i = 0; i < small_primes; i++)
+        rec[4 + i] = small[i];
+
+    rec += 4 + small_primes;
+
+    for (i = 0; i < num_factors; i++)
+    {
+        rec[2*i] = factor[i].ind;
+        rec[2*i + 1] = factor[i].exp;
+    }
+
+    store->offset[store->num] = store->length;
+    fmpz_init_set(store->Y + store->num, Y);
+    store->length += len;
+
+    if (lp == UWORD(1))
+        store->full[store->num_full++] = store->num;
+
+    return store->num++;
+}
+
+/*
+   return relation i of the store; the relation shares its data with the
+   store and must not be cleared
+*/
+relation_t qsieve_rel_store_get(qs_t qs_inf, slong i)
+{
+    relation_t rel;
+    slong * rec = qs_inf->store->data + qs_inf->store->offset[i];
+
+    rel.lp = rec[0];
+    rel.lp2 = rec[1];
+    rel.num_factors = rec[3];
+    rel.small_primes = qs_inf->small_primes;
+    rel.small = rec + 4;
+    rel.factor = (fac_t *) (rec + 4 + qs_inf->small_primes);
+    *rel.Y = qs_inf->store->Y[i];
+
+    return rel;
+}
+
+static int _qsieve_fac_cmp(const void * a, const void * b)
+{
+    slong i = ((const fac_t *) a)->ind;
+    slong j = ((const fac_t *) b)->ind;
+
+    return (i > j) - (i < j);
+}
+
+/*
+   Merge the partials rels[0], ..., rels[num - 1] forming a cycle in the
+   graph of partials into a full relation and store it. The large primes
+   of the vertices on the cycle, each of which occurs in exactly two of the
+   partials, are given in primes.
+*/
+static void _qsieve_add_cycle(qs_t qs_inf, const slong * rels, slong num,
+                                      const mp_limb_t * primes, slong num_lp)
+{
+    slong i, j, k, len;
+    slong * small;
+    fac_t * factor;
+    relation_t a;
+    fmpz_t Y, temp;
+
+    for (i = 0, len = 0; i < num; i++)
+        len += qsieve_rel_store_get(qs_inf, rels[i]).num_factors;
+
+    small = flint_calloc(qs_inf->small_primes, sizeof(slong));
+    factor = flint_malloc(FLINT_MAX(len, 1)*sizeof(fac_t));
+    fmpz_init_set_ui(Y, 1);
+    fmpz_init_set_ui(temp, 1);
+
+    for (i = 0, len = 0; i < num; i++)
+    {
+        a = qsieve_rel_store_get(qs_inf, rels[i]);
+
+        for (j = 0; j < qs_inf->small_primes; j++)
+            small[j] += a.small[j];
+
+        for (j = 0; j < a.num_factors; j++)
+            factor[len++] = a.factor[j];
+
+        fmpz_mul(Y, Y, a.Y);
+        fmpz_mod(Y, Y, qs_inf->kn);
+    }
+
+    /* each large prime occurs squared, so divide Y by it */
+    for (i = 0; i < num_lp; i++)
+    {
+        fmpz_mul_ui(temp, temp, primes[i]);
+        fmpz_mod(temp, temp, qs_inf->kn);
+    }
+
+    if (fmpz_invmod(temp, temp, qs_inf->kn) == 0)
+    {
+        flint_printf("Inverse doesn't exist !!\n");
+        flint_abort();
+    }
+
+    fmpz_mul(Y, Y, temp);
+    fmpz_mod(Y, Y, qs_inf->kn);
+
+    /* combine the exponents of equal factor base primes */
+    qsort(factor, len, sizeof(fac_t), _qsieve_fac_cmp);
+
+    for (i = 0, k = 0; i < len; i++)
+    {
+        if (k > 0 && factor[k - 1].ind == factor[i].ind)
+            factor[k - 1].exp += factor[i].exp;
+        else
+            factor[k++] = factor[i];
+    }
+
+    _qsieve_rel_store_append(qs_inf->store, UWORD(1), UWORD(1), -1, small,
+                                    qs_inf->small_primes, factor, k, Y);
+
+    qs_inf->num_cycles++;
+
+    flint_free(small);
+    flint_free(factor);
+    fmpz_clear(Y);
+    fmpz_clear(temp);
+}
+
+/*
+   Return the root of the tree of the spanning forest containing vertex v,
+   setting depth to the distance of v from it.
+*/
+static slong _qsieve_forest_root(hash_t * table, slong v, slong * depth)
+{
+    slong d = 0;
+
+    while (table[v].parent != -1)
+    {
+        v = table[v].parent;
+        d++;
+    }
+
+    *depth = d;
+
+    return v;
+}
+
+/*
+   Make v the root of its tree by reversing the path from v to the root.
+*/
+static void _qsieve_forest_reroot(hash_t * table, slong v)
+{
+    slong prev = -1, prev_edge = -1, next, next_edge;
+
+    while (v != -1)
+    {
+        next = table[v].parent;
+        next_edge = table[v].edge;
+
+        table[v].parent = prev;
+        table[v].edge = prev_edge;
+
+        prev = v;
+        prev_edge = next_edge;
+        v = next;
+    }
+}
+
+/*
+   Store a full relation (prime = 1) or a partial relation with large
+   primes prime and prime2 <= prime, where prime2 = 1 for a single large
+   prime. The partials are the edges of a graph on the large primes and 1,
+   of which a spanning forest is kept in the hash table. A partial joining
+   two trees of the forest is added to it; otherwise it closes a cycle,
+   which is merged into a full relation and stored as well. Returns 0 if
+   the relation was a duplicate of a stored partial, otherwise 1.
+
+   If a large prime divides kn, it is recorded in qs_inf->small_factor.
+*/
+int qsieve_add_relation(qs_t qs_inf, mp_limb_t prime, mp_limb_t prime2,
+                                                    fmpz_t Y, qs_poly_t poly)
+{
+    qs_rel_store_s * store = qs_inf->store;
+    slong i, j, k, u, v, ru, rv, du, dv, num, next = -1;
+    slong * rels;
+    mp_limb_t * primes;
+    relation_t a, b;
+    hash_t * table;
+
+    if (prime == UWORD(1))
+    {
+        _qsieve_rel_store_append(store, prime, prime2, -1, poly->small,
+                  qs_inf->small_primes, poly->factor, poly->num_factors, Y);
+        return 1;
+    }
+
+    if (fmpz_fdiv_ui(qs_inf->kn, prime) == 0)
+    {
+        qs_inf->small_factor = prime;
+        return 1;
+    }
+
+    if (prime2 != UWORD(1) && fmpz_fdiv_ui(qs_inf->kn, prime2) == 0)
+    {
+        qs_inf->small_factor = prime2;
+        return 1;
+    }
 
-    for (i = 0; i < qs_inf->small_primes; i++) /* write small primes */
-        flint_fprintf(qs_inf->siqs, "%X ", small[i]);
+    /* the table may move when an entry is added, so work with offsets */
+    v = qsieve_get_table_entry(qs_inf, prime) - qs_inf->table;
+    u = (prime2 == UWORD(1)) ? 0 :
+                     qsieve_get_table_entry(qs_inf, prime2) - qs_inf->table;
+    table = qs_inf->table;
 
-    flint_fprintf(qs_inf->siqs, "%X ", num_factors); /* write number of factors */
+    if (table[v].count != 0)
+    {
+        b.lp = prime;
+        b.lp2 = prime2;
+        b.num_factors = poly->num_factors;
+        b.small_primes = qs_inf->small_primes;
+        b.small = poly->small;
+        b.factor = poly->factor;
+
+        for (j = table[v].first; j != -1; j = store->data[store->offset[j] + 2])
+        {
+            a = qsieve_rel_store_get(qs_inf, j);
 
-    for (i = 0; i < num_factors; i++) /* write factor along with exponent */
-        flint_fprintf(qs_inf->siqs, "%wx %X ", factor[i].ind, factor[i].exp);
+            if (qsieve_compare_relation(&a, &b) == 0)
+                return 0;
+        }
 
-    str = fmpz_get_str(str, 16, Y); /* converting value of 'Y'  to hex */
+        next = table[v].first;
+    }
+
+    i = _qsieve_rel_store_append(store, prime, prime2, next, poly->small,
+                  qs_inf->small_primes, poly->factor, poly->num_factors, Y);
+
+    table[v].first = i;
+    table[v].count++;
+
+    ru = _qsieve_forest_root(table, u, &du);
+    rv = _qsieve_forest_root(table, v, &dv);
 
-    flint_fprintf(qs_inf->siqs, "%s\n", str); /* write value of 'Y' */
-    flint_free(str);
+    if (ru != rv) /* join the trees, hanging the smaller below the larger */
+    {
+        if (table[ru].size < table[rv].size)
+        {
+            j = u; u = v; v = j;
+            j = ru; ru = rv; rv = j;
+        }
+
+        table[ru].size += table[rv].size;
+
+        _qsieve_forest_reroot(table, v);
+        table[v].parent = u;
+        table[v].edge = i;
+
+        qs_inf->components--;
+
+        return 1;
+    }
+
+    /* the partial closes a cycle through the paths from u and v to their
+       common ancestor */
+    rels = flint_malloc((du + dv + 1)*sizeof(slong));
+    primes = flint_malloc((du + dv + 1)*sizeof(mp_limb_t));
+
+    num = 0;
+    k = 0;
+    rels[num++] = i;
+
+    while (du > dv)
+    {
+        primes[k++] = table[u].prime;
+        rels[num++] = table[u].edge;
+        u = table[u].parent;
+        du--;
+    }
+
+    while (dv > du)
+    {
+        primes[k++] = table[v].prime;
+        rels[num++] = table[v].edge;
+        v = table[v].parent;
+        dv--;
+    }
+
+    while (u != v)
+    {
+        primes[k++] = table[u].prime;
+        rels[num++] = table[u].edge;
+        u = table[u].parent;
+
+        primes[k++] = table[v].prime;
+        rels[num++] = table[v].edge;
+        v = table[v].parent;
+    }
+
+    primes[k++] = table[u].prime;
+
+    _qsieve_add_cycle(qs_inf, rels, num, primes, k);
+
+    flint_free(rels);
+    flint_free(primes);
+
+    return 1;
 }
 
 /******************************************************************************
@@ -169,7 +526,13 @@ hash_t * qsieve_get_table_entry(qs_t qs_inf, mp_limb_t prime)
         entry->prime = prime;
         entry->next = hash_table[first_offset];
         entry->count = 0;
+        entry->first = -1;
+        entry->parent = -1;
+        entry->edge = -1;
+        entry->size = 1;
         hash_table[first_offset] = qs_inf->vertices;
+
+        qs_inf->components++; /* a new isolated vertex */
     }
     
     return entry;
@@ -193,60 +556,6 @@ void qsieve_add_to_hashtable(qs_t qs_inf, mp_limb_t prime)
  * 
  *****************************************************************************/
 
-/*
-   given a string representing a relation, parse it to
-   obtain relation
-*/
-relation_t qsieve_parse_relation(qs_t qs_inf, char * str)
-{
-    slong i;
-    char * next;
-    relation_t rel;
-
-    rel.lp = UWORD(1);
-    rel.small = flint_malloc(qs_inf->small_primes * sizeof(slong));
-    rel.factor = flint_malloc(qs_inf->max_factors * sizeof(fac_t));
-
-    for (i = 0; i < qs_inf->small_primes; i++)
-    {
-        while (isspace(*str))
-            str++;
-
-        rel.small[i] = strtoul(str, &next, 16);
-        str = next;
-    }
-
-    while (isspace(*str))
-        str++;
-
-    rel.num_factors = strtoul(str, &next, 16);
-    rel.small_primes = qs_inf->small_primes;
-    str = next;
-
-    for (i = 0; i < rel.num_factors; i++)
-    {
-        while (isspace(*str))
-            str++;
-
-        rel.factor[i].ind = strtoul(str, &next, 16);
-        str = next;
-
-        while (isspace(*str))
-            str++;
-
-        rel.factor[i].exp = strtoul(str, &next, 16);
-        str = next;
-    }
-
-    while (isspace(*str))
-        str++;
-
-    fmpz_init(rel.Y);
-    fmpz_set_str(rel.Y, str, 16);
-
-    return rel;
-}
-
 /*
    given two partials with same large prime, merge them to
    obtain a full relation
@@ -258,6 +567,7 @@ relation_t qsieve_merge_relation(qs_t qs_inf, relation_t a, relation_t b)
     fmpz_t temp;
 
     c.lp = UWORD(1);
+    c.lp2 = UWORD(1);
     c.small = flint_malloc(qs_inf->small_primes * sizeof(slong));
     c.factor = flint_malloc(qs_inf->max_factors * sizeof(fac_t));
     fmpz_init(c.Y);
@@ -352,6 +662,12 @@ int qsieve_compare_relation(const void * a, const void * b)
     if (r1->lp < r2->lp)
         return -1;
 
+    if (r1->lp2 > r2->lp2)
+        return 1;
+
+    if (r1->lp2 < r2->lp2)
+        return -1;
+
     if (r1->num_factors > r2->num_factors)
         return 1;
 
@@ -425,7 +741,7 @@ int qsieve_remove_duplicates(relation_t * rel_list, slong num_relations)
 */
 void qsieve_insert_relation(qs_t qs_inf, relation_t * rel_list, slong num_relations)
 {
-    slong i, j, num_factors, fac_num;
+    slong i, j, num_factors, fac_num, len;
     slong * small;
     slong * curr_rel;
     fac_t * factor;
@@ -433,6 +749,14 @@ void qsieve_insert_relation(qs_t qs_inf, relation_t * rel_list, slong num_relati
 
     qs_inf->num_relations = 0;
 
+    /* merged relations have any number of factors, so size the relation
+       array to fit */
+    for (j = 0, len = 0; j < num_relations; j++)
+        len += 1 + 2*(qs_inf->small_primes + rel_list[j].num_factors);
+
+    qs_inf->relation = flint_realloc(qs_inf->relation, len*sizeof(slong));
+    qs_inf->curr_rel = qs_inf->relation;
+
     for (j = 0; j < num_relations; j++)
     {
         small = rel_list[j].small;
@@ -469,7 +793,8 @@ void qsieve_insert_relation(qs_t qs_inf, relation_t * rel_list, slong num_relati
 
         fmpz_set(qs_inf->Y_arr + qs_inf->num_relations, rel_list[j].Y);
 
-        qs_inf->curr_rel += qs_inf->max_factors*2;
+        qs_inf->rel_offset[qs_inf->num_relations] = curr_rel - qs_inf->relation;
+        qs_inf->curr_rel += 2*fac_num + 1;
         qs_inf->num_relations++;
     }
 
@@ -477,133 +802,63 @@ void qsieve_insert_relation(qs_t qs_inf, relation_t * rel_list, slong num_relati
 }
 
 /*
-   process relations from the file
+   Check whether enough distinct full relations, including those obtained by
+   merging partials, have been found, and if so insert them into the matrix.
+   Returns 1 if so, 0 if more relations are needed and -1 if a factor of kn
+   was found as a large prime.
 */
 int qsieve_process_relation(qs_t qs_inf)
 {
-    char buf[1024];
-    char * str;
-    slong i, num_relations = 0, num_relations2, full = 0;
-    slong rel_list_length;
-    slong rlist_length;
-    mp_limb_t prime;
-    hash_t * entry;
-    mp_limb_t * hash_table = qs_inf->hash_table;
-    slong rel_size = 50000;
-    relation_t * rel_list = (relation_t *) flint_malloc(rel_size * sizeof(relation_t));
-    relation_t * rlist;
-    int done = 0;
-  
-    qs_inf->siqs = fopen(qs_inf->fname, "r");
+    qs_rel_store_s * store = qs_inf->store;
+    slong i, j, num_relations, needed;
+    relation_t * rel_list;
+    int done;
 
-#if QS_DEBUG & 64
-    printf("Getting relations\n");
-#endif
+    if (qs_inf->small_factor != 0)
+        return -1;
 
-    while (fgets(buf, sizeof(buf), qs_inf->siqs) != NULL)
-    {
-        prime = strtoul(buf, &str, 16);
-        entry = qsieve_get_table_entry(qs_inf, prime);
+    needed = qs_inf->num_primes + qs_inf->ks_primes + qs_inf->extra_rels;
+    num_relations = store->num_full;
 
-        if (num_relations == rel_size)
-        {
-           rel_list = (relation_t *) flint_realloc(rel_list, 2*rel_size * sizeof(relation_t));
-           rel_size *= 2;
-        }
-        
-        if (prime == 1 || entry->count >= 2)
-        {
-            rel_list[num_relations] = qsieve_parse_relation(qs_inf, str);
-            rel_list[num_relations].lp = prime;
-            num_relations++;
-        }
+    if (num_relations < needed)
+    {
+        qs_inf->num_cycles -= 100;
+        return 0;
     }
 
-    fclose(qs_inf->siqs);
-
 #if QS_DEBUG & 64
     printf("Removing duplicates\n");
 #endif
 
-    num_relations = qsieve_remove_duplicates(rel_list, num_relations);
-    rel_list_length = num_relations;
-
-#if QS_DEBUG & 64
-    printf("Merging relations\n");
-#endif
-
-    rlist = flint_malloc(num_relations * sizeof(relation_t));
-    memset(hash_table, 0, (1 << 20) * sizeof(mp_limb_t));
-    qs_inf->vertices = 0;
+    rel_list = flint_malloc(num_relations*sizeof(relation_t));
 
-    rlist_length = 0;
     for (i = 0; i < num_relations; i++)
-    {
-        if (rel_list[i].lp == UWORD(1))
-        {
-            rlist[rlist_length++] = rel_list[i];
-            full++;
-        }
-        else
-        {
-            entry = qsieve_get_table_entry(qs_inf, rel_list[i].lp);
+        rel_list[i] = qsieve_rel_store_get(qs_inf, store->full[i]);
 
-            if (entry->count == 0) entry->count = i;
-            else
-            {
-                if (fmpz_fdiv_ui(qs_inf->kn, rel_list[i].lp) == 0)
-                {
-                   qs_inf->small_factor = rel_list[i].lp;
-                   
-                   done = -1;
-                   goto cleanup;
-                }
-                rlist[rlist_length++] = qsieve_merge_relation(qs_inf, rel_list[i], rel_list[entry->count]);
-            }
-        }
-    }
-
-    num_relations = rlist_length;
-
-#if QS_DEBUG & 64
-    printf("Sorting relations\n");
-#endif
+    /* the relations share their data with the store, so are not cleared */
+    qsort(rel_list, (size_t) num_relations, sizeof(relation_t),
+                                                      qsieve_compare_relation);
 
-    if (rlist_length < qs_inf->num_primes + qs_inf->ks_primes + qs_inf->extra_rels)
-    {
-       qs_inf->edges -= 100;
-       done = 0;
-       qs_inf->siqs = fopen(qs_inf->fname, "a");
-    } else
+    for (i = 1, j = 0; i < num_relations; i++)
     {
-       done = 1;
-       num_relations2 = qs_inf->num_primes + qs_inf->ks_primes + qs_inf->extra_rels;
-       qsort(rlist, (size_t) num_relations2, sizeof(relation_t), qsieve_compare_relation);
-       qsieve_insert_relation(qs_inf, rlist, num_relations2);
+        if (qsieve_compare_relation(rel_list + j, rel_list + i) != 0)
+            rel_list[++j] = rel_list[i];
     }
 
-cleanup:
+    num_relations = j + 1;
 
-    for (i = 0; i < rel_list_length; i++)
+    if (num_relations < needed)
     {
-        /* it looks like rlist stole our data if rel_list[i].lp == UWORD(1)) */
-        if (rel_list[i].lp != UWORD(1))
-        {
-            flint_free(rel_list[i].small);
-            flint_free(rel_list[i].factor);
-            fmpz_clear(rel_list[i].Y);
-        }
+        qs_inf->num_cycles -= 100;
+        done = 0;
     }
-    flint_free(rel_list);
-
-    for (i = 0; i < rlist_length; i++)
+    else
     {
-       flint_free(rlist[i].small);
-       flint_free(rlist[i].factor);
-       fmpz_clear(rlist[i].Y);
+        qsieve_insert_relation(qs_inf, rel_list, needed);
+        done = 1;
     }
-    flint_free(rlist);
+
+    flint_free(rel_list);
 
     return done;
 }
-
@@ -17,9 +17,12 @@ void qsieve_linalg_clear(qs_t qs_inf)
     slong i;
 
     flint_free(qs_inf->relation);
+    flint_free(qs_inf->rel_offset);
     flint_free(qs_inf->hash_table);
     flint_free(qs_inf->table);
 
+    qsieve_rel_store_clear(qs_inf->store);
+
     if (qs_inf->matrix != NULL)
     {
         for (i = 0; i < qs_inf->buffer_size; i++)
@@ -43,6 +46,7 @@ void qsieve_linalg_clear(qs_t qs_inf)
     flint_free(qs_inf->prime_count);
 
     qs_inf->relation = NULL;
+    qs_inf->rel_offset = NULL;
     qs_inf->matrix = NULL;
     qs_inf->Y_arr = NULL;
     qs_inf->prime_count = NULL;
@@ -12,6 +12,21 @@
 
 #include "qsieve.h"
 
+/*
+    Entry 0 of the hash table is the vertex 1 of the graph of partials,
+    which the single large prime partials join to their large prime.
+*/
+static void _qsieve_table_init_root(hash_t * table)
+{
+    table[0].prime = UWORD(1);
+    table[0].next = 0;
+    table[0].count = 0;
+    table[0].first = -1;
+    table[0].parent = -1;
+    table[0].edge = -1;
+    table[0].size = 1;
+}
+
 /*
     Initialise linear algebra.
 */
@@ -29,8 +44,8 @@ void qsieve_linalg_init(qs_t qs_inf)
     qs_inf->buffer_size = 2*(qs_inf->num_primes + qs_inf->extra_rels);
     qs_inf->matrix = flint_malloc((qs_inf->buffer_size)*sizeof(la_col_t));
     qs_inf->Y_arr = flint_malloc(qs_inf->buffer_size*sizeof(fmpz));
-    qs_inf->curr_rel = qs_inf->relation
-                     = flint_malloc(2*qs_inf->buffer_size*qs_inf->max_factors*sizeof(slong));
+    qs_inf->curr_rel = qs_inf->relation = NULL; /* sized when relations are inserted */
+    qs_inf->rel_offset = flint_malloc(qs_inf->buffer_size*sizeof(slong));
 
     for (i = 0; i < qs_inf->buffer_size; i++)
     {
@@ -55,6 +70,10 @@ void qsieve_linalg_init(qs_t qs_inf)
     qs_inf->table_size = 10000;
     qs_inf->hash_table = flint_calloc((1 << 20), sizeof(mp_limb_t));
     qs_inf->table = flint_malloc(qs_inf->table_size * sizeof(hash_t));
+    _qsieve_table_init_root(qs_inf->table);
+
+    qsieve_rel_store_init(qs_inf->store);
+    qs_inf->small_factor = 0;
 }
 
 /* 
@@ -70,8 +89,7 @@ void qsieve_linalg_realloc(qs_t qs_inf)
     qs_inf->buffer_size = 2*(qs_inf->num_primes + qs_inf->extra_rels);
     qs_inf->matrix = flint_realloc(qs_inf->matrix, qs_inf->buffer_size*sizeof(la_col_t));
     qs_inf->Y_arr = flint_realloc(qs_inf->Y_arr, qs_inf->buffer_size*sizeof(fmpz));
-    qs_inf->curr_rel = qs_inf->relation
-                     = flint_realloc(qs_inf->relation, 2*qs_inf->buffer_size*qs_inf->max_factors*sizeof(slong));
+    qs_inf->rel_offset = flint_realloc(qs_inf->rel_offset, qs_inf->buffer_size*sizeof(slong));
 
     qs_inf->prime_count = flint_realloc(qs_inf->prime_count, qs_inf->num_primes*sizeof(slong));
     qs_inf->num_primes = num_primes;
@@ -108,4 +126,7 @@ void qsieve_linalg_realloc(qs_t qs_inf)
     qs_inf->num_cycles = 0;
 
     memset(qs_inf->hash_table, 0, (1 << 20)*sizeof(mp_limb_t));
+    _qsieve_table_init_root(qs_inf->table);
+
+    qs_inf->small_factor = 0;
 }
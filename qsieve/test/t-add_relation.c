@@ -0,0 +1,228 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+#include "fmpz.h"
+#include "qsieve.h"
+
+#define POOL_SIZE 40
+
+static slong find(slong * uf, slong v)
+{
+    while (uf[v] != v)
+        v = uf[v];
+
+    return v;
+}
+
+int main(void)
+{
+    int i;
+    slong j, k, r, span, num_rels, num_full, cycles;
+    slong uf[POOL_SIZE + 1];
+    mp_limb_t pool[POOL_SIZE], pmax, prime, prime2;
+    qs_t qs_inf;
+    qs_poly_t poly;
+    relation_t a;
+    fmpz_t n, Y, T, t;
+
+    FLINT_TEST_INIT(state);
+
+    flint_printf("add_relation....");
+    fflush(stdout);
+
+    for (i = 0; i < 20 * flint_test_multiplier(); i++)
+    {
+        fmpz_init(n);
+        fmpz_init(Y);
+        fmpz_init(T);
+        fmpz_init(t);
+
+        /* a prime n = 3 mod 4, so that -1 is not a square modulo n */
+        do
+        {
+            fmpz_randprime(n, state, 90 + n_randint(state, 60), 0);
+        } while (fmpz_fdiv_ui(n, 4) != 3);
+
+        qsieve_init(qs_inf, n);
+        qs_inf->k = 1;
+        fmpz_set(qs_inf->kn, n);
+
+        if (qsieve_primes_init(qs_inf) != 0)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("factor base of a prime has a factor\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        qsieve_linalg_init(qs_inf);
+
+        poly->small = flint_malloc(qs_inf->small_primes*sizeof(slong));
+        poly->factor = flint_malloc(3*sizeof(fac_t));
+
+        /* large primes, between the largest factor base prime and
+           QS_LP_MULT times it */
+        pmax = qs_inf->factor_base[qs_inf->num_primes - 1].p;
+        for (j = 0; j < POOL_SIZE; j++)
+        {
+            pool[j] = n_nextprime(pmax + n_randint(state,
+                                            (QS_LP_MULT - 1)*pmax), 0);
+
+            for (k = 0; k < j; k++)
+                if (pool[k] == pool[j])
+                    j--;
+        }
+
+        /* sorted factor base indices are taken from three ranges */
+        span = (qs_inf->num_primes - qs_inf->small_primes)/3;
+
+        for (j = 0; j <= POOL_SIZE; j++)
+            uf[j] = j;
+
+        num_rels = n_randint(state, 200);
+        num_full = 0;
+        cycles = 0;
+
+        for (r = 0; r < num_rels; r++)
+        {
+            slong u, v;
+
+            /* random factorisation over the factor base */
+            for (j = 0; j < qs_inf->small_primes; j++)
+                poly->small[j] = 0;
+            poly->small[1] = n_randint(state, 10);
+
+            poly->num_factors = n_randint(state, 4);
+            for (j = 0; j < poly->num_factors; j++)
+            {
+                poly->factor[j].ind = qs_inf->small_primes + j*span
+                                                   + n_randint(state, span);
+                poly->factor[j].exp = n_randint(state, 3) + 1;
+            }
+
+            /* a full relation, an edge to 1 or an edge between two primes */
+            switch (n_randint(state, 4))
+            {
+                case 0:
+                    u = v = 0;
+                    break;
+                case 1:
+                    u = 0;
+                    v = n_randint(state, POOL_SIZE) + 1;
+                    break;
+                default:
+                    u = n_randint(state, POOL_SIZE) + 1;
+                    v = n_randint(state, POOL_SIZE) + 1;
+            }
+
+            if (u != 0 && pool[u - 1] > pool[v - 1])
+            {
+                k = u; u = v; v = k;
+            }
+
+            prime = (v == 0) ? 1 : pool[v - 1];
+            prime2 = (u == 0) ? 1 : pool[u - 1];
+
+            fmpz_set_ui(T, prime);
+            fmpz_mul_ui(T, T, prime2);
+            fmpz_mul_2exp(T, T, poly->small[1]);
+            for (j = 0; j < poly->num_factors; j++)
+            {
+                fmpz_set_ui(t, qs_inf->factor_base[poly->factor[j].ind].p);
+                fmpz_pow_ui(t, t, poly->factor[j].exp);
+                fmpz_mul(T, T, t);
+            }
+
+            fmpz_mod(T, T, n);
+            if (fmpz_jacobi(T, n) == -1)
+            {
+                poly->small[2] = 1;
+                fmpz_sub(T, n, T);
+            }
+
+            fmpz_sqrtmod(Y, T, n);
+
+            if (qsieve_add_relation(qs_inf, prime, prime2, Y, poly))
+            {
+                if (v == 0)
+                    num_full++;
+                else if (find(uf, u) == find(uf, v))
+                    cycles++;
+                else
+                    uf[find(uf, u)] = find(uf, v);
+            }
+        }
+
+        if (qs_inf->num_cycles != cycles
+            || qs_inf->store->num_full != num_full + cycles)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("num_cycles = %wd, expected %wd\n",
+                                                  qs_inf->num_cycles, cycles);
+            flint_printf("num_full = %wd, expected %wd\n",
+                                 qs_inf->store->num_full, num_full + cycles);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        /* each full relation must satisfy Y^2 = product of its factors */
+        for (r = 0; r < qs_inf->store->num_full; r++)
+        {
+            a = qsieve_rel_store_get(qs_inf, qs_inf->store->full[r]);
+
+            fmpz_one(T);
+            fmpz_mul_2exp(T, T, a.small[1]);
+            if (a.small[2] % 2)
+                fmpz_neg(T, T);
+            for (j = 0; j < a.num_factors; j++)
+            {
+                fmpz_set_ui(t, qs_inf->factor_base[a.factor[j].ind].p);
+                fmpz_pow_ui(t, t, a.factor[j].exp);
+                fmpz_mul(T, T, t);
+            }
+            fmpz_mod(T, T, n);
+
+            fmpz_mul(t, a.Y, a.Y);
+            fmpz_mod(t, t, n);
+
+            if (a.lp != 1 || a.lp2 != 1 || !fmpz_equal(t, T))
+            {
+                flint_printf("FAIL:\n");
+                flint_printf("invalid full relation\n");
+                flint_printf("Y = "); fmpz_print(a.Y); flint_printf("\n");
+                fflush(stdout);
+                flint_abort();
+            }
+        }
+
+        flint_free(poly->small);
+        flint_free(poly->factor);
+
+        qsieve_linalg_clear(qs_inf);
+        fmpz_clear(qs_inf->target_A);
+        qsieve_clear(qs_inf);
+
+        fmpz_clear(n);
+        fmpz_clear(Y);
+        fmpz_clear(T);
+        fmpz_clear(t);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
@@ -0,0 +1,132 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+
+#define MAX_DEPTH 20
+
+int main(void)
+{
+    int i, result;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("arena....");
+    fflush(stdout);
+
+    for (i = 0; i < 1000 * flint_test_multiplier(); i++)
+    {
+        mp_ptr blocks[MAX_DEPTH];
+        slong lens[MAX_DEPTH];
+        size_t marks[MAX_DEPTH];
+        flint_arena_stats_t stats;
+        slong depth, j, k;
+
+        depth = n_randint(state, MAX_DEPTH) + 1;
+
+        /* nested scopes, each filled with a pattern */
+        for (j = 0; j < depth; j++)
+        {
+            marks[j] = flint_arena_mark();
+
+            if (n_randint(state, 10) == 0)
+                lens[j] = n_randint(state, 100000);
+            else
+                lens[j] = n_randint(state, 100);
+
+            blocks[j] = FLINT_ARENA_ARRAY_ALLOC(lens[j], mp_limb_t);
+
+            result = (((ulong) blocks[j]) % 16 == 0);
+            if (!result)
+            {
+                flint_printf("FAIL:\n");
+                flint_printf("unaligned block\n");
+                fflush(stdout);
+                flint_abort();
+            }
+
+            for (k = 0; k < lens[j]; k++)
+                blocks[j][k] = j + k;
+        }
+
+        flint_arena_stats(stats);
+
+        result = (stats->used <= stats->high_water &&
+                  stats->used <= stats->reserved);
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("used = %wu, high_water = %wu, reserved = %wu\n",
+                     stats->used, stats->high_water, stats->reserved);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        /* unwind, checking no scope was overwritten by a later one */
+        for (j = depth - 1; j >= 0; j--)
+        {
+            for (k = 0; k < lens[j]; k++)
+            {
+                if (blocks[j][k] != (mp_limb_t) (j + k))
+                {
+                    flint_printf("FAIL:\n");
+                    flint_printf("block %wd overwritten\n", j);
+                    fflush(stdout);
+                    flint_abort();
+                }
+            }
+
+            flint_arena_release(marks[j]);
+        }
+
+        result = (flint_arena_mark() == marks[0]);
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("arena not unwound\n");
+            fflush(stdout);
+            flint_abort();
+        }
+    }
+
+    /* large scratch space is not kept once released */
+    for (i = 0; i < 10 * flint_test_multiplier(); i++)
+    {
+        flint_arena_stats_t stats;
+        size_t mark = flint_arena_mark();
+        slong j, num = n_randint(state, 4) + 1;
+
+        for (j = 0; j < num; j++)
+            FLINT_ARENA_ALLOC(n_randint(state, 2*FLINT_ARENA_KEEP) + 1);
+
+        flint_arena_release(mark);
+        flint_arena_stats(stats);
+
+        result = (mark == 0 && stats->reserved <= FLINT_ARENA_KEEP);
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("mark = %wu, reserved = %wu\n", mark, stats->reserved);
+            fflush(stdout);
+            flint_abort();
+        }
+    }
+
+    flint_arena_clear();
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
@@ -0,0 +1,319 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "fmpz_mat.h"
+#include "nmod_mat.h"
+#include "ulong_extras.h"
+#include "binfile.h"
+
+#define TMP_NAME "t-binfile.tmp"
+
+int main(void)
+{
+    int i, result;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("binfile....");
+    fflush(stdout);
+
+    /* mapped fmpz matrices */
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        fmpz_mat_t A;
+        flint_bin_map_t M;
+        fmpz_t x;
+        slong r, c, j, k;
+        FILE * file;
+
+        r = n_randint(state, 10);
+        c = n_randint(state, 10);
+
+        fmpz_mat_init(A, r, c);
+        fmpz_mat_randtest(A, state, n_randint(state, 300) + 1);
+        fmpz_init(x);
+
+        file = fopen(TMP_NAME, "wb");
+        result = (file != NULL) && fmpz_mat_fwrite_bin(file, A);
+        result = result && fclose(file) == 0;
+        result = result && flint_bin_map_open(M, TMP_NAME);
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("could not write and map %s\n", TMP_NAME);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        result = (M->header->type == FLINT_BIN_FMPZ_MAT &&
+                  M->header->dims[0] == r && M->header->dims[1] == c &&
+                  M->header->num == r*c);
+
+        for (j = 0; j < r && result; j++)
+        {
+            for (k = 0; k < c && result; k++)
+            {
+                fmpz * e = fmpz_mat_entry(A, j, k);
+                slong idx = j*c + k;
+
+                /* small entries are usable in place */
+                if (!COEFF_IS_MPZ(*e))
+                    result = flint_bin_map_is_small(M, idx)
+                                        && fmpz_equal(M->table + idx, e);
+                else
+                {
+                    slong size;
+                    mp_srcptr d;
+
+                    d = flint_bin_map_limbs(&size, M, idx);
+                    result = !flint_bin_map_is_small(M, idx)
+                          && size == COEFF_TO_PTR(*e)->_mp_size
+                          && mpn_cmp(d, COEFF_TO_PTR(*e)->_mp_d,
+                                                        FLINT_ABS(size)) == 0;
+                }
+
+                flint_bin_map_get_fmpz(x, M, idx);
+                result = result && fmpz_equal(x, e);
+            }
+        }
+
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            fmpz_mat_print_pretty(A); flint_printf("\n\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        flint_bin_map_close(M);
+
+        fmpz_clear(x);
+        fmpz_mat_clear(A);
+    }
+
+    /* mapped nmod matrices, and rejection of bad files */
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        nmod_mat_t A;
+        flint_bin_map_t M;
+        slong r, c, j, k;
+        FILE * file;
+
+        r = n_randint(state, 10);
+        c = n_randint(state, 10);
+
+        nmod_mat_init(A, r, c, n_randtest_not_zero(state));
+        nmod_mat_randtest(A, state);
+
+        file = fopen(TMP_NAME, "wb");
+        result = (file != NULL) && nmod_mat_fwrite_bin(file, A);
+        result = result && fclose(file) == 0;
+        result = result && flint_bin_map_open(M, TMP_NAME);
+
+        result = result && M->header->type == FLINT_BIN_NMOD_MAT &&
+                           M->header->dims[2] == A->mod.n;
+
+        for (j = 0; j < r && result; j++)
+            for (k = 0; k < c && result; k++)
+                result = (M->data[j*c + k] == nmod_mat_entry(A, j, k));
+
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            nmod_mat_print_pretty(A); flint_printf("\n\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        flint_bin_map_close(M);
+
+        /* a file with trailing garbage is not a valid container */
+        file = fopen(TMP_NAME, "ab");
+        result = (file != NULL) && fputc(0, file) != EOF;
+        result = result && fclose(file) == 0;
+        result = result && !flint_bin_map_open(M, TMP_NAME);
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("bad file was mapped\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        nmod_mat_clear(A);
+    }
+
+    /* table words which are neither small nor refer to the pool */
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        fmpz_mat_t A;
+        flint_bin_map_t M;
+        fmpz_t x;
+        slong r, c, idx, size;
+        fmpz w;
+        FILE * file;
+
+        r = n_randint(state, 10) + 1;
+        c = n_randint(state, 10) + 1;
+        idx = n_randint(state, r*c);
+
+        if (n_randint(state, 2))
+            w = COEFF_MAX + 1 + n_randint(state, 100);
+        else
+            w = WORD_MAX - n_randint(state, 100);
+
+        fmpz_mat_init(A, r, c);
+        fmpz_mat_randtest(A, state, n_randint(state, 300) + 1);
+        fmpz_init(x);
+
+        file = fopen(TMP_NAME, "wb");
+        result = (file != NULL) && fmpz_mat_fwrite_bin(file, A);
+        result = result && fclose(file) == 0;
+
+        file = fopen(TMP_NAME, "r+b");
+        result = result && (file != NULL) && fseek(file,
+            sizeof(flint_bin_header_struct) + idx*sizeof(mp_limb_t),
+                                                            SEEK_SET) == 0;
+        result = result && fwrite(&w, sizeof(fmpz), 1, file) == 1;
+        result = result && fclose(file) == 0;
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("could not write %s\n", TMP_NAME);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        file = fopen(TMP_NAME, "rb");
+        result = (file != NULL) && !fmpz_mat_fread_bin(file, A);
+        result = result && fclose(file) == 0;
+        result = result && fmpz_mat_is_zero(A);
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("invalid table word was read, w = %wd\n", w);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        result = flint_bin_map_open(M, TMP_NAME);
+        result = result && !flint_bin_map_is_small(M, idx);
+        result = result && flint_bin_map_limbs(&size, M, idx) == NULL;
+        fmpz_one(x);
+        result = result && !flint_bin_map_get_fmpz(x, M, idx) &&
+                                                            fmpz_is_zero(x);
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("invalid table word was mapped, w = %wd\n", w);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        flint_bin_map_close(M);
+
+        fmpz_clear(x);
+        fmpz_mat_clear(A);
+    }
+
+    /* indices outside the table and large coefficients with a zero top limb */
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        fmpz_mat_t A;
+        flint_bin_map_t M;
+        fmpz_t x;
+        fmpz * v;
+        slong r, c, idx, size, n, pos;
+        mp_limb_t zero = 0;
+        FILE * file;
+
+        r = n_randint(state, 10) + 1;
+        c = n_randint(state, 10) + 1;
+        idx = n_randint(state, r*c);
+        n = n_randint(state, 5) + 2;
+
+        fmpz_mat_init(A, r, c);
+        fmpz_mat_randtest(A, state, 20);
+        fmpz_init(x);
+        v = _fmpz_vec_init(r*c + 1);
+
+        /* the only large entry, so its limbs start the pool */
+        fmpz_randtest_unsigned(x, state, (n - 1)*FLINT_BITS);
+        fmpz_setbit(x, (n - 1)*FLINT_BITS + 1);
+        if (n_randint(state, 2))
+            fmpz_neg(x, x);
+        fmpz_set(A->entries + idx, x);
+
+        file = fopen(TMP_NAME, "wb");
+        result = (file != NULL) && fmpz_mat_fwrite_bin(file, A);
+        result = result && fclose(file) == 0;
+
+        result = result && flint_bin_map_open(M, TMP_NAME);
+        result = result && !flint_bin_map_is_small(M, r*c) &&
+                           !flint_bin_map_is_small(M, -1);
+        result = result && flint_bin_map_limbs(&size, M, r*c) == NULL &&
+                           flint_bin_map_limbs(&size, M, -1) == NULL;
+        result = result && !flint_bin_map_get_fmpz(x, M, r*c) &&
+                           fmpz_is_zero(x);
+        result = result && !flint_bin_map_get_fmpz_vec(v, M, 1, r*c) &&
+                           _fmpz_vec_is_zero(v, r*c);
+        result = result && !flint_bin_map_get_fmpz_vec(v, M, -1, 1) &&
+                           flint_bin_map_get_fmpz_vec(v, M, 0, r*c);
+
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("index outside the table was mapped\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        pos = sizeof(flint_bin_header_struct) + (M->header->num +
+                                       M->header->data + n)*sizeof(mp_limb_t);
+        flint_bin_map_close(M);
+
+        file = fopen(TMP_NAME, "r+b");
+        result = (file != NULL) && fseek(file, pos, SEEK_SET) == 0;
+        result = result && fwrite(&zero, sizeof(mp_limb_t), 1, file) == 1;
+        result = result && fclose(file) == 0;
+
+        result = result && flint_bin_map_open(M, TMP_NAME);
+        result = result && !flint_bin_map_is_small(M, idx);
+        result = result && flint_bin_map_limbs(&size, M, idx) == NULL;
+        result = result && !flint_bin_map_get_fmpz(x, M, idx) &&
+                           fmpz_is_zero(x);
+
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("zero top limb was mapped\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        flint_bin_map_close(M);
+
+        _fmpz_vec_clear(v, r*c + 1);
+        fmpz_clear(x);
+        fmpz_mat_clear(A);
+    }
+
+    remove(TMP_NAME);
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
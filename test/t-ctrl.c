@@ -0,0 +1,280 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_factor.h"
+#include "fmpz_poly.h"
+#include "aprcl.h"
+#include "ulong_extras.h"
+#include "ctrl.h"
+
+static int
+stop_after(void * data, const char * stage, slong done, slong total)
+{
+    slong * calls = (slong *) data;
+
+    (*calls)--;
+
+    return *calls < 0;
+}
+
+int main(void)
+{
+    int i, result;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("ctrl....");
+    fflush(stdout);
+
+    /* no attached context */
+    if (flint_ctrl_current() != NULL || flint_ctrl_check("test", 0, 0)
+                                     || flint_ctrl_stopped())
+    {
+        flint_printf("FAIL:\n");
+        flint_printf("check without a context\n");
+        fflush(stdout);
+        flint_abort();
+    }
+
+    /* stopped factorisation leaves a product equal to n */
+    for (i = 0; i < 10 * flint_test_multiplier(); i++)
+    {
+        flint_ctrl_t ctrl;
+        flint_ctrl_struct * prev;
+        fmpz_factor_t fac;
+        fmpz_t n, p, q;
+        slong calls, j;
+
+        fmpz_init(n);
+        fmpz_init(p);
+        fmpz_init(q);
+        fmpz_factor_init(fac);
+
+        fmpz_randprime(p, state, 60 + n_randint(state, 40), 0);
+        fmpz_randprime(q, state, 60 + n_randint(state, 40), 0);
+        fmpz_mul(n, p, q);
+        fmpz_mul_ui(n, n, n_randtest_not_zero(state));
+
+        flint_ctrl_init(ctrl);
+        calls = n_randint(state, 3);
+        flint_ctrl_set_progress(ctrl, stop_after, &calls);
+
+        prev = flint_ctrl_attach(ctrl);
+        fmpz_factor(fac, n);
+        flint_ctrl_attach(prev);
+
+        fmpz_factor_expand(p, fac);
+
+        result = fmpz_equal(n, p) && flint_ctrl_current() == prev &&
+                 flint_ctrl_status(ctrl) == FLINT_CTRL_CANCELLED;
+
+        /* factors found before stopping must be genuine */
+        for (j = 0; j < fac->num && result; j++)
+            result = fmpz_cmp_ui(fac->p + j, 1) > 0;
+
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("n = "); fmpz_print(n); flint_printf("\n");
+            flint_printf("product = "); fmpz_print(p); flint_printf("\n");
+            flint_printf("status = %d\n", flint_ctrl_status(ctrl));
+            fflush(stdout);
+            flint_abort();
+        }
+
+        fmpz_clear(n);
+        fmpz_clear(p);
+        fmpz_clear(q);
+        fmpz_factor_clear(fac);
+    }
+
+    /* primality tests return -1 once the deadline has passed */
+    for (i = 0; i < 2 * flint_test_multiplier(); i++)
+    {
+        flint_ctrl_t ctrl;
+        flint_ctrl_struct * prev;
+        fmpz_t n;
+        int r1, r2;
+
+        fmpz_init(n);
+        fmpz_randprime(n, state, 200 + n_randint(state, 100), 0);
+
+        flint_ctrl_init(ctrl);
+        flint_ctrl_set_timeout(ctrl, -1.0);
+
+        prev = flint_ctrl_attach(ctrl);
+        r1 = aprcl_is_prime(n);
+        r2 = aprcl_is_prime_gauss(n);
+        flint_ctrl_attach(prev);
+
+        result = r1 == -1 && r2 == -1 &&
+                 flint_ctrl_status(ctrl) == FLINT_CTRL_DEADLINE;
+
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("n = "); fmpz_print(n); flint_printf("\n");
+            flint_printf("r1 = %d, r2 = %d, status = %d\n",
+                                          r1, r2, flint_ctrl_status(ctrl));
+            fflush(stdout);
+            flint_abort();
+        }
+
+        fmpz_clear(n);
+    }
+
+    /* a stopped proof is not taken as proof of primality; about half of
+       the 200 bit primes need APR-CL, which is where the proof stops */
+    {
+        int unproved_nextprime = 0, unproved_smooth = 0;
+
+        for (i = 0; i < 100 && (i < 2 * flint_test_multiplier() ||
+                           !unproved_nextprime || !unproved_smooth); i++)
+        {
+            flint_ctrl_t ctrl;
+            flint_ctrl_struct * prev;
+            fmpz_factor_t fac;
+            fmpz_t n, p, q;
+            int r, stopped;
+
+            fmpz_init(n);
+            fmpz_init(p);
+            fmpz_init(q);
+            fmpz_factor_init(fac);
+
+            fmpz_randprime(p, state, 200, 0);
+            fmpz_sub_ui(n, p, 1);
+
+            flint_ctrl_init(ctrl);
+            flint_ctrl_set_timeout(ctrl, -1.0);
+
+            prev = flint_ctrl_attach(ctrl);
+            fmpz_nextprime(q, n, 1);
+            flint_ctrl_attach(prev);
+
+            stopped = (flint_ctrl_status(ctrl) != FLINT_CTRL_RUNNING);
+            unproved_nextprime |= fmpz_is_zero(q);
+
+            /* zero only if stopped, otherwise the next prime */
+            if (fmpz_is_zero(q) ? !stopped : !fmpz_equal(q, p))
+            {
+                flint_printf("FAIL:\n");
+                flint_printf("nextprime, stopped = %d\n", stopped);
+                flint_printf("n = "); fmpz_print(n); flint_printf("\n");
+                flint_printf("q = "); fmpz_print(q); flint_printf("\n");
+                fflush(stdout);
+                flint_abort();
+            }
+
+            fmpz_mul_ui(n, p, n_randint(state, 1000) + 2);
+
+            flint_ctrl_init(ctrl);
+            flint_ctrl_set_timeout(ctrl, -1.0);
+
+            prev = flint_ctrl_attach(ctrl);
+            r = fmpz_factor_smooth(fac, n, 32, 1);
+            flint_ctrl_attach(prev);
+
+            stopped = (flint_ctrl_status(ctrl) != FLINT_CTRL_RUNNING);
+            unproved_smooth |= (r == 0);
+
+            fmpz_factor_expand(q, fac);
+
+            /* incomplete only if stopped */
+            if ((r == 0 && !stopped) || !fmpz_equal(n, q))
+            {
+                flint_printf("FAIL:\n");
+                flint_printf("factor_smooth, stopped = %d\n", stopped);
+                flint_printf("n = "); fmpz_print(n); flint_printf("\n");
+                flint_printf("r = %d\n", r);
+                fmpz_factor_print(fac); flint_printf("\n");
+                fflush(stdout);
+                flint_abort();
+            }
+
+            fmpz_clear(n);
+            fmpz_clear(p);
+            fmpz_clear(q);
+            fmpz_factor_clear(fac);
+        }
+
+        if (!unproved_nextprime || !unproved_smooth)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("stopped proof accepted, nextprime %d, factor_smooth %d\n",
+                                         unproved_nextprime, unproved_smooth);
+            fflush(stdout);
+            flint_abort();
+        }
+    }
+
+    /* stopped polynomial factorisation leaves a product equal to f */
+    for (i = 0; i < 10 * flint_test_multiplier(); i++)
+    {
+        flint_ctrl_t ctrl;
+        flint_ctrl_struct * prev;
+        fmpz_poly_factor_t fac;
+        fmpz_poly_t f, g, h;
+        slong j;
+
+        fmpz_poly_init(f);
+        fmpz_poly_init(g);
+        fmpz_poly_init(h);
+        fmpz_poly_factor_init(fac);
+
+        fmpz_poly_set_ui(f, 1);
+        for (j = 0; j < 6; j++)
+        {
+            do {
+                fmpz_poly_randtest(g, state, n_randint(state, 10) + 2, 20);
+            } while (fmpz_poly_degree(g) < 1);
+            fmpz_poly_mul(f, f, g);
+        }
+
+        flint_ctrl_init(ctrl);
+        flint_ctrl_cancel(ctrl);
+
+        prev = flint_ctrl_attach(ctrl);
+        fmpz_poly_factor(fac, f);
+        flint_ctrl_attach(prev);
+
+        fmpz_poly_set_fmpz(h, &fac->c);
+        for (j = 0; j < fac->num; j++)
+        {
+            fmpz_poly_pow(g, fac->p + j, fac->exp[j]);
+            fmpz_poly_mul(h, h, g);
+        }
+
+        result = fmpz_poly_equal(f, h);
+
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("f = "); fmpz_poly_print(f); flint_printf("\n");
+            flint_printf("h = "); fmpz_poly_print(h); flint_printf("\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        fmpz_poly_clear(f);
+        fmpz_poly_clear(g);
+        fmpz_poly_clear(h);
+        fmpz_poly_factor_clear(fac);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
@@ -0,0 +1,151 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+#include "fmpz_poly.h"
+#include "fmpz_mat.h"
+#include "profiler.h"
+
+#define MAX_RECORDS 100
+
+/* total calls of the given entry point */
+static ulong entry_calls(const char * entry)
+{
+    flint_dispatch_record_struct * R;
+    slong i, j, n;
+    ulong calls = 0, hist;
+
+    R = flint_malloc(MAX_RECORDS*sizeof(flint_dispatch_record_struct));
+    n = flint_dispatch_trace_get(R, MAX_RECORDS);
+
+    for (i = 0; i < n; i++)
+    {
+        if (strcmp(R[i].entry, entry) != 0)
+            continue;
+
+        /* every call lands in exactly one bucket of each histogram */
+        for (hist = j = 0; j <= FLINT_BITS; j++)
+            hist += R[i].len_hist[j];
+
+        if (hist != R[i].calls)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("histogram of %s/%s inconsistent\n", entry, R[i].alg);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        calls += R[i].calls;
+    }
+
+    flint_free(R);
+
+    return calls;
+}
+
+int main(void)
+{
+    int i, result;
+    ulong expected = 0;
+    FILE * file;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("dispatch_trace....");
+    fflush(stdout);
+
+    flint_dispatch_trace_reset();
+
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        fmpz_poly_t a, b, c;
+
+        fmpz_poly_init(a);
+        fmpz_poly_init(b);
+        fmpz_poly_init(c);
+
+        fmpz_poly_randtest(a, state, n_randint(state, 100) + 1, 
+                                                     n_randint(state, 500) + 1);
+        fmpz_poly_randtest_not_zero(b, state, n_randint(state, 100) + 1,
+                                                     n_randint(state, 500) + 1);
+
+        /* _fmpz_poly_mul is reached exactly once per product */
+        fmpz_poly_mul(c, a, b);
+        expected += !fmpz_poly_is_zero(a);
+
+        fmpz_poly_clear(a);
+        fmpz_poly_clear(b);
+        fmpz_poly_clear(c);
+    }
+
+    result = (entry_calls("fmpz_poly_mul") == (FLINT_DISPATCH_TRACE ? expected : 0));
+    if (!result)
+    {
+        flint_printf("FAIL:\n");
+        flint_printf("calls = %wu, expected = %wu\n",
+                                        entry_calls("fmpz_poly_mul"), expected);
+        fflush(stdout);
+        flint_abort();
+    }
+
+    for (i = 0; i < 10 * flint_test_multiplier(); i++)
+    {
+        fmpz_mat_t A, B, C;
+        slong m = n_randint(state, 30) + 3;
+
+        fmpz_mat_init(A, m, m);
+        fmpz_mat_init(B, m, m);
+        fmpz_mat_init(C, m, m);
+
+        fmpz_mat_randtest(A, state, n_randint(state, 200) + 1);
+        fmpz_mat_randtest(B, state, n_randint(state, 200) + 1);
+        fmpz_mat_mul(C, A, B);
+
+        fmpz_mat_clear(A);
+        fmpz_mat_clear(B);
+        fmpz_mat_clear(C);
+    }
+
+    entry_calls("fmpz_mat_mul");
+
+    file = fopen("dispatch_trace_test", "w");
+    result = (file != NULL && flint_dispatch_trace_fprint_json(file));
+    if (file != NULL)
+        fclose(file);
+
+    if (remove("dispatch_trace_test") || !result)
+    {
+        flint_printf("FAIL:\n");
+        flint_printf("could not write trace\n");
+        fflush(stdout);
+        flint_abort();
+    }
+
+    flint_dispatch_trace_reset();
+
+    result = (entry_calls("fmpz_poly_mul") == 0);
+    if (!result)
+    {
+        flint_printf("FAIL:\n");
+        flint_printf("reset did not clear the trace\n");
+        fflush(stdout);
+        flint_abort();
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
@@ -0,0 +1,224 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+#include "fmpz_poly.h"
+#include "nmod_poly.h"
+#include "tuning.h"
+
+int main(void)
+{
+    int i, result;
+    flint_tuning_t T, S, D;
+    FILE * f;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("tuning....");
+    fflush(stdout);
+
+    flint_tuning_init(D);
+
+    /* write and read back random profiles */
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        slong j;
+
+        flint_tuning_init(T);
+        flint_tuning_init(S);
+
+        for (j = 0; j < FLINT_TUNE_NUM_PARAMS; j++)
+            T->params[j] = flint_tuning_param_min(j) + n_randint(state, 100000);
+
+        for (j = 0; j < 10; j++)
+            T->fft_tab[j / 2][j % 2] = n_randint(state, 5);
+
+        result = (flint_tuning_write(T, "flint_tuning_test") == 0 &&
+                  flint_tuning_read(S, "flint_tuning_test") == 0);
+
+        for (j = 0; result && j < FLINT_TUNE_NUM_PARAMS; j++)
+            result = (S->params[j] == T->params[j]);
+
+        for (j = 0; result && j < 10; j++)
+            result = (S->fft_tab[j / 2][j % 2] == T->fft_tab[j / 2][j % 2]);
+
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("profile not read back\n");
+            fflush(stdout);
+            remove("flint_tuning_test");
+            flint_abort();
+        }
+    }
+
+    /* a profile for another version or word size is rejected */
+    f = fopen("flint_tuning_test", "w");
+    fprintf(f, "version %d\nbits %d\nnmod_poly_mul_ks2 1\n",
+                                      FLINT_TUNING_VERSION + 1, FLINT_BITS);
+    fclose(f);
+
+    flint_tuning_init(S);
+    result = (flint_tuning_read(S, "flint_tuning_test") != 0 &&
+                   S->params[FLINT_TUNE_NMOD_POLY_MUL_KS2] ==
+                                     D->params[FLINT_TUNE_NMOD_POLY_MUL_KS2]);
+
+    f = fopen("flint_tuning_test", "w");
+    fprintf(f, "version %d\nbits %d\nnmod_poly_mul_ks2 1\n",
+                                      FLINT_TUNING_VERSION, 96 - FLINT_BITS);
+    fclose(f);
+
+    result = result && (flint_tuning_read(S, "flint_tuning_test") != 0);
+
+    if (remove("flint_tuning_test") || !result)
+    {
+        flint_printf("FAIL:\n");
+        flint_printf("mismatched profile accepted\n");
+        fflush(stdout);
+        flint_abort();
+    }
+
+    /* a value below the minimum is rejected */
+    f = fopen("flint_tuning_test", "w");
+    fprintf(f, "version %d\nbits %d\nfft_mulmod_2expp1 %ld\n",
+                                      FLINT_TUNING_VERSION, FLINT_BITS,
+               (long) flint_tuning_param_min(FLINT_TUNE_FFT_MULMOD_2EXPP1) - 1);
+    fclose(f);
+
+    flint_tuning_init(S);
+    result = (flint_tuning_read(S, "flint_tuning_test") != 0 &&
+                   S->params[FLINT_TUNE_FFT_MULMOD_2EXPP1] ==
+                                     D->params[FLINT_TUNE_FFT_MULMOD_2EXPP1]);
+
+    if (remove("flint_tuning_test") || !result)
+    {
+        flint_printf("FAIL:\n");
+        flint_printf("value below minimum accepted\n");
+        fflush(stdout);
+        flint_abort();
+    }
+
+    /* a lowered FFT cutoff loaded from a profile gives correct products */
+    f = fopen("flint_tuning_test", "w");
+    fprintf(f, "version %d\nbits %d\nfft_mulmod_2expp1 %ld\n",
+                                      FLINT_TUNING_VERSION, FLINT_BITS,
+               (long) flint_tuning_param_min(FLINT_TUNE_FFT_MULMOD_2EXPP1));
+    fclose(f);
+
+    result = (flint_tuning_load("flint_tuning_test") == 0);
+
+    if (remove("flint_tuning_test") || !result)
+    {
+        flint_printf("FAIL:\n");
+        flint_printf("profile with lowered cutoff not loaded\n");
+        fflush(stdout);
+        flint_abort();
+    }
+
+    for (i = 0; i < 20 * flint_test_multiplier(); i++)
+    {
+        fmpz_poly_t a, b, c, d;
+        slong len;
+
+        fmpz_poly_init(a);
+        fmpz_poly_init(b);
+        fmpz_poly_init(c);
+        fmpz_poly_init(d);
+
+        fmpz_poly_randtest(a, state, n_randint(state, 300) + 1, n_randint(state, 2000) + 1);
+        fmpz_poly_randtest(b, state, n_randint(state, 300) + 1, n_randint(state, 2000) + 1);
+        len = n_randint(state, a->length + b->length) + 1;
+
+        fmpz_poly_mullow_SS(c, a, b, len);
+        fmpz_poly_mullow_classical(d, a, b, len);
+
+        result = fmpz_poly_equal(c, d);
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("wrong product with lowered FFT cutoff\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        fmpz_poly_clear(a);
+        fmpz_poly_clear(b);
+        fmpz_poly_clear(c);
+        fmpz_poly_clear(d);
+    }
+
+    flint_tuning_set(D);
+
+    /* products do not depend on the crossovers */
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        fmpz_poly_t a, b, c, d;
+        nmod_poly_t e, g, h, k;
+        mp_limb_t n = n_randtest_not_zero(state);
+        slong j;
+
+        fmpz_poly_init(a);
+        fmpz_poly_init(b);
+        fmpz_poly_init(c);
+        fmpz_poly_init(d);
+        nmod_poly_init(e, n);
+        nmod_poly_init(g, n);
+        nmod_poly_init(h, n);
+        nmod_poly_init(k, n);
+
+        fmpz_poly_randtest(a, state, n_randint(state, 100), n_randint(state, 400));
+        fmpz_poly_randtest(b, state, n_randint(state, 100), n_randint(state, 400));
+        nmod_poly_randtest(e, state, n_randint(state, 200));
+        nmod_poly_randtest(g, state, n_randint(state, 200));
+
+        flint_tuning_set(D);
+        fmpz_poly_mul(c, a, b);
+        nmod_poly_mul(h, e, g);
+
+        flint_tuning_init(T);
+        for (j = 0; j < FLINT_TUNE_NUM_PARAMS; j++)
+            T->params[j] = n_randint(state, 2000);
+        for (j = 0; j < 10; j++)
+            T->fft_tab[j / 2][j % 2] = n_randint(state, 5);
+        flint_tuning_set(T);
+
+        fmpz_poly_mul(d, a, b);
+        nmod_poly_mul(k, e, g);
+
+        result = (fmpz_poly_equal(c, d) && nmod_poly_equal(h, k));
+        if (!result)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("product depends on profile\n");
+            fflush(stdout);
+            flint_abort();
+        }
+
+        fmpz_poly_clear(a);
+        fmpz_poly_clear(b);
+        fmpz_poly_clear(c);
+        fmpz_poly_clear(d);
+        nmod_poly_clear(e);
+        nmod_poly_clear(g);
+        nmod_poly_clear(h);
+        nmod_poly_clear(k);
+    }
+
+    flint_tuning_set(D);
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
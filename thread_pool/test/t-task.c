@@ -0,0 +1,238 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "fmpz.h"
+#include "fmpz_vec.h"
+#include "thread_support.h"
+
+/******************************************************************************
+    test1 - calculate x = n! with nested spawn/join, splitting the range in
+            two and spawning one half at each level
+*******************************************************************************/
+
+typedef struct
+{
+    ulong min;
+    ulong max;
+    fmpz_t ans;
+}
+worker1_arg_struct;
+
+void test1_helper(fmpz_t x, ulong min, ulong max);
+
+void worker1(void * varg)
+{
+    worker1_arg_struct * arg = (worker1_arg_struct *) varg;
+
+    test1_helper(arg->ans, arg->min, arg->max);
+}
+
+/* set x = product of numbers in (min, max] */
+void test1_helper(fmpz_t x, ulong min, ulong max)
+{
+    ulong i, mid;
+
+    if (max - min > UWORD(20))
+    {
+        flint_task_group_t G;
+        worker1_arg_struct arg[1];
+
+        mid = min + ((max - min)/UWORD(2));
+
+        flint_task_group_init(G);
+
+        arg->min = min;
+        arg->max = mid;
+        fmpz_init(arg->ans);
+        flint_task_spawn(G, worker1, arg);
+
+        test1_helper(x, mid, max);
+
+        flint_task_group_wait(G);
+
+        fmpz_mul(x, x, arg->ans);
+        fmpz_clear(arg->ans);
+    }
+    else
+    {
+        fmpz_one(x);
+        for (i = max; i > min; i--)
+            fmpz_mul_ui(x, x, i);
+    }
+}
+
+/******************************************************************************
+    test2 - nested parallel for: v[i] = sum_{j < i} (i + j) computed with an
+            inner parallel loop for every i
+*******************************************************************************/
+
+typedef struct
+{
+    fmpz * v;
+    slong inner_grain;
+}
+outer_arg_struct;
+
+typedef struct
+{
+    fmpz * partial;
+    slong i;
+}
+inner_arg_struct;
+
+void inner_body(slong start, slong stop, void * varg)
+{
+    inner_arg_struct * arg = (inner_arg_struct *) varg;
+    slong j;
+
+    for (j = start; j < stop; j++)
+        fmpz_set_si(arg->partial + j, arg->i + j);
+}
+
+void outer_body(slong start, slong stop, void * varg)
+{
+    outer_arg_struct * arg = (outer_arg_struct *) varg;
+    inner_arg_struct inner;
+    slong i;
+
+    for (i = start; i < stop; i++)
+    {
+        inner.partial = _fmpz_vec_init(i);
+        inner.i = i;
+
+        flint_parallel_for(0, i, arg->inner_grain, inner_body, &inner);
+
+        _fmpz_vec_sum(arg->v + i, inner.partial, i);
+        _fmpz_vec_clear(inner.partial, i);
+    }
+}
+
+/******************************************************************************
+    test3 - futures
+*******************************************************************************/
+
+void worker3(void * varg)
+{
+    fmpz * x = (fmpz *) varg;
+
+    fmpz_fac_ui(x, fmpz_get_ui(x));
+}
+
+int
+main(void)
+{
+    slong i, j;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("task....");
+    fflush(stdout);
+
+    for (i = 0; i < 10*flint_test_multiplier(); i++)
+    {
+        fmpz_t x, y;
+
+        fmpz_init(x);
+        fmpz_init(y);
+        flint_set_num_threads(n_randint(state, 10) + 1);
+
+        for (j = 0; j < 10; j++)
+        {
+            ulong n = n_randint(state, 2000);
+
+            fmpz_fac_ui(y, n);
+
+            test1_helper(x, 0, n);
+            if (!fmpz_equal(x, y))
+            {
+                flint_printf("FAIL:\n");
+                flint_printf("test1 n: %wu\n", n);
+                fflush(stdout);
+                flint_abort();
+            }
+        }
+
+        fmpz_clear(x);
+        fmpz_clear(y);
+    }
+
+    for (i = 0; i < 10*flint_test_multiplier(); i++)
+    {
+        outer_arg_struct arg;
+        slong n = n_randint(state, 200);
+
+        flint_set_num_threads(n_randint(state, 10) + 1);
+
+        arg.v = _fmpz_vec_init(n);
+        arg.inner_grain = n_randint(state, 10);
+
+        flint_parallel_for(0, n, n_randint(state, 5), outer_body, &arg);
+
+        for (j = 0; j < n; j++)
+        {
+            /* sum_{k < j} (j + k) = j^2 + j(j - 1)/2 */
+            if (!fmpz_equal_si(arg.v + j, j*j + j*(j - 1)/2))
+            {
+                flint_printf("FAIL:\n");
+                flint_printf("test2 n: %wd, j: %wd\n", n, j);
+                fflush(stdout);
+                flint_abort();
+            }
+        }
+
+        _fmpz_vec_clear(arg.v, n);
+    }
+
+    for (i = 0; i < 10*flint_test_multiplier(); i++)
+    {
+        flint_future_t F[5];
+        fmpz_t x[5], y;
+        ulong n[5];
+
+        flint_set_num_threads(n_randint(state, 10) + 1);
+
+        fmpz_init(y);
+
+        for (j = 0; j < 5; j++)
+        {
+            n[j] = n_randint(state, 500);
+            fmpz_init_set_ui(x[j], n[j]);
+            flint_future_spawn(F[j], worker3, x[j]);
+        }
+
+        /* the first future started the session, so wait on it first */
+        for (j = 0; j < 5; j++)
+        {
+            flint_future_wait(F[j]);
+
+            fmpz_fac_ui(y, n[j]);
+            if (!fmpz_equal(x[j], y))
+            {
+                flint_printf("FAIL:\n");
+                flint_printf("test3 n: %wu\n", n[j]);
+                fflush(stdout);
+                flint_abort();
+            }
+
+            fmpz_clear(x[j]);
+        }
+
+        fmpz_clear(y);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
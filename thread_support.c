@@ -1,6 +1,7 @@
 /*
     Copyright (C) 2013 Fredrik Johansson
     Copyright (C) 2019 Daniel Schultz
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -10,6 +11,7 @@
     (at your option) any later version.  See <https://www.gnu.org/licenses/>.
 */
 
+#include <string.h>
 #include "flint.h"
 #include "thread_pool.h"
 #include "thread_support.h"
@@ -123,3 +125,502 @@ void flint_give_back_threads(thread_pool_handle * handles, slong num_handles)
         flint_free(handles);
 }
 
+
+/*
+    Task scheduler.
+
+    The first task spawned by a thread which is not already running inside
+    the scheduler starts a session: threads are requested from the global
+    pool and each participant (the spawning thread plus its workers) gets its
+    own deque. Tasks are pushed and popped at the bottom of the owner's deque
+    and stolen from the top by idle participants. A participant waiting on a
+    group runs tasks until the group is done, so nested spawns from inside a
+    task simply feed the deques of the current session instead of asking the
+    pool for threads that are already in use. The session ends when the
+    group which started it has been waited on and no tasks are left.
+
+    Without thread local storage the participants cannot tell sessions apart,
+    so in that case (and without pthreads) tasks are run as they are spawned.
+*/
+
+#if FLINT_USES_PTHREAD && FLINT_USES_TLS
+
+typedef struct
+{
+    void (* fxn)(void *);
+    void * arg;
+    flint_task_group_struct * group;
+} _flint_task_struct;
+
+typedef struct
+{
+    pthread_mutex_t mutex;
+    _flint_task_struct * tasks;
+    slong alloc;
+    slong top;
+    slong bottom;
+} _flint_task_deque_struct;
+
+struct _flint_task_sched_struct;
+
+typedef struct
+{
+    struct _flint_task_sched_struct * sched;
+    slong id;
+} _flint_task_worker_arg_t;
+
+typedef struct _flint_task_sched_struct
+{
+    pthread_mutex_t mutex;
+    pthread_cond_t cond;
+    slong queued;       /* tasks sitting in some deque */
+    slong active;       /* tasks spawned but not yet finished */
+    slong sleepers;
+    int exit;
+    _flint_task_deque_struct * deques;
+    slong num_deques;
+    thread_pool_handle * threads;
+    slong num_threads;
+    _flint_task_worker_arg_t * args;
+} _flint_task_sched_struct;
+
+FLINT_TLS_PREFIX _flint_task_sched_struct * _flint_task_sched = NULL;
+FLINT_TLS_PREFIX slong _flint_task_id = 0;
+
+static void _flint_task_push(_flint_task_deque_struct * Q,
+                                                 const _flint_task_struct * t)
+{
+    pthread_mutex_lock(&Q->mutex);
+
+    if (Q->bottom >= Q->alloc)
+    {
+        if (Q->top > 0)
+        {
+            memmove(Q->tasks, Q->tasks + Q->top,
+                               (Q->bottom - Q->top)*sizeof(_flint_task_struct));
+            Q->bottom -= Q->top;
+            Q->top = 0;
+        }
+        else
+        {
+            Q->alloc = FLINT_MAX(2*Q->alloc, WORD(16));
+            Q->tasks = (_flint_task_struct *) flint_realloc(Q->tasks,
+                                           Q->alloc*sizeof(_flint_task_struct));
+        }
+    }
+
+    Q->tasks[Q->bottom++] = *t;
+
+    pthread_mutex_unlock(&Q->mutex);
+}
+
+/* owner end: most recently pushed task first */
+static int _flint_task_pop(_flint_task_deque_struct * Q,
+                                                       _flint_task_struct * t)
+{
+    int found = 0;
+
+    pthread_mutex_lock(&Q->mutex);
+
+    if (Q->bottom > Q->top)
+    {
+        *t = Q->tasks[--Q->bottom];
+        found = 1;
+
+        if (Q->bottom == Q->top)
+            Q->bottom = Q->top = 0;
+    }
+
+    pthread_mutex_unlock(&Q->mutex);
+
+    return found;
+}
+
+/* thief end: oldest, and for divide and conquer usually largest, task */
+static int _flint_task_steal(_flint_task_deque_struct * Q,
+                                                       _flint_task_struct * t)
+{
+    int found = 0;
+
+    /* the owner updates bottom and top under the lock, so even an empty
+       deque must be checked with the lock held */
+    pthread_mutex_lock(&Q->mutex);
+
+    if (Q->bottom > Q->top)
+    {
+        *t = Q->tasks[Q->top++];
+        found = 1;
+
+        if (Q->bottom == Q->top)
+            Q->bottom = Q->top = 0;
+    }
+
+    pthread_mutex_unlock(&Q->mutex);
+
+    return found;
+}
+
+/* run one task from our own deque or a victim's, return 0 if none found */
+static int _flint_task_run_one(_flint_task_sched_struct * S, slong id)
+{
+    _flint_task_struct t;
+    flint_task_group_struct * G;
+    slong i;
+    int found;
+
+    found = _flint_task_pop(S->deques + id, &t);
+
+    for (i = 1; !found && i < S->num_deques; i++)
+        found = _flint_task_steal(S->deques + (id + i) % S->num_deques, &t);
+
+    if (!found)
+        return 0;
+
+    pthread_mutex_lock(&S->mutex);
+    S->queued--;
+    pthread_mutex_unlock(&S->mutex);
+
+    t.fxn(t.arg);
+
+    G = t.group;
+
+    pthread_mutex_lock(&S->mutex);
+    G->pending--;
+    S->active--;
+    if (G->pending == 0 || S->active == 0)
+        pthread_cond_broadcast(&S->cond);
+    pthread_mutex_unlock(&S->mutex);
+
+    return 1;
+}
+
+/*
+    Help until *count is zero (or the session exits if count is NULL). The
+    count is only read with the lock held, which also makes the results of
+    the tasks counted visible to the caller.
+*/
+static void _flint_task_help(_flint_task_sched_struct * S, slong id,
+                                                       volatile slong * count)
+{
+    while (1)
+    {
+        pthread_mutex_lock(&S->mutex);
+
+        while (S->queued == 0 && (count == NULL ? !S->exit : *count > 0))
+        {
+            S->sleepers++;
+            pthread_cond_wait(&S->cond, &S->mutex);
+            S->sleepers--;
+        }
+
+        if (count == NULL ? S->exit : *count == 0)
+        {
+            pthread_mutex_unlock(&S->mutex);
+            return;
+        }
+
+        pthread_mutex_unlock(&S->mutex);
+
+        _flint_task_run_one(S, id);
+    }
+}
+
+static void _flint_task_worker(void * varg)
+{
+    _flint_task_worker_arg_t * arg = (_flint_task_worker_arg_t *) varg;
+
+    _flint_task_sched = arg->sched;
+    _flint_task_id = arg->id;
+
+    _flint_task_help(arg->sched, arg->id, NULL);
+
+    _flint_task_sched = NULL;
+    _flint_task_id = 0;
+}
+
+static _flint_task_sched_struct * _flint_task_sched_start(void)
+{
+    _flint_task_sched_struct * S;
+    thread_pool_handle * threads;
+    slong i, num_threads;
+
+    num_threads = flint_request_threads(&threads, flint_get_num_threads());
+
+    if (num_threads < 1)
+    {
+        flint_give_back_threads(threads, num_threads);
+        return NULL;
+    }
+
+    S = (_flint_task_sched_struct *) flint_malloc(
+                                             sizeof(_flint_task_sched_struct));
+
+    pthread_mutex_init(&S->mutex, NULL);
+    pthread_cond_init(&S->cond, NULL);
+    S->queued = 0;
+    S->active = 0;
+    S->sleepers = 0;
+    S->exit = 0;
+    S->threads = threads;
+    S->num_threads = num_threads;
+    S->num_deques = num_threads + 1;
+    S->deques = (_flint_task_deque_struct *) flint_malloc(
+                             S->num_deques*sizeof(_flint_task_deque_struct));
+    S->args = (_flint_task_worker_arg_t *) flint_malloc(
+                                 num_threads*sizeof(_flint_task_worker_arg_t));
+
+    for (i = 0; i < S->num_deques; i++)
+    {
+        pthread_mutex_init(&S->deques[i].mutex, NULL);
+        S->deques[i].tasks = NULL;
+        S->deques[i].alloc = 0;
+        S->deques[i].top = 0;
+        S->deques[i].bottom = 0;
+    }
+
+    _flint_task_sched = S;
+    _flint_task_id = 0;
+
+    for (i = 0; i < num_threads; i++)
+    {
+        S->args[i].sched = S;
+        S->args[i].id = i + 1;
+        thread_pool_wake(global_thread_pool, threads[i], 0,
+                                                 _flint_task_worker, S->args + i);
+    }
+
+    return S;
+}
+
+static void _flint_task_sched_stop(_flint_task_sched_struct * S)
+{
+    slong i;
+
+    pthread_mutex_lock(&S->mutex);
+    S->exit = 1;
+    pthread_cond_broadcast(&S->cond);
+    pthread_mutex_unlock(&S->mutex);
+
+    for (i = 0; i < S->num_threads; i++)
+        thread_pool_wait(global_thread_pool, S->threads[i]);
+
+    flint_give_back_threads(S->threads, S->num_threads);
+
+    for (i = 0; i < S->num_deques; i++)
+    {
+        pthread_mutex_destroy(&S->deques[i].mutex);
+        flint_free(S->deques[i].tasks);
+    }
+
+    pthread_cond_destroy(&S->cond);
+    pthread_mutex_destroy(&S->mutex);
+
+    flint_free(S->deques);
+    flint_free(S->args);
+    flint_free(S);
+
+    _flint_task_sched = NULL;
+    _flint_task_id = 0;
+}
+
+void flint_task_group_init(flint_task_group_t G)
+{
+    G->pending = 0;
+    G->sched = NULL;
+    G->owns_sched = 0;
+}
+
+void flint_task_spawn(flint_task_group_t G, void (* f)(void *), void * arg)
+{
+    _flint_task_sched_struct * S = _flint_task_sched;
+    _flint_task_struct t;
+
+    if (S == NULL)
+    {
+        S = _flint_task_sched_start();
+
+        if (S == NULL)
+        {
+            f(arg);
+            return;
+        }
+
+        G->owns_sched = 1;
+    }
+
+    t.fxn = f;
+    t.arg = arg;
+    t.group = G;
+
+    /* tasks of the group may be spawning into it from other threads */
+    pthread_mutex_lock(&S->mutex);
+    if (G->sched == NULL)
+        G->sched = S;
+    G->pending++;
+    S->active++;
+    S->queued++;
+    pthread_mutex_unlock(&S->mutex);
+
+    _flint_task_push(S->deques + _flint_task_id, &t);
+
+    pthread_mutex_lock(&S->mutex);
+    if (S->sleepers > 0)
+        pthread_cond_signal(&S->cond);
+    pthread_mutex_unlock(&S->mutex);
+}
+
+void flint_task_group_wait(flint_task_group_t G)
+{
+    _flint_task_sched_struct * S = (_flint_task_sched_struct *) G->sched;
+
+    if (S == NULL)
+        return;
+
+    if (G->owns_sched)
+    {
+        _flint_task_help(S, _flint_task_id, &S->active);
+        _flint_task_sched_stop(S);
+    }
+    else if (S == _flint_task_sched)
+    {
+        /* otherwise the session, and with it every task of G, has ended */
+        _flint_task_help(S, _flint_task_id, &G->pending);
+    }
+
+    flint_task_group_init(G);
+}
+
+slong flint_task_num_threads(void)
+{
+    if (_flint_task_sched != NULL)
+        return _flint_task_sched->num_deques;
+
+    return flint_get_num_threads();
+}
+
+#else
+
+void flint_task_group_init(flint_task_group_t G)
+{
+    G->pending = 0;
+    G->sched = NULL;
+    G->owns_sched = 0;
+}
+
+void flint_task_spawn(flint_task_group_t G, void (* f)(void *), void * arg)
+{
+    f(arg);
+}
+
+void flint_task_group_wait(flint_task_group_t G)
+{
+}
+
+slong flint_task_num_threads(void)
+{
+    return 1;
+}
+
+#endif
+
+void flint_future_spawn(flint_future_t F, void (* f)(void *), void * arg)
+{
+    flint_task_group_init(F);
+    flint_task_spawn(F, f, arg);
+}
+
+void flint_future_wait(flint_future_t F)
+{
+    flint_task_group_wait(F);
+}
+
+typedef struct
+{
+    slong start;
+    slong stop;
+    slong grain;
+    slong num_chunks;
+    void (* fxn)(slong, slong, void *);
+    void * arg;
+    flint_task_group_struct * group;
+    struct _flint_parallel_for_node_struct * nodes;
+} _flint_parallel_for_struct;
+
+typedef struct _flint_parallel_for_node_struct
+{
+    _flint_parallel_for_struct * loop;
+    slong c0;
+    slong c1;
+} _flint_parallel_for_node_struct;
+
+/*
+    Run chunks [c0, c1) by repeatedly handing the upper half to the scheduler,
+    so that a thief always takes a large contiguous piece of the range.
+    The node for a half starting at chunk c is stored at index c.
+*/
+static void _flint_parallel_for_worker(void * varg)
+{
+    _flint_parallel_for_node_struct * node =
+                                    (_flint_parallel_for_node_struct *) varg;
+    _flint_parallel_for_struct * L = node->loop;
+    slong c0 = node->c0, c1 = node->c1, cm, lo, hi;
+
+    while (c1 - c0 > 1)
+    {
+        cm = c0 + (c1 - c0)/2;
+        L->nodes[cm].loop = L;
+        L->nodes[cm].c0 = cm;
+        L->nodes[cm].c1 = c1;
+        flint_task_spawn(L->group, _flint_parallel_for_worker, L->nodes + cm);
+        c1 = cm;
+    }
+
+    lo = L->start + c0*L->grain;
+    hi = FLINT_MIN(lo + L->grain, L->stop);
+
+    L->fxn(lo, hi, L->arg);
+}
+
+void flint_parallel_for(slong start, slong stop, slong grain,
+                              void (* f)(slong, slong, void *), void * arg)
+{
+    _flint_parallel_for_struct L;
+    flint_task_group_t G;
+    slong num_threads;
+
+    if (stop <= start)
+        return;
+
+    num_threads = flint_task_num_threads();
+
+    if (grain <= 0)
+        grain = FLINT_MAX((stop - start)/(4*num_threads), WORD(1));
+
+    if (num_threads <= 1 || stop - start <= grain)
+    {
+        f(start, stop, arg);
+        return;
+    }
+
+    flint_task_group_init(G);
+
+    L.start = start;
+    L.stop = stop;
+    L.grain = grain;
+    L.num_chunks = (stop - start - 1)/grain + 1;
+    L.fxn = f;
+    L.arg = arg;
+    L.group = G;
+    L.nodes = (_flint_parallel_for_node_struct *) flint_malloc(
+                          L.num_chunks*sizeof(_flint_parallel_for_node_struct));
+
+    L.nodes[0].loop = &L;
+    L.nodes[0].c0 = 0;
+    L.nodes[0].c1 = L.num_chunks;
+
+    _flint_parallel_for_worker(L.nodes + 0);
+
+    flint_task_group_wait(G);
+
+    flint_free(L.nodes);
+}
@@ -27,6 +27,38 @@ FLINT_DLL slong flint_request_threads(thread_pool_handle ** handles,
 FLINT_DLL void flint_give_back_threads(thread_pool_handle * handles,
                                                             slong num_handles);
 
+/* task scheduler ************************************************************/
+
+typedef struct
+{
+    volatile slong pending;
+    void * sched;
+    int owns_sched;
+} flint_task_group_struct;
+
+typedef flint_task_group_struct flint_task_group_t[1];
+
+typedef flint_task_group_struct flint_future_struct;
+
+typedef flint_future_struct flint_future_t[1];
+
+FLINT_DLL void flint_task_group_init(flint_task_group_t G);
+
+FLINT_DLL void flint_task_spawn(flint_task_group_t G,
+                                              void (* f)(void *), void * arg);
+
+FLINT_DLL void flint_task_group_wait(flint_task_group_t G);
+
+FLINT_DLL void flint_future_spawn(flint_future_t F,
+                                              void (* f)(void *), void * arg);
+
+FLINT_DLL void flint_future_wait(flint_future_t F);
+
+FLINT_DLL void flint_parallel_for(slong start, slong stop, slong grain,
+                         void (* f)(slong, slong, void *), void * arg);
+
+FLINT_DLL slong flint_task_num_threads(void);
+
 #ifdef __cplusplus
 }
 #endif
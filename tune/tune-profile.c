@@ -0,0 +1,474 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+/*
+    Measure algorithm crossovers on this machine and write a tuning profile.
+
+    usage: tune-profile [file]
+
+    The profile (default flint_tuning.txt) can be loaded by pointing the
+    FLINT_TUNING_FILE environment variable at it or with flint_tuning_load.
+    Crossovers which are not measured here (Strassen and multimodular fmpz_mat
+    multiplication of small entries lie beyond dimension 1000) keep their
+    defaults.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include <time.h>
+#include "flint.h"
+#include "ulong_extras.h"
+#include "mpn_extras.h"
+#include "fft.h"
+#include "nmod_vec.h"
+#include "nmod_poly.h"
+#include "fmpz_vec.h"
+#include "fmpz_poly.h"
+#include "fmpz_mat.h"
+#include "tuning.h"
+
+#define MIN_TIME 0.02
+
+/* seconds per call of f(arg) */
+static double time_fn(void (* f)(void *, int), void * arg)
+{
+    clock_t start;
+    double elapsed;
+    slong reps = 1;
+
+    while (1)
+    {
+        slong i;
+
+        start = clock();
+        for (i = 0; i < reps; i++)
+            f(arg, (int) i);
+        elapsed = ((double) (clock() - start)) / CLOCKS_PER_SEC;
+
+        if (elapsed >= MIN_TIME)
+            return elapsed / reps;
+
+        reps *= 2;
+    }
+}
+
+/* FFT ***********************************************************************/
+
+typedef struct
+{
+    mp_ptr r, i1, i2, tt;
+    mp_size_t n1, n2, limbs;
+    flint_bitcnt_t bits;
+    slong depth, w;
+} fft_arg_t;
+
+static void fft_mul(void * varg, int alg)
+{
+    fft_arg_t * a = (fft_arg_t *) varg;
+
+    mul_truncate_sqrt2(a->r, a->i1, a->n1, a->i2, a->n2, a->depth, a->w);
+}
+
+static void fft_mulmod(void * varg, int i)
+{
+    fft_arg_t * a = (fft_arg_t *) varg;
+
+    _fft_mulmod_2expp1(a->r, a->i1, a->i2, a->limbs, a->depth, a->w);
+}
+
+static void fft_mulmod_basecase(void * varg, int i)
+{
+    fft_arg_t * a = (fft_arg_t *) varg;
+
+    flint_mpn_mulmod_2expp1_basecase(a->r, a->i1, a->i2, 0, a->bits, a->tt);
+}
+
+/* same measurement as FFT_TAB in fft/tune/tune-fft.c */
+static void tune_fft_tab(flint_tuning_t T, flint_rand_t state)
+{
+    slong depth, w, off;
+
+    for (depth = 6; depth <= 10; depth++)
+    {
+        for (w = 1; w <= 2; w++)
+        {
+            mp_size_t n = (UWORD(1) << depth);
+            flint_bitcnt_t bits1 = (n*w - (depth + 1))/2;
+            flint_bitcnt_t b = 2*n*bits1;
+            double t, best = 0.0;
+            fft_arg_t a;
+
+            a.n1 = a.n2 = (b - 1)/FLINT_BITS + 1;
+            a.i1 = flint_malloc(4*a.n1*sizeof(mp_limb_t));
+            a.i2 = a.i1 + a.n1;
+            a.r = a.i2 + a.n2;
+
+            flint_mpn_urandomb(a.i1, state->gmp_state, b);
+            flint_mpn_urandomb(a.i2, state->gmp_state, b);
+
+            for (off = 0; off <= 4; off++)
+            {
+                a.depth = depth - off;
+                a.w = w*(WORD(1) << (2*off));
+
+                t = time_fn(fft_mul, &a);
+
+                if (off == 0 || t < best)
+                {
+                    best = t;
+                    T->fft_tab[depth - 6][w - 1] = off;
+                }
+            }
+
+            flint_free(a.i1);
+        }
+    }
+}
+
+/* same measurement as FFT_MULMOD_2EXPP1_CUTOFF in fft/tune/tune-fft.c */
+static void tune_fft_mulmod(flint_tuning_t T, flint_rand_t state)
+{
+    slong depth, w, off, best_d = 12, best_w = 1;
+    int fft_won = 0;
+
+    for (depth = 12; depth <= 20 && !fft_won; depth++)
+    {
+        for (w = 1; w <= 2; w++)
+        {
+            mp_size_t n = (UWORD(1) << depth);
+            slong depth1, w1;
+            double t, best = 0.0;
+            fft_arg_t a;
+
+            a.bits = n*w;
+            a.limbs = (a.bits - 1)/FLINT_BITS + 1;
+            a.i1 = flint_malloc(6*(a.limbs + 1)*sizeof(mp_limb_t));
+            a.i2 = a.i1 + a.limbs + 1;
+            a.r = a.i2 + a.limbs + 1;
+            a.tt = a.r + 2*(a.limbs + 1);
+
+            flint_mpn_urandomb(a.i1, state->gmp_state, a.limbs*FLINT_BITS);
+            flint_mpn_urandomb(a.i2, state->gmp_state, a.limbs*FLINT_BITS);
+            a.i1[a.limbs] = 0;
+            a.i2[a.limbs] = 0;
+
+            depth1 = FLINT_CLOG2(a.bits)/2;
+            w1 = a.bits/(UWORD(1) << (2*depth1));
+
+            for (off = 0; off <= 4; off++)
+            {
+                a.depth = depth1 - off;
+                a.w = w1*(WORD(1) << (2*off));
+
+                t = time_fn(fft_mulmod, &a);
+
+                if (off == 0 || t < best)
+                    best = t;
+            }
+
+            if (time_fn(fft_mulmod_basecase, &a) < best)
+            {
+                best_d = depth + (w == 2);
+                best_w = w + 1 - 2*(w == 2);
+            }
+            else
+                fft_won = 1;
+
+            flint_free(a.i1);
+        }
+    }
+
+    T->params[FLINT_TUNE_FFT_MULMOD_2EXPP1] =
+                                (WORD(1) << best_d)*best_w/(2*FLINT_BITS);
+}
+
+/* nmod_poly *****************************************************************/
+
+typedef struct
+{
+    mp_ptr res, a, b;
+    slong len;
+    nmod_t mod;
+} nmod_poly_arg_t;
+
+static void nmod_poly_KS(void * varg, int i)
+{
+    nmod_poly_arg_t * p = (nmod_poly_arg_t *) varg;
+
+    _nmod_poly_mul_KS(p->res, p->a, p->len, p->b, p->len, 0, p->mod);
+}
+
+static void nmod_poly_KS2(void * varg, int i)
+{
+    nmod_poly_arg_t * p = (nmod_poly_arg_t *) varg;
+
+    _nmod_poly_mul_KS2(p->res, p->a, p->len, p->b, p->len, p->mod);
+}
+
+static void nmod_poly_KS4(void * varg, int i)
+{
+    nmod_poly_arg_t * p = (nmod_poly_arg_t *) varg;
+
+    _nmod_poly_mul_KS4(p->res, p->a, p->len, p->b, p->len, p->mod);
+}
+
+/*
+    For each modulus size find the first length at which the second algorithm
+    wins and return the median of the measure len*scale(bits) over the sizes.
+*/
+static slong tune_nmod_poly(void (* f1)(void *, int), void (* f2)(void *, int),
+                                  int square, slong max_len, flint_rand_t state)
+{
+    static const slong sizes[5] = { 4, 12, 24, 40, 60 };
+    slong found[5], num_found = 0, s, len, i, j;
+
+    for (s = 0; s < 5; s++)
+    {
+        slong bits = sizes[s];
+        nmod_poly_arg_t p;
+
+        nmod_init(&p.mod, n_randbits(state, bits) | 1 | (UWORD(1) << (bits - 1)));
+
+        for (len = 8; len <= max_len; len += len/4)
+        {
+            p.len = len;
+            p.a = _nmod_vec_init(4*len);
+            p.b = p.a + len;
+            p.res = p.b + len;
+            _nmod_vec_randtest(p.a, state, 2*len, p.mod);
+
+            if (time_fn(f2, &p) < time_fn(f1, &p))
+            {
+                found[num_found++] = square ? len*(bits + 1)*(bits + 1)
+                                            : len*bits;
+                _nmod_vec_clear(p.a);
+                break;
+            }
+
+            _nmod_vec_clear(p.a);
+        }
+    }
+
+    if (num_found == 0)
+        return -1;
+
+    /* insertion sort, then median */
+    for (i = 1; i < num_found; i++)
+    {
+        for (j = i; j > 0 && found[j - 1] > found[j]; j--)
+        {
+            slong t = found[j];
+            found[j] = found[j - 1];
+            found[j - 1] = t;
+        }
+    }
+
+    return found[num_found/2];
+}
+
+/* fmpz_poly *****************************************************************/
+
+typedef struct
+{
+    fmpz * res, * a, * b;
+    slong len;
+} fmpz_poly_arg_t;
+
+static void fmpz_poly_classical(void * varg, int i)
+{
+    fmpz_poly_arg_t * p = (fmpz_poly_arg_t *) varg;
+
+    _fmpz_poly_mul_classical(p->res, p->a, p->len, p->b, p->len);
+}
+
+static void fmpz_poly_KS(void * varg, int i)
+{
+    fmpz_poly_arg_t * p = (fmpz_poly_arg_t *) varg;
+
+    _fmpz_poly_mul_KS(p->res, p->a, p->len, p->b, p->len);
+}
+
+static void fmpz_poly_SS(void * varg, int i)
+{
+    fmpz_poly_arg_t * p = (fmpz_poly_arg_t *) varg;
+
+    _fmpz_poly_mul_SS(p->res, p->a, p->len, p->b, p->len);
+}
+
+/* return 1 if f2 beats f1 for length len and coefficients of limbs limbs */
+static int fmpz_poly_beats(void (* f1)(void *, int), void (* f2)(void *, int),
+                                slong len, slong limbs, flint_rand_t state)
+{
+    fmpz_poly_arg_t p;
+    int r;
+
+    p.len = len;
+    p.a = _fmpz_vec_init(4*len);
+    p.b = p.a + len;
+    p.res = p.b + len;
+    _fmpz_vec_randtest(p.a, state, 2*len, limbs*FLINT_BITS - 1);
+
+    r = (time_fn(f2, &p) < time_fn(f1, &p));
+
+    _fmpz_vec_clear(p.a, 4*len);
+
+    return r;
+}
+
+static void tune_fmpz_poly(flint_tuning_t T, flint_rand_t state)
+{
+    slong len, limbs;
+
+    /* classical against KS for two limb coefficients */
+    for (len = 2; len <= 64; len++)
+    {
+        if (fmpz_poly_beats(fmpz_poly_classical, fmpz_poly_KS, len, 2, state))
+        {
+            T->params[FLINT_TUNE_FMPZ_POLY_MUL_CLASSICAL] = len;
+            break;
+        }
+    }
+
+    /* largest coefficients for which KS beats SS at moderate length */
+    for (limbs = 1; limbs <= 16; limbs++)
+    {
+        if (fmpz_poly_beats(fmpz_poly_KS, fmpz_poly_SS, 64, limbs, state))
+            break;
+    }
+
+    T->params[FLINT_TUNE_FMPZ_POLY_MUL_KS_LIMBS] = FLINT_MAX(2*(limbs - 1), 2);
+
+    /* length from which KS beats SS again for six limb coefficients */
+    for (len = 64; len <= 16384; len *= 2)
+    {
+        if (fmpz_poly_beats(fmpz_poly_SS, fmpz_poly_KS, len, 6, state))
+        {
+            T->params[FLINT_TUNE_FMPZ_POLY_MUL_SS_RATIO] =
+                                     FLINT_MAX(2*len/(12*FLINT_BITS), WORD(1));
+            break;
+        }
+    }
+}
+
+/* fmpz_mat ******************************************************************/
+
+typedef struct
+{
+    fmpz_mat_struct * C, * A, * B;
+    flint_bitcnt_t cbits;
+} fmpz_mat_arg_t;
+
+static void fmpz_mat_double_word(void * varg, int i)
+{
+    fmpz_mat_arg_t * m = (fmpz_mat_arg_t *) varg;
+
+    _fmpz_mat_mul_double_word_internal(m->C, m->A, m->B, 0, m->cbits);
+}
+
+static void fmpz_mat_multi_mod(void * varg, int i)
+{
+    fmpz_mat_arg_t * m = (fmpz_mat_arg_t *) varg;
+
+    _fmpz_mat_mul_multi_mod(m->C, m->A, m->B, 0, m->cbits);
+}
+
+static void tune_fmpz_mat(flint_tuning_t T, flint_rand_t state)
+{
+    slong dim, i, j;
+
+    /* entries just over one word, where the extra cbits term vanishes */
+    for (dim = 50; dim <= 1000; dim += dim/4)
+    {
+        fmpz_mat_t A, B, C;
+        fmpz_mat_arg_t m;
+        int won;
+
+        fmpz_mat_init(A, dim, dim);
+        fmpz_mat_init(B, dim, dim);
+        fmpz_mat_init(C, dim, dim);
+
+        for (i = 0; i < dim; i++)
+        {
+            for (j = 0; j < dim; j++)
+            {
+                fmpz_randbits(fmpz_mat_entry(A, i, j), state, FLINT_BITS + 4);
+                fmpz_abs(fmpz_mat_entry(A, i, j), fmpz_mat_entry(A, i, j));
+                fmpz_randbits(fmpz_mat_entry(B, i, j), state, FLINT_BITS + 4);
+                fmpz_abs(fmpz_mat_entry(B, i, j), fmpz_mat_entry(B, i, j));
+            }
+        }
+
+        m.A = A;
+        m.B = B;
+        m.C = C;
+        m.cbits = 2*(FLINT_BITS + 4) + FLINT_BIT_COUNT(dim);
+
+        won = (time_fn(fmpz_mat_multi_mod, &m) <
+                                        time_fn(fmpz_mat_double_word, &m));
+
+        fmpz_mat_clear(A);
+        fmpz_mat_clear(B);
+        fmpz_mat_clear(C);
+
+        if (won)
+        {
+            T->params[FLINT_TUNE_FMPZ_MAT_MUL_DOUBLE_WORD] = dim;
+            break;
+        }
+    }
+}
+
+int
+main(int argc, char ** argv)
+{
+    const char * path = (argc > 1) ? argv[1] : "flint_tuning.txt";
+    flint_tuning_t T;
+    slong r, i;
+    FLINT_TEST_INIT(state);
+
+    _flint_rand_init_gmp(state);
+
+    flint_tuning_init(T);
+
+    flint_printf("fft...\n");
+    tune_fft_tab(T, state);
+    tune_fft_mulmod(T, state);
+
+    flint_printf("nmod_poly_mul...\n");
+    r = tune_nmod_poly(nmod_poly_KS, nmod_poly_KS2, 0, 2000, state);
+    if (r > 0)
+        T->params[FLINT_TUNE_NMOD_POLY_MUL_KS2] = r;
+    r = tune_nmod_poly(nmod_poly_KS2, nmod_poly_KS4, 1, 20000, state);
+    if (r > 0)
+        T->params[FLINT_TUNE_NMOD_POLY_MUL_KS4] = r;
+
+    flint_printf("fmpz_poly_mul...\n");
+    tune_fmpz_poly(T, state);
+
+    flint_printf("fmpz_mat_mul...\n");
+    tune_fmpz_mat(T, state);
+
+    for (i = 0; i < FLINT_TUNE_NUM_PARAMS; i++)
+        flint_printf("%s %wd\n", flint_tuning_param_name(i), T->params[i]);
+
+    if (flint_tuning_write(T, path))
+    {
+        flint_printf("could not write %s\n", path);
+        flint_randclear(state);
+        return 1;
+    }
+
+    flint_printf("profile written to %s\n", path);
+
+    FLINT_TEST_CLEANUP(state);
+    return 0;
+}
@@ -0,0 +1,253 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "flint.h"
+#include "fft_tuning.h"
+#include "tuning.h"
+
+#if FLINT_USES_PTHREAD
+#include <pthread.h>
+
+static pthread_once_t _flint_tuning_once = PTHREAD_ONCE_INIT;
+#endif
+
+flint_tuning_struct _flint_tuning;
+volatile int _flint_tuning_initialised = 0;
+
+static const char * _flint_tuning_names[FLINT_TUNE_NUM_PARAMS] =
+{
+    "nmod_poly_mul_ks2",
+    "nmod_poly_mul_ks4",
+    "fmpz_poly_mul_classical",
+    "fmpz_poly_mul_ks_limbs",
+    "fmpz_poly_mul_ss_ratio",
+    "fmpz_mat_mul_strassen",
+    "fmpz_mat_mul_multi_mod",
+    "fmpz_mat_mul_double_word",
+    "fft_mulmod_2expp1"
+};
+
+static const slong _flint_tuning_defaults[FLINT_TUNE_NUM_PARAMS] =
+{
+    800,
+    100000,
+    7,
+    8,
+    4,
+    1000,
+    4000,
+    300,
+    FFT_MULMOD_2EXPP1_CUTOFF
+};
+
+/* smallest values the algorithms can handle */
+static const slong _flint_tuning_min[FLINT_TUNE_NUM_PARAMS] =
+{
+    0,
+    0,
+    0,
+    0,
+    0,
+    0,
+    0,
+    0,
+    16      /* fft_mulmod_2expp1 crashes for very small cutoffs */
+};
+
+static const int _flint_tuning_fft_tab[5][2] = FFT_TAB;
+
+const char * flint_tuning_param_name(flint_tune_param_t p)
+{
+    if ((int) p < 0 || p >= FLINT_TUNE_NUM_PARAMS)
+        return NULL;
+
+    return _flint_tuning_names[p];
+}
+
+slong flint_tuning_param_min(flint_tune_param_t p)
+{
+    if ((int) p < 0 || p >= FLINT_TUNE_NUM_PARAMS)
+        return 0;
+
+    return _flint_tuning_min[p];
+}
+
+void flint_tuning_init(flint_tuning_t T)
+{
+    slong i;
+
+    for (i = 0; i < FLINT_TUNE_NUM_PARAMS; i++)
+        T->params[i] = _flint_tuning_defaults[i];
+
+    memcpy(T->fft_tab, _flint_tuning_fft_tab, sizeof(T->fft_tab));
+}
+
+/*
+    The profile is a text file of "name value" lines. It must start with
+    the format version and the word size it was measured for; lines
+    starting with # and unknown names are ignored, and missing names keep
+    the value already in T. Values below the minimum for a parameter are
+    an error. On error T is left unchanged.
+*/
+int flint_tuning_read(flint_tuning_t T, const char * path)
+{
+    flint_tuning_t R;
+    FILE * file;
+    char line[256], name[64];
+    long v[10];
+    slong i, version = -1, bits = -1;
+    int n, ok = 1;
+
+    file = fopen(path, "r");
+    if (file == NULL)
+        return 1;
+
+    *R = *T;
+
+    while (ok && fgets(line, sizeof(line), file) != NULL)
+    {
+        if (line[0] == '#' || line[0] == '\n')
+            continue;
+
+        n = sscanf(line, "%63s %ld %ld %ld %ld %ld %ld %ld %ld %ld %ld", name,
+                   v + 0, v + 1, v + 2, v + 3, v + 4,
+                   v + 5, v + 6, v + 7, v + 8, v + 9);
+
+        if (n < 2)
+        {
+            ok = 0;
+        }
+        else if (strcmp(name, "version") == 0)
+        {
+            version = v[0];
+        }
+        else if (strcmp(name, "bits") == 0)
+        {
+            bits = v[0];
+        }
+        else if (version != FLINT_TUNING_VERSION || bits != FLINT_BITS)
+        {
+            ok = 0;
+        }
+        else if (strcmp(name, "fft_tab") == 0)
+        {
+            ok = (n == 11);
+
+            for (i = 0; ok && i < 10; i++)
+            {
+                ok = (v[i] >= 0 && v[i] <= 4);
+                R->fft_tab[i / 2][i % 2] = v[i];
+            }
+        }
+        else
+        {
+            for (i = 0; i < FLINT_TUNE_NUM_PARAMS; i++)
+            {
+                if (strcmp(name, _flint_tuning_names[i]) == 0)
+                {
+                    ok = (n == 2 && v[0] >= _flint_tuning_min[i]);
+                    R->params[i] = v[0];
+                    break;
+                }
+            }
+        }
+    }
+
+    fclose(file);
+
+    if (!ok || version != FLINT_TUNING_VERSION || bits != FLINT_BITS)
+        return 1;
+
+    *T = *R;
+
+    return 0;
+}
+
+int flint_tuning_write(const flint_tuning_t T, const char * path)
+{
+    FILE * file;
+    slong i;
+    int r;
+
+    file = fopen(path, "w");
+    if (file == NULL)
+        return 1;
+
+    fprintf(file, "# FLINT tuning profile, written by tune-profile\n");
+    fprintf(file, "version %d\n", FLINT_TUNING_VERSION);
+    fprintf(file, "bits %d\n", FLINT_BITS);
+
+    for (i = 0; i < FLINT_TUNE_NUM_PARAMS; i++)
+        fprintf(file, "%s %ld\n", _flint_tuning_names[i], (long) T->params[i]);
+
+    fprintf(file, "fft_tab");
+    for (i = 0; i < 10; i++)
+        fprintf(file, " %d", T->fft_tab[i / 2][i % 2]);
+    fprintf(file, "\n");
+
+    r = ferror(file);
+
+    return (fclose(file) != 0 || r != 0);
+}
+
+void flint_tuning_set(const flint_tuning_t T)
+{
+    slong i;
+
+    flint_tuning_get();
+
+    _flint_tuning = *T;
+
+    for (i = 0; i < FLINT_TUNE_NUM_PARAMS; i++)
+        _flint_tuning.params[i] = FLINT_MAX(_flint_tuning.params[i],
+                                            _flint_tuning_min[i]);
+}
+
+int flint_tuning_load(const char * path)
+{
+    flint_tuning_t T;
+
+    flint_tuning_init(T);
+
+    if (flint_tuning_read(T, path))
+        return 1;
+
+    flint_tuning_set(T);
+
+    return 0;
+}
+
+static void _flint_tuning_startup(void)
+{
+    const char * path = getenv(FLINT_TUNING_ENV);
+
+    flint_tuning_init(&_flint_tuning);
+
+    if (path != NULL && path[0] != '\0')
+        flint_tuning_read(&_flint_tuning, path);
+
+    _flint_tuning_initialised = 1;
+}
+
+const flint_tuning_struct * flint_tuning_get(void)
+{
+#if FLINT_USES_PTHREAD
+    pthread_once(&_flint_tuning_once, _flint_tuning_startup);
+#else
+    if (!_flint_tuning_initialised)
+        _flint_tuning_startup();
+#endif
+
+    return &_flint_tuning;
+}
@@ -0,0 +1,82 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#ifndef FLINT_TUNING_H
+#define FLINT_TUNING_H
+
+#include "flint.h"
+
+#ifdef __cplusplus
+ extern "C" {
+#endif
+
+/*
+    Algorithm crossovers which can be measured on the target machine and
+    loaded at runtime. The defaults are the values which used to be fixed
+    at build time.
+*/
+
+#define FLINT_TUNING_VERSION 1
+
+#define FLINT_TUNING_ENV "FLINT_TUNING_FILE"
+
+typedef enum
+{
+    FLINT_TUNE_NMOD_POLY_MUL_KS2,       /* len*bits from which KS2 is used */
+    FLINT_TUNE_NMOD_POLY_MUL_KS4,       /* len*(bits+1)^2 for KS4 */
+    FLINT_TUNE_FMPZ_POLY_MUL_CLASSICAL, /* length below which classical */
+    FLINT_TUNE_FMPZ_POLY_MUL_KS_LIMBS,  /* limbs1 + limbs2 always doing KS */
+    FLINT_TUNE_FMPZ_POLY_MUL_SS_RATIO,  /* KS if limbs*FLINT_BITS*r < len */
+    FLINT_TUNE_FMPZ_MAT_MUL_STRASSEN,   /* dimension, plus 300 per thread */
+    FLINT_TUNE_FMPZ_MAT_MUL_MULTI_MOD,  /* dimension, plus 300 per thread */
+    FLINT_TUNE_FMPZ_MAT_MUL_DOUBLE_WORD,/* dimension for multi_mod */
+    FLINT_TUNE_FFT_MULMOD_2EXPP1,       /* limbs from which to use the FFT */
+    FLINT_TUNE_NUM_PARAMS
+} flint_tune_param_t;
+
+typedef struct
+{
+    slong params[FLINT_TUNE_NUM_PARAMS];
+    int fft_tab[5][2];      /* see fft_tuning.h */
+} flint_tuning_struct;
+
+typedef flint_tuning_struct flint_tuning_t[1];
+
+FLINT_DLL extern flint_tuning_struct _flint_tuning;
+FLINT_DLL extern volatile int _flint_tuning_initialised;
+
+FLINT_DLL const flint_tuning_struct * flint_tuning_get(void);
+
+/* the profile in use, loaded on first use */
+#define FLINT_TUNING \
+    (_flint_tuning_initialised ? &_flint_tuning : flint_tuning_get())
+
+#define FLINT_TUNE(p) (FLINT_TUNING->params[p])
+
+FLINT_DLL const char * flint_tuning_param_name(flint_tune_param_t p);
+
+FLINT_DLL slong flint_tuning_param_min(flint_tune_param_t p);
+
+FLINT_DLL void flint_tuning_init(flint_tuning_t T);
+
+FLINT_DLL int flint_tuning_read(flint_tuning_t T, const char * path);
+
+FLINT_DLL int flint_tuning_write(const flint_tuning_t T, const char * path);
+
+FLINT_DLL void flint_tuning_set(const flint_tuning_t T);
+
+FLINT_DLL int flint_tuning_load(const char * path);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
@@ -59,6 +59,10 @@ typedef struct {
 
 #define FLINT_PRIME_PI_ODD_LOOKUP_CUTOFF 311
 
+/* beyond these, prime counting does not use the table of cached primes */
+#define FLINT_PRIME_PI_LMO_CUTOFF (UWORD(1) << 22)
+#define FLINT_NTH_PRIME_LMO_CUTOFF (UWORD(1) << 18)
+
 #define FLINT_SIEVE_SIZE 65536
 
 #if FLINT64
@@ -79,7 +83,7 @@ typedef struct
     ulong sieve_b;
     slong sieve_i;
     slong sieve_num;
-    char * sieve;
+    mp_ptr sieve;       /* bit i is set iff sieve_a + 2i is prime */
 }
 n_primes_struct;
 
@@ -95,17 +99,40 @@ FLINT_DLL void n_primes_sieve_range(n_primes_t iter, ulong a, ulong b);
 
 FLINT_DLL void n_primes_jump_after(n_primes_t iter, ulong n);
 
+FLINT_DLL void n_sieve_odd_bits(mp_ptr sieve, slong len, ulong a,
+                      const unsigned int * sieve_primes, ulong bound);
+
+FLINT_DLL mp_ptr n_primes_range(slong * num, ulong a, ulong b);
+
+FLINT_DLL void n_primes_partition(ulong * bounds, ulong a, ulong b,
+                                                                 slong parts);
+
 ULONG_EXTRAS_INLINE ulong
 n_primes_next(n_primes_t iter)
 {
+    ulong w, z;
+    slong i;
+
     if (iter->small_i < iter->small_num)
         return iter->small_primes[(iter->small_i)++];
 
     for (;;)
     {
         while (iter->sieve_i < iter->sieve_num)
-            if (iter->sieve[iter->sieve_i++] != 0)
-                return iter->sieve_a + 2 * (iter->sieve_i - 1);
+        {
+            i = iter->sieve_i;
+            w = iter->sieve[i / FLINT_BITS] >> (i % FLINT_BITS);
+
+            if (w != 0)
+            {
+                count_trailing_zeros(z, w);
+                i += z;
+                iter->sieve_i = i + 1;
+                return iter->sieve_a + 2 * i;
+            }
+
+            iter->sieve_i = (i / FLINT_BITS + 1) * FLINT_BITS;
+        }
 
         if (iter->sieve_b == 0)
             n_primes_jump_after(iter, iter->small_primes[iter->small_num-1]);
@@ -116,14 +143,35 @@ n_primes_next(n_primes_t iter)
 
 FLINT_DLL extern const unsigned int flint_primes_small[];
 
-extern FLINT_TLS_PREFIX ulong * _flint_primes[FLINT_BITS];
-extern FLINT_TLS_PREFIX double * _flint_prime_inverses[FLINT_BITS];
-extern FLINT_TLS_PREFIX int _flint_primes_used;
+/*
+    The prime cache is shared by all threads. _flint_primes[i] holds 2^i
+    primes for i < _flint_primes_used; these entries are never changed once
+    published, so they can be read without locking after an acquire load of
+    _flint_primes_used. Larger tables are published under a lock. Each
+    thread reading the cache counts itself as a user with _n_primes_register
+    and the cache is freed when the last user calls flint_cleanup.
+*/
+FLINT_DLL extern ulong * _flint_primes[FLINT_BITS];
+FLINT_DLL extern double * _flint_prime_inverses[FLINT_BITS];
+FLINT_DLL extern int _flint_primes_used;
+
+#if FLINT_USES_PTHREAD && (__GNUC__ > 4 || (__GNUC__ == 4 && __GNUC_MINOR__ >= 8))
+#define _FLINT_PRIMES_USED_LOAD() \
+    __atomic_load_n(&_flint_primes_used, __ATOMIC_ACQUIRE)
+#define _FLINT_PRIMES_USED_STORE(x) \
+    __atomic_store_n(&_flint_primes_used, (x), __ATOMIC_RELEASE)
+#else
+#define _FLINT_PRIMES_USED_LOAD() (*((volatile int *) &_flint_primes_used))
+#define _FLINT_PRIMES_USED_STORE(x) \
+    (*((volatile int *) &_flint_primes_used) = (x))
+#endif
 
 FLINT_DLL void n_compute_primes(ulong num_primes);
 
 FLINT_DLL void n_cleanup_primes(void);
 
+FLINT_DLL void _n_primes_register(void);
+
 FLINT_DLL const ulong * n_primes_arr_readonly(ulong n);
 FLINT_DLL const double * n_prime_inverses_arr_readonly(ulong n);
 
@@ -399,12 +447,16 @@ FLINT_DLL int n_is_prime_pocklington(ulong n, ulong iterations);
 
 FLINT_DLL int n_is_prime(ulong n);
 
+FLINT_DLL void n_is_prime_vec(int * res, const ulong * vec, slong len);
+
 FLINT_DLL ulong n_nth_prime(ulong n);
 
 FLINT_DLL void n_nth_prime_bounds(ulong *lo, ulong *hi, ulong n);
 
 FLINT_DLL ulong n_prime_pi(ulong n);
 
+FLINT_DLL ulong n_prime_pi_lmo(ulong n);
+
 FLINT_DLL void n_prime_pi_bounds(ulong *lo, ulong *hi, ulong n);
 
 FLINT_DLL int n_remove(ulong * n, ulong p);
@@ -439,8 +491,13 @@ FLINT_DLL ulong n_factor_lehman(ulong n);
 
 FLINT_DLL ulong n_factor_SQUFOF(ulong n, ulong iters);
 
+FLINT_DLL void _n_factor_cofactor(n_factor_t * factors, ulong n, int proved);
+
 FLINT_DLL void n_factor(n_factor_t * factors, ulong n, int proved);
 
+FLINT_DLL void n_factor_vec(n_factor_t * factors, const ulong * vec,
+                                                       slong len, int proved);
+
 FLINT_DLL ulong n_factor_pp1(ulong n, ulong B1, ulong c);
 
 FLINT_DLL ulong n_factor_pp1_wrapper(ulong n);
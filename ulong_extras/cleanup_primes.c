@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2013 Fredrik Johansson
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -13,20 +14,86 @@
 #include "flint.h"
 #include "ulong_extras.h"
 
-void
-n_cleanup_primes()
+#if FLINT_USES_PTHREAD
+#include <pthread.h>
+
+extern pthread_mutex_t _flint_primes_lock;
+#endif
+
+/*
+    Number of threads which have used the cache and not yet called
+    flint_cleanup. The last of them to do so frees the cache.
+*/
+static int _flint_primes_users = 0;
+static FLINT_TLS_PREFIX int _flint_primes_registered = 0;
+
+static void
+_n_cleanup_primes(void)
 {
-    int i;
+    int i, used;
+
+    used = _flint_primes_used;
 
-    for (i = 0; i < _flint_primes_used; i++)
+    _FLINT_PRIMES_USED_STORE(0);
+
+    for (i = 0; i < used; i++)
     {
-        if (i < _flint_primes_used - 1 && _flint_primes[i] == _flint_primes[i+1])
+        if (i < used - 1 && _flint_primes[i] == _flint_primes[i+1])
             continue;
 
         flint_free(_flint_primes[i]);
         flint_free(_flint_prime_inverses[i]);
     }
+}
+
+void
+n_cleanup_primes()
+{
+#if FLINT_USES_PTHREAD
+    pthread_mutex_lock(&_flint_primes_lock);
+#endif
+
+    _n_cleanup_primes();
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_unlock(&_flint_primes_lock);
+#endif
+}
+
+static void
+_n_cleanup_primes_thread(void)
+{
+#if FLINT_USES_PTHREAD
+    pthread_mutex_lock(&_flint_primes_lock);
+#endif
+
+    _flint_primes_registered = 0;
+
+    if (_flint_primes_users > 0 && --_flint_primes_users == 0)
+        _n_cleanup_primes();
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_unlock(&_flint_primes_lock);
+#endif
+}
+
+void
+_n_primes_register(void)
+{
+    if (_flint_primes_registered)
+        return;
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_lock(&_flint_primes_lock);
+#endif
+
+    _flint_primes_users++;
+
+#if FLINT_USES_PTHREAD
+    pthread_mutex_unlock(&_flint_primes_lock);
+#endif
 
-    _flint_primes_used = 0;
+    _flint_primes_registered = 1;
+    flint_register_cleanup_function(_n_cleanup_primes_thread);
 }
 
@@ -22,11 +22,10 @@
 #include "flint.h"
 #include "ulong_extras.h"
 
-#if FLINT_REENTRANT && !FLINT_USES_TLS
+#if FLINT_USES_PTHREAD
 #include <pthread.h>
 
-static pthread_once_t primes_initialised = PTHREAD_ONCE_INIT;
-pthread_mutex_t primes_lock;
+pthread_mutex_t _flint_primes_lock = PTHREAD_MUTEX_INITIALIZER;
 #endif
 
 const unsigned int flint_primes_small[] =
@@ -44,61 +43,61 @@ const unsigned int flint_primes_small[] =
 };
 
 
-/* _flint_primes[i] holds an array of 2^i primes */
-FLINT_TLS_PREFIX mp_limb_t * _flint_primes[FLINT_BITS];
-FLINT_TLS_PREFIX double * _flint_prime_inverses[FLINT_BITS];
-FLINT_TLS_PREFIX int _flint_primes_used = 0;
-
-#if FLINT_REENTRANT && !FLINT_USES_TLS
-void n_compute_primes_init()
-{
-   pthread_mutex_init(&primes_lock, NULL);
-}
-#endif
+/* _flint_primes[i] holds an array of 2^i primes, shared by all threads */
+mp_limb_t * _flint_primes[FLINT_BITS];
+double * _flint_prime_inverses[FLINT_BITS];
+int _flint_primes_used = 0;
 
 void
 n_compute_primes(ulong num_primes)
 {
-    int i, m;
+    int i, m, used;
     ulong num_computed;
+    mp_ptr primes;
+    double * inverses;
 
-#if FLINT_REENTRANT && !FLINT_USES_TLS
-    pthread_once(&primes_initialised, n_compute_primes_init);
-    pthread_mutex_lock(&primes_lock);
-#endif
+    _n_primes_register();
 
     m = FLINT_CLOG2(num_primes);
 
-    if (_flint_primes_used == 0)
-        flint_register_cleanup_function(n_cleanup_primes);
+    if (m < _FLINT_PRIMES_USED_LOAD())
+        return;
 
-    if (m >= _flint_primes_used)
+#if FLINT_USES_PTHREAD
+    pthread_mutex_lock(&_flint_primes_lock);
+#endif
+
+    /* another thread may have published a large enough table meanwhile */
+    used = _flint_primes_used;
+
+    if (m >= used)
     {
         n_primes_t iter;
 
         num_computed = UWORD(1) << m;
-        _flint_primes[m] = flint_malloc(sizeof(mp_limb_t) * num_computed);
-        _flint_prime_inverses[m] = flint_malloc(sizeof(double) * num_computed);
+        primes = flint_malloc(sizeof(mp_limb_t) * num_computed);
+        inverses = flint_malloc(sizeof(double) * num_computed);
 
         n_primes_init(iter);
         for (i = 0; i < num_computed; i++)
         {
-            _flint_primes[m][i] = n_primes_next(iter);
-            _flint_prime_inverses[m][i] = n_precompute_inverse(_flint_primes[m][i]);
+            primes[i] = n_primes_next(iter);
+            inverses[i] = n_precompute_inverse(primes[i]);
         }
         n_primes_clear(iter);
 
-        /* copy to lower power-of-two slots */
-        for (i = m - 1; i >= _flint_primes_used; i--)
+        /* fill the new power-of-two slots, then publish them */
+        for (i = m; i >= used; i--)
         {
-            _flint_primes[i] = _flint_primes[m];
-            _flint_prime_inverses[i] = _flint_prime_inverses[m];
+            _flint_primes[i] = primes;
+            _flint_prime_inverses[i] = inverses;
         }
-        _flint_primes_used = m + 1;
+
+        _FLINT_PRIMES_USED_STORE(m + 1);
     }
 
-#if FLINT_REENTRANT && !FLINT_USES_TLS
-    pthread_mutex_unlock(&primes_lock);
+#if FLINT_USES_PTHREAD
+    pthread_mutex_unlock(&_flint_primes_lock);
 #endif
 }
 
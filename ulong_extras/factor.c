@@ -23,22 +23,21 @@ static int is_prime(mp_limb_t n, int proved)
     return proved ? n_is_prime(n) : n_is_probabprime(n);
 }
 
-void n_factor(n_factor_t * factors, mp_limb_t n, int proved)
+void _n_factor_cofactor(n_factor_t * factors, mp_limb_t cofactor, int proved)
 {
    ulong factor_arr[FLINT_MAX_FACTORS_IN_LIMB];
    ulong exp_arr[FLINT_MAX_FACTORS_IN_LIMB];
    ulong factors_left;
    ulong exp;
-   mp_limb_t cofactor, factor, cutoff;
+   mp_limb_t n, factor, cutoff;
 
-   cofactor = n_factor_trial(factors, n, FLINT_FACTOR_TRIAL_PRIMES);
-   if (cofactor == UWORD(1)) return;
    if (is_prime(cofactor, proved)) 
    {
       n_factor_insert(factors, cofactor, UWORD(1));
       return;
    }
 
+   n = cofactor;
    factor_arr[0] = cofactor;
    factors_left = 1;
    exp_arr[0] = 1;
@@ -88,3 +87,13 @@ void n_factor(n_factor_t * factors, mp_limb_t n, int proved)
       }
    } 
 }
+
+void n_factor(n_factor_t * factors, mp_limb_t n, int proved)
+{
+   mp_limb_t cofactor;
+
+   cofactor = n_factor_trial(factors, n, FLINT_FACTOR_TRIAL_PRIMES);
+   if (cofactor == UWORD(1)) return;
+
+   _n_factor_cofactor(factors, cofactor, proved);
+}
@@ -0,0 +1,154 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+#include "thread_support.h"
+
+typedef struct
+{
+    n_factor_t * factors;
+    const mp_limb_t * vec;
+    int proved;
+    const mp_limb_t * primes;
+    const mp_limb_t * inv;      /* p^-1 mod 2^FLINT_BITS */
+    const mp_limb_t * lim;      /* UWORD_MAX / p */
+}
+_n_factor_vec_struct;
+
+/*
+    For odd p, p divides n iff n*p^-1 mod 2^FLINT_BITS <= UWORD_MAX / p,
+    in which case n*p^-1 is the quotient. This replaces each division of
+    the trial stage by a multiplication.
+
+    Composite cofactors too large for n_factor_one_line are first split
+    with Pollard-Brent, which is several times faster than p+1 and SQUFOF
+    in this range.
+*/
+static void
+_n_factor_vec_worker(slong start, slong stop, void * varg)
+{
+    _n_factor_vec_struct * arg = (_n_factor_vec_struct *) varg;
+    const mp_limb_t * primes = arg->primes;
+    const mp_limb_t * inv = arg->inv;
+    const mp_limb_t * lim = arg->lim;
+    mp_limb_t n, p, q;
+    ulong exp;
+    slong i, j;
+    flint_rand_t state;
+
+    flint_randinit(state);
+
+    for (i = start; i < stop; i++)
+    {
+        n_factor_t * factors = arg->factors + i;
+
+        n = arg->vec[i];
+
+        if (n < 2)
+            continue;
+
+        count_trailing_zeros(exp, n);
+
+        if (exp != 0)
+        {
+            n >>= exp;
+            n_factor_insert(factors, 2, exp);
+        }
+
+        for (j = 1; j < FLINT_FACTOR_TRIAL_PRIMES; j++)
+        {
+            p = primes[j];
+
+            if (p*p > n)
+                break;
+
+            q = n*inv[j];
+
+            if (q <= lim[j])
+            {
+                exp = 0;
+
+                do {
+                    n = q;
+                    exp++;
+                    q = n*inv[j];
+                } while (q <= lim[j]);
+
+                n_factor_insert(factors, p, exp);
+            }
+        }
+
+        /* n has no prime factor below sqrt(n) or below the cutoff */
+        if (n == 1)
+            continue;
+        else if (n < FLINT_FACTOR_TRIAL_CUTOFF)
+            n_factor_insert(factors, n, 1);
+#if FLINT64
+        else if (n >= FLINT_FACTOR_ONE_LINE_MAX && !n_is_probabprime(n)
+                    && n_factor_pollard_brent(&q, state, n, 5, 1 << 16))
+        {
+            _n_factor_cofactor(factors, q, arg->proved);
+            _n_factor_cofactor(factors, n / q, arg->proved);
+        }
+#endif
+        else
+            _n_factor_cofactor(factors, n, arg->proved);
+    }
+
+    flint_randclear(state);
+}
+
+void n_factor_vec(n_factor_t * factors, const mp_limb_t * vec,
+                                                        slong len, int proved)
+{
+    _n_factor_vec_struct arg;
+    mp_ptr inv, lim;
+    mp_limb_t p, t;
+    slong j;
+
+    if (len <= 0)
+        return;
+
+    arg.primes = n_primes_arr_readonly(FLINT_FACTOR_TRIAL_PRIMES);
+
+    inv = flint_malloc(FLINT_FACTOR_TRIAL_PRIMES*sizeof(mp_limb_t));
+    lim = flint_malloc(FLINT_FACTOR_TRIAL_PRIMES*sizeof(mp_limb_t));
+
+    for (j = 1; j < FLINT_FACTOR_TRIAL_PRIMES; j++)
+    {
+        p = arg.primes[j];
+
+        /* Newton iteration, p*p = 1 mod 8 gives 3 correct bits */
+        t = p;
+        t *= 2 - p*t;
+        t *= 2 - p*t;
+        t *= 2 - p*t;
+        t *= 2 - p*t;
+#if FLINT64
+        t *= 2 - p*t;
+#endif
+        inv[j] = t;
+        lim[j] = UWORD_MAX / p;
+    }
+
+    arg.factors = factors;
+    arg.vec = vec;
+    arg.proved = proved;
+    arg.inv = inv;
+    arg.lim = lim;
+
+    flint_parallel_for(0, len, 0, _n_factor_vec_worker, &arg);
+
+    flint_free(inv);
+    flint_free(lim);
+}
@@ -0,0 +1,216 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+#include "thread_support.h"
+
+/* lanes tested together in the base 2 stage */
+#define LANES 256
+
+/* odd primes used for the trial stage, 3 to 149 */
+#define TRIAL_PRIMES 34
+
+typedef struct
+{
+    int * res;
+    const mp_limb_t * vec;
+    const mp_limb_t * primes;
+    mp_limb_t inv[TRIAL_PRIMES];    /* p^-1 mod 2^FLINT_BITS */
+    mp_limb_t lim[TRIAL_PRIMES];    /* UWORD_MAX / p */
+}
+_n_is_prime_vec_struct;
+
+static __inline__ mp_limb_t
+_binvert(mp_limb_t n)
+{
+    /* Newton iteration, n*n = 1 mod 8 gives 3 correct bits */
+    mp_limb_t t = n;
+
+    t *= 2 - n*t;
+    t *= 2 - n*t;
+    t *= 2 - n*t;
+    t *= 2 - n*t;
+#if FLINT64
+    t *= 2 - n*t;
+#endif
+
+    return t;
+}
+
+/*
+    Montgomery product a*b/2^FLINT_BITS mod n for a, b < n, where
+    ninv = n^-1 mod 2^FLINT_BITS. As a*b - u*n with u = a*b*ninv has a zero
+    low word, only the high words need to be subtracted, which works for
+    any odd n.
+*/
+static __inline__ mp_limb_t
+_mont_mul(mp_limb_t a, mp_limb_t b, mp_limb_t n, mp_limb_t ninv)
+{
+    mp_limb_t hi, lo, mh, ml, r;
+
+    umul_ppmm(hi, lo, a, b);
+    umul_ppmm(mh, ml, lo*ninv, n);
+
+    r = hi - mh;
+    r += n & -(mp_limb_t) (hi < mh);
+
+    return r;
+}
+
+/*
+    Strong base 2 test of the odd n[0], ..., n[num - 1] at once. The lanes
+    are stored as separate arrays and the square and double steps of the
+    exponentiation run in lockstep over all lanes, starting from the top
+    bit of the largest exponent, so that the inner loop has no data
+    dependent branches. Lanes which fail have their entry of res set
+    to 0.
+*/
+static void
+_n_is_strong_probabprime2_lanes(int * res, const slong * idx,
+                                               const mp_limb_t * n, slong num)
+{
+    mp_limb_t ninv[LANES], one[LANES], d[LANES], x[LANES], y, m1;
+    unsigned int s[LANES];
+    slong i, b, bits;
+    ulong e;
+
+    bits = 0;
+
+    for (i = 0; i < num; i++)
+    {
+        ninv[i] = _binvert(n[i]);
+        one[i] = (-n[i]) % n[i];            /* 2^FLINT_BITS mod n */
+        count_trailing_zeros(s[i], n[i] - 1);
+        d[i] = (n[i] - 1) >> s[i];
+        x[i] = one[i];
+        bits = FLINT_MAX(bits, FLINT_BIT_COUNT(d[i]));
+    }
+
+    for (b = bits - 1; b >= 0; b--)
+    {
+        for (i = 0; i < num; i++)
+        {
+            x[i] = _mont_mul(x[i], x[i], n[i], ninv[i]);
+
+            /* add x to itself if bit b of d is set, without branching */
+            e = -((d[i] >> b) & 1);
+            y = n[i] - (x[i] & e);
+            m1 = -(mp_limb_t) (x[i] < y);
+            x[i] = x[i] - y + (n[i] & m1);
+        }
+    }
+
+    for (i = 0; i < num; i++)
+    {
+        m1 = n[i] - one[i];                 /* -1 in Montgomery form */
+        y = x[i];
+
+        if (y == one[i] || y == m1)
+            continue;
+
+        for (e = 1; e < s[i]; e++)
+        {
+            y = _mont_mul(y, y, n[i], ninv[i]);
+
+            if (y == m1 || y == one[i])
+                break;
+        }
+
+        if (y != m1)
+            res[idx[i]] = 0;
+    }
+}
+
+static void
+_n_is_prime_vec_worker(slong start, slong stop, void * varg)
+{
+    _n_is_prime_vec_struct * arg = (_n_is_prime_vec_struct *) varg;
+    int * res = arg->res;
+    mp_limb_t lanes[LANES], n;
+    slong idx[LANES];
+    slong i, j, k, num;
+
+    for (i = start; i < stop; i += LANES)
+    {
+        num = 0;
+
+        /* trial division, with small inputs handled directly */
+        for (k = i; k < FLINT_MIN(i + LANES, stop); k++)
+        {
+            n = arg->vec[k];
+
+            if (n < FLINT_PRIMES_TAB_DEFAULT_CUTOFF)
+            {
+                res[k] = n_is_prime(n);
+                continue;
+            }
+
+            res[k] = 0;
+
+            if ((n & 1) == 0)
+                continue;
+
+            for (j = 0; j < TRIAL_PRIMES; j++)
+                if (n*arg->inv[j] <= arg->lim[j])
+                    break;
+
+            if (j == TRIAL_PRIMES)
+            {
+                res[k] = 1;
+                idx[num] = k;
+                lanes[num] = n;
+                num++;
+            }
+        }
+
+        _n_is_strong_probabprime2_lanes(res, idx, lanes, num);
+
+        /* Lucas step on the survivors, as in n_is_probabprime_BPSW */
+        for (j = 0; j < num; j++)
+        {
+            k = idx[j];
+            n = lanes[j];
+
+            if (res[k])
+            {
+                if ((n % 10) == 3 || (n % 10) == 7)
+                    res[k] = n_is_probabprime_fibonacci(n);
+                else
+                    res[k] = (n_is_probabprime_lucas(n) == 1);
+            }
+        }
+    }
+}
+
+void n_is_prime_vec(int * res, const mp_limb_t * vec, slong len)
+{
+    _n_is_prime_vec_struct arg;
+    mp_limb_t p;
+    slong j;
+
+    if (len <= 0)
+        return;
+
+    arg.res = res;
+    arg.vec = vec;
+    arg.primes = n_primes_arr_readonly(TRIAL_PRIMES + 1);
+
+    for (j = 0; j < TRIAL_PRIMES; j++)
+    {
+        p = arg.primes[j + 1];
+        arg.inv[j] = _binvert(p);
+        arg.lim[j] = UWORD_MAX / p;
+    }
+
+    flint_parallel_for(0, len, LANES, _n_is_prime_vec_worker, &arg);
+}
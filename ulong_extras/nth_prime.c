@@ -12,6 +12,7 @@
 #define ulong ulongxx /* interferes with system includes */
 #include <stdlib.h>
 #include <stdio.h>
+#include <math.h>
 #undef ulong
 #define ulong mp_limb_t
 #include "flint.h"
@@ -19,12 +20,49 @@
 
 mp_limb_t n_nth_prime(ulong n)
 {
+    mp_limb_t lo, hi, x, p;
+    ulong c;
+    double l, ll;
+    n_primes_t iter;
+
     if (n == 0)
     {
         flint_printf("Exception (n_nth_prime). n_nth_prime(0) is undefined.\n");
         flint_abort();
     }
 
-    return n_primes_arr_readonly(n)[n-1];
-}
+    if (n < FLINT_NTH_PRIME_LMO_CUTOFF)
+        return n_primes_arr_readonly(n)[n-1];
+
+    /* Cipolla's estimate, kept within the proven bounds */
+    n_nth_prime_bounds(&lo, &hi, n);
+
+    l = log((double) n);
+    ll = log(l);
+    x = (mp_limb_t) (n*(l + ll - 1.0 + (ll - 2.0)/l));
+    x = FLINT_MAX(x, lo);
+    x = FLINT_MIN(x, hi);
+
+    /* correct the estimate once using the density of primes near x */
+    c = n_prime_pi(x);
+    l = log((double) x);
+
+    if (c < n)
+        x += (mp_limb_t) ((n - c)*l);
+    else
+        x -= (mp_limb_t) ((c - n)*l);
 
+    /* step below p_n, then count primes up to it */
+    for (c = n_prime_pi(x); c >= n; c = n_prime_pi(x))
+        x -= (mp_limb_t) ((c - n + 1)*l) + 1;
+
+    n_primes_init(iter);
+    n_primes_jump_after(iter, x);
+
+    for (p = x; c < n; c++)
+        p = n_primes_next(iter);
+
+    n_primes_clear(iter);
+
+    return p;
+}
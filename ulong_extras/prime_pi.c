@@ -36,6 +36,9 @@ ulong n_prime_pi(mp_limb_t n)
         return FLINT_PRIME_PI_ODD_LOOKUP[(n-1)/2];
     }
 
+    if (n >= FLINT_PRIME_PI_LMO_CUTOFF)
+        return n_prime_pi_lmo(n);
+
     n_prime_pi_bounds(&low, &high, n);
     primes = n_primes_arr_readonly(high + 1);
 
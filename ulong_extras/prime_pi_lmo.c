@@ -0,0 +1,472 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <string.h>
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+#include "thread_support.h"
+
+/*
+    Lagarias-Miller-Odlyzko prime counting, following the presentation of
+    Deleglise and Rivat. With y = alpha*x^(1/3) and a = pi(y),
+
+        pi(x) = phi(x, a) + a - 1 - P2(x, a),
+
+    where phi(x, a) is split into ordinary leaves S1, computed with a small
+    table for phi(., c), and special leaves S2, computed by sieving [1, x/y)
+    in segments with a binary indexed tree to count unsieved values.
+    P2 is computed by sieving (sqrt(x), x/y] in segments. Both sieves are
+    split into blocks which are processed in parallel; each block counts
+    relative to its own start and the counts are combined afterwards.
+
+    All sums are computed modulo 2^FLINT_BITS, which is exact as pi(x) is
+    a single word.
+*/
+
+#define LMO_SEGMENT (WORD(1) << 16)
+
+#define LMO_PHI_C 6
+
+/* set s[i] = 1 if lo + i is prime, using the given primes up to sqrt */
+static void
+_lmo_sieve(char * s, ulong lo, slong len, const mp_limb_t * primes)
+{
+    ulong p, j, hi = lo + len - 1;
+    slong i;
+
+    memset(s, 1, len);
+
+    for (i = 0; ; i++)
+    {
+        p = primes[i];
+        if (p > hi / p)
+            break;
+
+        j = FLINT_MAX(p*p, ((lo + p - 1)/p)*p) - lo;
+
+        for ( ; j < (ulong) len; j += p)
+            s[j] = 0;
+    }
+
+    for (i = 0; i < len && lo + i < 2; i++)
+        s[i] = 0;
+}
+
+/* binary indexed tree over positions 0..len-1 */
+static void
+_lmo_tree_init(int * tree, const char * s, slong len)
+{
+    slong i, j;
+
+    for (i = 0; i < len; i++)
+        tree[i] = s[i];
+
+    for (i = 0; i < len; i++)
+    {
+        j = i | (i + 1);
+        if (j < len)
+            tree[j] += tree[i];
+    }
+}
+
+/* number of unsieved positions in [0, i] */
+static ulong
+_lmo_tree_query(const int * tree, slong i)
+{
+    ulong r = 0;
+
+    for ( ; i >= 0; i = (i & (i + 1)) - 1)
+        r += tree[i];
+
+    return r;
+}
+
+static void
+_lmo_tree_remove(int * tree, slong len, slong i)
+{
+    for ( ; i < len; i |= i + 1)
+        tree[i]--;
+}
+
+typedef struct
+{
+    ulong x;
+    ulong y;
+    slong c;
+    slong pi_y;
+    const mp_limb_t * primes;
+    const int * mu_lpf;     /* mu(n)*lpf(n), lpf(1) = y + 1 */
+    ulong limit;            /* sieve [1, limit) */
+    ulong block;
+    ulong * s2;             /* per block */
+    ulong * phi;            /* per block, counts relative to the block */
+    slong * mu_sum;         /* per block, sum of mu over the leaves */
+}
+_lmo_s2_struct;
+
+static void
+_lmo_s2_worker(slong start, slong stop, void * varg)
+{
+    _lmo_s2_struct * arg = (_lmo_s2_struct *) varg;
+    const mp_limb_t * primes = arg->primes;
+    const int * mu_lpf = arg->mu_lpf;
+    ulong x = arg->x, y = arg->y;
+    slong c = arg->c, pi_y = arg->pi_y;
+    ulong low, high, block_high, p, m, min_m, max_m, count, s2, * phi, * next;
+    slong t, b, len, * mu_sum;
+    char * sieve;
+    int * tree;
+    int v;
+
+    sieve = (char *) flint_malloc(LMO_SEGMENT);
+    tree = (int *) flint_malloc(LMO_SEGMENT*sizeof(int));
+    next = (ulong *) flint_malloc((pi_y + 1)*sizeof(ulong));
+
+    for (t = start; t < stop; t++)
+    {
+        low = 1 + t*arg->block;
+        block_high = FLINT_MIN(low + arg->block, arg->limit);
+        phi = arg->phi + t*(pi_y + 1);
+        mu_sum = arg->mu_sum + t*(pi_y + 1);
+        s2 = 0;
+
+        for (b = 1; b <= pi_y; b++)
+        {
+            p = primes[b - 1];
+            next[b] = ((low + p - 1)/p)*p;
+            phi[b] = 0;
+            mu_sum[b] = 0;
+        }
+
+        for ( ; low < block_high; low += LMO_SEGMENT)
+        {
+            high = FLINT_MIN(low + LMO_SEGMENT, block_high);
+            len = high - low;
+
+            memset(sieve, 1, len);
+
+            for (b = 1; b <= c; b++)
+            {
+                p = primes[b - 1];
+                for (m = next[b]; m < high; m += p)
+                    sieve[m - low] = 0;
+                next[b] = m;
+            }
+
+            _lmo_tree_init(tree, sieve, len);
+
+            /* leaves n = p_b*m with low <= x/n < high */
+            for (b = c + 1; b < pi_y; b++)
+            {
+                p = primes[b - 1];
+                min_m = FLINT_MAX(x/p/high, y/p);
+                max_m = FLINT_MIN(x/p/low, y);
+
+                if (p >= max_m)
+                    break;
+
+                for (m = max_m; m > min_m; m--)
+                {
+                    v = mu_lpf[m];
+
+                    if (v > 0 && p < (ulong) v)
+                    {
+                        count = phi[b] + _lmo_tree_query(tree, x/p/m - low);
+                        s2 -= count;
+                        mu_sum[b]++;
+                    }
+                    else if (v < 0 && p < (ulong) -v)
+                    {
+                        count = phi[b] + _lmo_tree_query(tree, x/p/m - low);
+                        s2 += count;
+                        mu_sum[b]--;
+                    }
+                }
+
+                phi[b] += _lmo_tree_query(tree, len - 1);
+
+                for (m = next[b]; m < high; m += p)
+                {
+                    if (sieve[m - low])
+                    {
+                        sieve[m - low] = 0;
+                        _lmo_tree_remove(tree, len, m - low);
+                    }
+                }
+
+                next[b] = m;
+            }
+        }
+
+        arg->s2[t] = s2;
+    }
+
+    flint_free(sieve);
+    flint_free(tree);
+    flint_free(next);
+}
+
+typedef struct
+{
+    ulong x;
+    ulong y;
+    ulong s;                /* floor(sqrt(x)) */
+    const mp_limb_t * primes;
+    ulong zlo;              /* sieve [zlo, zhi] */
+    ulong zhi;
+    ulong block;
+    ulong * count;          /* per block, primes in the block */
+    ulong * sum;            /* per block, sum of pi(x/p) - pi(start - 1) */
+    ulong * num;            /* per block, number of p with x/p in the block */
+}
+_lmo_p2_struct;
+
+static void
+_lmo_p2_worker(slong start, slong stop, void * varg)
+{
+    _lmo_p2_struct * arg = (_lmo_p2_struct *) varg;
+    ulong x = arg->x, zl, zh, z, hi, pl, ph, p, count, sum, num, pos, run;
+    slong t, len;
+    char * zs, * ps;
+
+    zs = (char *) flint_malloc(LMO_SEGMENT);
+    ps = (char *) flint_malloc(LMO_SEGMENT + 2);
+
+    for (t = start; t < stop; t++)
+    {
+        zl = arg->zlo + t*arg->block;
+        hi = FLINT_MIN(zl + arg->block - 1, arg->zhi);
+        count = sum = num = 0;
+
+        for ( ; zl <= hi; zl += LMO_SEGMENT)
+        {
+            zh = FLINT_MIN(zl + LMO_SEGMENT - 1, hi);
+            len = zh - zl + 1;
+
+            _lmo_sieve(zs, zl, len, arg->primes);
+
+            /* primes p with zl <= x/p <= zh, of which there are at most
+               len + 1 as zl > sqrt(x) */
+            pl = FLINT_MAX(arg->y + 1, x/(zh + 1) + 1);
+            ph = FLINT_MIN(arg->s, x/zl);
+
+            pos = 0;
+            run = 0;
+
+            if (pl <= ph)
+            {
+                _lmo_sieve(ps, pl, ph - pl + 1, arg->primes);
+
+                for (p = ph; p >= pl; p--)
+                {
+                    if (!ps[p - pl])
+                        continue;
+
+                    z = x/p - zl;
+
+                    for ( ; pos <= z; pos++)
+                        run += zs[pos];
+
+                    sum += count + run;
+                    num++;
+                }
+            }
+
+            for ( ; pos < (ulong) len; pos++)
+                run += zs[pos];
+
+            count += run;
+        }
+
+        arg->count[t] = count;
+        arg->sum[t] = sum;
+        arg->num[t] = num;
+    }
+
+    flint_free(zs);
+    flint_free(ps);
+}
+
+/* split [0, len) into blocks which are multiples of the segment size */
+static slong
+_lmo_num_blocks(ulong * block, ulong len)
+{
+    slong num_threads = flint_get_num_threads(), nseg, nblocks;
+
+    nseg = (len + LMO_SEGMENT - 1)/LMO_SEGMENT;
+    nblocks = num_threads > 1 ? FLINT_MIN(8*num_threads, nseg) : 1;
+    nblocks = FLINT_MAX(nblocks, 1);
+
+    *block = ((nseg + nblocks - 1)/nblocks)*LMO_SEGMENT;
+
+    return (len + *block - 1) / *block;
+}
+
+ulong n_prime_pi_lmo(ulong x)
+{
+    ulong y, s, zmax, pp, tot, s1, s2, p2, sum, base, B, a2, i, j, p;
+    slong a, c, k, t, nblocks, num_primes;
+    const mp_limb_t * primes;
+    unsigned int * phi_tab;
+    int * mu_lpf;
+    _lmo_s2_struct S2;
+    _lmo_p2_struct P2;
+
+    if (x < FLINT_PRIME_PI_ODD_LOOKUP_CUTOFF)
+        return n_prime_pi(x);
+
+    s = n_sqrt(x);
+
+    /* y = alpha*x^(1/3); alpha = 2 was fastest in practice */
+    y = 2*n_cbrt(x);
+    y = FLINT_MIN(y, s - 1);
+
+    a = n_prime_pi(y);
+    c = FLINT_MIN(a, LMO_PHI_C);
+    zmax = x/(y + 1);
+
+    /* primes up to y, and up to sqrt(x/y) for sieving */
+    num_primes = FLINT_MAX(a, n_prime_pi(n_sqrt(zmax))) + 2;
+    primes = n_primes_arr_readonly(num_primes);
+
+    /* mu(n)*lpf(n) for n <= y */
+    mu_lpf = (int *) flint_malloc((y + 1)*sizeof(int));
+
+    for (i = 1; i <= y; i++)
+        mu_lpf[i] = 1;
+
+    for (k = 0; k < a; k++)
+    {
+        p = primes[k];
+
+        for (j = p; j <= y; j += p)
+            mu_lpf[j] = (mu_lpf[j] == 1 || mu_lpf[j] == -1) ?
+                                                -mu_lpf[j]*(int) p : -mu_lpf[j];
+
+        for (j = p*p; j <= y; j += p*p)
+            mu_lpf[j] = 0;
+    }
+
+    mu_lpf[1] = y + 1;
+
+    /* ordinary leaves, phi(x/n, c) = (x/n/pp)*tot + phi_tab[(x/n) % pp] */
+    pp = 1;
+    tot = 1;
+    for (k = 0; k < c; k++)
+    {
+        pp *= primes[k];
+        tot *= primes[k] - 1;
+    }
+
+    phi_tab = (unsigned int *) flint_malloc(pp*sizeof(unsigned int));
+
+    for (i = 0; i < pp; i++)
+        phi_tab[i] = 1;
+
+    for (k = 0; k < c; k++)
+        for (j = 0; j < pp; j += primes[k])
+            phi_tab[j] = 0;
+
+    for (i = 1; i < pp; i++)
+        phi_tab[i] += phi_tab[i - 1];
+
+    s1 = 0;
+    p = c == 0 ? 1 : primes[c - 1];
+
+    for (i = 1; i <= y; i++)
+    {
+        if (mu_lpf[i] > 0 && (ulong) mu_lpf[i] > p)
+            s1 += (x/i/pp)*tot + phi_tab[(x/i) % pp];
+        else if (mu_lpf[i] < 0 && (ulong) -mu_lpf[i] > p)
+            s1 -= (x/i/pp)*tot + phi_tab[(x/i) % pp];
+    }
+
+    flint_free(phi_tab);
+
+    /* special leaves */
+    S2.x = x;
+    S2.y = y;
+    S2.c = c;
+    S2.pi_y = a;
+    S2.primes = primes;
+    S2.mu_lpf = mu_lpf;
+    S2.limit = x/y + 1;
+
+    nblocks = _lmo_num_blocks(&S2.block, S2.limit - 1);
+
+    S2.s2 = (ulong *) flint_malloc(nblocks*sizeof(ulong));
+    S2.phi = (ulong *) flint_malloc(nblocks*(a + 1)*sizeof(ulong));
+    S2.mu_sum = (slong *) flint_malloc(nblocks*(a + 1)*sizeof(slong));
+
+    flint_parallel_for(0, nblocks, 1, _lmo_s2_worker, &S2);
+
+    s2 = 0;
+    for (t = 0; t < nblocks; t++)
+    {
+        s2 += S2.s2[t];
+
+        /* values of phi before block t */
+        if (t > 0)
+        {
+            for (k = 1; k <= a; k++)
+            {
+                s2 -= ((ulong) S2.mu_sum[t*(a + 1) + k])
+                                                  *S2.phi[(t - 1)*(a + 1) + k];
+                S2.phi[t*(a + 1) + k] += S2.phi[(t - 1)*(a + 1) + k];
+            }
+        }
+    }
+
+    flint_free(S2.s2);
+    flint_free(S2.phi);
+    flint_free(S2.mu_sum);
+    flint_free(mu_lpf);
+
+    /* P2 = sum_{y < p <= s} pi(x/p) - pi(p) + 1 */
+    B = n_prime_pi(s);
+    sum = (x/s == s && n_is_prime(s)) ? B : 0;
+
+    if (zmax > s)
+    {
+        P2.x = x;
+        P2.y = y;
+        P2.s = s;
+        P2.primes = primes;
+        P2.zlo = s + 1;
+        P2.zhi = zmax;
+
+        nblocks = _lmo_num_blocks(&P2.block, zmax - s);
+
+        P2.count = (ulong *) flint_malloc(nblocks*sizeof(ulong));
+        P2.sum = (ulong *) flint_malloc(nblocks*sizeof(ulong));
+        P2.num = (ulong *) flint_malloc(nblocks*sizeof(ulong));
+
+        flint_parallel_for(0, nblocks, 1, _lmo_p2_worker, &P2);
+
+        base = B;
+        for (t = 0; t < nblocks; t++)
+        {
+            sum += P2.sum[t] + P2.num[t]*base;
+            base += P2.count[t];
+        }
+
+        flint_free(P2.count);
+        flint_free(P2.sum);
+        flint_free(P2.num);
+    }
+
+    /* sum_{b = a + 1}^{B} (b - 1) */
+    a2 = (B*(B - 1))/2 - (((ulong) a)*(a - 1))/2;
+    p2 = sum - a2;
+
+    return s1 + s2 + a - 1 - p2;
+}
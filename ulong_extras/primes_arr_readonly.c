@@ -1,5 +1,6 @@
 /*
     Copyright (C) 2013 Fredrik Johansson
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -21,8 +22,10 @@ const mp_limb_t * n_primes_arr_readonly(ulong num_primes)
     if (num_primes < 1)
         return NULL;
 
+    _n_primes_register();
+
     m = FLINT_CLOG2(num_primes);
-    if (m >= _flint_primes_used)
+    if (m >= _FLINT_PRIMES_USED_LOAD())
         n_compute_primes(num_primes);
 
     return _flint_primes[m];
@@ -0,0 +1,73 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#define ulong ulongxx /* interferes with system includes */
+#include <math.h>
+#undef ulong
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+
+/* an increasing approximation to li(x) */
+static double
+_li_approx(double x)
+{
+    double l;
+
+    if (x < 16.0)
+        return x*_li_approx(16.0)/16.0;
+
+    l = log(x);
+
+    return x/l*(1.0 + 1.0/l + 2.0/(l*l));
+}
+
+void
+n_primes_partition(mp_limb_t * bounds, mp_limb_t a, mp_limb_t b, slong parts)
+{
+    double fa, fb, target;
+    mp_limb_t lo, hi, mid;
+    slong i;
+
+    bounds[0] = a;
+    bounds[parts] = b;
+
+    if (b <= a)
+    {
+        for (i = 1; i < parts; i++)
+            bounds[i] = a;
+        return;
+    }
+
+    fa = _li_approx((double) a);
+    fb = _li_approx((double) b);
+
+    for (i = 1; i < parts; i++)
+    {
+        target = fa + (fb - fa)*i/parts;
+
+        /* smallest x in [bounds[i - 1], b] with li(x) >= target */
+        lo = bounds[i - 1];
+        hi = b;
+
+        while (lo < hi)
+        {
+            mid = lo + (hi - lo)/2;
+
+            if (_li_approx((double) mid) < target)
+                lo = mid + 1;
+            else
+                hi = mid;
+        }
+
+        bounds[i] = lo;
+    }
+}
@@ -0,0 +1,125 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <string.h>
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+#include "thread_support.h"
+
+/* odd values per segment; 2^18 bits fit in a 32KB cache */
+#define PRIMES_RANGE_SEGMENT (WORD(1) << 18)
+
+typedef struct
+{
+    mp_limb_t a;                /* first odd value */
+    slong len;                  /* number of odd values */
+    const unsigned int * primes;
+    mp_limb_t bound;
+    mp_ptr * res;               /* per segment */
+    slong * num;                /* per segment */
+}
+_primes_range_struct;
+
+static void
+_primes_range_worker(slong start, slong stop, void * varg)
+{
+    _primes_range_struct * arg = (_primes_range_struct *) varg;
+    mp_ptr sieve, res;
+    mp_limb_t w, a, z;
+    slong i, j, len, nw, num;
+
+    sieve = flint_malloc((PRIMES_RANGE_SEGMENT/FLINT_BITS)*sizeof(mp_limb_t));
+
+    for (i = start; i < stop; i++)
+    {
+        a = arg->a + 2*i*PRIMES_RANGE_SEGMENT;
+        len = FLINT_MIN(PRIMES_RANGE_SEGMENT,
+                                       arg->len - i*PRIMES_RANGE_SEGMENT);
+        nw = (len + FLINT_BITS - 1)/FLINT_BITS;
+
+        n_sieve_odd_bits(sieve, len, a, arg->primes, arg->bound);
+
+        num = mpn_popcount(sieve, nw);
+        res = flint_malloc(FLINT_MAX(num, 1)*sizeof(mp_limb_t));
+
+        for (j = num = 0; j < nw; j++)
+        {
+            for (w = sieve[j]; w != 0; w &= w - 1)
+            {
+                count_trailing_zeros(z, w);
+                res[num++] = a + 2*(j*FLINT_BITS + z);
+            }
+        }
+
+        arg->res[i] = res;
+        arg->num[i] = num;
+    }
+
+    flint_free(sieve);
+}
+
+mp_ptr
+n_primes_range(slong * num, mp_limb_t a, mp_limb_t b)
+{
+    _primes_range_struct arg;
+    n_primes_t iter;
+    mp_ptr res;
+    slong i, nseg, total;
+
+    *num = 0;
+
+    if (a < 2)
+        a = 2;
+
+    if (b <= a)
+        return NULL;
+
+    /* odd values a, a + 2, ... below b */
+    arg.a = a + (a % 2 == 0);
+    arg.len = b > arg.a ? (b - arg.a + 1)/2 : 0;
+
+    n_primes_init(iter);
+    arg.bound = n_sqrt(b - 1) + 1;
+    n_primes_extend_small(iter, arg.bound);
+    arg.primes = iter->small_primes;
+
+    nseg = (arg.len + PRIMES_RANGE_SEGMENT - 1)/PRIMES_RANGE_SEGMENT;
+    arg.res = flint_malloc(FLINT_MAX(nseg, 1)*sizeof(mp_ptr));
+    arg.num = flint_malloc(FLINT_MAX(nseg, 1)*sizeof(slong));
+
+    flint_parallel_for(0, nseg, 1, _primes_range_worker, &arg);
+
+    total = (a == 2);
+    for (i = 0; i < nseg; i++)
+        total += arg.num[i];
+
+    res = flint_malloc(FLINT_MAX(total, 1)*sizeof(mp_limb_t));
+
+    total = 0;
+    if (a == 2)
+        res[total++] = 2;
+
+    for (i = 0; i < nseg; i++)
+    {
+        memcpy(res + total, arg.res[i], arg.num[i]*sizeof(mp_limb_t));
+        total += arg.num[i];
+        flint_free(arg.res[i]);
+    }
+
+    flint_free(arg.res);
+    flint_free(arg.num);
+    n_primes_clear(iter);
+
+    *num = total;
+
+    return res;
+}
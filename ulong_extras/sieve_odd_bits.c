@@ -0,0 +1,101 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+
+/* the odd numbers coprime to 3, 5, 7 and 11 repeat with this period */
+#define WHEEL 1155
+
+#define WHEEL_WORDS (WHEEL/FLINT_BITS + 3)
+
+void
+n_sieve_odd_bits(mp_ptr sieve, slong len, mp_limb_t a,
+    const unsigned int * sieve_primes, mp_limb_t bound)
+{
+    mp_limb_t pat[WHEEL_WORDS], w, p, t;
+    slong i, j, nw, s;
+    ulong k, o;
+    const unsigned int wheel_primes[4] = {3, 5, 7, 11};
+
+    if (len <= 0)
+        return;
+
+    nw = (len + FLINT_BITS - 1)/FLINT_BITS;
+
+    /* bit k of pat is set iff 2k + 1 is coprime to the wheel, extended so
+       that a full word can be read from any offset below WHEEL */
+    for (i = 0; i < WHEEL_WORDS; i++)
+        pat[i] = 0;
+
+    for (k = 0; k < WHEEL + FLINT_BITS; k++)
+    {
+        t = 2*k + 1;
+        if (t % 3 != 0 && t % 5 != 0 && t % 7 != 0 && t % 11 != 0)
+            pat[k/FLINT_BITS] |= UWORD(1) << (k % FLINT_BITS);
+    }
+
+    /* presieve with the wheel */
+    o = ((a - 1)/2) % WHEEL;
+
+    for (i = 0; i < nw; i++)
+    {
+        j = o/FLINT_BITS;
+        s = o % FLINT_BITS;
+
+        w = pat[j] >> s;
+        if (s != 0)
+            w |= pat[j + 1] << (FLINT_BITS - s);
+
+        sieve[i] = w;
+
+        o += FLINT_BITS;
+        if (o >= WHEEL)
+            o -= WHEEL;
+    }
+
+    /* remaining primes, starting from p^2 */
+    for (i = 0; (p = sieve_primes[i]) <= bound; i++)
+    {
+        if (p <= 11)
+            continue;
+
+        t = p*p;
+        if (t >= a)
+        {
+            t = (t - a)/2;
+        }
+        else
+        {
+            t = p - ((a - p)/2) % p;
+            if (t == p)
+                t = 0;
+        }
+
+        for ( ; t < (ulong) len; t += p)
+            sieve[t/FLINT_BITS] &= ~(UWORD(1) << (t % FLINT_BITS));
+    }
+
+    /* the wheel primes themselves, and 1 */
+    for (i = 0; i < 4; i++)
+    {
+        t = wheel_primes[i];
+        if (t >= a && (t - a)/2 < (ulong) len)
+            sieve[(t - a)/2/FLINT_BITS] |= UWORD(1) << (((t - a)/2) % FLINT_BITS);
+    }
+
+    if (a == 1)
+        sieve[0] &= ~UWORD(1);
+
+    if (len % FLINT_BITS != 0)
+        sieve[nw - 1] &= (UWORD(1) << (len % FLINT_BITS)) - 1;
+}
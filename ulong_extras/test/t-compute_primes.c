@@ -1,6 +1,7 @@
 /*
     Copyright (C) 2009 William Hart
     Copyright (C) 2013 Fredrik Johansson
+    Copyright (C) 2021 William Hart
 
     This file is part of FLINT.
 
@@ -15,6 +16,55 @@
 #include <gmp.h>
 #include "flint.h"
 #include "ulong_extras.h"
+#include "thread_support.h"
+#if FLINT_USES_PTHREAD
+#include <pthread.h>
+#endif
+
+typedef struct
+{
+    const mp_limb_t * ref;
+    slong lim;
+    const mp_limb_t ** tables;
+    int fail;
+}
+worker_arg_t;
+
+/* each task grows the shared table and records what it sees */
+static void
+worker(slong start, slong stop, void * varg)
+{
+    worker_arg_t * arg = (worker_arg_t *) varg;
+    slong i, n;
+    const mp_limb_t * primes;
+
+    for (i = start; i < stop; i++)
+    {
+        n = FLINT_MIN((i + 1)*(arg->lim/64), arg->lim);
+        primes = n_primes_arr_readonly(n);
+
+        if (primes[n - 1] != arg->ref[n - 1] || primes[0] != 2)
+            arg->fail = 1;
+
+        arg->tables[i] = n_primes_arr_readonly(arg->lim);
+    }
+}
+
+#if FLINT_USES_PTHREAD && (FLINT_USES_TLS || !FLINT_REENTRANT)
+/* use the table from a thread which then releases its memory */
+static void *
+cleanup_worker(void * varg)
+{
+    slong * lim = (slong *) varg;
+
+    if (n_primes_arr_readonly(*lim)[0] != 2)
+        *lim = 0;
+
+    flint_cleanup();
+
+    return NULL;
+}
+#endif
 
 int main()
 {
@@ -64,6 +114,61 @@ int main()
         }
     }
 
+#if FLINT_USES_PTHREAD && (FLINT_USES_TLS || !FLINT_REENTRANT)
+    /* the table is freed once every thread which used it cleaned up */
+    {
+        pthread_t thread;
+        slong n = lim;
+
+        n_primes_arr_readonly(lim);
+        flint_cleanup();
+
+        if (_flint_primes_used != 0)
+        {
+            flint_printf("FAIL!\n");
+            flint_printf("table not freed by flint_cleanup\n");
+            abort();
+        }
+
+        pthread_create(&thread, NULL, cleanup_worker, &n);
+        pthread_join(thread, NULL);
+
+        if (n != lim || _flint_primes_used != 0)
+        {
+            flint_printf("FAIL!\n");
+            flint_printf("table not freed by flint_cleanup in a thread\n");
+            abort();
+        }
+    }
+#endif
+
+    /* all threads share one table */
+    {
+        worker_arg_t arg;
+        const mp_limb_t * tables[64];
+
+        n_cleanup_primes();
+        flint_set_num_threads(4);
+
+        arg.ref = ref_primes;
+        arg.lim = lim;
+        arg.tables = tables;
+        arg.fail = 0;
+
+        flint_parallel_for(0, 64, 1, worker, &arg);
+
+        for (i = 0; i < 64; i++)
+            if (tables[i] != n_primes_arr_readonly(lim))
+                arg.fail = 1;
+
+        if (arg.fail)
+        {
+            flint_printf("FAIL!\n");
+            flint_printf("threads disagree on the prime table\n");
+            abort();
+        }
+    }
+
     flint_free(ref_primes);
     flint_free(ref_inverses);
     FLINT_TEST_CLEANUP(state);
@@ -0,0 +1,99 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+
+int main(void)
+{
+    int i, j, k, l;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("factor_vec....");
+    fflush(stdout);
+
+    /* compare with n_factor, up to the order of the factors */
+    for (i = 0; i < 10 * flint_test_multiplier(); i++)
+    {
+        slong len = n_randint(state, 500);
+        mp_ptr vec = flint_malloc((len + 1)*sizeof(mp_limb_t));
+        n_factor_t * fac = flint_malloc((len + 1)*sizeof(n_factor_t));
+        n_factor_t f;
+
+        for (j = 0; j < len; j++)
+        {
+            switch (n_randint(state, 4))
+            {
+                case 0:
+                    vec[j] = n_randtest_not_zero(state);
+                    break;
+                case 1:
+                    vec[j] = n_randtest_prime(state, 0)*n_randint(state, 1000);
+                    break;
+                case 2:
+                    vec[j] = n_pow(n_randint(state, 100), n_randint(state, 10));
+                    break;
+                default:
+                    vec[j] = n_randbits(state, n_randint(state, FLINT_BITS) + 1);
+            }
+
+            vec[j] = FLINT_MAX(vec[j], 1);
+
+            n_factor_init(fac + j);
+        }
+
+        flint_set_num_threads(n_randint(state, 4) + 1);
+
+        n_factor_vec(fac, vec, len, n_randint(state, 2));
+
+        for (j = 0; j < len; j++)
+        {
+            n_factor_init(&f);
+            n_factor(&f, vec[j], 0);
+
+            if (f.num != fac[j].num)
+            {
+                flint_printf("FAIL:\n");
+                flint_printf("n = %wu, num = %d, expected %d\n",
+                                                  vec[j], fac[j].num, f.num);
+                fflush(stdout);
+                flint_abort();
+            }
+
+            /* the factors may come out in a different order */
+            for (k = 0; k < f.num; k++)
+            {
+                for (l = 0; l < f.num; l++)
+                    if (f.p[k] == fac[j].p[l])
+                        break;
+
+                if (l == f.num || f.exp[k] != fac[j].exp[l])
+                {
+                    flint_printf("FAIL:\n");
+                    flint_printf("n = %wu, factor %d\n", vec[j], k);
+                    fflush(stdout);
+                    flint_abort();
+                }
+            }
+        }
+
+        flint_free(vec);
+        flint_free(fac);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
@@ -0,0 +1,89 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+
+/* strong pseudoprimes to base 2 */
+mp_limb_t spsp2[] = {
+    UWORD(2047), UWORD(1373653), UWORD(25326001), UWORD(3215031751),
+#if FLINT64
+    UWORD(2152302898747), UWORD(3474749660383), UWORD(341550071728321),
+    UWORD(3825123056546413051)
+#endif
+};
+
+int main(void)
+{
+    int i, j;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("is_prime_vec....");
+    fflush(stdout);
+
+    /* compare with n_is_prime */
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        slong len = n_randint(state, 1000);
+        mp_ptr vec = flint_malloc((len + 1)*sizeof(mp_limb_t));
+        int * res = flint_malloc((len + 1)*sizeof(int));
+        mp_limb_t p, q;
+
+        for (j = 0; j < len; j++)
+        {
+            switch (n_randint(state, 5))
+            {
+                case 0:
+                    vec[j] = n_randtest(state);
+                    break;
+                case 1:
+                    vec[j] = n_randtest_prime(state, 0);
+                    break;
+                case 2:
+                    p = n_randprime(state, n_randint(state, FLINT_BITS/2 - 1) + 2, 0);
+                    q = n_randprime(state, n_randint(state, FLINT_BITS/2 - 1) + 2, 0);
+                    vec[j] = p*q;
+                    break;
+                case 3:
+                    vec[j] = spsp2[n_randint(state, sizeof(spsp2)/sizeof(mp_limb_t))];
+                    break;
+                default:
+                    vec[j] = n_randbits(state, n_randint(state, FLINT_BITS + 1));
+            }
+        }
+
+        flint_set_num_threads(n_randint(state, 4) + 1);
+
+        n_is_prime_vec(res, vec, len);
+
+        for (j = 0; j < len; j++)
+        {
+            if (res[j] != n_is_prime(vec[j]))
+            {
+                flint_printf("FAIL:\n");
+                flint_printf("n = %wu, res = %d\n", vec[j], res[j]);
+                fflush(stdout);
+                flint_abort();
+            }
+        }
+
+        flint_free(vec);
+        flint_free(res);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
@@ -43,6 +43,48 @@ int main(void)
         }
     }
 
+    /* values beyond the cached table */
+    for (n = 0; n < 10 * FLINT_MIN(10, flint_test_multiplier()); n++)
+    {
+        ulong x = n_randint(state, FLINT_PRIME_PI_LMO_CUTOFF << 4) + 1;
+
+        if ((n_prime_pi(x - 1) + 1 == n_prime_pi(x)) != n_is_prime(x))
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("expected pi(%wu) + 1 = pi(%wu)\n", x - 1, x);
+            abort();
+        }
+
+        if (n_prime_pi_lmo(x) != n_prime_pi(x))
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("pi(%wu) = %wu, lmo gives %wu\n", x,
+                                            n_prime_pi(x), n_prime_pi_lmo(x));
+            abort();
+        }
+    }
+
+    {
+        ulong i, pi[] = {5761455, 50847534};
+        ulong nth[] = {15485863, 179424673};
+        ulong x = 100000000;
+        ulong m = 1000000;
+
+        for (i = 0; i < 2; i++, x *= 10, m *= 10)
+        {
+            if (n_prime_pi(x) != pi[i] || n_nth_prime(m) != nth[i] ||
+                n_prime_pi(x - 1) != pi[i])
+            {
+                flint_printf("FAIL:\n");
+                flint_printf("pi(%wu) = %wu, expected %wu\n", x,
+                                                           n_prime_pi(x), pi[i]);
+                flint_printf("p(%wu) = %wu, expected %wu\n", m,
+                                                         n_nth_prime(m), nth[i]);
+                abort();
+            }
+        }
+    }
+
     FLINT_TEST_CLEANUP(state);
     flint_printf("PASS\n");
     return 0;
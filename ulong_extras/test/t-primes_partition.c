@@ -0,0 +1,111 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+
+#define MAX_PARTS 16
+
+int main(void)
+{
+    int i;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("primes_partition....");
+    fflush(stdout);
+
+    /* walking each part with its own iterator gives all primes once */
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        mp_limb_t bounds[MAX_PARTS + 1], a, b, p, q;
+        slong j, parts, num, count[MAX_PARTS], total;
+        n_primes_t iter;
+        mp_ptr res;
+
+        a = n_randint(state, 1000000);
+        b = a + n_randint(state, 1000000);
+        parts = n_randint(state, MAX_PARTS) + 1;
+
+        n_primes_partition(bounds, a, b, parts);
+
+        res = n_primes_range(&num, a, b);
+
+        q = 0;
+        total = 0;
+        for (j = 0; j < parts; j++)
+        {
+            if (bounds[j] > bounds[j + 1])
+            {
+                flint_printf("FAIL:\n");
+                flint_printf("bounds not increasing\n");
+                fflush(stdout);
+                flint_abort();
+            }
+
+            n_primes_init(iter);
+            n_primes_jump_after(iter, bounds[j] == 0 ? 0 : bounds[j] - 1);
+
+            count[j] = 0;
+            while ((p = n_primes_next(iter)) < bounds[j + 1])
+            {
+                if (total >= num || res[total] != p || p <= q)
+                {
+                    flint_printf("FAIL:\n");
+                    flint_printf("a = %wu, b = %wu, part %wd, p = %wu\n",
+                                                                 a, b, j, p);
+                    fflush(stdout);
+                    flint_abort();
+                }
+
+                q = p;
+                total++;
+                count[j]++;
+            }
+
+            n_primes_clear(iter);
+        }
+
+        if (total != num)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("a = %wu, b = %wu, %wd primes, expected %wd\n",
+                                                              a, b, total, num);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        /* parts should be roughly balanced */
+        if (num >= 1000*parts)
+        {
+            for (j = 0; j < parts; j++)
+            {
+                if (count[j] < num/parts/2 || count[j] > 2*num/parts)
+                {
+                    flint_printf("FAIL:\n");
+                    flint_printf("a = %wu, b = %wu, part %wd has %wd of %wd\n",
+                                                        a, b, j, count[j], num);
+                    fflush(stdout);
+                    flint_abort();
+                }
+            }
+        }
+
+        flint_free(res);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}
@@ -0,0 +1,80 @@
+/*
+    Copyright (C) 2021 William Hart
+
+    This file is part of FLINT.
+
+    FLINT is free software: you can redistribute it and/or modify it under
+    the terms of the GNU Lesser General Public License (LGPL) as published
+    by the Free Software Foundation; either version 2.1 of the License, or
+    (at your option) any later version.  See <https://www.gnu.org/licenses/>.
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <gmp.h>
+#include "flint.h"
+#include "ulong_extras.h"
+
+int main(void)
+{
+    int i;
+    FLINT_TEST_INIT(state);
+
+    flint_printf("primes_range....");
+    fflush(stdout);
+
+    /* compare with the prime iterator */
+    for (i = 0; i < 100 * flint_test_multiplier(); i++)
+    {
+        n_primes_t iter;
+        mp_ptr res;
+        mp_limb_t a, b, p;
+        slong j, num;
+
+        if (n_randint(state, 4) == 0)
+            a = n_randint(state, 100);
+        else
+            a = n_randtest_bits(state, n_randint(state, FLINT_BITS/2 + 8) + 1);
+
+        if (n_randint(state, 10) == 0)
+            b = a + n_randint(state, 3000000);
+        else
+            b = a + n_randint(state, 10000);
+
+        flint_set_num_threads(n_randint(state, 5) + 1);
+
+        res = n_primes_range(&num, a, b);
+
+        n_primes_init(iter);
+        n_primes_jump_after(iter, a == 0 ? 0 : a - 1);
+
+        for (j = 0; (p = n_primes_next(iter)) < b; j++)
+        {
+            if (j >= num || res[j] != p)
+            {
+                flint_printf("FAIL:\n");
+                flint_printf("a = %wu, b = %wu, j = %wd, num = %wd, p = %wu\n",
+                                                               a, b, j, num, p);
+                fflush(stdout);
+                flint_abort();
+            }
+        }
+
+        if (j != num)
+        {
+            flint_printf("FAIL:\n");
+            flint_printf("a = %wu, b = %wu, num = %wd, expected %wd\n",
+                                                                 a, b, num, j);
+            fflush(stdout);
+            flint_abort();
+        }
+
+        n_primes_clear(iter);
+        flint_free(res);
+    }
+
+    FLINT_TEST_CLEANUP(state);
+
+    flint_printf("PASS\n");
+    return 0;
+}